@@ -0,0 +1,416 @@
+"""
+Benchmarks for the Minecraft Modlist Exporter.
+
+Generates synthetic mod folders and times scanning, metadata extraction per metadata
+format and each export writer. Results are printed (or written) as JSON so runs of
+different versions can be compared.
+
+Usage:
+    python modlist_bench.py suite [--mods 400] [--seed 1] [--output bench.json]
+    python modlist_bench.py generate DIR [--mods 400] [--seed 1]
+    python modlist_bench.py readers [--classes 20000] [--jars 3] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+import modlist_core as core
+
+# Share of generated JARs per metadata kind (the rest of the weight goes to 'fabric')
+METADATA_KIND_WEIGHTS = (
+    ('fabric', 0.55),
+    ('mcmod', 0.15),
+    ('mods_toml', 0.20),
+    ('plain', 0.05),   # No metadata at all (library JARs)
+    ('corrupt', 0.05), # Not a ZIP archive
+)
+NESTED_FOLDERS = ('', '', '', 'optional', 'disabled', 'client/extra')
+
+
+def _fabric_payload(mod_id, rng):
+    return json.dumps({
+        'schemaVersion': 1,
+        'id': mod_id,
+        'version': f"{rng.randint(0, 5)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}+mc1.20.1",
+        'name': mod_id.replace('_', ' ').title(),
+        'description': "Synthetic benchmark mod. " * rng.randint(1, 8),
+        'authors': [f"author{rng.randint(1, 50)}"],
+        'contact': {
+            'homepage': f"https://modrinth.com/mod/{mod_id}",
+            'sources': f"https://github.com/example/{mod_id}",
+            'issues': f"https://github.com/example/{mod_id}/issues"
+        },
+        'environment': '*',
+        'entrypoints': {'main': [f"com.example.{mod_id}.Main"]},
+        'depends': {'fabricloader': '>=0.14.0', 'minecraft': '~1.20.1', 'fabric-api': '*'},
+        'custom': {'modmenu': {'links': {'modmenu.discord': f"https://discord.gg/{mod_id}"}}}
+    }, indent=2)
+
+
+def _mcmod_payload(mod_id, rng):
+    return json.dumps([{
+        'modid': mod_id,
+        'name': mod_id.replace('_', ' ').title(),
+        'description': "Synthetic legacy Forge mod.",
+        'version': f"1.{rng.randint(0, 12)}.{rng.randint(0, 9)}",
+        'mcversion': '1.12.2',
+        'url': f"https://www.curseforge.com/minecraft/mc-mods/{mod_id}",
+        'authorList': [f"author{rng.randint(1, 50)}"]
+    }], indent=2)
+
+
+def _mods_toml_payload(mod_id, rng):
+    return (
+        'modLoader="javafml"\n'
+        'loaderVersion="[47,)"\n'
+        'license="MIT"\n'
+        f'issueTrackerURL="https://github.com/example/{mod_id}/issues"\n'
+        '[[mods]]\n'
+        f'modId="{mod_id}"\n'
+        f'version="{rng.randint(1, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"\n'
+        f'displayName="{mod_id.replace("_", " ").title()}"\n'
+        f'displayURL="https://www.curseforge.com/minecraft/mc-mods/{mod_id}"\n'
+        "description='''\nSynthetic benchmark Forge mod.\n'''\n"
+        f'[[dependencies.{mod_id}]]\n'
+        'modId="forge"\nmandatory=true\nversionRange="[47,)"\nordering="NONE"\nside="BOTH"\n'
+    )
+
+
+def _write_jar(path, kind, mod_id, class_count, rng):
+    """Writes one synthetic JAR of the given metadata kind."""
+    if kind == 'corrupt':
+        # Truncated ZIP: local header signature followed by garbage, no central directory
+        path.write_bytes(b'PK\x03\x04' + os.urandom(rng.randint(64, 4096)))
+        return
+
+    payload = os.urandom(rng.randint(200, 2000))
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('META-INF/MANIFEST.MF', 'Manifest-Version: 1.0\n')
+        for i in range(class_count):
+            zf.writestr(f"com/example/{mod_id}/pkg{i % 20}/Class{i}.class", payload)
+        if kind == 'fabric':
+            zf.writestr('fabric.mod.json', _fabric_payload(mod_id, rng))
+        elif kind == 'mcmod':
+            zf.writestr('mcmod.info', _mcmod_payload(mod_id, rng))
+        elif kind == 'mods_toml':
+            zf.writestr('META-INF/mods.toml', _mods_toml_payload(mod_id, rng))
+
+
+def generate_mod_folder(root, mod_count=400, seed=1, max_classes=1500):
+    """
+    Creates mod_count synthetic JARs under root, with a mix of metadata formats, varied
+    sizes (log-distributed class counts), a few corrupt archives and nested subfolders.
+    Returns a dict of metadata kind -> list of generated JAR paths.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    kinds = [kind for kind, _ in METADATA_KIND_WEIGHTS]
+    weights = [weight for _, weight in METADATA_KIND_WEIGHTS]
+    generated = {kind: [] for kind in kinds}
+
+    for i in range(mod_count):
+        kind = rng.choices(kinds, weights)[0]
+        mod_id = f"bench_mod_{i:05d}"
+        folder = root / rng.choice(NESTED_FOLDERS)
+        folder.mkdir(parents=True, exist_ok=True)
+        # Most mods are small, a few are huge (like real packs)
+        class_count = min(max_classes, int(rng.lognormvariate(3.5, 1.2)))
+        jar_path = folder / f"{mod_id}-{rng.randint(1, 9)}.{rng.randint(0, 20)}.jar"
+        _write_jar(jar_path, kind, mod_id, class_count, rng)
+        generated[kind].append(jar_path)
+
+    return generated
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _summarize(samples):
+    """Summary statistics (milliseconds) of a list of timings in seconds."""
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'total_ms': sum(samples) * 1000,
+        'mean_ms': statistics.mean(samples) * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'max_ms': max(samples) * 1000
+    }
+
+
+def bench_scan(root, workers, repeat):
+    """Times directory walking and full extraction (uncached, then from a warm cache)."""
+    results = {}
+    walk_times = []
+    extract_times = []
+    for _ in range(repeat):
+        jar_entries, walk_time = _timed(core.find_jar_entries, root)
+        _, extract_time = _timed(core.extract_entries, jar_entries, None, workers)
+        walk_times.append(walk_time)
+        extract_times.append(extract_time)
+    results['jar_count'] = len(jar_entries)
+    results['walk'] = _summarize(walk_times)
+    results['extract_uncached'] = _summarize(extract_times)
+
+    with tempfile.TemporaryDirectory(prefix="modlist-bench-cache-") as cache_dir:
+        cache = core.MetadataCache(Path(cache_dir) / core.METADATA_CACHE_FILENAME)
+        _, cold_time = _timed(core.extract_entries, jar_entries, cache, workers)
+        cache.save()
+        cache = core.MetadataCache(cache.cache_path)
+        _, warm_time = _timed(core.extract_entries, jar_entries, cache, workers)
+    results['extract_cache_cold_ms'] = cold_time * 1000
+    results['extract_cache_warm_ms'] = warm_time * 1000
+    results['workers'] = workers
+    return results
+
+
+def bench_hashing(root, repeat):
+    """Times the hashing stage (all algorithms, then SHA-1 only) and a warm hash cache."""
+    jar_entries = core.find_jar_entries(root)
+    total_bytes = sum(stat_result.st_size for _, _, stat_result in jar_entries)
+    results = {'bytes': total_bytes, 'workers': core.HASH_WORKERS, 'pool_kind': core.HASH_POOL_KIND}
+    for label, algorithms in (('all', core.HASH_ALGORITHMS), ('sha1', ('sha1',))):
+        samples = [_timed(core.hash_entries, jar_entries, None, algorithms=algorithms)[1] for _ in range(repeat)]
+        results[label] = dict(_summarize(samples), mb_per_s=total_bytes / 1e6 / max(min(samples), 1e-9))
+
+    with tempfile.TemporaryDirectory(prefix="modlist-bench-hash-") as cache_dir:
+        cache = core.FileHashCache(Path(cache_dir) / core.HASH_CACHE_FILENAME)
+        core.hash_entries(jar_entries, cache)
+        cache.save()
+        cache = core.FileHashCache(cache.cache_path)
+        _, warm_time = _timed(core.hash_entries, jar_entries, cache)
+    results['cache_warm_ms'] = warm_time * 1000
+    return results
+
+
+def bench_extract_per_format(generated, repeat):
+    """Times extract_mod_info one JAR at a time, grouped by metadata kind."""
+    results = {}
+    for kind, paths in generated.items():
+        samples = []
+        for _ in range(repeat):
+            for path in paths:
+                _, elapsed = _timed(core.extract_mod_info, path, path.name)
+                samples.append(elapsed)
+        results[kind] = _summarize(samples)
+    return results
+
+
+def bench_export_writers(mods, repeat):
+    """Times each report writer on its own (no concurrency) and records output sizes."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="modlist-bench-export-") as export_dir:
+        for name, writer_class in core.REPORT_WRITERS.items():
+            samples = []
+            size = 0
+            for _ in range(repeat):
+                writer = writer_class(Path(export_dir) / f"bench{writer_class.suffix}", export_dir, len(mods))
+                (_, size), elapsed = _timed(writer.run, mods)
+                samples.append(elapsed)
+            results[name] = dict(_summarize(samples), bytes=size)
+
+        _, elapsed = _timed(core.export_reports, mods, export_dir, export_dir, "bench-all")
+        results['export_reports_ms'] = elapsed * 1000
+    return results
+
+
+def bench_records(mods, copies=50):
+    """
+    Compares the memory of plain dict records against ModRecord/ModTable, as loaded from the
+    metadata cache (fresh strings per record), and times sorting the table.
+    """
+    cached = [json.loads(json.dumps(mod.to_dict())) for mod in mods] * copies
+    results = {'records': len(cached)}
+    builders = {
+        'dict': lambda: [dict(data, links=dict(data['links'])) for data in cached],
+        'mod_record': lambda: [core.ModRecord(data) for data in cached],
+        'mod_table': lambda: core.ModTable(cached),
+    }
+    for label, build in builders.items():
+        tracemalloc.start()
+        records, elapsed = _timed(build)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = {'bytes_per_record': current / max(len(cached), 1), 'build_ms': elapsed * 1000}
+        del records
+    table = core.ModTable(cached)
+    _, elapsed = _timed(table.order, 'name')
+    results['table_sort_ms'] = elapsed * 1000
+    return results
+
+
+def bench_search(mods, target=10000, repeat=200):
+    """
+    Builds a ModSearchIndex over the scanned mods repeated up to target records (a
+    multi-instance inventory) and times prefix, fuzzy and faceted queries.
+    """
+    records = [mod.replace(filename=f"{copy}-{mod['filename']}", instances=[f"instance{copy % 20}"])
+               for copy in range(target // max(len(mods), 1) + 1) for mod in mods][:target]
+    index = core.ModSearchIndex()
+    _, build_time = _timed(index.extend, records)
+    _, warm_time = _timed(index.warm)
+    word = next((token for token in sorted(index.postings) if len(token) >= 6 and token.isalpha()), 'mod')
+    queries = {
+        'one_letter': (word[:1], None),
+        'prefix': (word[:3], None),
+        'word': (word, None),
+        'fuzzy': (word[:2] + word[3] + word[2] + word[4:], None),
+        'two_words': (f"{word[:3]} {word[-3:]}", None),
+        'facets': ('', {'loader': 'Fabric', 'links': 'yes'}),
+        'prefix_and_facets': (word[:2], {'loader': 'Forge', 'instance': 'instance3'}),
+    }
+    results = {'records': len(records), 'tokens': len(index.postings), 'build_ms': build_time * 1000,
+               'warm_ms': warm_time * 1000}
+    for label, (query, facets) in queries.items():
+        samples = [_timed(index.search_ids, query, facets)[1] for _ in range(repeat)]
+        results[label] = dict(_summarize(samples), query=query)
+    return results
+
+
+def run_suite(mod_count=400, seed=1, workers=core.SCAN_WORKERS, repeat=3, root=None):
+    """Generates a synthetic mod folder (in a temp dir unless root is given) and runs every benchmark."""
+    with tempfile.TemporaryDirectory(prefix="modlist-bench-") as tmp:
+        root = Path(root) if root else Path(tmp) / "mods"
+        generated, generate_time = _timed(generate_mod_folder, root, mod_count, seed)
+        mods, _ = core.extract_entries(core.find_jar_entries(root))
+        mods.sort(key=lambda x: x['name'].lower())
+
+        return {
+            'app_version': core.APP_VERSION,
+            'extractor_version': core.EXTRACTOR_VERSION,
+            'python': platform.python_version(),
+            'platform': f"{platform.system()} {platform.machine()}",
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'params': {'mods': mod_count, 'seed': seed, 'workers': workers, 'repeat': repeat,
+                       'generated': {kind: len(paths) for kind, paths in generated.items()},
+                       'generate_s': generate_time},
+            'scan': bench_scan(root, workers, repeat),
+            'extract_per_format': bench_extract_per_format(generated, repeat),
+            'hashing': bench_hashing(root, repeat),
+            'export': bench_export_writers(mods, repeat),
+            'records': bench_records(mods),
+            'search': bench_search(mods)
+        }
+
+
+def make_large_jar(path, class_count, class_size=512):
+    """Writes a Fabric mod JAR with class_count dummy class entries and a fabric.mod.json."""
+    metadata = {
+        'schemaVersion': 1,
+        'id': path.stem.lower(),
+        'name': f"Benchmark {path.stem}",
+        'version': '1.0.0',
+        'description': 'Synthetic benchmark mod.',
+        'contact': {'homepage': 'https://example.invalid', 'sources': 'https://example.invalid/src'}
+    }
+    payload = os.urandom(class_size)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('META-INF/MANIFEST.MF', 'Manifest-Version: 1.0\n')
+        for i in range(class_count):
+            zf.writestr(f"com/example/{path.stem}/pkg{i % 100}/Class{i}.class", payload)
+        zf.writestr('fabric.mod.json', json.dumps(metadata))
+    return path
+
+
+def _read_with_zipfile(jar_path):
+    with core.ZipFileJar(jar_path) as jar:
+        return jar.read('fabric.mod.json')
+
+
+def _read_with_central_directory(jar_path):
+    with core.CentralDirectoryJar(jar_path) as jar:
+        return jar.read('fabric.mod.json')
+
+
+def _time_calls(func, jar_paths, repeat):
+    """Returns per-round wall times (seconds) for reading every JAR once."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for jar_path in jar_paths:
+            func(jar_path)
+        rounds.append(time.perf_counter() - start)
+    return rounds
+
+
+def bench_jar_readers(class_count=20000, jar_count=3, repeat=5):
+    """Compares zipfile.ZipFile against CentralDirectoryJar on large synthetic JARs."""
+    with tempfile.TemporaryDirectory(prefix="modlist-bench-") as tmp:
+        jar_paths = [make_large_jar(Path(tmp) / f"bigmod{i}.jar", class_count) for i in range(jar_count)]
+
+        # Both readers must agree before their timings mean anything
+        for jar_path in jar_paths:
+            if _read_with_zipfile(jar_path) != _read_with_central_directory(jar_path):
+                raise RuntimeError(f"Readers disagree on {jar_path.name}")
+
+        results = {}
+        for label, func in (('zipfile', _read_with_zipfile), ('central_directory', _read_with_central_directory)):
+            rounds = _time_calls(func, jar_paths, repeat)
+            results[label] = {
+                'best_s': min(rounds),
+                'median_s': statistics.median(rounds),
+                'per_jar_ms': min(rounds) / jar_count * 1000
+            }
+
+        results['speedup'] = results['zipfile']['best_s'] / max(results['central_directory']['best_s'], 1e-9)
+        results['params'] = {'classes_per_jar': class_count, 'jars': jar_count, 'repeat': repeat,
+                             'jar_size_bytes': jar_paths[0].stat().st_size}
+        return results
+
+
+def _emit(results, output):
+    text = json.dumps(results, indent=4)
+    if output:
+        Path(output).write_text(text + "\n", encoding='utf-8')
+    else:
+        print(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minecraft Modlist Exporter benchmarks")
+    subparsers = parser.add_subparsers(dest='command')
+
+    suite = subparsers.add_parser('suite', help="Generate a synthetic mod folder and time scan, extraction and export")
+    suite.add_argument('--mods', type=int, default=400, help="Number of synthetic JARs")
+    suite.add_argument('--seed', type=int, default=1, help="Random seed (same seed, same folder)")
+    suite.add_argument('--jobs', type=int, default=core.SCAN_WORKERS, help="Extraction workers")
+    suite.add_argument('--repeat', type=int, default=3, help="Timing rounds per benchmark")
+    suite.add_argument('--output', metavar='FILE', help="Write the JSON results to FILE instead of stdout")
+
+    generate = subparsers.add_parser('generate', help="Only generate a synthetic mod folder")
+    generate.add_argument('directory', help="Target folder (created if needed)")
+    generate.add_argument('--mods', type=int, default=400, help="Number of synthetic JARs")
+    generate.add_argument('--seed', type=int, default=1, help="Random seed (same seed, same folder)")
+
+    readers = subparsers.add_parser('readers', help="Compare the JAR metadata readers on large JARs")
+    readers.add_argument('--classes', type=int, default=20000, help="Class entries per synthetic JAR")
+    readers.add_argument('--jars', type=int, default=3, help="Number of synthetic JARs")
+    readers.add_argument('--repeat', type=int, default=5, help="Timing rounds (best is reported)")
+    readers.add_argument('--output', metavar='FILE', help="Write the JSON results to FILE instead of stdout")
+
+    args = parser.parse_args(argv)
+    if args.command == 'suite':
+        _emit(run_suite(args.mods, args.seed, args.jobs, args.repeat), args.output)
+    elif args.command == 'generate':
+        generated = generate_mod_folder(args.directory, args.mods, args.seed)
+        print(json.dumps({kind: len(paths) for kind, paths in generated.items()}))
+    elif args.command == 'readers':
+        _emit(bench_jar_readers(args.classes, args.jars, args.repeat), args.output)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""
+Headless command-line interface for the Minecraft Modlist Exporter.
+
+Uses only the GUI-free core (modlist_core), so it runs on build servers without a
+display or tkinter. Examples:
+
+    python modlist_cli.py --scan ~/.minecraft/mods --format md,json --out ./reports
+    python modlist_cli.py --instances ~/.local/share/PrismLauncher/instances --jobs 8
+    python modlist_cli.py --instances ~/.local/share/PrismLauncher/instances --select "Pack A,Pack B"
+    python modlist_cli.py --scan ./mods --watch
+"""
+import time
+STARTUP_START = time.perf_counter() # Import time is reported in .perf.json (see core.record_startup)
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import modlist_core as core
+core.record_startup('import', STARTUP_START)
+
+
+def parse_formats(value):
+    """Parses a comma-separated --format value ('all' selects every format)."""
+    formats = [f.strip().lower() for f in value.split(',') if f.strip()]
+    if formats == ['all']:
+        return core.REPORT_FORMATS
+    unknown = [f for f in formats if f not in core.REPORT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"unknown format(s): {', '.join(unknown) or '(none)'}; choose from {', '.join(core.REPORT_FORMATS)} or 'all'")
+    return tuple(formats)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="modlist_cli.py",
+        description="Scan Minecraft mod folders and export modlist reports without the GUI.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--scan', metavar='DIR',
+                        help="Mods folder to scan (default: the standard .minecraft/mods folder)")
+    source.add_argument('--instances', metavar='ROOT',
+                        help="Launcher instance root; exports every instance's mods folder plus a combined, "
+                             "deduplicated report set in one batch")
+    source.add_argument('--list-instances', metavar='QUERY', nargs='?', const='',
+                        help="Index the instances of every known launcher and list those matching QUERY")
+    source.add_argument('--history', metavar='MOD',
+                        help="List the recorded version changes of a mod (mod id or name) in every scanned folder")
+    source.add_argument('--running', metavar='MOD[@VERSION]',
+                        help="List the folders whose latest recorded scan contains a mod (optionally that version)")
+    parser.add_argument('--select', metavar='NAMES',
+                        help="With --instances: comma-separated instance folder names to include (default: all)")
+    parser.add_argument('--format', dest='formats', type=parse_formats, default=None,
+                        metavar='LIST', help=f"Comma-separated report formats: {','.join(core.REPORT_FORMATS)} "
+                                             "(default: all; all but deps with --stream)")
+    parser.add_argument('--out', metavar='DIR', default=str(core.DEFAULT_EXPORT_DIR),
+                        help=f"Output directory (default: {core.DEFAULT_EXPORT_DIR})")
+    parser.add_argument('--jobs', type=int, default=core.SCAN_WORKERS, metavar='N',
+                        help=f"Parallel extraction workers (default: {core.SCAN_WORKERS})")
+    parser.add_argument('--processes', action='store_true',
+                        help="Use a process pool instead of threads for extraction")
+    parser.add_argument('--hashes', action='store_true', default=core.SCAN_HASHES_ENABLED,
+                        help="Add SHA-1, SHA-512 and CurseForge fingerprints of every JAR to the reports")
+    parser.add_argument('--nested', action='store_true', default=core.NESTED_JARS_ENABLED,
+                        help="Also list the JARs bundled inside mods (Fabric/Quilt jar-in-jar, Forge jarjar)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Memory-bounded scan for huge trees (with --scan): extraction starts while the folder "
+                             "is still being listed and records are sorted on disk, so memory stays flat "
+                             "(no dependency check, and no 'deps' report unless --format asks for it)")
+    parser.add_argument('--watch', action='store_true',
+                        help="After the scan, keep watching the mods folder and update the reports "
+                             "whenever JARs are added, removed or replaced (Ctrl+C to stop)")
+    parser.add_argument('--watch-history', action='store_true',
+                        help="With --watch: also add every settled change to the scan history "
+                             "(by default only the initial scan is recorded)")
+    parser.add_argument('--enrich', action='store_true', default=core.ENRICH_ENABLED,
+                        help="Look the JARs up on Modrinth and CurseForge (by hash, implies --hashes) to add "
+                             "project links and name/version for JARs without metadata; only with --scan. "
+                             "CurseForge needs the CURSEFORGE_API_KEY environment variable")
+    parser.add_argument('--modrinth-url', metavar='URL',
+                        help="Modrinth API base URL for --enrich (default: https://api.modrinth.com, "
+                             "or $MODLIST_MODRINTH_URL; '' skips Modrinth)")
+    parser.add_argument('--curseforge-url', metavar='URL',
+                        help="CurseForge API base URL for --enrich (default: https://api.curseforge.com, "
+                             "or $MODLIST_CURSEFORGE_URL; '' skips CurseForge)")
+    parser.add_argument('--profile', choices=('cprofile', 'tracemalloc'), default=core.PROFILE_MODE,
+                        help="Capture a cProfile or tracemalloc summary of the scan into the .perf.json report "
+                             "(cprofile runs extraction on one worker, tracemalloc on threads)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignore and don't update the on-disk metadata and hash caches")
+    parser.add_argument('--no-history', action='store_true',
+                        help="Don't add this scan to the scan history (see --history and --running)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only print errors")
+    return parser
+
+
+def scan_directory(directory, workers, pool_kind, cache, hashes=False, hash_cache=None, nested=False, perf=None,
+                   scan_index=None, enrich=None):
+    """
+    Scans one mods folder. Returns (a ModTable sorted by name, timings, wall_time). If a
+    scan_index dict is given, it is filled like core.build_scan_index (for --watch). enrich,
+    if given, is called with the list of records after hashing (see enrich_records).
+    """
+    perf = perf if perf is not None else core.PerfRecorder()
+    start = time.perf_counter()
+    with perf.timer('scan_for_jar_files'):
+        jar_entries = core.find_jar_entries(directory)
+    with perf.timer('extract'):
+        mods, timings = core.extract_entries(jar_entries, cache, workers, pool_kind, nested=nested, perf=perf)
+    if hashes:
+        with perf.timer('hash'):
+            for index, file_hashes in enumerate(core.hash_entries(jar_entries, hash_cache)):
+                if file_hashes is not None:
+                    mods[index] = mods[index].replace(hashes=file_hashes)
+    if enrich is not None:
+        with perf.timer('enrich'):
+            enrich(mods)
+    seen_paths = [path for path, _, _ in jar_entries]
+    if cache is not None:
+        cache.evict_missing(directory, seen_paths)
+    if hash_cache is not None:
+        hash_cache.evict_missing(directory, seen_paths)
+    if scan_index is not None:
+        scan_index.update(core.build_scan_index(jar_entries, mods))
+    mods = core.ModTable(mods)
+    mods.sort('name')
+    return mods, timings, time.perf_counter() - start
+
+
+def run_stream_scan(directory, out_dir, base_filename, args, cache, hash_cache, log):
+    """Scans a huge mods tree through core.stream_scan and exports from the on-disk sort."""
+    workers, pool_kind = core.profiled_pool(args.profile, args.jobs, "process" if args.processes else "thread")
+    perf = core.PerfRecorder()
+    perf.meta.update(mode='stream', workers=workers, pool_kind=pool_kind, nested=args.nested, hashes=args.hashes)
+    algorithms = core.HASH_ALGORITHMS if args.hashes else ()
+    progress = {'jars': 0, 'reported': time.perf_counter()}
+
+    def on_record(mod_data, elapsed):
+        progress['jars'] += 1
+        now = time.perf_counter()
+        if now - progress['reported'] >= 5:
+            progress['reported'] = now
+            log(f"{progress['jars']} JARs scanned...")
+
+    with core.ExternalSorter() as mods:
+        with core.ProfileCapture(args.profile) as capture:
+            with perf.timer('stream'):
+                jars, first_record, wall_time = core.stream_scan(directory, mods, cache, workers, pool_kind,
+                                                                 nested=args.nested, perf=perf, hash_cache=hash_cache,
+                                                                 algorithms=algorithms, on_record=on_record)
+        perf.profile = capture.result
+        perf.meta.update(jars=jars, wall_time=wall_time, first_record=first_record, sort_runs=len(mods.runs))
+        if not args.no_history:
+            warn_history(core.record_scan_history([(mods, directory, None)], perf))
+
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating export directory: {e}", file=sys.stderr)
+            return False
+        timing_info = core.format_stream_timings(jars, first_record, wall_time, workers, pool_kind, len(mods.runs),
+                                                 cache)
+        written, errors, stats = core.export_reports(mods, directory, out_dir, base_filename, args.formats,
+                                                     info_sections=[timing_info], perf=perf)
+    for filename, message in errors:
+        print(f"Error writing file {filename}: {message}", file=sys.stderr)
+    log(f"{directory}: {jars} JARs in {wall_time:.2f}s (first after {first_record or 0:.3f}s)"
+        f" -> {len(written)} files in {out_dir} [{core.format_export_summary(stats)}]")
+    return not errors
+
+
+def enrich_records(mods, remote_cache, args, log):
+    """Looks mods up on Modrinth/CurseForge and replaces the matched records in the list."""
+    import modlist_remote as remote # Only loaded (with asyncio and ssl) when --enrich is used
+    modrinth_url = remote.MODRINTH_API_URL if args.modrinth_url is None else args.modrinth_url
+    curseforge_url = remote.CURSEFORGE_API_URL if args.curseforge_url is None else args.curseforge_url
+    updates, stats = remote.enrich_mods(mods, remote_cache, modrinth_url, curseforge_url, remote.CURSEFORGE_API_KEY)
+    for index, fields in updates.items():
+        mods[index] = mods[index].replace(**fields)
+    if curseforge_url and not remote.CURSEFORGE_API_KEY:
+        log("CurseForge lookups skipped: set CURSEFORGE_API_KEY to enable them.")
+    for message in stats['errors']:
+        print(f"Warning: Remote lookup failed: {message}", file=sys.stderr)
+    log(remote.format_enrich_summary(stats))
+    return stats
+
+
+def run_scan(directory, out_dir, base_filename, args, cache, hash_cache, log, scan_index=None, remote_cache=None):
+    """Scans a mods folder and exports its reports. Returns True on success."""
+    workers, pool_kind = core.profiled_pool(args.profile, args.jobs, "process" if args.processes else "thread")
+    if cache is not None:
+        cache.hits = cache.misses = 0
+
+    perf = core.PerfRecorder()
+    perf.meta.update(mode='scan', workers=workers, pool_kind=pool_kind, nested=args.nested, hashes=args.hashes,
+                     enrich=args.enrich)
+
+    def enrich(records):
+        stats = enrich_records(records, remote_cache, args, log)
+        perf.meta['remote'] = {key: value for key, value in stats.items() if key != 'errors'}
+
+    with core.ProfileCapture(args.profile) as capture:
+        mods, timings, wall_time = scan_directory(directory, workers, pool_kind, cache, args.hashes, hash_cache,
+                                                  args.nested, perf, scan_index,
+                                                  enrich if args.enrich else None)
+    perf.profile = capture.result
+    perf.meta.update(jars=len(mods), wall_time=wall_time)
+    timing_info = core.format_scan_timings(timings, wall_time, workers, pool_kind, cache)
+    if not args.no_history:
+        warn_history(core.record_scan_history([(mods, directory, None)], perf))
+
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Error creating export directory: {e}", file=sys.stderr)
+        return False
+
+    with perf.timer('dependencies'):
+        analysis = core.analyze_dependencies(mods) # Shared with the deps report
+    written, errors, stats = core.export_reports(mods, directory, out_dir, base_filename, args.formats,
+                                                 info_sections=[timing_info], perf=perf, analysis=analysis)
+    for filename, message in errors:
+        print(f"Error writing file {filename}: {message}", file=sys.stderr)
+
+    with_metadata = sum(1 for m in mods if 'Could not extract metadata' not in m['description'])
+    log(f"{directory}: {len(mods)} JARs ({with_metadata} with metadata) in {wall_time:.2f}s"
+        f" -> {len(written)} files in {out_dir} [{core.format_export_summary(stats)}]")
+    if analysis['issues']:
+        log("\n".join(core.format_dependency_lines(analysis)))
+    return not errors
+
+
+def watch_directory(directory, out_dir, base_filename, args, cache, hash_cache, scan_index, log, remote_cache=None):
+    """
+    Re-extracts only the JARs that change in directory and rewrites the reports (same file
+    names) after every change, until interrupted. The folder state after a change is only
+    added to the scan history with --watch-history.
+    """
+    workers, pool_kind = args.jobs, "process" if args.processes else "thread"
+    watcher = core.FolderWatcher(directory)
+    log(f"Watching {directory} ({watcher.mode}). Press Ctrl+C to stop.")
+    try:
+        for changes in watcher.changes():
+            start = time.perf_counter()
+            entries = changes['added'] + changes['changed']
+            mods, _ = core.extract_entries(entries, cache, workers, pool_kind, nested=args.nested)
+            if args.hashes:
+                for index, file_hashes in enumerate(core.hash_entries(entries, hash_cache)):
+                    if file_hashes is not None:
+                        mods[index] = mods[index].replace(hashes=file_hashes)
+            if args.enrich and mods:
+                enrich_records(mods, remote_cache, args, log)
+            core.apply_watch_changes(scan_index, changes, mods)
+
+            all_mods = core.ModTable(record for _, _, record in scan_index.values())
+            all_mods.sort('name')
+            if args.watch_history and not args.no_history:
+                warn_history(core.record_scan_history([(all_mods, directory, None)]))
+            written, errors, _ = core.export_reports(all_mods, directory, out_dir, base_filename, args.formats)
+            for filename, message in errors:
+                print(f"Error writing file {filename}: {message}", file=sys.stderr)
+            seen_paths = [path for path, _, _ in changes['entries']]
+            for file_cache in (cache, hash_cache):
+                if file_cache is not None:
+                    file_cache.evict_missing(directory, seen_paths)
+            for file_cache in (cache, hash_cache, remote_cache):
+                if file_cache is not None:
+                    file_cache.save()
+            log(f"{time.strftime('%H:%M:%S')} {core.format_watch_changes(changes)}: {len(all_mods)} JARs,"
+                f" {len(written)} files updated in {time.perf_counter() - start:.2f}s")
+    except KeyboardInterrupt:
+        watcher.close()
+    return True
+
+
+def warn_history(error):
+    if error:
+        print(f"Warning: {error}", file=sys.stderr)
+
+
+def show_history(mod, log):
+    """Prints the recorded version changes of a mod."""
+    with core.ScanHistory() as history:
+        events = history.mod_history(mod)
+        scans = history.stats()['scans']
+    for line in core.format_history_lines(events):
+        print(line)
+    log(f"{len(events)} changes of {mod} in {scans} recorded scans.")
+    return 0
+
+
+def show_running(query, log):
+    """Prints the folders whose latest recorded scan contains a mod (at a version, with MOD@VERSION)."""
+    mod, _, version = query.partition('@')
+    with core.ScanHistory() as history:
+        results = history.instances_running(mod, version or None)
+    for result in results:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(result['time']))
+        print(f"{result['label']}: {result['version']} ({result['filename']}, scanned {when})\n    {result['instance']}")
+    log(f"{len(results)} folders run {mod}{' ' + version if version else ''}.")
+    return 0
+
+
+def list_indexed_instances(query, log):
+    """Rebuilds the whole-machine instance index and prints the matching instances."""
+    index = core.InstanceIndex()
+    index.load()
+    index.rebuild()
+    index.save()
+    matches = index.search(query)
+    for record in matches:
+        details = ", ".join(filter(None, [record['loader'], record['mc_version'], f"{record['mod_count']} mods"]))
+        print(f"{record['launcher']}: {record['name']} ({details})\n    {record['mods_path']}")
+    log(f"{len(matches)} of {len(index.records)} instances listed.")
+    return 0
+
+
+def run_batch(root, out_dir, base_filename, args, cache, hash_cache, log):
+    """Scans the selected instances of a launcher root as one batch and exports their reports."""
+    instances = core.list_instances(root)
+    if args.select:
+        wanted = [name.strip() for name in args.select.split(',') if name.strip()]
+        missing = [name for name in wanted if name not in instances]
+        if missing:
+            print(f"Error: Instance(s) not found in {root}: {', '.join(missing)}", file=sys.stderr)
+            return False
+        instances = wanted
+    if not instances:
+        print(f"Error: No instances found in {root}.", file=sys.stderr)
+        return False
+
+    selected = []
+    for instance_name in instances:
+        mods_path = root / instance_name / "mods"
+        if not mods_path.is_dir():
+            log(f"Skipping {instance_name}: no mods folder.")
+            continue
+        selected.append((instance_name, mods_path))
+
+    workers, pool_kind = core.profiled_pool(args.profile, args.jobs, "process" if args.processes else "thread")
+    perf = core.PerfRecorder()
+    perf.meta.update(mode='batch', workers=workers, pool_kind=pool_kind, nested=args.nested,
+                     instances=[name for name, _ in selected])
+    with core.ProfileCapture(args.profile) as capture:
+        batch = core.batch_scan(selected, cache, workers, pool_kind, hash_cache, args.nested, perf)
+    perf.profile = capture.result
+    perf.meta.update(jars=batch['total_jars'], unique=len(batch['unique_mods']), wall_time=batch['wall_time'])
+    timing_info = core.format_scan_timings(batch['timings'], batch['wall_time'], workers, pool_kind, cache)
+    if not args.no_history:
+        warn_history(core.record_scan_history(
+            [(instance['mods'], instance['mods_path'], instance['name']) for instance in batch['instances']], perf))
+
+    try:
+        written, errors, stats = core.export_batch(batch, out_dir, base_filename, args.formats,
+                                                   info_sections=[timing_info], perf=perf)
+    except OSError as e:
+        print(f"Error creating export directory: {e}", file=sys.stderr)
+        return False
+    for filename, message in errors:
+        print(f"Error writing file {filename}: {message}", file=sys.stderr)
+
+    unique = len(batch['unique_mods'])
+    log(f"{root}: {len(selected)} instances, {batch['total_jars']} JARs ({unique} unique) in {batch['wall_time']:.2f}s"
+        f" -> {len(written)} files in {out_dir} [combined: {core.format_export_summary(stats)}]")
+    return not errors
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log = (lambda message: None) if args.quiet else print
+    if args.formats is None:
+        # The dependency analysis needs every record, which --stream avoids holding
+        args.formats = tuple(f for f in core.REPORT_FORMATS if f != 'deps') if args.stream else core.REPORT_FORMATS
+
+    if args.select and not args.instances:
+        print("Error: --select requires --instances.", file=sys.stderr)
+        return 2
+    query_mode = args.list_instances is not None or args.history or args.running
+    if args.watch and (args.instances or query_mode):
+        print("Error: --watch only works with a single mods folder (--scan).", file=sys.stderr)
+        return 2
+    if args.enrich and (args.instances or query_mode):
+        print("Error: --enrich only works with a single mods folder (--scan).", file=sys.stderr)
+        return 2
+    if args.stream and (args.instances or query_mode or args.watch or args.enrich):
+        print("Error: --stream only works with a single mods folder (--scan), without --watch or --enrich.",
+              file=sys.stderr)
+        return 2
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1.", file=sys.stderr)
+        return 2
+
+    if args.list_instances is not None:
+        return list_indexed_instances(args.list_instances, log)
+    if args.history or args.running:
+        import sqlite3
+        try:
+            return show_history(args.history, log) if args.history else show_running(args.running, log)
+        except sqlite3.Error as e:
+            print(f"Error: Could not read the scan history: {e}", file=sys.stderr)
+            return 1
+
+    cache = None if args.no_cache or not core.METADATA_CACHE_ENABLED else core.MetadataCache()
+    hash_cache = None if args.no_cache or not core.METADATA_CACHE_ENABLED else core.FileHashCache()
+    remote_cache = None
+    if args.enrich:
+        args.hashes = True # Remote lookups are keyed by SHA-1 and CurseForge fingerprint
+        if not args.no_cache:
+            import modlist_remote as remote
+            remote_cache = remote.ResponseCache()
+    out_dir = Path(args.out).expanduser()
+    base_filename = core.make_base_filename()
+    ok = True
+
+    if args.instances:
+        root = Path(args.instances).expanduser()
+        if not root.is_dir():
+            print(f"Error: Instance root not found at {root}.", file=sys.stderr)
+            return 1
+        ok = run_batch(root, out_dir, base_filename, args, cache, hash_cache, log)
+    else:
+        directory = args.scan or core.find_minecraft_mods_folder()
+        if not directory:
+            print("Error: Could not automatically find the default .minecraft/mods folder. Use --scan DIR.", file=sys.stderr)
+            return 1
+        directory = Path(directory).expanduser()
+        if not directory.is_dir():
+            print(f"Error: Mods directory not found at: {directory}", file=sys.stderr)
+            return 1
+        if args.stream:
+            ok = run_stream_scan(directory, out_dir, base_filename, args, cache, hash_cache, log)
+            for file_cache in (cache, hash_cache):
+                if file_cache is not None:
+                    file_cache.save()
+            return 0 if ok else 1
+        scan_index = {} if args.watch else None
+        ok = run_scan(directory, out_dir, base_filename, args, cache, hash_cache, log, scan_index, remote_cache)
+        if args.watch:
+            for file_cache in (cache, hash_cache, remote_cache):
+                if file_cache is not None:
+                    file_cache.save()
+            ok = watch_directory(directory, out_dir, base_filename, args, cache, hash_cache, scan_index, log,
+                                 remote_cache) and ok
+
+    for file_cache in (cache, hash_cache, remote_cache):
+        if file_cache is not None:
+            file_cache.save()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
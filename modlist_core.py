@@ -0,0 +1,3952 @@
+"""
+Scanning and export core of the Minecraft Modlist Exporter.
+
+Everything here is GUI-free (no tkinter import) so it can be shared by the Tk app in
+modlistexportv3.py and the headless command-line interface in modlist_cli.py.
+"""
+import os
+import json
+from pathlib import Path
+import platform
+import time
+from datetime import datetime
+import zipfile
+import zlib
+import struct
+import threading
+import io
+import array
+import sys
+import re
+import select
+import errno
+import bisect
+import heapq
+import queue
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+# csv, hashlib, pickle, sqlite3, tempfile, tomllib and the process pool (multiprocessing) are
+# imported where they are first needed: most runs never touch several of them, and importing
+# them all up front is a sizeable share of the GUI's and CLI's startup time.
+
+APP_VERSION = "4.5"
+
+# --- Common Launcher Path Definitions ---
+LAUNCHER_PATHS = {
+    "Windows": {
+        "Default Minecraft (.minecraft)": r"%APPDATA%\.minecraft\mods", # Final folder
+        "Prism Launcher (Instances)": r"%APPDATA%\PrismLauncher\instances", # Instance root
+        "MultiMC (Instances)": r"%APPDATA%\MultiMC\instances", # Instance root
+        "Modrinth App (Instances)": r"%APPDATA%\Modrinth\instances", # Instance root
+        "CurseForge (Legacy Overwolf)": r"%APPDATA%\CurseForge\Minecraft\Instances", # Instance root
+        "FTB App (Instances)": r"%APPDATA%\ftblauncher\instances", # Instance root
+        "GDLauncher (Instances)": r"%APPDATA%\gdlauncher\instances", # Instance root
+        "Technic Launcher (Modpacks)": r"%APPDATA%\.technic\modpacks", # Instance root
+        "ATLauncher (Instances)": r"%APPDATA%\ATLauncher\Instances", # Instance root
+    },
+    "Linux": {
+        "Default Minecraft (.minecraft)": "~/.minecraft/mods", # Final folder
+        "Prism Launcher (Instances)": "~/.local/share/PrismLauncher/instances", # Instance root
+        "MultiMC (Instances)": "~/.local/share/multimc/instances", # Instance root
+        "PolyMC (Instances)": "~/.local/share/polymc/instances", # Instance root
+        "Modrinth App (Instances)": "~/.local/share/modrinth-app/instances", # Instance root
+        "GDLauncher / GTK-L (Instances) (1)": "~/.local/share/gdlauncher/instances", # Instance root
+        "GDLauncher / GTK-L (Instances) (2 - Alternative)": "~/gdlauncher/instances", # Instance root
+        "ATLauncher (Instances) (1)": "~/ATLauncher/Instances", # Instance root
+        "ATLauncher (Instances) (2 - Local Share)": "~/.local/share/atlauncher/instances", # Instance root
+        "FTB App (Flatpak/Snap)": "~/.var/app/com.feed-the-beast.ftb-app/data/ftblauncher/instances", # Instance root
+        "XMinecraft Launcher (Instances)": "~/.minecraftx/instances", # Instance root
+    },
+    "Darwin": { # macOS
+        "Default Minecraft": "~/Library/Application Support/minecraft/mods", # Final folder
+        "Prism Launcher (Instances)": "~/Library/Application Support/PrismLauncher/instances", # Instance root
+        "MultiMC (Instances)": "~/Library/Application Support/MultiMC/instances", # Instance root
+        "Modrinth App (Instances)": "~/Library/Application Support/Modrinth/instances", # Instance root
+        "CurseForge (Overwolf)": "~/Library/Application Support/CurseForge/Minecraft/Instances", # Instance root
+        "FTB App (Instances)": "~/Library/Application Support/ftblauncher/instances", # Instance root
+    }
+}
+
+# --- Scan Engine Settings ---
+# Worker pool used to spread extract_mod_info across JARs. Threads work well because
+# zip reading and decompression release the GIL; processes can be used for very large packs.
+SCAN_POOL_KIND = "thread" # "thread" or "process"
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+SLOWEST_FILES_REPORTED = 10
+
+# --- Streaming Scan Settings ---
+# Memory-bounded pipeline for huge trees (walk -> filter -> extract -> sink), see stream_scan
+STREAM_WALK_QUEUE_SIZE = 1024       # Entries buffered between the walker thread and the extractors
+STREAM_IN_FLIGHT_PER_WORKER = 4     # JARs queued on the pool per worker
+STREAM_SORT_RUN_SIZE = 5000         # Records sorted in memory before a run is spilled to disk
+STREAM_CANCEL_POLL_SECONDS = 0.1    # How often a streaming scan waiting on busy workers checks for cancel
+
+# --- Instrumentation Settings ---
+PROFILE_MODE = None     # None, "cprofile" or "tracemalloc" (see ProfileCapture)
+PROFILE_TOP_N = 25      # Functions / allocation sites kept in .perf.json
+PERF_REPORT_ENABLED = True # Write <base>.perf.json next to .info.txt
+
+# --- Metadata Cache Settings ---
+METADATA_CACHE_ENABLED = True
+METADATA_CACHE_VERIFY_HASH = False # Also compare a SHA-1 of the JAR (slower, catches same-size/same-mtime edits)
+METADATA_CACHE_FILENAME = "metadata-cache.jsonl"
+EXTRACTOR_VERSION = 5 # Bump when extract_mod_info output changes so stale cache entries are ignored
+
+# --- Nested JAR Settings ---
+NESTED_JARS_ENABLED = False         # Also scan JARs bundled inside mods (Fabric/Quilt 'jars', Forge jarjar)
+NESTED_JAR_MAX_DEPTH = 2            # Bundled JARs inside bundled JARs are followed this deep
+NESTED_JAR_MAX_BYTES = 32 * 1024 * 1024     # Larger nested JARs are listed but not read
+NESTED_JAR_MEMORY_LIMIT = 64 * 1024 * 1024  # Nested JAR bytes held in memory at once per scanned JAR
+NESTED_RESULT_CACHE_SIZE = 2048     # Parsed nested JARs kept per process, keyed by CRC-32 and size
+JARJAR_METADATA_FILE = 'META-INF/jarjar/metadata.json'
+
+# --- Content Hashing Settings ---
+SCAN_HASHES_ENABLED = False # Optional scan stage: adds a 'hashes' dict to every mod record
+HASH_ALGORITHMS = ('sha1', 'sha512', 'curseforge') # Modrinth lookup keys and the CurseForge fingerprint
+HASH_POOL_KIND = "process"  # The CurseForge fingerprint is pure Python and CPU-bound
+HASH_WORKERS = os.cpu_count() or 1
+HASH_READ_SIZE = 4 * 1024 * 1024
+HASH_CACHE_FILENAME = "hash-cache.jsonl"
+HASH_ENGINE_VERSION = 1
+ENRICH_ENABLED = False      # Optional stage after hashing: Modrinth/CurseForge lookups (see modlist_remote)
+
+# --- Watch Mode Settings ---
+WATCH_USE_INOTIFY = True        # Linux: wake up on inotify events instead of polling
+WATCH_POLL_MIN_SECONDS = 0.5    # Polling interval right after a change...
+WATCH_POLL_MAX_SECONDS = 8.0    # ...doubling up to this while the folder stays unchanged
+WATCH_SETTLE_SECONDS = 0.4      # A change is reported once the listing is stable this long
+WATCH_STOP_CHECK_SECONDS = 0.5  # How often an idle inotify watcher checks its stop event
+
+# --- Search Settings ---
+SEARCH_FUZZY_MIN_LENGTH = 4     # Shorter query words only match as prefixes, never fuzzily
+SEARCH_HEAVY_PREFIX_LENGTH = 3  # Prefixes up to this length...
+SEARCH_HEAVY_PREFIX_TOKENS = 64 # ...matching at least this many tokens keep a precomputed doc set
+
+# --- Scan History Settings ---
+HISTORY_ENABLED = True          # Append every exported scan to the history store
+HISTORY_FILENAME = "scan-history.sqlite3"
+HISTORY_SCHEMA_VERSION = 1
+HISTORY_INSERT_BATCH = 5000     # Records inserted per executemany, so a scan is never held as rows at once
+
+# --- Lightweight JAR Reader ---
+# Metadata files looked up in every JAR. Only these entries are located in the central directory.
+# Filled by register_metadata_parser (see Metadata Parsers).
+JAR_METADATA_FILES = ()
+FAST_JAR_READER_ENABLED = True
+
+# ZIP record layouts (see APPNOTE.TXT)
+_EOCD_SIGNATURE = b'PK\x05\x06'
+_EOCD_STRUCT = struct.Struct('<4s4H2LH')
+_EOCD_MAX_SEARCH = _EOCD_STRUCT.size + 0xFFFF # Record plus the largest possible archive comment
+_CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+_CENTRAL_HEADER_STRUCT = struct.Struct('<4s6H3L5H2L')
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_LOCAL_HEADER_STRUCT = struct.Struct('<4s5H3L2H')
+_ZIP64_MARKER = 0xFFFFFFFF
+
+class UnsupportedJarLayout(Exception):
+    """Raised by CentralDirectoryJar for archives it does not handle (falls back to zipfile)."""
+
+class CentralDirectoryJar:
+    """
+    Minimal read-only JAR reader that locates only the wanted entries.
+
+    It reads the end-of-central-directory record and the central directory in one bulk
+    read, then finds the wanted names with bytes.find() instead of building a ZipInfo for
+    every class file. Only the requested entries are inflated; locate() finds more entries
+    later without another read. jar_path may also be a seekable binary file object (e.g. a
+    nested JAR in memory), which is left open. ZIP64, multi-disk, encrypted or unusually
+    compressed archives raise UnsupportedJarLayout.
+    """
+
+    def __init__(self, jar_path, wanted_names=None):
+        if wanted_names is None:
+            wanted_names = JAR_METADATA_FILES
+        self.jar_path = jar_path
+        self.entries = {}   # name -> (method, crc, compressed_size, size, local_header_offset)
+        self._owns_file = isinstance(jar_path, (str, os.PathLike))
+        self._file = open(jar_path, 'rb') if self._owns_file else jar_path
+        try:
+            self._read_central_directory()
+            self.locate(wanted_names)
+        except Exception:
+            self.close()
+            raise
+
+    def _read_central_directory(self):
+        f = self._file
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        tail_size = min(file_size, _EOCD_MAX_SEARCH)
+        f.seek(file_size - tail_size)
+        tail = f.read(tail_size)
+
+        eocd_pos = tail.rfind(_EOCD_SIGNATURE)
+        if eocd_pos < 0 or eocd_pos + _EOCD_STRUCT.size > len(tail):
+            raise UnsupportedJarLayout("End of central directory not found")
+
+        (_, disk, cd_disk, _, total_entries, cd_size, cd_offset, _) = _EOCD_STRUCT.unpack_from(tail, eocd_pos)
+        if disk != 0 or cd_disk != 0:
+            raise UnsupportedJarLayout("Multi-disk archive")
+        if cd_offset == _ZIP64_MARKER or cd_size == _ZIP64_MARKER or total_entries == 0xFFFF:
+            raise UnsupportedJarLayout("ZIP64 archive")
+
+        # Archives with prepended data (e.g. launcher stubs) shift every recorded offset
+        eocd_offset = file_size - tail_size + eocd_pos
+        self._shift = eocd_offset - cd_size - cd_offset
+        if self._shift < 0:
+            raise UnsupportedJarLayout("Inconsistent central directory offset")
+
+        f.seek(cd_offset + self._shift)
+        self._central_directory = f.read(cd_size)
+        if len(self._central_directory) != cd_size:
+            raise UnsupportedJarLayout("Truncated central directory")
+
+    def locate(self, wanted_names):
+        """Finds more entries in the central directory read when the JAR was opened."""
+        central_directory = self._central_directory
+        header_size = _CENTRAL_HEADER_STRUCT.size
+        for name in wanted_names:
+            if name in self.entries:
+                continue
+            encoded = name.encode('utf-8')
+            pos = central_directory.find(encoded)
+            while pos >= 0:
+                header_pos = pos - header_size
+                if header_pos >= 0 and central_directory.startswith(_CENTRAL_HEADER_SIGNATURE, header_pos):
+                    header = _CENTRAL_HEADER_STRUCT.unpack_from(central_directory, header_pos)
+                    if header[10] == len(encoded):
+                        self._add_entry(name, header)
+                        break
+                pos = central_directory.find(encoded, pos + 1)
+
+    def _add_entry(self, name, header):
+        (_, _, _, flags, method, _, _, crc, compressed_size, size,
+         _, _, _, _, _, _, local_header_offset) = header
+        if flags & 0x1:
+            raise UnsupportedJarLayout("Encrypted entry")
+        if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise UnsupportedJarLayout(f"Compression method {method}")
+        if _ZIP64_MARKER in (compressed_size, size, local_header_offset):
+            raise UnsupportedJarLayout("ZIP64 entry")
+        self.entries[name] = (method, crc, compressed_size, size, local_header_offset)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def entry_info(self, name):
+        """Returns (uncompressed size, CRC-32) of a located entry. Raises KeyError."""
+        _, crc, _, size, _ = self.entries[name]
+        return size, crc
+
+    def read(self, name):
+        """Returns the decompressed bytes of a located entry. Raises KeyError like ZipFile.read."""
+        method, crc, compressed_size, size, local_header_offset = self.entries[name]
+
+        self._file.seek(local_header_offset + self._shift)
+        local_header = self._file.read(_LOCAL_HEADER_STRUCT.size)
+        if len(local_header) != _LOCAL_HEADER_STRUCT.size or not local_header.startswith(_LOCAL_HEADER_SIGNATURE):
+            raise UnsupportedJarLayout("Bad local file header")
+        name_length, extra_length = _LOCAL_HEADER_STRUCT.unpack(local_header)[9:]
+        self._file.seek(name_length + extra_length, os.SEEK_CUR)
+        raw = self._file.read(compressed_size)
+
+        data = raw if method == zipfile.ZIP_STORED else zlib.decompressobj(-zlib.MAX_WBITS).decompress(raw)
+        if len(data) != size or zlib.crc32(data) & 0xFFFFFFFF != crc:
+            raise UnsupportedJarLayout("CRC or size mismatch")
+        return data
+
+    def close(self):
+        self._central_directory = b''
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ZipFileJar:
+    """Fallback with the same interface as CentralDirectoryJar, backed by zipfile.ZipFile."""
+
+    def __init__(self, jar_path, wanted_names=None):
+        if wanted_names is None:
+            wanted_names = JAR_METADATA_FILES
+        self._zf = zipfile.ZipFile(jar_path, 'r')
+        self._all_names = set(self._zf.namelist())
+        self._names = self._all_names & set(wanted_names)
+
+    def locate(self, wanted_names):
+        self._names |= self._all_names & set(wanted_names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def entry_info(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        info = self._zf.getinfo(name)
+        return info.file_size, info.CRC
+
+    def read(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        return self._zf.read(name)
+
+    def close(self):
+        self._zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _FallbackOnReadJar:
+    """Wraps a CentralDirectoryJar and transparently retries reads through zipfile."""
+
+    def __init__(self, jar_path, fast_jar, wanted_names):
+        self._jar_path = jar_path
+        self._wanted_names = wanted_names
+        self._jar = fast_jar
+
+    def __contains__(self, name):
+        return name in self._jar
+
+    def locate(self, wanted_names):
+        self._wanted_names = tuple(self._wanted_names) + tuple(wanted_names)
+        self._jar.locate(wanted_names)
+
+    def entry_info(self, name):
+        return self._jar.entry_info(name)
+
+    def read(self, name):
+        if isinstance(self._jar, CentralDirectoryJar):
+            try:
+                return self._jar.read(name)
+            except (UnsupportedJarLayout, zlib.error):
+                self._jar.close()
+                self._jar = ZipFileJar(self._jar_path, self._wanted_names)
+        return self._jar.read(name)
+
+    def close(self):
+        self._jar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_jar(jar_path, wanted_names=None):
+    """
+    Opens a JAR for reading the wanted metadata entries, using CentralDirectoryJar when
+    possible and zipfile.ZipFile for anything it can't handle. Invalid archives raise
+    zipfile.BadZipFile as before.
+    """
+    if wanted_names is None:
+        wanted_names = JAR_METADATA_FILES
+    if FAST_JAR_READER_ENABLED:
+        try:
+            return _FallbackOnReadJar(jar_path, CentralDirectoryJar(jar_path, wanted_names), wanted_names)
+        except (UnsupportedJarLayout, struct.error):
+            pass # Let zipfile decide whether the archive is valid
+    return ZipFileJar(jar_path, wanted_names)
+
+# --- TOML ---
+_TOML_BARE_KEY_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+_TOML_ESCAPES = {'b': '\b', 't': '\t', 'n': '\n', 'f': '\f', 'r': '\r', '"': '"', '\\': '\\'}
+_TOML_NUMBER = re.compile(r'[+-]?(?:0x[0-9A-Fa-f_]+|0o[0-7_]+|0b[01_]+|inf|nan|[0-9_]+(?:\.[0-9_]+)?(?:[eE][+-]?[0-9_]+)?)')
+_TOML_BARE_VALUE = re.compile(r'[^\s,\]\}#]+') # Dates and times are kept as plain strings
+
+class _MiniTomlParser:
+    """
+    Small TOML reader used when tomllib (Python 3.11+) is unavailable. It covers what mod
+    metadata files use: tables, arrays of tables, dotted keys, all string forms, numbers,
+    booleans, arrays and inline tables. Malformed input raises ValueError.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        line = self.text.count('\n', 0, self.pos) + 1
+        return ValueError(f"Invalid TOML (line {line}): {message}")
+
+    def skip_spaces(self):
+        while self.pos < len(self.text) and self.text[self.pos] in ' \t':
+            self.pos += 1
+
+    def skip_blank(self):
+        """Skips whitespace, newlines and comments (between statements and inside arrays)."""
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if char in ' \t\r\n':
+                self.pos += 1
+            elif char == '#':
+                end = self.text.find('\n', self.pos)
+                self.pos = len(self.text) if end < 0 else end
+            else:
+                break
+
+    def expect(self, token):
+        if not self.text.startswith(token, self.pos):
+            raise self.error(f"expected {token!r}")
+        self.pos += len(token)
+
+    def parse(self):
+        root = {}
+        table = root
+        while True:
+            self.skip_blank()
+            if self.pos >= len(self.text):
+                return root
+            if self.text.startswith('[[', self.pos):
+                self.pos += 2
+                keys = self.parse_key()
+                self.expect(']]')
+                table = self.open_table(root, keys, array=True)
+            elif self.text.startswith('[', self.pos):
+                self.pos += 1
+                keys = self.parse_key()
+                self.expect(']')
+                table = self.open_table(root, keys, array=False)
+            else:
+                keys = self.parse_key()
+                self.expect('=')
+                self.skip_spaces()
+                self.assign(table, keys, self.parse_value())
+            # Only a comment may follow on the same line
+            self.skip_spaces()
+            if self.pos < len(self.text) and self.text[self.pos] not in '#\r\n':
+                raise self.error("expected end of line")
+
+    def parse_key(self):
+        keys = []
+        while True:
+            self.skip_spaces()
+            char = self.text[self.pos:self.pos + 1]
+            if char in ('"', "'"):
+                keys.append(self.parse_string())
+            else:
+                start = self.pos
+                while self.pos < len(self.text) and self.text[self.pos] in _TOML_BARE_KEY_CHARS:
+                    self.pos += 1
+                if start == self.pos:
+                    raise self.error("expected a key")
+                keys.append(self.text[start:self.pos])
+            self.skip_spaces()
+            if not self.text.startswith('.', self.pos):
+                return keys
+            self.pos += 1
+
+    def open_table(self, root, keys, array):
+        table = root
+        for key in keys[:-1]:
+            table = table.setdefault(key, {})
+            if isinstance(table, list):
+                table = table[-1]
+            if not isinstance(table, dict):
+                raise self.error(f"{key!r} is not a table")
+        last = keys[-1]
+        if array:
+            tables = table.setdefault(last, [])
+            if not isinstance(tables, list):
+                raise self.error(f"{last!r} is not an array of tables")
+            tables.append({})
+            return tables[-1]
+        table = table.setdefault(last, {})
+        if isinstance(table, list):
+            table = table[-1]
+        if not isinstance(table, dict):
+            raise self.error(f"{last!r} is not a table")
+        return table
+
+    def assign(self, table, keys, value):
+        for key in keys[:-1]:
+            table = table.setdefault(key, {})
+            if not isinstance(table, dict):
+                raise self.error(f"{key!r} is not a table")
+        if keys[-1] in table:
+            raise self.error(f"duplicate key {keys[-1]!r}")
+        table[keys[-1]] = value
+
+    def parse_value(self):
+        text, pos = self.text, self.pos
+        char = text[pos:pos + 1]
+        if char in ('"', "'"):
+            return self.parse_string()
+        if char == '[':
+            self.pos += 1
+            items = []
+            while True:
+                self.skip_blank()
+                if text.startswith(']', self.pos):
+                    self.pos += 1
+                    return items
+                items.append(self.parse_value())
+                self.skip_blank()
+                if text.startswith(',', self.pos):
+                    self.pos += 1
+                elif not text.startswith(']', self.pos):
+                    raise self.error("expected ',' or ']' in array")
+        if char == '{':
+            self.pos += 1
+            table = {}
+            self.skip_spaces()
+            if text.startswith('}', self.pos):
+                self.pos += 1
+                return table
+            while True:
+                keys = self.parse_key()
+                self.expect('=')
+                self.skip_spaces()
+                self.assign(table, keys, self.parse_value())
+                self.skip_spaces()
+                if text.startswith('}', self.pos):
+                    self.pos += 1
+                    return table
+                self.expect(',')
+        for word, value in (('true', True), ('false', False)):
+            if text.startswith(word, pos):
+                self.pos += len(word)
+                return value
+
+        match = _TOML_BARE_VALUE.match(text, pos)
+        if not match:
+            raise self.error("expected a value")
+        token = match.group()
+        self.pos = match.end()
+        if _TOML_NUMBER.fullmatch(token):
+            digits = token.replace('_', '')
+            if digits.lstrip('+-')[:2] in ('0x', '0o', '0b'):
+                return int(digits, 0)
+            if any(c in digits for c in '.eEn') or digits.lstrip('+-') == 'inf':
+                return float(digits)
+            return int(digits)
+        return token
+
+    def parse_string(self):
+        text = self.text
+        for quote in ('"""', "'''", '"', "'"):
+            if text.startswith(quote, self.pos):
+                break
+        self.pos += len(quote)
+        multiline = len(quote) == 3
+        if multiline and text.startswith('\n', self.pos):
+            self.pos += 1
+        elif multiline and text.startswith('\r\n', self.pos):
+            self.pos += 2
+
+        if quote[0] == "'":
+            end = text.find(quote, self.pos)
+            if end < 0 or (not multiline and '\n' in text[self.pos:end]):
+                raise self.error("unterminated string")
+            value = text[self.pos:end]
+            self.pos = end + len(quote)
+            return value
+
+        parts = []
+        while True:
+            if self.pos >= len(text) or (not multiline and text[self.pos] == '\n'):
+                raise self.error("unterminated string")
+            if text.startswith(quote, self.pos):
+                self.pos += len(quote)
+                return ''.join(parts)
+            char = text[self.pos]
+            if char != '\\':
+                parts.append(char)
+                self.pos += 1
+                continue
+            escape = text[self.pos + 1:self.pos + 2]
+            if escape in _TOML_ESCAPES:
+                parts.append(_TOML_ESCAPES[escape])
+                self.pos += 2
+            elif escape in ('u', 'U'):
+                width = 4 if escape == 'u' else 8
+                digits = text[self.pos + 2:self.pos + 2 + width]
+                try:
+                    parts.append(chr(int(digits, 16)))
+                except ValueError:
+                    raise self.error("invalid unicode escape")
+                self.pos += 2 + width
+            elif multiline and escape in (' ', '\t', '\r', '\n'):
+                # Line-ending backslash: drop the newline and the following indentation
+                self.pos += 1
+                while self.pos < len(text) and text[self.pos] in ' \t\r\n':
+                    self.pos += 1
+            else:
+                raise self.error(f"invalid escape '\\{escape}'")
+
+def parse_toml(text):
+    """Parses a TOML document with tomllib when available, otherwise with _MiniTomlParser."""
+    try:
+        import tomllib # Python 3.11+
+    except ImportError:
+        return _MiniTomlParser(text).parse()
+    return tomllib.loads(text)
+
+# --- Metadata Parsers ---
+# (priority, entry name, parse function); lower priorities are tried first
+METADATA_PARSERS = []
+# Entries parsers may read besides their own file. Located in the same central directory pass.
+JAR_AUXILIARY_FILES = ('META-INF/MANIFEST.MF', JARJAR_METADATA_FILE)
+
+def register_metadata_parser(entry_name, parse, priority=100):
+    """
+    Adds a metadata format. parse(data, jar) receives the raw bytes of entry_name and the open
+    JAR (for JAR_AUXILIARY_FILES) and returns a dict with any of 'name', 'version',
+    'description', 'links', 'loader', 'mod_id', 'provides', 'dependencies' (see
+    analyze_dependencies) and 'jars' (bundled JAR paths), or None to let the next format try. ValueError,
+    KeyError, IndexError, TypeError and AttributeError also pass on to the next format.
+
+    Every registered entry is located in the single central directory read per JAR, so new
+    formats don't add archive opens. Register at import time so process-pool workers see it.
+    """
+    global JAR_METADATA_FILES
+    METADATA_PARSERS.append((priority, entry_name, parse))
+    METADATA_PARSERS.sort(key=lambda p: p[0])
+    names = [name for _, name, _ in METADATA_PARSERS] + list(JAR_AUXILIARY_FILES)
+    JAR_METADATA_FILES = tuple(dict.fromkeys(names))
+
+def _read_manifest_attribute(jar, attribute):
+    """Returns a main-section attribute of META-INF/MANIFEST.MF, or None."""
+    try:
+        manifest = jar.read('META-INF/MANIFEST.MF').decode('utf-8', 'replace')
+    except KeyError:
+        return None
+    lines = []
+    for line in manifest.splitlines():
+        if not line:
+            break # End of the main section
+        if line.startswith(' ') and lines:
+            lines[-1] += line[1:] # Continuation line
+        else:
+            lines.append(line)
+    prefix = attribute.lower() + ':'
+    for line in lines:
+        if line.lower().startswith(prefix):
+            return line[len(prefix):].strip()
+    return None
+
+def _version_list(versions):
+    """Normalizes a Fabric/Quilt version requirement (string, list, or Quilt any/all object) to a list."""
+    if isinstance(versions, str):
+        return [versions]
+    if isinstance(versions, dict):
+        if 'all' in versions:
+            return [' '.join(v for v in versions['all'] if isinstance(v, str))]
+        versions = versions.get('any', [])
+    return [v for v in versions if isinstance(v, str)] if isinstance(versions, list) else ['*']
+
+def _author_list(value):
+    """
+    Normalizes the author fields of the metadata formats to a list of names (or None):
+    a comma-separated string (mods.toml), a list of names or {'name': ...} objects
+    (fabric.mod.json, mcmod.info) or a name -> role mapping (quilt.mod.json contributors).
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    elif isinstance(value, dict):
+        value = list(value)
+    elif not isinstance(value, list):
+        return None
+    names = []
+    for entry in value:
+        if isinstance(entry, dict):
+            entry = entry.get('name')
+        if isinstance(entry, str) and entry.strip():
+            names.append(entry.strip())
+    return names or None
+
+def _fabric_dependencies(data):
+    dependencies = []
+    for kind in ('depends', 'recommends', 'breaks', 'conflicts'):
+        entries = data.get(kind) or {}
+        if isinstance(entries, dict):
+            for mod_id, versions in entries.items():
+                dependencies.append({'id': mod_id, 'kind': kind, 'versions': _version_list(versions), 'syntax': 'fabric'})
+    return dependencies
+
+def _quilt_dependencies(loader_data):
+    dependencies = []
+    for kind in ('depends', 'breaks'):
+        for entry in loader_data.get(kind, []):
+            if isinstance(entry, str):
+                entry = {'id': entry}
+            if not isinstance(entry, dict) or not isinstance(entry.get('id'), str):
+                continue # Nested any-of groups are not checked
+            entry_kind = 'recommends' if kind == 'depends' and entry.get('optional') else kind
+            dependencies.append({'id': entry['id'].split(':')[-1], 'kind': entry_kind,
+                                 'versions': _version_list(entry.get('versions', '*')), 'syntax': 'fabric'})
+    return dependencies
+
+def _mods_toml_dependencies(document, mod_id):
+    dependencies = []
+    kinds = {'required': 'depends', 'optional': 'optional', 'incompatible': 'breaks', 'discouraged': 'conflicts'}
+    entries = document.get('dependencies', {}).get(mod_id, [])
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or not entry.get('modId'):
+            continue
+        if 'type' in entry:
+            kind = kinds.get(str(entry['type']).lower(), 'optional') # NeoForge
+        else:
+            kind = 'depends' if entry.get('mandatory', False) else 'optional'
+        range_spec = entry.get('versionRange')
+        dependencies.append({'id': entry['modId'], 'kind': kind,
+                             'versions': [range_spec] if isinstance(range_spec, str) else [], 'syntax': 'maven'})
+    return dependencies
+
+def _parse_fabric_mod_json(data, jar):
+    data = json.loads(data.decode('utf-8'), strict=False)
+
+    links = {
+        'Homepage': data.get('contact', {}).get('homepage'),
+        'Sources': data.get('contact', {}).get('sources'),
+        'Issues': data.get('contact', {}).get('issues')
+    }
+
+    modmenu_links = data.get('custom', {}).get('modmenu', {}).get('links', {})
+    for key, url in modmenu_links.items():
+        clean_key = key.replace('modmenu.', '').replace('_', ' ').title()
+        links[clean_key] = url
+
+    return {
+        'name': data.get('name'),
+        'version': data.get('version'),
+        'description': data.get('description', 'No description provided.'),
+        'links': {k: v for k, v in links.items() if v and v.strip()},
+        'loader': 'Fabric',
+        'mod_id': data.get('id'),
+        'authors': _author_list(data.get('authors')),
+        'provides': data.get('provides', []),
+        'dependencies': _fabric_dependencies(data),
+        'jars': [entry.get('file') for entry in data.get('jars', []) if isinstance(entry, dict)]
+    }
+
+def _parse_quilt_mod_json(data, jar):
+    loader_data = json.loads(data.decode('utf-8'), strict=False)['quilt_loader']
+    metadata = loader_data.get('metadata', {})
+    contact = metadata.get('contact', {})
+    links = {'Homepage': contact.get('homepage'), 'Sources': contact.get('sources'), 'Issues': contact.get('issues')}
+
+    return {
+        'name': metadata.get('name') or loader_data.get('id'),
+        'version': loader_data.get('version'),
+        'description': metadata.get('description', 'No description provided.'),
+        'links': {k: v for k, v in links.items() if v and v.strip()},
+        'loader': 'Quilt',
+        'mod_id': loader_data.get('id'),
+        'authors': _author_list(metadata.get('contributors')),
+        'provides': [p if isinstance(p, str) else p.get('id') for p in loader_data.get('provides', [])],
+        'dependencies': _quilt_dependencies(loader_data),
+        'jars': loader_data.get('jars', [])
+    }
+
+def _parse_mods_toml(data, jar, loader):
+    document = parse_toml(data.decode('utf-8'))
+    mod = document['mods'][0] # The first [[mods]] entry describes the JAR
+
+    version = mod.get('version')
+    if version and '${file.jarVersion}' in version:
+        jar_version = _read_manifest_attribute(jar, 'Implementation-Version')
+        version = version.replace('${file.jarVersion}', jar_version) if jar_version else None
+
+    links = {'Homepage': mod.get('displayURL'), 'Issues': document.get('issueTrackerURL')}
+
+    return {
+        'name': mod.get('displayName') or mod.get('modId'),
+        'version': version,
+        'description': (mod.get('description') or '').strip() or f'{loader} mod metadata found (mods.toml).',
+        'links': {k: v for k, v in links.items() if isinstance(v, str) and v.strip()},
+        'loader': loader,
+        'mod_id': mod.get('modId'),
+        'authors': _author_list(mod.get('authors') or document.get('authors')),
+        'dependencies': _mods_toml_dependencies(document, mod.get('modId'))
+    }
+
+def _parse_forge_mods_toml(data, jar):
+    return _parse_mods_toml(data, jar, 'Forge')
+
+def _parse_neoforge_mods_toml(data, jar):
+    return _parse_mods_toml(data, jar, 'NeoForge')
+
+def _parse_mcmod_info(data, jar):
+    # mcmod.info is usually an array, containing one mod entry
+    data = json.loads(data.decode('utf-8'), strict=False)
+    if isinstance(data, dict):
+        data = data['modList'] # Version 2 layout
+    data = data[0]
+
+    links = {}
+    if data.get('url'): links['Homepage'] = data['url']
+
+    return {
+        'name': data.get('name'),
+        'version': data.get('version'),
+        'description': data.get('description', 'Forge mod metadata found (mcmod.info).'),
+        'links': links,
+        'loader': 'Forge',
+        'mod_id': data.get('modid'),
+        'authors': _author_list(data.get('authorList') or data.get('authors'))
+    }
+
+# Fabric first: JARs shipping both Fabric and Quilt metadata keep being reported as Fabric
+register_metadata_parser('fabric.mod.json', _parse_fabric_mod_json, priority=10)
+register_metadata_parser('quilt.mod.json', _parse_quilt_mod_json, priority=20)
+register_metadata_parser('META-INF/neoforge.mods.toml', _parse_neoforge_mods_toml, priority=30)
+register_metadata_parser('META-INF/mods.toml', _parse_forge_mods_toml, priority=40)
+register_metadata_parser('mcmod.info', _parse_mcmod_info, priority=50)
+
+# --- Mod Records ---
+# Strings repeated across thousands of records are stored once (see ModRecord)
+_SHARED_STRINGS = {}
+
+def _shared(value):
+    """Returns the shared copy of a common string (link keys, loaders, fallback descriptions)."""
+    if type(value) is not str:
+        return value
+    return _SHARED_STRINGS.setdefault(value, sys.intern(value))
+
+for _text in ('N/A', 'Unknown', 'Fabric', 'Quilt', 'Forge', 'NeoForge', 'No description provided.',
+              'Could not extract metadata (Not a Fabric/Forge/Quilt mod, or JSON invalid).',
+              'Not a valid JAR/ZIP file.', 'Bundled library (jarjar).',
+              'Forge mod metadata found (mcmod.info).', 'Forge mod metadata found (mods.toml).',
+              'NeoForge mod metadata found (mods.toml).'):
+    _shared(_text)
+
+class ModRecord:
+    """
+    One scanned JAR. Reads like the dict records it replaces (mod['name'], mod.get(),
+    'hashes' in mod, dict(mod)) but keeps the fields in slots and shares the strings that
+    repeat across records: link keys, loaders and the descriptions in _SHARED_STRINGS.
+    Keys are listed in slot order; any other key lives in _extra. to_dict() gives the plain
+    dict used by the metadata cache.
+    """
+    __slots__ = ('filename', 'name', 'version', 'description', 'links', 'loader', 'size', 'mod_id', 'authors',
+                 'provides', 'dependencies', 'nested', 'hashes', 'instances', 'path', 'parent', 'depth', '_extra')
+    FIELDS = __slots__[:-1]
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, data=(), **fields):
+        self._extra = None
+        for key, value in dict(data, **fields).items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a record from a dict (a parser result or a cache entry); nested records are converted too."""
+        return data if isinstance(data, cls) else cls(data)
+
+    def __setitem__(self, key, value):
+        if key == 'links':
+            value = {_shared(k): v for k, v in value.items()}
+        elif key == 'nested':
+            value = [ModRecord.from_dict(record) for record in value]
+        elif key in ('version', 'loader', 'description'):
+            value = _SHARED_STRINGS.get(value, value) if type(value) is str else value
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __delitem__(self, key):
+        try:
+            if key in self._FIELD_SET:
+                delattr(self, key)
+            else:
+                del self._extra[key]
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        keys = [name for name in self.FIELDS if hasattr(self, name)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __eq__(self, other):
+        if isinstance(other, (ModRecord, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ModRecord({dict(self.items())!r})"
+
+    def replace(self, **changes):
+        """Returns a copy with some fields changed; the field values themselves are shared."""
+        return ModRecord(self.items(), **changes)
+
+    def to_dict(self):
+        """Plain dict (in key order) for JSON output and the metadata cache."""
+        data = dict(self.items())
+        if 'nested' in data:
+            data['nested'] = [record.to_dict() for record in data['nested']]
+        return data
+
+def _json_default(value):
+    """json.dump(default=...) hook so reports can serialize ModRecords directly."""
+    if isinstance(value, ModRecord):
+        return dict(value.items())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class ModTable:
+    """
+    Columnar store of ModRecords for large (combined multi-instance) inventories. Besides
+    the records it keeps one list per COLUMNS entry, so sorting and filtering touch those
+    plain lists instead of every record. Iterates, indexes and len()s like a list of
+    records, so the export writers and the results view work on it directly.
+    """
+    COLUMNS = ('filename', 'name', 'version', 'loader', 'size')
+
+    def __init__(self, records=()):
+        self.records = []
+        self.columns = {column: [] for column in self.COLUMNS}
+        self.extend(records)
+
+    def append(self, record):
+        record = ModRecord.from_dict(record)
+        self.records.append(record)
+        for column, values in self.columns.items():
+            values.append(record.get(column))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def remove(self, record):
+        """Removes a record (the same object, not an equal one)."""
+        for index, candidate in enumerate(self.records):
+            if candidate is record:
+                del self.records[index]
+                for values in self.columns.values():
+                    del values[index]
+                return
+        raise ValueError("record not in table")
+
+    def refresh(self):
+        """Re-reads the columns after records were changed in place (e.g. by remote enrichment)."""
+        self.columns = {column: [record.get(column) for record in self.records] for column in self.COLUMNS}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __setitem__(self, index, record):
+        """Puts another record (e.g. a record.replace() copy) at index."""
+        record = ModRecord.from_dict(record)
+        self.records[index] = record
+        for column, values in self.columns.items():
+            values[index] = record.get(column)
+
+    def copy(self):
+        """Snapshot sharing the records (e.g. for a background export)."""
+        table = ModTable()
+        table.records = list(self.records)
+        table.columns = {column: list(values) for column, values in self.columns.items()}
+        return table
+
+    def _sort_key(self, column):
+        values = self.columns[column]
+        if column == 'size':
+            return lambda i: values[i] or 0
+        return lambda i: str(values[i] if values[i] is not None else '').lower()
+
+    def order(self, column='name', descending=False):
+        """Record indices sorted by one column (strings case-insensitively)."""
+        return sorted(range(len(self.records)), key=self._sort_key(column), reverse=descending)
+
+    def sorted(self, column='name', descending=False):
+        """The records sorted by one column, as a list."""
+        return [self.records[i] for i in self.order(column, descending)]
+
+    def sort(self, column='name', descending=False):
+        """Sorts the table in place by one column."""
+        order = self.order(column, descending)
+        self.records = [self.records[i] for i in order]
+        self.columns = {name: [values[i] for i in order] for name, values in self.columns.items()}
+
+    def where(self, column, predicate):
+        """Indices of the records whose column value satisfies predicate."""
+        return [i for i, value in enumerate(self.columns[column]) if predicate(value)]
+
+    def search(self, text, columns=('name', 'filename')):
+        """Records whose columns contain text (case-insensitive), in table order."""
+        text = text.lower()
+        matches = set()
+        for column in columns:
+            matches.update(self.where(column, lambda value: value is not None and text in str(value).lower()))
+        return [self.records[i] for i in sorted(matches)]
+
+# --- Search Index ---
+_SEARCH_TOKEN = re.compile(r'[a-z0-9]+')
+
+def _mc_version_facet(record):
+    """Minecraft minor version a mod declares ('1.20'), 'any' for an open range, 'unknown' if none."""
+    for dependency in record.get('dependencies') or ():
+        if dependency.get('id') == 'minecraft':
+            match = re.search(r'1\.\d+', ' '.join(dependency.get('versions') or ()))
+            return match.group(0) if match else 'any'
+    return 'unknown'
+
+class ModSearchIndex:
+    """
+    Inverted index over scanned mods for the results filter: name, filename, mod id,
+    description, authors and link domains are split into lowercase word tokens. Records are
+    added as they arrive (and removed again by watch mode).
+
+    search() matches every query word as a prefix of some token; a word without any prefix
+    match falls back to tokens one edit away (insert, delete, substitute or swap) through a
+    symmetric-delete table built on the first fuzzy lookup. Facets (see FACETS) narrow the
+    result with exact values.
+
+    Short prefixes shared by many tokens ('m', 'mo', 'mod' with thousands of mod ids) are
+    the expensive case, so their doc sets are kept up to date once computed; warm() builds
+    them all after a scan so every later query stays well under a millisecond.
+    """
+    FACETS = ('loader', 'mc', 'links', 'fallback', 'instance')
+
+    def __init__(self):
+        self.records = []       # doc id -> record, None once removed
+        self.postings = {}      # token -> set of doc ids
+        self.facets = {facet: {} for facet in self.FACETS} # facet -> value -> set of doc ids
+        self._doc_ids = {}      # id(record) -> doc id
+        self._doc_keys = []     # doc id -> (tokens, facet pairs), for remove()
+        self._vocabulary = []   # Sorted tokens, for prefix lookups
+        self._deletes = None    # One-deletion variant -> tokens (fuzzy lookups)
+        self._heavy = {}        # Short prefix matching many tokens -> doc ids, kept current
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    @staticmethod
+    def tokens(record):
+        """The set of search tokens of a record."""
+        parts = [str(record.get(field) or '') for field in ('name', 'mod_id', 'description')]
+        parts.append(os.path.splitext(record.get('filename') or '')[0])
+        parts.extend(record.get('authors') or ())
+        for url in (record.get('links') or {}).values():
+            parts.append(urlsplit(url).netloc)
+        return set(_SEARCH_TOKEN.findall(' '.join(parts).lower()))
+
+    @staticmethod
+    def facet_values(record):
+        """(facet, value) pairs of a record."""
+        fallback = record.get('loader') == 'Unknown' and not record.get('mod_id')
+        pairs = [('loader', record.get('loader') or 'Unknown'), ('mc', _mc_version_facet(record)),
+                 ('links', 'yes' if record.get('links') else 'no'), ('fallback', 'yes' if fallback else 'no')]
+        pairs.extend(('instance', name) for name in record.get('instances') or ())
+        return pairs
+
+    @staticmethod
+    def _variants(token):
+        return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+    def add(self, record):
+        """Indexes a record (once; adding the same object again is a no-op)."""
+        if id(record) in self._doc_ids:
+            return
+        doc = len(self.records)
+        self.records.append(record)
+        self._doc_ids[id(record)] = doc
+        tokens = tuple(self.tokens(record))
+        heavy = self._heavy
+        for token in tokens:
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = set()
+                bisect.insort(self._vocabulary, token)
+                if self._deletes is not None:
+                    for variant in self._variants(token):
+                        self._deletes.setdefault(variant, set()).add(token)
+            docs.add(doc)
+            if heavy:
+                for length in range(1, SEARCH_HEAVY_PREFIX_LENGTH + 1):
+                    prefix_docs = heavy.get(token[:length])
+                    if prefix_docs is not None:
+                        prefix_docs.add(doc)
+        pairs = self.facet_values(record)
+        for facet, value in pairs:
+            self.facets[facet].setdefault(value, set()).add(doc)
+        self._doc_keys.append((tokens, pairs))
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def remove(self, record):
+        """Drops a record from the index. Returns False if it wasn't indexed."""
+        doc = self._doc_ids.pop(id(record), None)
+        if doc is None:
+            return False
+        tokens, pairs = self._doc_keys[doc]
+        for token in tokens:
+            docs = self.postings[token]
+            docs.discard(doc)
+            if not docs:
+                del self.postings[token] # Stale _deletes entries are skipped at lookup
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+            for length in range(1, SEARCH_HEAVY_PREFIX_LENGTH + 1):
+                prefix_docs = self._heavy.get(token[:length])
+                if prefix_docs is not None:
+                    prefix_docs.discard(doc)
+        for facet, value in pairs:
+            docs = self.facets[facet][value]
+            docs.discard(doc)
+            if not docs:
+                del self.facets[facet][value]
+        self.records[doc] = None
+        self._doc_keys[doc] = None
+        return True
+
+    def _token_range(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        return start, bisect.bisect_left(self._vocabulary, prefix + '\x7f', start)
+
+    def _prefix_docs(self, word):
+        docs = self._heavy.get(word)
+        if docs is not None:
+            return docs
+        start, end = self._token_range(word)
+        if end - start == 1:
+            return self.postings[self._vocabulary[start]]
+        docs = set().union(*(self.postings[token] for token in self._vocabulary[start:end]))
+        if len(word) <= SEARCH_HEAVY_PREFIX_LENGTH and end - start >= SEARCH_HEAVY_PREFIX_TOKENS:
+            self._heavy[word] = docs
+        return docs
+
+    def warm(self):
+        """Precomputes the doc sets of every short prefix shared by many tokens."""
+        prefixes = {token[:length] for token in self._vocabulary
+                    for length in range(1, SEARCH_HEAVY_PREFIX_LENGTH + 1)}
+        for prefix in prefixes:
+            if prefix not in self._heavy:
+                start, end = self._token_range(prefix)
+                if end - start >= SEARCH_HEAVY_PREFIX_TOKENS:
+                    self._prefix_docs(prefix)
+
+    def _fuzzy_docs(self, word):
+        if len(word) < SEARCH_FUZZY_MIN_LENGTH:
+            return set()
+        if self._deletes is None:
+            self._deletes = {}
+            for token in self.postings:
+                for variant in self._variants(token):
+                    self._deletes.setdefault(variant, set()).add(token)
+        docs = set()
+        for variant in self._variants(word):
+            for token in self._deletes.get(variant, ()):
+                docs |= self.postings.get(token, set())
+        return docs
+
+    def search_ids(self, query='', facets=None):
+        """
+        Doc ids matching every word of query and every given facet value ({facet: value};
+        None values are ignored). Returns None when there is nothing to filter by.
+        """
+        candidates = [self.facets[facet].get(value, set()) for facet, value in (facets or {}).items()
+                      if value is not None]
+        for word in set(_SEARCH_TOKEN.findall(query.lower())):
+            candidates.append(self._prefix_docs(word) or self._fuzzy_docs(word))
+        if not candidates:
+            return None
+        # Smallest set first, so every intersection only walks the current result
+        candidates.sort(key=len)
+        result = candidates[0]
+        for docs in candidates[1:]:
+            if not result:
+                break
+            result = result & docs
+        return result
+
+    def search(self, query='', facets=None):
+        """Matching records in the order they were added (see search_ids)."""
+        docs = self.search_ids(query, facets)
+        if docs is None:
+            return [record for record in self.records if record is not None]
+        return [self.records[doc] for doc in sorted(docs)]
+
+    def filter(self, records, query='', facets=None):
+        """The given records (e.g. a sorted view) that match, keeping their order."""
+        docs = self.search_ids(query, facets)
+        if docs is None:
+            return list(records)
+        doc_ids = self._doc_ids
+        return [record for record in records if doc_ids.get(id(record)) in docs]
+
+    def facet_counts(self):
+        """{facet: {value: number of records}} for building facet choices."""
+        return {facet: {value: len(docs) for value, docs in values.items()} for facet, values in self.facets.items()}
+
+# --- Metadata Extraction ---
+def extract_mod_info(jar_path, filename, nested=False):
+    """
+    Extracts mod metadata (name, version, links) with the first registered parser (see
+    METADATA_PARSERS) whose file is present and readable. Also records the detected loader
+    and the JAR size in bytes. With nested=True the record also gets a flat 'nested' list
+    of the bundled JARs (see extract_nested_jars). Returns a ModRecord.
+    """
+    try:
+        file_size = os.path.getsize(jar_path)
+    except OSError:
+        file_size = 0
+
+    depth = NESTED_JAR_MAX_DEPTH if nested else 0
+    mod_data, nested_jars = _read_mod_info(jar_path, filename, file_size, depth, [NESTED_JAR_MEMORY_LIMIT])
+    mod_data = ModRecord(mod_data)
+    if nested:
+        mod_data['nested'] = nested_jars
+    return mod_data
+
+def _read_mod_info(source, filename, file_size, nested_depth, budget):
+    """
+    Reads one JAR (a path or an in-memory file object). Returns (mod_data, nested records),
+    descending at most nested_depth levels into bundled JARs.
+    """
+    fallback_data = {
+        'filename': filename,
+        'name': filename.replace('.jar', ''),
+        'version': 'N/A',
+        'description': 'Could not extract metadata (Not a Fabric/Forge/Quilt mod, or JSON invalid).',
+        'links': {},
+        'loader': 'Unknown',
+        'size': file_size
+    }
+
+    try:
+        start = time.perf_counter()
+        with open_jar(source) as jar:
+            _add_stage('jar_open', start)
+            mod_data = None
+            nested_paths = []
+            for _, entry_name, parse in METADATA_PARSERS:
+                if entry_name not in jar:
+                    continue
+                try:
+                    start = time.perf_counter()
+                    data = jar.read(entry_name)
+                    _add_stage('entry_read', start)
+                    start = time.perf_counter()
+                    parsed = parse(data, jar)
+                    _add_stage('parse', start)
+                except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                    parsed = None # Broken metadata in this format, try the next one
+                if not parsed:
+                    continue
+
+                nested_paths = parsed.pop('jars', None) or []
+                mod_data = dict(fallback_data, description='No description provided.')
+                mod_data.update((key, value) for key, value in parsed.items() if value is not None)
+                break
+
+            nested_jars = []
+            if nested_depth > 0:
+                start = time.perf_counter()
+                nested_jars = extract_nested_jars(jar, filename, nested_paths, nested_depth, budget)
+                _add_stage('nested', start)
+            return mod_data or fallback_data, nested_jars
+
+    except zipfile.BadZipFile:
+        fallback_data['description'] = 'Not a valid JAR/ZIP file.'
+    except Exception as e:
+        fallback_data['description'] = f'Error during extraction: {e}'
+
+    return fallback_data, []
+
+# --- Nested JARs ---
+_nested_results = {}    # (crc, size, depth) -> (mod_data, nested records) of a bundled JAR
+_nested_results_lock = threading.Lock()
+
+def _jarjar_entries(jar):
+    """Returns {path: (name, version)} from Forge/NeoForge's META-INF/jarjar/metadata.json."""
+    try:
+        data = json.loads(jar.read(JARJAR_METADATA_FILE).decode('utf-8'))
+        jars = data.get('jars', [])
+    except (KeyError, ValueError, AttributeError):
+        return {}
+    entries = {}
+    for entry in jars:
+        if isinstance(entry, dict) and isinstance(entry.get('path'), str):
+            identifier = entry.get('identifier') or {}
+            version = entry.get('version') or {}
+            entries[entry['path']] = (identifier.get('artifact'), version.get('artifactVersion'))
+    return entries
+
+def _skipped_nested_record(path, size, reason):
+    name = path.rsplit('/', 1)[-1]
+    return {'filename': name, 'name': name.replace('.jar', ''), 'version': 'N/A',
+            'description': f'Nested JAR not scanned ({reason}).', 'links': {}, 'loader': 'Unknown', 'size': size}
+
+def extract_nested_jars(jar, parent_name, nested_paths, depth, budget):
+    """
+    Extracts the JARs bundled in an open JAR: the given nested_paths (Fabric/Quilt 'jars'
+    entries) plus anything listed in META-INF/jarjar/metadata.json. Nested JARs are read
+    straight from the parent into memory, never to disk.
+
+    Returns a flat list of records with 'path' (inside its parent), 'parent' (the parent's
+    filename) and 'depth' (1 for JARs bundled directly in the scanned JAR). budget is a
+    one-item list with the bytes that may still be held in memory; JARs over it or over
+    NESTED_JAR_MAX_BYTES are recorded as skipped. Results are cached by CRC-32 and size, so a
+    library bundled by many mods is parsed once per process.
+    """
+    jarjar = _jarjar_entries(jar)
+    paths = list(dict.fromkeys([path for path in nested_paths if isinstance(path, str)] + list(jarjar)))
+    jar.locate(paths)
+
+    records = []
+    for path in paths:
+        if path not in jar:
+            continue # Declared but missing
+        size, crc = jar.entry_info(path)
+        key = (crc, size, depth)
+        with _nested_results_lock:
+            cached = _nested_results.get(key)
+
+        if cached is not None:
+            mod_data, inner = cached
+        elif size > NESTED_JAR_MAX_BYTES or size > budget[0]:
+            mod_data, inner = _skipped_nested_record(path, size, "over the memory limit"), []
+        else:
+            budget[0] -= size
+            try:
+                source = io.BytesIO(jar.read(path))
+                mod_data, inner = _read_mod_info(source, path.rsplit('/', 1)[-1], size, depth - 1, budget)
+            except Exception as e:
+                mod_data, inner = _skipped_nested_record(path, size, f"read error: {e}"), []
+            else:
+                if mod_data['loader'] == 'Unknown' and jarjar.get(path, (None, None))[0]:
+                    # Plain library: use the Maven coordinates from jarjar metadata
+                    artifact, version = jarjar[path]
+                    mod_data = dict(mod_data, name=artifact, version=version or 'N/A',
+                                    description='Bundled library (jarjar).')
+                with _nested_results_lock:
+                    if len(_nested_results) >= NESTED_RESULT_CACHE_SIZE:
+                        _nested_results.pop(next(iter(_nested_results)))
+                    _nested_results[key] = (mod_data, inner)
+            finally:
+                budget[0] += size
+
+        records.append(dict(mod_data, path=path, parent=parent_name, depth=1))
+        records.extend(dict(record, depth=record['depth'] + 1) for record in inner)
+    return records
+
+
+# --- Metadata Cache ---
+def get_user_cache_dir():
+    """Returns the per-user cache directory for this application (not created here)."""
+    system = platform.system()
+    if system == "Windows":
+        base = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser("~")
+    elif system == "Darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser("~/.cache")
+    return Path(base) / "mc-modlist-export"
+
+def hash_file(path, algorithm='sha1', chunk_size=1024 * 1024):
+    """Returns the hex digest of a file, read in large chunks."""
+    import hashlib
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class MetadataCache:
+    """
+    Persistent JSON-lines cache of extract_mod_info results, keyed by absolute path,
+    file size and mtime (and optionally a SHA-1 of the content).
+    """
+    record_version = EXTRACTOR_VERSION
+
+    def __init__(self, cache_path=None, verify_hash=METADATA_CACHE_VERIFY_HASH):
+        self.cache_path = Path(cache_path) if cache_path else get_user_cache_dir() / METADATA_CACHE_FILENAME
+        self.verify_hash = verify_hash
+        self.entries = {}   # absolute path -> record dict
+        self.loaded = False
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Reads the cache file once. Corrupt lines and outdated records are skipped."""
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('v') == self.record_version and 'path' in record:
+                        self.entries[record['path']] = record
+        except OSError:
+            pass # No cache yet, or unreadable: start empty
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(str(path))
+
+    def lookup(self, path, stat_result, require=()):
+        """
+        Returns a copy of the cached data if the file is unchanged and the data has every key
+        in require, otherwise None.
+        """
+        key = self._key(path)
+        with self._lock:
+            record = self.entries.get(key)
+        if (record is None or record['size'] != stat_result.st_size
+                or record['mtime'] != stat_result.st_mtime_ns
+                or any(name not in record['data'] for name in require)):
+            self.misses += 1
+            return None
+        if self.verify_hash:
+            try:
+                if record.get('sha1') != hash_file(path):
+                    self.misses += 1
+                    return None
+            except OSError:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return self._copy(record['data'])
+
+    @staticmethod
+    def _copy(data):
+        return ModRecord(data)
+
+    @staticmethod
+    def _cacheable(data):
+        return not data['description'].startswith('Error during extraction')
+
+    def store(self, path, stat_result, mod_data):
+        """Records a fresh extraction result. Transient extraction errors are not cached."""
+        if not self._cacheable(mod_data):
+            return
+        record = {
+            'v': self.record_version,
+            'path': self._key(path),
+            'size': stat_result.st_size,
+            'mtime': stat_result.st_mtime_ns,
+            'data': mod_data.to_dict() if isinstance(mod_data, ModRecord) else mod_data
+        }
+        if self.verify_hash:
+            try:
+                record['sha1'] = hash_file(path)
+            except OSError:
+                return
+        with self._lock:
+            self.entries[record['path']] = record
+            self.dirty = True
+
+    def evict_missing(self, directory, seen_paths):
+        """Drops entries under directory that were not seen in a complete scan of it."""
+        prefix = os.path.join(self._key(directory), '')
+        seen = {self._key(p) for p in seen_paths}
+        with self._lock:
+            stale = [key for key in self.entries if key.startswith(prefix) and key not in seen]
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                self.dirty = True
+        return len(stale)
+
+    def save(self):
+        """Rewrites the cache file atomically if anything changed."""
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(self.cache_path.parent, exist_ok=True)
+            temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with self._lock:
+                records = list(self.entries.values())
+                self.dirty = False
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')) + "\n")
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass # The cache is best-effort; a failed write only costs a slower next scan
+
+# --- Content Hashing ---
+_MURMUR2_M = 0x5bd1e995
+_UINT32_MASK = 0xFFFFFFFF
+_CURSEFORGE_IGNORED_BYTES = b'\t\n\r '
+_WORD_TYPECODE = 'I' if array.array('I').itemsize == 4 else 'L'
+
+class Murmur2Hasher:
+    """
+    Incremental 32-bit MurmurHash2 (little-endian words, as in the reference code). The seed
+    is mixed with the total length before the first word, so the length must be known up
+    front; update() then takes the data in chunks of any size (up to 3 bytes carry over).
+    """
+
+    def __init__(self, length, seed=1):
+        self.h = (seed ^ length) & _UINT32_MASK
+        self.tail = b''
+
+    def update(self, data):
+        data = memoryview(data)
+        if self.tail:
+            head = self.tail + bytes(data[:4 - len(self.tail)])
+            data = data[4 - len(self.tail):]
+            if len(head) < 4:
+                self.tail = head
+                return
+            self._mix_words(head)
+        end = len(data) - (len(data) & 3)
+        self._mix_words(data[:end])
+        self.tail = bytes(data[end:])
+
+    def _mix_words(self, data):
+        words = array.array(_WORD_TYPECODE)
+        words.frombytes(data)
+        if sys.byteorder == 'big':
+            words.byteswap()
+
+        h, m, mask = self.h, _MURMUR2_M, _UINT32_MASK
+        for k in words:
+            k = (k * m) & mask
+            k = ((k ^ (k >> 24)) * m) & mask
+            h = ((h * m) & mask) ^ k
+        self.h = h
+
+    def intdigest(self):
+        h, m, mask, tail = self.h, _MURMUR2_M, _UINT32_MASK, self.tail
+        if tail:
+            if len(tail) == 3:
+                h ^= tail[2] << 16
+            if len(tail) >= 2:
+                h ^= tail[1] << 8
+            h = ((h ^ tail[0]) * m) & mask
+
+        h ^= h >> 13
+        h = (h * m) & mask
+        return h ^ (h >> 15)
+
+def murmur2(data, seed=1):
+    """32-bit MurmurHash2 of a bytes-like object (little-endian words, as in the reference code)."""
+    hasher = Murmur2Hasher(len(data), seed)
+    hasher.update(data)
+    return hasher.intdigest()
+
+def compute_file_hashes(path, algorithms=HASH_ALGORITHMS, read_size=HASH_READ_SIZE):
+    """
+    Computes every requested hash while reading the file in read_size chunks. 'curseforge'
+    is CurseForge's fingerprint: MurmurHash2 (seed 1) of the content with tab, LF, CR and
+    space bytes removed; all other names are hashlib algorithms (hex digests). The
+    fingerprint's seed needs the stripped length, so a file larger than one chunk is read a
+    second time for it; memory stays at one chunk either way.
+    """
+    import hashlib
+    digests = [(name, hashlib.new(name)) for name in algorithms if name != 'curseforge']
+    fingerprint = 'curseforge' in algorithms
+    normalized_length = 0
+    first_chunk = None  # Stripped content of a file that fits in one chunk
+    chunks = 0
+    with open(path, 'rb', buffering=0) as f:
+        for chunk in iter(lambda: f.read(read_size), b''):
+            chunks += 1
+            for _, digest in digests:
+                digest.update(chunk)
+            if fingerprint:
+                normalized = chunk.translate(None, _CURSEFORGE_IGNORED_BYTES)
+                normalized_length += len(normalized)
+                first_chunk = normalized if chunks == 1 else None
+
+        hashes = {name: digest.hexdigest() for name, digest in digests}
+        if fingerprint:
+            hasher = Murmur2Hasher(normalized_length)
+            if chunks <= 1:
+                hasher.update(first_chunk or b'')
+            else:
+                f.seek(0)
+                for chunk in iter(lambda: f.read(read_size), b''):
+                    hasher.update(chunk.translate(None, _CURSEFORGE_IGNORED_BYTES))
+            hashes['curseforge'] = hasher.intdigest()
+    return hashes
+
+def _executor_class(pool_kind):
+    """Pool class for a pool kind; the process pool pulls in multiprocessing, so it's imported on first use."""
+    if pool_kind == "process":
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor
+    return ThreadPoolExecutor
+
+def _timed_hash(path, algorithms):
+    """Runs compute_file_hashes and returns (hashes or None if unreadable, elapsed_seconds)."""
+    start = time.perf_counter()
+    try:
+        hashes = compute_file_hashes(path, algorithms)
+    except OSError:
+        hashes = None
+    return hashes, time.perf_counter() - start
+
+class FileHashCache(MetadataCache):
+    """Persistent cache of compute_file_hashes results, keyed by absolute path, file size and mtime."""
+    record_version = HASH_ENGINE_VERSION
+
+    def __init__(self, cache_path=None):
+        super().__init__(cache_path or get_user_cache_dir() / HASH_CACHE_FILENAME, verify_hash=False)
+
+    @staticmethod
+    def _copy(data):
+        return dict(data)
+
+    @staticmethod
+    def _cacheable(data):
+        return True
+
+def iter_hash(jar_entries, cache=None, workers=HASH_WORKERS, pool_kind=HASH_POOL_KIND, cancel_event=None,
+              algorithms=HASH_ALGORITHMS):
+    """
+    Hashes (full_path, filename, stat_result) entries on a worker pool and yields
+    (index, hashes, elapsed_seconds) in completion order; hashes is None for unreadable files.
+    Files whose cached hashes (see FileHashCache) are still valid are not read again.
+    """
+    if cache is not None:
+        cache.load()
+    pending = []
+    partial = {}    # index -> cached hashes that lack some of the requested algorithms
+    for index, (path, _, stat_result) in enumerate(jar_entries):
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        cached = cache.lookup(path, stat_result) if cache is not None else None
+        if cached is not None and all(name in cached for name in algorithms):
+            yield index, cached, 0.0
+        else:
+            pending.append(index)
+            if cached:
+                partial[index] = cached
+    if not pending:
+        return
+
+    def finish(index, hashes, elapsed):
+        if hashes is not None and cache is not None:
+            path, _, stat_result = jar_entries[index]
+            cache.store(path, stat_result, dict(partial.get(index, {}), **hashes))
+        return index, hashes, elapsed
+
+    if workers <= 1 or len(pending) <= 1:
+        for index in pending:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            yield finish(index, *_timed_hash(jar_entries[index][0], algorithms))
+        return
+
+    executor = _executor_class(pool_kind)(max_workers=min(workers, len(pending)))
+    futures = {}
+    try:
+        for index in pending:
+            futures[executor.submit(_timed_hash, jar_entries[index][0], algorithms)] = index
+        for future in as_completed(futures):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            yield finish(futures[future], *future.result())
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+def hash_entries(jar_entries, cache=None, workers=HASH_WORKERS, pool_kind=HASH_POOL_KIND, algorithms=HASH_ALGORITHMS):
+    """Like iter_hash, but returns the hashes (or None) in the same order as jar_entries."""
+    hashes = [None] * len(jar_entries)
+    for index, file_hashes, _ in iter_hash(jar_entries, cache, workers, pool_kind, algorithms=algorithms):
+        hashes[index] = file_hashes
+    return hashes
+
+# --- Instrumentation ---
+_stage_local = threading.local()
+
+def _add_stage(name, start):
+    """Adds the time since start to the current thread's stage timers (see _timed_extract)."""
+    stages = getattr(_stage_local, 'stages', None)
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+STARTUP_TIMINGS = {}    # name -> seconds, process-wide startup timings set by record_startup
+
+def record_startup(name, start):
+    """
+    Stores the seconds since start (a time.perf_counter() value) as a startup timing, e.g.
+    'import' or 'first_paint'. Every later .perf.json report includes them.
+    """
+    STARTUP_TIMINGS[name] = time.perf_counter() - start
+
+class PerfRecorder:
+    """
+    Thread-safe timers and counters for one scan and its export, written to <base>.perf.json
+    by export_reports. Timers keep count, total and max seconds; add_file() keeps the
+    files_kept slowest per-JAR extraction times (a min-heap, so memory stays flat).
+    """
+
+    def __init__(self, files_kept=SLOWEST_FILES_REPORTED):
+        self.timers = {}    # name -> [count, total seconds, max seconds]
+        self.counters = {}
+        self.files = []     # Min-heap of (seconds, sequence, filename)
+        self.files_kept = files_kept
+        self._file_count = 0
+        self.meta = {}
+        self.profile = None # ProfileCapture.result
+        self._lock = threading.Lock()
+
+    def add_time(self, name, seconds, count=1):
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += count
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds / max(count, 1))
+
+    def timer(self, name):
+        """Context manager timing a block under name."""
+        return _PerfTimer(self, name)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_file(self, filename, seconds, stages=None):
+        with self._lock:
+            self._file_count += 1
+            item = (seconds, self._file_count, filename)
+            if len(self.files) < self.files_kept:
+                heapq.heappush(self.files, item)
+            elif item > self.files[0]:
+                heapq.heapreplace(self.files, item)
+        for stage, stage_seconds in (stages or {}).items():
+            self.add_time(f"extract.{stage}", stage_seconds)
+
+    def to_dict(self, export_stats=(), top_n=SLOWEST_FILES_REPORTED):
+        """Machine-readable summary (all times in milliseconds)."""
+        with self._lock:
+            timers = {name: {'count': count, 'total_ms': total * 1000, 'max_ms': longest * 1000}
+                      for name, (count, total, longest) in sorted(self.timers.items())}
+            slowest = [(name, seconds) for seconds, _, name in sorted(self.files, reverse=True)[:top_n]]
+            counters = dict(self.counters)
+        return {
+            'app_version': APP_VERSION,
+            'extractor_version': EXTRACTOR_VERSION,
+            'python': platform.python_version(),
+            'platform': f"{platform.system()} {platform.machine()}",
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'meta': self.meta,
+            'startup': {f"{name}_ms": seconds * 1000 for name, seconds in STARTUP_TIMINGS.items()},
+            'timers': timers,
+            'counters': counters,
+            'slowest_jars': [{'filename': name, 'ms': seconds * 1000} for name, seconds in slowest],
+            'export': list(export_stats),
+            'profile': self.profile
+        }
+
+class _PerfTimer:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.add_time(self.name, time.perf_counter() - self.start)
+
+def profiled_pool(mode, workers, pool_kind):
+    """
+    Returns the (workers, pool_kind) a scan should use under ProfileCapture(mode): cProfile
+    only sees the calling thread and tracemalloc only this process.
+    """
+    if mode == 'cprofile':
+        return 1, "thread"
+    if mode == 'tracemalloc':
+        return workers, "thread"
+    return workers, pool_kind
+
+class ProfileCapture:
+    """
+    Optional deep capture around a scan: 'cprofile' records the hottest functions of the
+    calling thread, 'tracemalloc' the peak memory and the top allocation sites. The summary
+    ends up in result (and PerfRecorder.profile). Any other mode does nothing.
+    """
+
+    def __init__(self, mode, top_n=PROFILE_TOP_N):
+        self.mode = mode
+        self.top_n = top_n
+        self.result = None
+
+    def __enter__(self):
+        if self.mode == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.mode == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.mode == 'cprofile':
+            self._profiler.disable()
+            import pstats
+            stats = pstats.Stats(self._profiler).stats
+            hottest = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+            self.result = {'mode': 'cprofile', 'functions': [
+                {'function': f"{path}:{line}({name})", 'calls': calls, 'own_ms': own * 1000, 'cumulative_ms': cumulative * 1000}
+                for (path, line, name), (_, calls, own, cumulative, _) in hottest]}
+        elif self.mode == 'tracemalloc':
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:self.top_n]
+            tracemalloc.stop()
+            self.result = {'mode': 'tracemalloc', 'current_bytes': current, 'peak_bytes': peak, 'allocations': [
+                {'location': str(stat.traceback[0]), 'size_bytes': stat.size, 'count': stat.count} for stat in top]}
+
+# --- Scan Engine ---
+def _timed_extract(jar_path, filename, nested=False):
+    """
+    Runs extract_mod_info and returns (mod_data, elapsed_seconds, stage_seconds). The stage
+    timers travel back with the result, so they also work across a process pool.
+    """
+    _stage_local.stages = stages = {}
+    start = time.perf_counter()
+    try:
+        mod_data = extract_mod_info(jar_path, filename, nested)
+    finally:
+        _stage_local.stages = None
+    return mod_data, time.perf_counter() - start, stages
+
+def iter_jar_entries(directory):
+    """
+    Recursively yields (full_path, filename, stat_result) for every .jar file under
+    directory using os.scandir, so size/mtime come from the directory listing. Entries
+    come out folder by folder, in name order, as each folder is listed.
+    """
+    pending_dirs = [directory]
+    # Recursive scan (for nested mod folders, e.g., optional or disabled subfolders)
+    while pending_dirs:
+        current = pending_dirs.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False): # Like os.walk: symlinked folders (and loops) are skipped
+                    subdirs.append(entry.path)
+                elif entry.name.endswith('.jar') and entry.is_file():
+                    yield Path(entry.path), entry.name, entry.stat()
+            except OSError:
+                continue # Vanished or unreadable entry
+        # Reversed so subfolders are visited in name order
+        pending_dirs.extend(reversed(subdirs))
+
+def find_jar_entries(directory):
+    """Collects the entries of iter_jar_entries into a list."""
+    return list(iter_jar_entries(directory))
+
+def find_jar_files(directory):
+    """Recursively collects (full_path, filename) pairs for every .jar file under directory."""
+    return [(path, name) for path, name, _ in find_jar_entries(directory)]
+
+def iter_extract(jar_files, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND, cancel_event=None,
+                 nested=NESTED_JARS_ENABLED, perf=None):
+    """
+    Extracts metadata for a list of (full_path, filename) pairs on a worker pool and
+    yields (index, mod_data, elapsed_seconds) as each JAR finishes (completion order).
+    Stops early, cancelling pending work, once cancel_event is set. nested is passed on to
+    extract_mod_info. Per-JAR and per-stage times are recorded in perf (a PerfRecorder).
+    """
+    def record(index, elapsed, stages):
+        if perf is not None:
+            perf.count('extracted')
+            perf.add_file(jar_files[index][1], elapsed, stages)
+
+    if workers <= 1 or len(jar_files) <= 1:
+        for index, (path, name) in enumerate(jar_files):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            mod_data, elapsed, stages = _timed_extract(path, name, nested)
+            record(index, elapsed, stages)
+            yield index, mod_data, elapsed
+        return
+
+    executor = _executor_class(pool_kind)(max_workers=min(workers, len(jar_files)))
+    futures = {}
+    try:
+        for index, (path, name) in enumerate(jar_files):
+            futures[executor.submit(_timed_extract, path, name, nested)] = index
+
+        for future in as_completed(futures):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            mod_data, elapsed, stages = future.result()
+            record(futures[future], elapsed, stages)
+            yield futures[future], mod_data, elapsed
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+def iter_extract_cached(jar_entries, cache=None, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND,
+                        cancel_event=None, previous_index=None, nested=NESTED_JARS_ENABLED, perf=None):
+    """
+    Like iter_extract, but takes (full_path, filename, stat_result) entries and only sends
+    new or modified JARs to the worker pool. Unchanged JARs are reused from previous_index
+    (an incremental rescan, see build_scan_index) or served from a MetadataCache.
+    Fresh results are stored in the cache. A nested scan only reuses results that include
+    their nested JARs; other scans drop them.
+    """
+    require = ('nested',) if nested else ()
+    if cache is not None:
+        cache.load()
+    pending = []    # original indices of JARs that need extracting
+    for index, (path, name, stat_result) in enumerate(jar_entries):
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        start = time.perf_counter()
+        mod_data = None
+        if previous_index is not None:
+            previous = previous_index.get(os.path.abspath(str(path)))
+            if (previous and previous[0] == stat_result.st_size and previous[1] == stat_result.st_mtime_ns
+                    and (not nested or 'nested' in previous[2])):
+                mod_data = previous[2]
+        if mod_data is None and cache is not None:
+            mod_data = cache.lookup(path, stat_result, require)
+        if mod_data is not None:
+            mod_data = _strip_nested(mod_data, nested)
+            if perf is not None:
+                perf.count('reused')
+            yield index, mod_data, time.perf_counter() - start
+        else:
+            pending.append(index)
+
+    misses = [jar_entries[index][:2] for index in pending]
+    for miss_index, mod_data, elapsed in iter_extract(misses, workers, pool_kind, cancel_event, nested, perf):
+        index = pending[miss_index]
+        if cache is not None:
+            cache.store(jar_entries[index][0], jar_entries[index][2], mod_data)
+        yield index, mod_data, elapsed
+
+def extract_many(jar_files, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND, nested=NESTED_JARS_ENABLED):
+    """
+    Extracts metadata for a list of (full_path, filename) pairs on a worker pool.
+    Returns (mods, timings), both in the same order as jar_files. Each timing is a
+    (filename, seconds) tuple.
+    """
+    mods = [None] * len(jar_files)
+    timings = [None] * len(jar_files)
+    for index, mod_data, elapsed in iter_extract(jar_files, workers, pool_kind, nested=nested):
+        mods[index] = mod_data
+        timings[index] = (jar_files[index][1], elapsed)
+    return mods, timings
+
+def extract_entries(jar_entries, cache=None, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND, previous_index=None,
+                    nested=NESTED_JARS_ENABLED, perf=None):
+    """
+    Same as extract_many for (full_path, filename, stat_result) entries from find_jar_entries,
+    reusing unchanged JARs from previous_index and/or a MetadataCache.
+    """
+    mods = [None] * len(jar_entries)
+    timings = [None] * len(jar_entries)
+    for index, mod_data, elapsed in iter_extract_cached(jar_entries, cache, workers, pool_kind,
+                                                         previous_index=previous_index, nested=nested, perf=perf):
+        mods[index] = mod_data
+        timings[index] = (jar_entries[index][1], elapsed)
+    return mods, timings
+
+def _strip_nested(mod_data, nested):
+    """A reused record without its nested JARs when the scan doesn't list them."""
+    if not nested and 'nested' in mod_data:
+        return ModRecord((key, value) for key, value in mod_data.items() if key != 'nested')
+    return mod_data
+
+def build_scan_index(jar_entries, mods_by_entry):
+    """
+    Builds the in-memory index used by incremental rescans:
+    absolute path -> (size, mtime_ns, mod_data).
+    """
+    index = {}
+    for (path, _, stat_result), mod_data in zip(jar_entries, mods_by_entry):
+        if mod_data is not None:
+            index[os.path.abspath(str(path))] = (stat_result.st_size, stat_result.st_mtime_ns, mod_data)
+    return index
+
+# --- Streaming Scan ---
+def iter_walk_threaded(directory, queue_size=STREAM_WALK_QUEUE_SIZE, cancel_event=None):
+    """
+    Yields iter_jar_entries(directory) while the walk runs ahead on its own thread, at most
+    queue_size entries ahead (a bounded queue), so listing huge trees overlaps extraction.
+    """
+    entries = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                entries.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def walk():
+        try:
+            for entry in iter_jar_entries(directory):
+                if (cancel_event is not None and cancel_event.is_set()) or not put(entry):
+                    break
+        except BaseException as e:
+            put(e)
+        put(done)
+
+    walker = threading.Thread(target=walk, daemon=True)
+    walker.start()
+    try:
+        while True:
+            item = entries.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set() # Unblocks a walker stuck on a full queue when the consumer stops early
+        walker.join()
+
+def _stream_task(path, name, nested, extract, algorithms):
+    """One pipeline job for the pool: extract (if extract) and/or hash (if algorithms) one JAR."""
+    extracted = _timed_extract(path, name, nested) if extract else None
+    hashed = _timed_hash(path, algorithms) if algorithms else None
+    return extracted, hashed
+
+def iter_stream_extract(entries, cache=None, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND, cancel_event=None,
+                        nested=NESTED_JARS_ENABLED, perf=None, hash_cache=None, algorithms=(), max_in_flight=None):
+    """
+    Streaming counterpart of iter_extract_cached (plus iter_hash when algorithms are given)
+    for an iterable of entries of unknown length, e.g. iter_walk_threaded. Entries are
+    pulled only while fewer than max_in_flight JARs (default: STREAM_IN_FLIGHT_PER_WORKER
+    per worker) wait on the pool, so memory stays bounded however many JARs there are.
+    Yields (seq, entry, mod_data, elapsed) in completion order; seq is the entry's position
+    in entries. Records carry 'hashes' when algorithms are given and the file is readable.
+    """
+    require = ('nested',) if nested else ()
+    for file_cache in (cache, hash_cache):
+        if file_cache is not None:
+            file_cache.load()
+    max_in_flight = max_in_flight or max(1, workers) * STREAM_IN_FLIGHT_PER_WORKER
+
+    def finish(seq, entry, mod_data, file_hashes, elapsed):
+        if file_hashes is not None:
+            mod_data = mod_data.replace(hashes=file_hashes)
+        return seq, entry, mod_data, elapsed
+
+    def complete(seq, entry, mod_data, file_hashes, result):
+        (extracted, hashed), (path, name, stat_result) = result, entry
+        elapsed = 0.0
+        if extracted is not None:
+            mod_data, elapsed, stages = extracted
+            if perf is not None:
+                perf.count('extracted')
+                perf.add_file(name, elapsed, stages)
+            if cache is not None:
+                cache.store(path, stat_result, mod_data)
+        if hashed is not None:
+            file_hashes = hashed[0] if hashed[0] is None else dict(file_hashes or {}, **hashed[0])
+            if file_hashes is not None and hash_cache is not None:
+                hash_cache.store(path, stat_result, file_hashes)
+        return finish(seq, entry, mod_data, file_hashes, elapsed)
+
+    executor = None
+    if workers > 1:
+        executor = _executor_class(pool_kind)(max_workers=workers)
+    in_flight = {}  # future -> (seq, entry, cached mod_data, cached hashes)
+    try:
+        for seq, entry in enumerate(entries):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            path, name, stat_result = entry
+            mod_data = cache.lookup(path, stat_result, require) if cache is not None else None
+            if mod_data is not None:
+                mod_data = _strip_nested(mod_data, nested)
+                if perf is not None:
+                    perf.count('reused')
+            file_hashes = hash_cache.lookup(path, stat_result) if algorithms and hash_cache is not None else None
+            missing = [name for name in algorithms if not file_hashes or name not in file_hashes]
+            if mod_data is not None and not missing:
+                yield finish(seq, entry, mod_data, file_hashes, 0.0)
+                continue
+            task = (path, name, nested, mod_data is None, tuple(missing))
+            if executor is None:
+                yield complete(seq, entry, mod_data, file_hashes, _stream_task(*task))
+                continue
+            in_flight[executor.submit(_stream_task, *task)] = (seq, entry, mod_data, file_hashes)
+            while len(in_flight) >= max_in_flight:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                done, _ = wait(in_flight, timeout=STREAM_CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield complete(*in_flight.pop(future), future.result())
+        while in_flight:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            done, _ = wait(in_flight, timeout=STREAM_CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield complete(*in_flight.pop(future), future.result())
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+def _name_sort_key(mod):
+    name = mod.get('name')
+    return str(name if name is not None else '').lower()
+
+class ExternalSorter:
+    """
+    Sink of the streaming scan: sorts records that need not fit in memory. add() buffers
+    up to run_size records, then spills them sorted to a temporary run file; iterating
+    merges the runs (heapq.merge) straight from disk. Ties keep the order of their seq
+    numbers, so the result matches ModTable.sort('name') over the entries in walk order.
+    len() and repeated or concurrent iteration work, so a sorter can be passed to
+    export_reports as its mods. Use as a context manager (close() deletes the runs).
+    """
+
+    def __init__(self, key=_name_sort_key, run_size=STREAM_SORT_RUN_SIZE, temp_dir=None):
+        self.key = key
+        self.run_size = run_size
+        self.temp_dir = temp_dir
+        self.buffer = []    # (sort key, seq, record) of the run being filled
+        self.runs = []      # Paths of the spilled, sorted run files
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, record, seq=None):
+        self.buffer.append((self.key(record), self.count if seq is None else seq, record))
+        self.count += 1
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        import pickle, tempfile
+        self.buffer.sort(key=lambda item: item[:2])
+        fd, run_path = tempfile.mkstemp(prefix="modlist-run-", suffix=".pickle", dir=self.temp_dir)
+        with os.fdopen(fd, 'wb', buffering=REPORT_BUFFER_SIZE) as f:
+            # One self-contained pickle per item: a shared unpickler memo would keep every record read
+            for item in self.buffer:
+                pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+        self.runs.append(run_path)
+        self.buffer = []
+
+    @staticmethod
+    def _read_run(run_path):
+        import pickle
+        with open(run_path, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        with self._lock:
+            self.buffer.sort(key=lambda item: item[:2])
+            runs = [self._read_run(run_path) for run_path in self.runs] + [iter(list(self.buffer))]
+        for _, _, record in heapq.merge(*runs, key=lambda item: item[:2]):
+            yield record
+
+    def close(self):
+        for run_path in self.runs:
+            try:
+                os.remove(run_path)
+            except OSError:
+                pass
+        self.runs = []
+        self.buffer = []
+
+def stream_scan(directory, sink, cache=None, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND, cancel_event=None,
+                nested=NESTED_JARS_ENABLED, perf=None, hash_cache=None, algorithms=(), on_record=None):
+    """
+    Memory-bounded scan of huge trees: walk (os.scandir on its own thread, bounded queue)
+    -> filter (.jar files) -> extract (bounded in-flight pool jobs) -> sink (sink.add(record,
+    seq), e.g. an ExternalSorter). on_record(record, elapsed) sees every record as soon as
+    it is ready. Returns (jars, seconds to the first record or None, wall_time).
+    """
+    start = time.perf_counter()
+    first_record = None
+    jars = 0
+    entries = iter_walk_threaded(directory, cancel_event=cancel_event)
+    for seq, _, mod_data, elapsed in iter_stream_extract(entries, cache, workers, pool_kind, cancel_event, nested,
+                                                         perf, hash_cache, algorithms):
+        if first_record is None:
+            first_record = time.perf_counter() - start
+        sink.add(mod_data, seq)
+        jars += 1
+        if on_record is not None:
+            on_record(mod_data, elapsed)
+    return jars, first_record, time.perf_counter() - start
+
+# --- Watch Mode ---
+# inotify(7) event mask: anything that can add, remove or rewrite a JAR (or a subfolder)
+_IN_WATCH_MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+_IN_IGNORED = 0x8000    # The watch is gone (folder deleted or moved off the filesystem)
+_INOTIFY_EVENT = struct.Struct('iIII') # wd, mask, cookie, name length; the name follows
+
+class _Inotify:
+    """
+    Minimal inotify wrapper over libc (ctypes). Mostly a wake-up signal: events are only
+    parsed to forget the watches the kernel dropped, so a folder that is deleted and
+    created again gets watched again.
+    """
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = {}   # folder -> watch descriptor
+        self.folders = {}   # watch descriptor -> folder
+        self.pending = False # Events were read by sync() but not reported by wait() yet
+
+    def add_watch(self, directory):
+        """Watches a folder (once). Raises OSError if the kernel refuses, e.g. ENOSPC when out of watches."""
+        if directory in self.watched:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_WATCH_MASK)
+        if wd < 0:
+            error = self._ctypes.get_errno()
+            raise OSError(error, os.strerror(error), directory)
+        self.folders.pop(self.watched.get(directory), None)
+        self.watched[directory] = wd
+        self.folders[wd] = directory
+
+    def _read_events(self):
+        """Drains the event queue, forgetting dropped watches. Returns whether there was any event."""
+        any_event = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return any_event
+            if not data:
+                return any_event
+            any_event = True
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                wd, mask, _, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size + name_length
+                if mask & _IN_IGNORED:
+                    directory = self.folders.pop(wd, None)
+                    if directory is not None and self.watched.get(directory) == wd:
+                        del self.watched[directory]
+
+    def sync(self):
+        """Reads queued events now (so dropped watches are forgotten); wait() still reports them."""
+        if self._read_events():
+            self.pending = True
+
+    def wait(self, timeout):
+        """Returns True if any event arrived within timeout seconds (and drains the queue)."""
+        if self.pending:
+            self.pending = False
+            self._read_events()
+            return True
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        self._read_events()
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+def snapshot_jar_entries(jar_entries):
+    """Absolute path -> (size, mtime_ns) for a find_jar_entries listing."""
+    return {os.path.abspath(str(path)): (stat_result.st_size, stat_result.st_mtime_ns)
+            for path, _, stat_result in jar_entries}
+
+class FolderWatcher:
+    """
+    Watches a mods folder (and its subfolders) for added, removed and rewritten JARs.
+
+    With inotify (Linux) the listing is only re-read after the kernel reports a change;
+    elsewhere, or once a folder can't be watched (e.g. fs.inotify.max_user_watches is
+    reached), the folder is polled, backing off from WATCH_POLL_MIN_SECONDS to
+    WATCH_POLL_MAX_SECONDS while nothing changes. A change is reported once the listing
+    has been stable for WATCH_SETTLE_SECONDS, so JARs still being copied are not read
+    half-written. changes() yields {'added': [entry], 'changed': [entry], 'removed': [path],
+    'entries': listing} dicts (entries as in find_jar_entries) until stop_event is set.
+    """
+
+    def __init__(self, directory, jar_entries=None, stop_event=None, use_inotify=WATCH_USE_INOTIFY):
+        self.directory = directory
+        self.stop_event = stop_event or threading.Event()
+        self.inotify = None
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self.inotify = _Inotify()
+            except (OSError, AttributeError):
+                self.inotify = None # No libc/inotify (or out of watches): poll instead
+        self._watch_folders()
+        if jar_entries is None:
+            jar_entries = find_jar_entries(directory)
+        self.snapshot = snapshot_jar_entries(jar_entries)
+        self.mode = 'inotify' if self.inotify else 'polling'
+
+    def _watch_folders(self):
+        if self.inotify is None:
+            return
+        self.inotify.sync() # Forget the watches of deleted folders before re-adding
+        for current, _, _ in os.walk(self.directory):
+            try:
+                self.inotify.add_watch(current)
+            except OSError as e:
+                if e.errno in (errno.ENOENT, errno.ENOTDIR):
+                    continue # Deleted since the walk listed it; the next listing notices
+                self.close() # A folder without a watch would never wake us up: poll instead
+                self.mode = 'polling'
+                return
+
+    def _wait(self, interval):
+        """Waits for a possible change. Returns False once stopped."""
+        if self.inotify is None:
+            return not self.stop_event.wait(interval)
+        while not self.stop_event.is_set():
+            if self.inotify.wait(WATCH_STOP_CHECK_SECONDS):
+                return True
+        return False
+
+    def _diff(self, jar_entries):
+        current = snapshot_jar_entries(jar_entries)
+        by_path = {os.path.abspath(str(entry[0])): entry for entry in jar_entries}
+        added = [by_path[path] for path in current if path not in self.snapshot]
+        changed = [by_path[path] for path, state in current.items()
+                   if path in self.snapshot and self.snapshot[path] != state]
+        removed = [path for path in self.snapshot if path not in current]
+        return current, added, changed, removed
+
+    def changes(self):
+        interval = WATCH_POLL_MIN_SECONDS
+        try:
+            while self._wait(interval):
+                self._watch_folders() # New (or re-created) subfolders, before listing them
+                jar_entries = find_jar_entries(self.directory)
+                current, added, changed, removed = self._diff(jar_entries)
+                if not (added or changed or removed):
+                    interval = min(interval * 2, WATCH_POLL_MAX_SECONDS)
+                    continue
+
+                # Let copies finish: re-list until two listings agree
+                while not self.stop_event.wait(WATCH_SETTLE_SECONDS):
+                    jar_entries = find_jar_entries(self.directory)
+                    settled = snapshot_jar_entries(jar_entries)
+                    if settled == current:
+                        break
+                    current = settled
+                if self.stop_event.is_set():
+                    return
+                current, added, changed, removed = self._diff(jar_entries)
+                self.snapshot = current
+                interval = WATCH_POLL_MIN_SECONDS
+                if added or changed or removed:
+                    yield {'added': added, 'changed': changed, 'removed': removed, 'entries': jar_entries}
+        finally:
+            self.close()
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+def apply_watch_changes(scan_index, changes, mods):
+    """
+    Applies one FolderWatcher change set to a build_scan_index index. mods are the freshly
+    extracted records of changes['added'] + changes['changed'], in that order.
+
+    Returns (old_records, new_records): the records that were removed or replaced and the
+    ones that take their place, so a caller can patch its own list or view.
+    """
+    old_records = []
+    for path in changes['removed']:
+        previous = scan_index.pop(path, None)
+        if previous is not None:
+            old_records.append(previous[2])
+    new_records = []
+    for (path, _, stat_result), mod_data in zip(changes['added'] + changes['changed'], mods):
+        key = os.path.abspath(str(path))
+        previous = scan_index.get(key)
+        if previous is not None:
+            old_records.append(previous[2])
+        scan_index[key] = (stat_result.st_size, stat_result.st_mtime_ns, mod_data)
+        new_records.append(mod_data)
+    return old_records, new_records
+
+def format_watch_changes(changes):
+    """One-line summary of a change set, e.g. '2 added, 1 updated, 1 removed'."""
+    parts = [f"{len(changes[key])} {label}" for key, label in
+             (('added', 'added'), ('changed', 'updated'), ('removed', 'removed')) if changes[key]]
+    return ", ".join(parts) or "no changes"
+
+# --- Scan Diff ---
+def diff_mod_lists(old_mods, new_mods):
+    """
+    Compares two scans by mod name and returns a structured diff:
+    {'added': [...], 'removed': [...], 'updated': [...]}. Several JARs may share a name
+    (e.g. two versions of a library): within a name, JARs with the same filename are
+    compared with each other, the remaining ones are paired in filename order (an update
+    if the version differs, a rename otherwise), and any left over are added or removed.
+    """
+    def by_name(mods):
+        mapping = {}
+        for mod in mods:
+            mapping.setdefault(mod['name'].lower(), []).append(mod)
+        return mapping
+
+    old_map = by_name(old_mods)
+    new_map = by_name(new_mods)
+
+    def summary(mod):
+        return {'name': mod['name'], 'version': mod['version'], 'filename': mod['filename']}
+
+    def update(old, new):
+        return {
+            'name': new['name'],
+            'old_version': old['version'],
+            'new_version': new['version'],
+            'old_filename': old['filename'],
+            'new_filename': new['filename']
+        }
+
+    added, removed, updated = [], [], []
+    for key in sorted(old_map.keys() | new_map.keys()):
+        old_group = sorted(old_map.get(key, ()), key=lambda mod: mod['filename'])
+        new_group = sorted(new_map.get(key, ()), key=lambda mod: mod['filename'])
+        new_by_file = {}
+        for mod in new_group:
+            new_by_file.setdefault(mod['filename'], []).append(mod)
+        unmatched_old = []
+        for old in old_group:
+            same_file = new_by_file.get(old['filename'])
+            if not same_file:
+                unmatched_old.append(old)
+                continue
+            new = same_file.pop(0)
+            if old['version'] != new['version']:
+                updated.append(update(old, new))
+        left = {id(mod) for mods in new_by_file.values() for mod in mods}
+        unmatched_new = [mod for mod in new_group if id(mod) in left]
+        for old, new in zip(unmatched_old, unmatched_new):
+            if old['version'] != new['version']: # Else just renamed
+                updated.append(update(old, new))
+        added.extend(summary(mod) for mod in unmatched_new[len(unmatched_old):])
+        removed.extend(summary(mod) for mod in unmatched_old[len(unmatched_new):])
+
+    return {'added': added, 'removed': removed, 'updated': updated}
+
+def format_diff_lines(diff):
+    """Renders a diff from diff_mod_lists as human-readable lines (no trailing newlines)."""
+    lines = [f"Changes Since Previous Scan: {len(diff['added'])} added, {len(diff['removed'])} removed, {len(diff['updated'])} updated"]
+    for mod in diff['added']:
+        lines.append(f" + {mod['name']} ({mod['version']})")
+    for mod in diff['removed']:
+        lines.append(f" - {mod['name']} ({mod['version']})")
+    for mod in diff['updated']:
+        lines.append(f" ~ {mod['name']}: {mod['old_version']} -> {mod['new_version']}")
+    return lines
+
+# --- Scan History ---
+def history_key(mod):
+    """The key a mod is tracked under in the scan history: its mod id, else 'file:' + its filename."""
+    return mod.get('mod_id') or f"file:{mod['filename']}"
+
+def history_label(mods_path):
+    """Display name of a mods folder: the instance folder for '.../<instance>/mods', else the folder itself."""
+    path = Path(mods_path)
+    return path.parent.name if path.name.lower() == 'mods' and path.parent.name else path.name
+
+class ScanHistory:
+    """
+    Append-only SQLite store of exported scans, for trend queries across thousands of them
+    ("when did this mod's version change", "which instances still run version X"). Every
+    string (mod ids, names, versions, filenames, folders) is stored once in the strings
+    table and referenced by id, so a scan adds a handful of small integers per mod.
+    Records are clustered by (mod, scan) and scans are indexed by (instance, id), so both
+    queries only read the rows of the mod they ask about. Use as a context manager.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS strings (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY, time REAL NOT NULL, instance INTEGER NOT NULL, label INTEGER NOT NULL,
+            app_version INTEGER NOT NULL, mod_count INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS scans_instance ON scans (instance, id);
+        CREATE TABLE IF NOT EXISTS records (
+            mod INTEGER NOT NULL, scan INTEGER NOT NULL, seq INTEGER NOT NULL, name INTEGER, version INTEGER,
+            filename INTEGER, loader INTEGER, size INTEGER, sha1 INTEGER,
+            PRIMARY KEY (mod, scan, seq)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS mod_names (name INTEGER NOT NULL, mod INTEGER NOT NULL,
+            PRIMARY KEY (name, mod)) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else get_user_cache_dir() / HISTORY_FILENAME
+        self._conn = None
+        self._string_ids = {}   # value -> strings.id, for the strings seen by this connection
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def connect(self):
+        """Opens (creating if needed) the database. Raises sqlite3.Error for a newer or broken file."""
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(self.db_path.parent, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version > HISTORY_SCHEMA_VERSION:
+                    raise sqlite3.DatabaseError(f"{self.db_path.name} was written by a newer version (schema {version})")
+                conn.execute("PRAGMA journal_mode=WAL")
+                with conn:
+                    conn.executescript(self.SCHEMA)
+                    conn.execute(f"PRAGMA user_version = {HISTORY_SCHEMA_VERSION}")
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _string_id(self, value):
+        if value is None:
+            return None
+        value = str(value)
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            row = self._conn.execute("SELECT id FROM strings WHERE value = ?", (value,)).fetchone()
+            string_id = row[0] if row else self._conn.execute("INSERT INTO strings (value) VALUES (?)", (value,)).lastrowid
+            self._string_ids[value] = string_id
+        return string_id
+
+    def append(self, scans, timestamp=None):
+        """
+        Appends [(mods, mods folder, label or None)] as one transaction, all with the same
+        timestamp. Returns the new scan ids.
+        """
+        import sqlite3
+        conn = self.connect()
+        timestamp = timestamp if timestamp is not None else time.time()
+        scan_ids = []
+        try:
+            with conn:
+                for mods, mods_path, label in scans:
+                    scan_id = conn.execute(
+                        "INSERT INTO scans (time, instance, label, app_version, mod_count) VALUES (?, ?, ?, ?, ?)",
+                        (timestamp, self._string_id(os.path.abspath(str(mods_path))),
+                         self._string_id(label or history_label(mods_path)), self._string_id(APP_VERSION), len(mods))
+                    ).lastrowid
+                    rows = []
+                    for seq, mod in enumerate(mods):
+                        rows.append((self._string_id(history_key(mod)), scan_id, seq, self._string_id(mod.get('name')),
+                                     self._string_id(mod.get('version')), self._string_id(mod.get('filename')),
+                                     self._string_id(mod.get('loader')), mod.get('size'),
+                                     self._string_id((mod.get('hashes') or {}).get('sha1'))))
+                        if len(rows) >= HISTORY_INSERT_BATCH:
+                            self._insert_records(rows)
+                            rows = []
+                    self._insert_records(rows)
+                    scan_ids.append(scan_id)
+        except sqlite3.Error:
+            self._string_ids.clear() # Ids of rolled-back strings must not be reused
+            raise
+        return scan_ids
+
+    def _insert_records(self, rows):
+        self._conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._conn.executemany("INSERT OR IGNORE INTO mod_names VALUES (?, ?)",
+                               {(row[3], row[0]) for row in rows if row[3] is not None})
+
+    def _lookup(self, value):
+        row = self.connect().execute("SELECT id FROM strings WHERE value = ?", (value,)).fetchone()
+        return row[0] if row else None
+
+    def _mod_ids(self, query):
+        """Ids of the history keys matching query: an exact mod id or key, else a mod name (any case)."""
+        conn = self.connect()
+        for key in (query, f"file:{query}"):
+            key_id = self._lookup(key)
+            if key_id is not None and conn.execute("SELECT 1 FROM records WHERE mod = ? LIMIT 1", (key_id,)).fetchone():
+                return [key_id]
+        return [row[0] for row in conn.execute(
+            "SELECT DISTINCT m.mod FROM strings n JOIN mod_names m ON m.name = n.id WHERE n.value = ? COLLATE NOCASE",
+            (query,))]
+
+    def _instance_ids(self, instance):
+        """Ids of the instances whose folder or label equals instance (None: no filter)."""
+        if instance is None:
+            return None
+        ids = set()
+        for value in (instance, os.path.abspath(instance)):
+            string_id = self._lookup(value)
+            if string_id is not None:
+                ids.add(string_id)
+        return ids
+
+    def scans(self, instance=None):
+        """Every recorded scan (oldest first) as {'id', 'time', 'instance', 'label', 'mods'}."""
+        instance_ids = self._instance_ids(instance)
+        rows = self.connect().execute(
+            "SELECT s.id, s.time, i.value, l.value, s.mod_count, s.instance, s.label FROM scans s"
+            " JOIN strings i ON i.id = s.instance JOIN strings l ON l.id = s.label ORDER BY s.id")
+        return [{'id': row[0], 'time': row[1], 'instance': row[2], 'label': row[3], 'mods': row[4]}
+                for row in rows if instance_ids is None or instance_ids & {row[5], row[6]}]
+
+    def mod_history(self, query, instance=None):
+        """
+        Version changes of a mod (by mod id or name) per instance, oldest first:
+        {'time', 'instance', 'label', 'mod', 'change': 'added'|'updated'|'removed', 'version',
+        'old_version', 'filename'}. A mod missing from a later scan of its instance is 'removed'.
+        """
+        conn = self.connect()
+        instance_ids = self._instance_ids(instance)
+        events = []
+        for mod_id in self._mod_ids(query):
+            present = {} # instance id -> {scan id: (version, filename)}
+            for instance_id, label_id, scan_id, version, filename in conn.execute(
+                    "SELECT s.instance, s.label, r.scan, v.value, f.value FROM records r JOIN scans s ON s.id = r.scan"
+                    " LEFT JOIN strings v ON v.id = r.version LEFT JOIN strings f ON f.id = r.filename"
+                    " WHERE r.mod = ? ORDER BY r.scan", (mod_id,)):
+                if instance_ids is None or instance_ids & {instance_id, label_id}:
+                    present.setdefault(instance_id, {}).setdefault(scan_id, (version, filename))
+            mod_key = conn.execute("SELECT value FROM strings WHERE id = ?", (mod_id,)).fetchone()[0]
+            for instance_id, found in present.items():
+                previous = None
+                for scan_id, scan_time, instance_path, label in conn.execute(
+                        "SELECT s.id, s.time, i.value, l.value FROM scans s JOIN strings i ON i.id = s.instance"
+                        " JOIN strings l ON l.id = s.label WHERE s.instance = ? AND s.id >= ? ORDER BY s.id",
+                        (instance_id, min(found))):
+                    current = found.get(scan_id)
+                    if current is None and previous is None:
+                        continue
+                    if current is None:
+                        change = 'removed'
+                    elif previous is None:
+                        change = 'added'
+                    elif current[0] != previous[0]:
+                        change = 'updated'
+                    else:
+                        continue
+                    events.append({'time': scan_time, 'instance': instance_path, 'label': label, 'mod': mod_key,
+                                   'change': change, 'version': (current or previous)[0],
+                                   'old_version': previous[0] if change == 'updated' else None,
+                                   'filename': (current or previous)[1]})
+                    previous = current
+        events.sort(key=lambda event: (event['time'], event['label']))
+        return events
+
+    def instances_running(self, query, version=None):
+        """
+        Instances whose latest recorded scan contains the mod (by mod id or name), optionally
+        only at this version: [{'instance', 'label', 'time', 'version', 'filename'}].
+        """
+        conn = self.connect()
+        results = []
+        for mod_id in self._mod_ids(query):
+            results.extend({'instance': row[0], 'label': row[1], 'time': row[2], 'version': row[3], 'filename': row[4]}
+                           for row in conn.execute(
+                               "SELECT i.value, l.value, s.time, v.value, f.value"
+                               " FROM (SELECT MAX(id) AS id FROM scans GROUP BY instance) latest"
+                               " JOIN scans s ON s.id = latest.id JOIN records r ON r.mod = ? AND r.scan = s.id"
+                               " JOIN strings i ON i.id = s.instance JOIN strings l ON l.id = s.label"
+                               " LEFT JOIN strings v ON v.id = r.version LEFT JOIN strings f ON f.id = r.filename",
+                               (mod_id,))
+                           if version is None or row[3] == version)
+        results.sort(key=lambda result: result['label'].lower())
+        return results
+
+    def stats(self):
+        """Row counts and the database size in bytes."""
+        conn = self.connect()
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ('scans', 'records', 'strings')}
+        counts['bytes'] = sum(os.path.getsize(path) for path in (self.db_path, Path(f"{self.db_path}-wal"))
+                              if os.path.exists(path))
+        return counts
+
+def record_scan_history(scans, perf=None, db_path=None):
+    """
+    Appends [(mods, mods folder, label or None)] to the scan history (see ScanHistory.append).
+    Returns an error message or None: a broken history never fails a scan or an export.
+    """
+    if not HISTORY_ENABLED:
+        return None
+    import sqlite3
+    perf = perf if perf is not None else PerfRecorder()
+    with perf.timer('history'):
+        try:
+            with ScanHistory(db_path) as history:
+                history.append(scans)
+        except (sqlite3.Error, OSError) as e:
+            return f"Scan history not updated: {e}"
+    return None
+
+def format_history_lines(events):
+    """Renders mod_history events as lines (no trailing newlines)."""
+    lines = []
+    for event in events:
+        when = datetime.fromtimestamp(event['time']).strftime('%Y-%m-%d %H:%M')
+        if event['change'] == 'updated':
+            detail = f"{event['old_version']} -> {event['version']}"
+        else:
+            detail = f"{event['change']} ({event['version']})"
+        lines.append(f"{when}  {event['label']}: {event['mod']} {detail}")
+    return lines
+
+
+# --- Dependency Analysis ---
+# Provided by the game or the loader itself, never by a JAR in the mods folder
+BUILTIN_MOD_IDS = frozenset({
+    'minecraft', 'java', 'fabricloader', 'fabric-loader', 'quilt_loader', 'forge', 'neoforge', 'fml', 'javafml', 'mcp',
+})
+# Dependency kind -> (severity when missing, severity when the version doesn't match)
+DEPENDENCY_KINDS = {
+    'depends': ('error', 'error'),
+    'optional': (None, 'error'),        # Forge: only checked when present
+    'recommends': ('warning', 'warning'),
+}
+CONFLICT_KINDS = {'breaks': 'error', 'conflicts': 'warning'}
+# The record fields analyze_dependencies reads (see dependency_record)
+DEPENDENCY_FIELDS = ('name', 'version', 'filename', 'mod_id', 'provides', 'dependencies')
+
+_VERSION_SPLIT = re.compile(r'[.\-_]')
+_MAVEN_RANGE = re.compile(r'[\[(]([^\])]*)[\])]')
+
+def _version_key(version):
+    """
+    Sort key for a mod version: numeric parts compare as numbers, a pre-release ('-beta')
+    sorts before its release and build metadata ('+1.20.1') is ignored. Returns None for
+    versions that can't be compared ('N/A', unresolved placeholders).
+    """
+    if not isinstance(version, str):
+        return None
+    version = version.strip().split('+', 1)[0]
+    if version[:1] in ('v', 'V'):
+        version = version[1:]
+    if not version or version == 'N/A' or '$' in version or not version[0].isdigit():
+        return None
+    release, _, pre_release = version.partition('-')
+
+    def parts(text):
+        result = [(0, int(part), '') if part.isdigit() else (1, 0, part.lower())
+                  for part in _VERSION_SPLIT.split(text) if part]
+        while result and result[-1] == (0, 0, ''):
+            result.pop() # 1.20 == 1.20.0
+        return tuple(result)
+
+    return parts(release), 0 if pre_release else 1, parts(pre_release)
+
+def _numeric_prefix(version):
+    key = _version_key(version)
+    if key is None:
+        return None
+    numbers = []
+    for kind, number, _ in key[0]:
+        if kind:
+            break
+        numbers.append(number)
+    return numbers
+
+def _fabric_predicate_matches(version, predicate):
+    """Checks one Fabric/Quilt version predicate ('>=1.2', '~1.2.3', '^2', '1.20.x', '*')."""
+    predicate = predicate.strip()
+    if predicate in ('', '*'):
+        return True
+    for operator in ('>=', '<=', '>', '<', '=', '~', '^'):
+        if predicate.startswith(operator):
+            target = predicate[len(operator):].strip()
+            break
+    else:
+        operator, target = '=', predicate
+
+    if target.lower().endswith(('.x', '.*')) or target.lower() in ('x', '*'):
+        prefix = _numeric_prefix(target.rstrip('xX*').rstrip('.') or '0')
+        numbers = _numeric_prefix(version)
+        if prefix is None or numbers is None:
+            return None
+        numbers = numbers + [0] * (len(prefix) - len(numbers))
+        return target.lower() in ('x', '*') or numbers[:len(prefix)] == prefix
+
+    version_key, target_key = _version_key(version), _version_key(target)
+    if version_key is None or target_key is None:
+        return None
+    if operator in ('~', '^'):
+        # Same major.minor (~) or same major (^), and not older than the target
+        keep = 2 if operator == '~' else 1
+        numbers, target_numbers = _numeric_prefix(version), _numeric_prefix(target)
+        pad = lambda n: (n + [0] * keep)[:keep]
+        return pad(numbers) == pad(target_numbers) and version_key >= target_key
+    return {'>=': version_key >= target_key, '<=': version_key <= target_key, '>': version_key > target_key,
+            '<': version_key < target_key, '=': version_key == target_key}[operator]
+
+def _maven_range_matches(version, spec):
+    """Checks a Maven version range as used by mods.toml ('[47,)', '(,1.2]', '[1.0]', or '1.0' for 1.0 and newer)."""
+    spec = spec.strip()
+    if spec in ('', '*'):
+        return True
+    version_key = _version_key(version)
+    if version_key is None:
+        return None
+    ranges = list(_MAVEN_RANGE.finditer(spec))
+    if not ranges:
+        target_key = _version_key(spec)
+        return None if target_key is None else version_key >= target_key
+
+    for match in ranges:
+        low, comma, high = match.group(1).partition(',')
+        if not comma:
+            high = low # '[1.0]' pins an exact version
+        low_key = _version_key(low) if low.strip() else None
+        high_key = _version_key(high) if high.strip() else None
+        if low.strip() and low_key is None or high.strip() and high_key is None:
+            return None
+        inclusive_low, inclusive_high = match.group(0)[0] == '[', match.group(0)[-1] == ']'
+        if low_key is not None and (version_key < low_key or version_key == low_key and not inclusive_low):
+            continue
+        if high_key is not None and (version_key > high_key or version_key == high_key and not inclusive_high):
+            continue
+        return True
+    return False
+
+def version_satisfies(version, requirement):
+    """
+    Checks a version against a dependency's 'versions' (any of them may match) in its
+    'syntax' ('fabric' or 'maven'). Returns True, False, or None when it can't be decided.
+    """
+    predicates = requirement.get('versions') or []
+    if not predicates:
+        return True
+    undecided = False
+    for predicate in predicates:
+        if requirement.get('syntax') == 'maven':
+            result = _maven_range_matches(version, predicate)
+        else:
+            # Space-separated Fabric predicates must all match
+            results = [_fabric_predicate_matches(version, part) for part in predicate.split()] or [True]
+            result = False if False in results else (None if None in results else True)
+        if result:
+            return True
+        undecided = undecided or result is None
+    return None if undecided else False
+
+def dependency_record(mod):
+    """
+    Copy of a record with only DEPENDENCY_FIELDS (of the mod and its bundled JARs), for
+    callers that collect records for analyze_dependencies but can't keep them whole.
+    """
+    slim = ModRecord((key, mod[key]) for key in DEPENDENCY_FIELDS if key in mod)
+    if mod.get('nested'):
+        slim['nested'] = [dependency_record(record) for record in mod['nested']]
+    return slim
+
+def analyze_dependencies(mods):
+    """
+    Builds a mod-id index over the scanned mods (including 'provides' aliases and bundled
+    JARs) and checks every declared dependency against it with dictionary lookups.
+
+    Returns {'mod_ids': count, 'issues': [...], 'counts': {type: count}, 'graph': {...}}.
+    Issue types: 'missing', 'version' (range not satisfied), 'duplicate' (one mod id in
+    several JARs) and 'breaks' (a declared incompatibility is installed).
+    """
+    providers = {}  # mod id -> records providing it
+    top_level = {}  # mod id -> top-level mods declaring it as their own id
+    for mod in mods:
+        for record in [mod] + list(mod.get('nested', ())):
+            for mod_id in [record.get('mod_id')] + list(record.get('provides') or ()):
+                if mod_id:
+                    providers.setdefault(mod_id, []).append(record)
+        if mod.get('mod_id'):
+            top_level.setdefault(mod['mod_id'], []).append(mod)
+
+    issues = []
+
+    def add(issue_type, severity, mod, target, message, requirement=None, found=()):
+        issues.append({
+            'type': issue_type, 'severity': severity, 'mod': mod['name'], 'filename': mod['filename'],
+            'mod_id': mod.get('mod_id'), 'target': target,
+            'required': ' || '.join(requirement.get('versions') or ['*']) if requirement else None,
+            'found': [f"{record['version']} ({record['filename']})" for record in found],
+            'message': message
+        })
+
+    for mod_id, owners in top_level.items():
+        if len(owners) > 1:
+            files = ', '.join(owner['filename'] for owner in owners)
+            add('duplicate', 'error', owners[0], mod_id, f"Mod id '{mod_id}' is provided by {len(owners)} JARs: {files}",
+                found=owners)
+
+    for mod in mods:
+        for requirement in mod.get('dependencies', ()):
+            target, kind = requirement['id'], requirement['kind']
+            if target in BUILTIN_MOD_IDS or target == mod.get('mod_id'):
+                continue
+            found = providers.get(target, [])
+            wanted = ' || '.join(requirement.get('versions') or ['any version'])
+
+            if kind in CONFLICT_KINDS:
+                clashing = [record for record in found if version_satisfies(record['version'], requirement)]
+                if clashing:
+                    add('breaks', CONFLICT_KINDS[kind], mod, target,
+                        f"{mod['name']} {'breaks' if kind == 'breaks' else 'conflicts with'} {target} ({wanted}), "
+                        f"but {clashing[0]['name']} {clashing[0]['version']} is installed",
+                        requirement, clashing)
+                continue
+
+            missing_severity, version_severity = DEPENDENCY_KINDS.get(kind, (None, None))
+            if not found:
+                if missing_severity:
+                    add('missing', missing_severity, mod, target,
+                        f"{mod['name']} {'requires' if kind == 'depends' else kind} {target} ({wanted}), which is not installed",
+                        requirement)
+            elif version_severity and not any(version_satisfies(record['version'], requirement) is not False
+                                              for record in found):
+                add('version', version_severity, mod, target,
+                    f"{mod['name']} needs {target} {wanted}, but found {', '.join(r['version'] for r in found)}",
+                    requirement, found)
+
+    counts = {}
+    for issue in issues:
+        counts[issue['type']] = counts.get(issue['type'], 0) + 1
+
+    graph = {}
+    for mod_id, owners in top_level.items():
+        mod = owners[0]
+        graph[mod_id] = {
+            'name': mod['name'],
+            'version': mod['version'],
+            'filename': mod['filename'],
+            'depends': sorted({r['id'] for r in mod.get('dependencies', ()) if r['kind'] not in CONFLICT_KINDS}),
+            'breaks': sorted({r['id'] for r in mod.get('dependencies', ()) if r['kind'] in CONFLICT_KINDS}),
+            'bundles': sorted({r['mod_id'] for r in mod.get('nested', ()) if r.get('mod_id')}),
+        }
+    return {'mod_ids': len(providers), 'issues': issues, 'counts': counts, 'graph': graph}
+
+def format_dependency_lines(analysis):
+    """Renders analyze_dependencies results as human-readable lines (no trailing newlines)."""
+    counts = analysis['counts']
+    lines = [f"Dependency Check: {len(analysis['issues'])} issues ({counts.get('missing', 0)} missing, "
+             f"{counts.get('version', 0)} version mismatches, {counts.get('duplicate', 0)} duplicate ids, "
+             f"{counts.get('breaks', 0)} conflicts)"]
+    for issue in analysis['issues']:
+        lines.append(f" [{issue['severity'].upper()}] {issue['message']}")
+    return lines
+
+
+# --- Launcher Helpers ---
+def get_launcher_paths(os_system=None):
+    """Returns the LAUNCHER_PATHS entry for the given (or current) OS."""
+    os_system = os_system or platform.system()
+    if os_system == "Windows":
+        return LAUNCHER_PATHS["Windows"]
+    elif os_system == "Darwin":
+        return LAUNCHER_PATHS["Darwin"]
+    return LAUNCHER_PATHS["Linux"]
+
+def resolve_path(path_template, os_system=None):
+    """Resolves OS-specific path variables like ~ and %APPDATA%."""
+    if (os_system or platform.system()) == "Windows":
+        path = path_template.replace("%APPDATA%", os.environ.get('APPDATA', ''))
+    else:
+        path = os.path.expanduser(path_template)
+    return path
+
+def find_minecraft_mods_folder(os_system=None):
+    """Attempts to find the default Minecraft mods folder based on OS."""
+    for name, path_template in get_launcher_paths(os_system).items():
+        if name.startswith("Default Minecraft"):
+            mods_path = resolve_path(path_template, os_system)
+            return mods_path if Path(mods_path).is_dir() else None
+    return None
+
+def list_instances(instance_root_path):
+    """Returns the sorted, non-hidden instance folder names inside a launcher root."""
+    # DirEntry.is_dir() usually answers from the directory listing itself, without a stat per entry
+    with os.scandir(instance_root_path) as it:
+        return sorted(entry.name for entry in it if not entry.name.startswith('.') and entry.is_dir())
+
+# Files whose changes invalidate an instance's cached metadata
+INSTANCE_METADATA_FILES = ("instance.json", "instance.cfg", "mmc-pack.json")
+INSTANCE_METADATA_WORKERS = 8
+
+# mmc-pack.json component uid -> runtime label (Prism Launcher / MultiMC)
+MMC_PACK_COMPONENTS = (
+    ("net.fabricmc.fabric-loader", "Fabric"),
+    ("net.minecraftforge", "Forge"),
+    ("org.quiltmc.quilt-loader", "Quilt"),
+    ("net.neoforged", "NeoForge"),
+)
+
+def _read_instance_cfg(cfg_path):
+    """Parses a Prism/MultiMC instance.cfg (INI-style key=value lines, optional [General] header)."""
+    values = {}
+    with open(cfg_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            key, sep, value = line.partition('=')
+            if sep and not line.startswith('['):
+                values[key.strip()] = value.strip()
+    return values
+
+def count_mod_jars(mods_path):
+    """Counts the .jar files directly inside a mods folder. Returns None if it doesn't exist."""
+    count, _, newest = summarize_mods_folder(mods_path)
+    return None if newest is None else count
+
+def get_instance_metadata(instance_path):
+    """
+    Attempts to read metadata from common instance files (XMinecraft instance.json,
+    Prism/MultiMC instance.cfg + mmc-pack.json) and counts the JARs in its mods folder.
+    """
+    instance_path = Path(instance_path)
+    mod_count = count_mod_jars(instance_path / "mods")
+    counts = {'mod_count': mod_count, 'mods_exists': mod_count is not None, 'mc_version': None, 'loader': None}
+
+    # 1. Check for XMinecraft Launcher (instance.json)
+    xmcl_path = instance_path / "instance.json"
+    if xmcl_path.exists():
+        try:
+            with open(xmcl_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                runtime = data.get('runtime', {})
+
+                # Construct a descriptive runtime string
+                runtime_parts = [f"MC: {runtime.get('minecraft') or 'N/A'}"]
+                if runtime.get('fabricLoader'): runtime_parts.append(f"Fabric: {runtime['fabricLoader']}")
+                if runtime.get('forge'): runtime_parts.append(f"Forge: {runtime['forge']}")
+                if runtime.get('quiltLoader'): runtime_parts.append(f"Quilt: {runtime['quiltLoader']}")
+                if runtime.get('neoForged'): runtime_parts.append(f"NeoForge: {runtime['neoForged']}")
+
+                counts['mc_version'] = runtime.get('minecraft')
+                for key, label in (('fabricLoader', 'Fabric'), ('forge', 'Forge'), ('quiltLoader', 'Quilt'), ('neoForged', 'NeoForge')):
+                    if runtime.get(key):
+                        counts['loader'] = label
+                        break
+
+                return dict(counts, **{
+                    'name': data.get('name', instance_path.name),
+                    'description': data.get('description', 'No description.'),
+                    'runtime': ", ".join(runtime_parts)
+                })
+        except Exception:
+            pass # Continue to fallbacks
+
+    # 2. Check for Prism Launcher / MultiMC (instance.cfg + mmc-pack.json)
+    cfg_path = instance_path / "instance.cfg"
+    if cfg_path.exists():
+        try:
+            cfg = _read_instance_cfg(cfg_path)
+            runtime_parts = []
+            try:
+                with open(instance_path / "mmc-pack.json", 'r', encoding='utf-8') as f:
+                    components = {c.get('uid'): c.get('version') for c in json.load(f).get('components', [])}
+                counts['mc_version'] = components.get('net.minecraft')
+                runtime_parts.append(f"MC: {counts['mc_version'] or 'N/A'}")
+                for uid, label in MMC_PACK_COMPONENTS:
+                    if components.get(uid):
+                        runtime_parts.append(f"{label}: {components[uid]}")
+                        counts['loader'] = counts['loader'] or label
+            except (OSError, ValueError, AttributeError):
+                # Older MultiMC instances keep the game version in instance.cfg
+                counts['mc_version'] = cfg.get('IntendedVersion')
+                runtime_parts.append(f"MC: {counts['mc_version'] or 'N/A'}")
+
+            return dict(counts, **{
+                'name': cfg.get('name') or instance_path.name,
+                'description': cfg.get('notes') or 'No description.',
+                'runtime': ", ".join(runtime_parts)
+            })
+        except Exception:
+            pass # Continue to fallbacks
+
+    # Fallback metadata
+    return dict(counts, **{
+        'name': instance_path.name,
+        'description': 'Metadata unavailable or could not be read.',
+        'runtime': 'N/A'
+    })
+
+def get_instance_signature(instance_path):
+    """Returns a tuple of mtimes (instance folder, mods folder, metadata files) that changes when the instance does."""
+    instance_path = Path(instance_path)
+    signature = []
+    for path in (instance_path, instance_path / "mods") + tuple(instance_path / name for name in INSTANCE_METADATA_FILES):
+        try:
+            signature.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+class InstanceMetadataCache:
+    """In-memory cache of get_instance_metadata results, invalidated by get_instance_signature."""
+
+    def __init__(self):
+        self._entries = {}  # absolute instance path -> (signature, metadata)
+        self._lock = threading.Lock()
+
+    def get(self, instance_path):
+        """Returns the (possibly cached) metadata of an instance. Safe to call from worker threads."""
+        key = os.path.abspath(str(instance_path))
+        signature = get_instance_signature(instance_path)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        metadata = get_instance_metadata(instance_path)
+        with self._lock:
+            self._entries[key] = (signature, metadata)
+        return metadata
+
+# --- Instance Discovery Index ---
+INSTANCE_INDEX_FILENAME = "instance-index.json"
+INSTANCE_INDEX_VERSION = 1
+DISCOVERY_WORKERS = 8
+
+def summarize_mods_folder(mods_path):
+    """Returns (jar count, total JAR bytes, newest mtime) for the .jar files directly in a mods folder."""
+    count = total_size = 0
+    newest = 0.0
+    try:
+        newest = os.stat(mods_path).st_mtime
+        with os.scandir(mods_path) as it:
+            for entry in it:
+                if entry.name.endswith('.jar'):
+                    try:
+                        stat_result = entry.stat()
+                    except OSError:
+                        continue
+                    count += 1
+                    total_size += stat_result.st_size
+                    newest = max(newest, stat_result.st_mtime)
+    except OSError:
+        return 0, 0, None
+    return count, total_size, newest
+
+def _index_instance(launcher_name, instance_path, mods_path, previous):
+    """Builds one index record, reusing the previous record if the instance is unchanged."""
+    signature = list(get_instance_signature(instance_path))
+    if previous and previous.get('signature') == signature and previous.get('mods_path') == str(mods_path):
+        return dict(previous, launcher=launcher_name)
+
+    metadata = get_instance_metadata(instance_path)
+    mod_count, total_size, last_modified = summarize_mods_folder(mods_path)
+    return {
+        'launcher': launcher_name,
+        'path': str(instance_path),
+        'mods_path': str(mods_path),
+        'name': metadata['name'],
+        'description': metadata['description'],
+        'runtime': metadata['runtime'],
+        'loader': metadata['loader'],
+        'mc_version': metadata['mc_version'],
+        'mod_count': mod_count,
+        'total_size': total_size,
+        'last_modified': last_modified,
+        'signature': signature
+    }
+
+def _probe_launcher_root(launcher_name, path_template, os_system):
+    """Lists (launcher, instance path, mods path) for one LAUNCHER_PATHS entry. Missing roots yield nothing."""
+    root = Path(resolve_path(path_template, os_system))
+    if launcher_name.startswith("Default Minecraft"):
+        # This entry already points at a mods folder; treat .minecraft itself as the instance
+        return [(launcher_name, root.parent, root)] if root.is_dir() else []
+    try:
+        instances = list_instances(root)
+    except OSError:
+        return []
+    return [(launcher_name, root / name, root / name / "mods") for name in instances]
+
+class InstanceIndex:
+    """
+    Persistent index of every instance found under all LAUNCHER_PATHS roots for this OS
+    (instance -> loader, MC version, mod count, total size, last-modified), stored as JSON
+    in the user cache directory. rebuild() probes all roots concurrently and only re-reads
+    instances whose signature (see get_instance_signature) changed.
+    """
+
+    def __init__(self, index_path=None, os_system=None):
+        self.index_path = Path(index_path) if index_path else get_user_cache_dir() / INSTANCE_INDEX_FILENAME
+        self.os_system = os_system or platform.system()
+        self.records = []
+        self.built_at = None
+
+    def load(self):
+        """Loads the saved index. Returns False if there is none (or it is outdated)."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != INSTANCE_INDEX_VERSION:
+            return False
+        self.records = data.get('instances', [])
+        self.built_at = data.get('built_at')
+        return True
+
+    def save(self):
+        """Writes the index atomically. Failures are ignored (the index is only a speed-up)."""
+        try:
+            os.makedirs(self.index_path.parent, exist_ok=True)
+            temp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': INSTANCE_INDEX_VERSION, 'built_at': self.built_at,
+                           'instances': self.records}, f)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            pass
+
+    def rebuild(self, workers=DISCOVERY_WORKERS):
+        """Probes every launcher root and instance concurrently and replaces the records."""
+        previous = {record['path']: record for record in self.records}
+        launchers = get_launcher_paths(self.os_system)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            probes = [executor.submit(_probe_launcher_root, name, template, self.os_system)
+                      for name, template in launchers.items()]
+            found = []
+            seen = set()
+            for probe in probes:
+                for launcher_name, instance_path, mods_path in probe.result():
+                    # Several entries can resolve to the same folder (e.g. alternative paths)
+                    key = os.path.realpath(str(instance_path))
+                    if key not in seen:
+                        seen.add(key)
+                        found.append((launcher_name, instance_path, mods_path))
+
+            futures = [executor.submit(_index_instance, launcher_name, instance_path, mods_path,
+                                       previous.get(str(instance_path)))
+                       for launcher_name, instance_path, mods_path in found]
+            records = []
+            for future in futures:
+                try:
+                    records.append(future.result())
+                except OSError:
+                    continue # Instance vanished while indexing
+
+        records.sort(key=lambda r: (r['launcher'].lower(), r['name'].lower()))
+        self.records = records
+        self.built_at = time.time()
+        return records
+
+    def search(self, query):
+        """Returns the records whose name, launcher, loader, MC version or folder contain every query word."""
+        words = query.lower().split()
+        if not words:
+            return list(self.records)
+        matches = []
+        for record in self.records:
+            haystack = " ".join(str(record.get(field) or '') for field in
+                                ('name', 'launcher', 'loader', 'mc_version', 'path')).lower()
+            if all(word in haystack for word in words):
+                matches.append(record)
+        return matches
+
+# --- Report Export ---
+REPORT_FORMATS = ('md', 'txt', 'json', 'csv', 'info', 'modlinks', 'deps')
+DEFAULT_EXPORT_DIR = Path.home() / "Desktop" / "modlist"
+REPORT_BUFFER_SIZE = 256 * 1024 # Write buffer per report file
+
+def make_base_filename():
+    """Returns the timestamped base name shared by all files of one export."""
+    return f"modlist-{time.strftime('%Y%m%d-%H%M%S')}"
+
+def get_system_info(scan_path, extra_sections=()):
+    """Gathers system information for info.txt."""
+    info = []
+    info.append("--- System Information ---\n")
+    info.append(f"Date and Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    system = platform.system()
+    # Custom note for the user's environment
+    if system == "Linux":
+        info.append("Operating System: Linux (Arch Linux/KDE - Inferred from user environment)\n")
+    else:
+         info.append(f"Operating System: {system} {platform.release()} ({platform.version()})\n")
+
+    info.append(f"System Architecture: {platform.machine()}\n")
+    info.append(f"Python Version: {platform.python_version()}\n")
+    info.append(f"Current Scan Path: {scan_path}\n")
+    info.extend(extra_sections)
+    info.append("\n--- Disclaimer ---\n")
+    info.append("Detailed hardware information (like RAM usage or GPU model) requires external, non-standard Python libraries and is therefore omitted.")
+    return "\n".join(info)
+
+def format_scan_timings(timings, wall_time, workers, pool_kind, cache=None):
+    """Summarizes the per-file extraction timings of a scan for info.txt."""
+    if not timings:
+        return "\n--- Scan Timings ---\nNo timing data recorded.\n"
+
+    cpu_total = sum(elapsed for _, elapsed in timings)
+    speedup = cpu_total / wall_time if wall_time > 0 else 0.0
+
+    info = ["\n--- Scan Timings ---\n"]
+    info.append(f"Worker Pool: {workers} {pool_kind} workers\n")
+    info.append(f"Files Extracted: {len(timings)}\n")
+    if cache is not None:
+        info.append(f"Metadata Cache: {cache.hits} hits, {cache.misses} misses ({cache.cache_path})\n")
+    info.append(f"Wall Time: {wall_time:.3f}s\n")
+    info.append(f"Summed Per-File Time: {cpu_total:.3f}s (parallel speedup x{speedup:.2f})\n")
+    info.append("Slowest Files:\n")
+    slowest = sorted(timings, key=lambda t: t[1], reverse=True)[:SLOWEST_FILES_REPORTED]
+    for filename, elapsed in slowest:
+        info.append(f"  {elapsed * 1000:.1f} ms - {filename}\n")
+    return "\n".join(info)
+
+def format_stream_timings(jars, first_record, wall_time, workers, pool_kind, sort_runs, cache=None):
+    """Summarizes a stream_scan for info.txt (it keeps no per-file timings list)."""
+    info = ["\n--- Streaming Scan ---\n"]
+    info.append(f"Worker Pool: {workers} {pool_kind} workers\n")
+    info.append(f"Files Extracted: {jars}\n")
+    if cache is not None:
+        info.append(f"Metadata Cache: {cache.hits} hits, {cache.misses} misses ({cache.cache_path})\n")
+    info.append(f"Wall Time: {wall_time:.3f}s (first record after {first_record or 0.0:.3f}s)\n")
+    info.append(f"Sorted Runs Spilled To Disk: {sort_runs}\n")
+    return "\n".join(info)
+
+class ReportWriter:
+    """
+    Base class for the streaming report writers used by export_reports.
+
+    Each writer streams every mod record straight to a buffered temp file next to its
+    target and is renamed into place by commit(), so a failed export never leaves a
+    half-written report behind. Subclasses override begin(), write_mod() and end().
+    """
+    suffix = ''
+    newline = None # Passed to open(); csv needs ''
+    uses_mods = True # False for writers whose write_mod() ignores the records (no pass over mods)
+
+    def __init__(self, filepath, scan_path, total_mods, diff=None, info_sections=()):
+        self.filepath = filepath
+        self.scan_path = scan_path
+        self.total_mods = total_mods
+        self.diff = diff
+        self.info_sections = info_sections
+        self.temp_path = filepath.with_name(filepath.name + ".tmp")
+        self.f = None
+
+    def open(self):
+        self.f = open(self.temp_path, 'w', encoding='utf-8', newline=self.newline, buffering=REPORT_BUFFER_SIZE)
+
+    def begin(self):
+        pass
+
+    def write_mod(self, index, mod):
+        pass
+
+    def end(self):
+        pass
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def commit(self):
+        """Flushes the temp file and atomically renames it onto the final path."""
+        self.close()
+        os.replace(self.temp_path, self.filepath)
+
+    def discard(self):
+        """Closes and removes the temp file after a failure."""
+        try:
+            self.close()
+        except OSError:
+            pass
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+    def run(self, mods):
+        """Writes the whole report for mods and commits it. Returns (seconds, bytes written)."""
+        start = time.perf_counter()
+        try:
+            self.open()
+            self.begin()
+            if self.uses_mods:
+                for index, mod in enumerate(mods):
+                    self.write_mod(index, mod)
+            self.end()
+            self.commit()
+        except BaseException:
+            self.discard()
+            raise
+        return time.perf_counter() - start, os.path.getsize(self.filepath)
+
+class MarkdownReportWriter(ReportWriter):
+    """Detailed Markdown (.md) report."""
+    suffix = '.md'
+
+    def begin(self):
+        self.f.write(f"# Minecraft Modlist Export\n\n"
+                     f"Scanned Directory: `{self.scan_path}`\n"
+                     f"Total Mods: **{self.total_mods}**\n\n---\n\n")
+
+    def write_mod(self, index, mod):
+        write = self.f.write
+        write(f"### {index+1}. {mod['name']} (`{mod['version']}`)\n")
+        write(f"**File:** `{mod['filename']}`\n\n")
+        if 'instances' in mod:
+            # Combined batch report
+            write(f"**Instances:** {', '.join(mod['instances'])}\n\n")
+        write(f"**Description:** {mod['description']}\n\n")
+
+        if mod['links']:
+            write("**Links:**\n")
+            for key, url in mod['links'].items():
+                write(f"* [{key}]({url})\n")
+        else:
+            write("* No links found in metadata.\n")
+
+        if mod.get('nested'):
+            write("\n**Bundled JARs:**\n")
+            for bundled in mod['nested']:
+                write(f"{'  ' * (bundled['depth'] - 1)}* {bundled['name']} (`{bundled['version']}`) - `{bundled['path']}` in `{bundled['parent']}`\n")
+        write("\n")
+
+    def end(self):
+        diff = self.diff
+        if not diff:
+            return
+        write = self.f.write
+        write(f"---\n\n## {format_diff_lines(diff)[0]}\n\n")
+        for mod in diff['added']:
+            write(f"* **Added:** {mod['name']} (`{mod['version']}`)\n")
+        for mod in diff['removed']:
+            write(f"* **Removed:** {mod['name']} (`{mod['version']}`)\n")
+        for mod in diff['updated']:
+            write(f"* **Updated:** {mod['name']} (`{mod['old_version']}` → `{mod['new_version']}`)\n")
+        write("\n")
+
+class TextReportWriter(ReportWriter):
+    """Plain text (.txt) report."""
+    suffix = '.txt'
+
+    def begin(self):
+        self.f.write(f"Minecraft Modlist Export\nScanned Directory: {self.scan_path}\nTotal Mods: {self.total_mods}\n" + ("=" * 50) + "\n\n")
+
+    def write_mod(self, index, mod):
+        write = self.f.write
+        write(f"MOD: {mod['name']} ({mod['version']})\n")
+        write(f"FILE: {mod['filename']}\n")
+        for key, url in mod['links'].items():
+            write(f" {key}: {url}\n")
+        for bundled in mod.get('nested', ()):
+            write(f" BUNDLED: {bundled['name']} ({bundled['version']}) in {bundled['parent']}\n")
+        write("-" * 50 + "\n")
+
+class JsonReportWriter(ReportWriter):
+    """
+    Raw data (.json) report. Records are encoded one at a time, producing the same
+    layout as json.dump(indent=4) without holding the whole document in memory.
+    """
+    suffix = '.json'
+
+    def begin(self):
+        self.f.write("{\n"
+                     f'    "scan_path": {json.dumps(str(self.scan_path))},\n'
+                     f'    "total_mods": {self.total_mods},\n'
+                     '    "mods": [')
+        self.first = True
+
+    def write_mod(self, index, mod):
+        encoded = json.dumps(mod, indent=4, default=_json_default).replace("\n", "\n        ")
+        self.f.write(("\n        " if self.first else ",\n        ") + encoded)
+        self.first = False
+
+    def end(self):
+        self.f.write("]\n}" if self.first else "\n    ]\n}")
+
+class CsvReportWriter(ReportWriter):
+    """Spreadsheet-friendly CSV (.csv) report."""
+    suffix = '.csv'
+    newline = ''
+
+    def begin(self):
+        import csv
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(['Index', 'Mod Name', 'Version', 'Filename', 'Homepage', 'Sources'])
+
+    def write_mod(self, index, mod):
+        self.writer.writerow([
+            index + 1,
+            mod['name'],
+            mod['version'],
+            mod['filename'],
+            mod['links'].get('Homepage', ''),
+            mod['links'].get('Sources', '')
+        ])
+
+class InfoReportWriter(ReportWriter):
+    """System information (.info.txt) file."""
+    suffix = '.info.txt'
+    uses_mods = False
+
+    def end(self):
+        self.f.write(get_system_info(self.scan_path, self.info_sections))
+
+class ModlinksReportWriter(ReportWriter):
+    """modlinks.txt with ALL unique extracted URLs (collected during the pass, written sorted)."""
+    suffix = '.modlinks.txt'
+
+    def begin(self):
+        self.all_links = set()
+
+    def write_mod(self, index, mod):
+        self.all_links.update(mod['links'].values())
+
+    def end(self):
+        write = self.f.write
+        write("--- Automatically Extracted Mod Links ---\n")
+        write(f"Total unique links found: {len(self.all_links)}\n\n")
+        if self.all_links:
+            for url in sorted(self.all_links):
+                write(f"{url}\n")
+        else:
+            write("No links (homepage, sources, modrinth, etc.) were found in the mod metadata files.\n")
+
+class DiffReportWriter(ReportWriter):
+    """Changes since the previous scan (.diff.json), written only after an incremental rescan."""
+    suffix = '.diff.json'
+    uses_mods = False
+
+    def end(self):
+        diff_data = {"scan_path": str(self.scan_path)}
+        diff_data.update(self.diff)
+        json.dump(diff_data, self.f, indent=4)
+
+class PerfReportWriter(ReportWriter):
+    """Scan and export instrumentation (.perf.json), see PerfRecorder. Set perf_data before run()."""
+    suffix = '.perf.json'
+    uses_mods = False
+    perf_data = None
+
+    def end(self):
+        perf_data = {"scan_path": str(self.scan_path), "total_mods": self.total_mods}
+        perf_data.update(self.perf_data or {})
+        json.dump(perf_data, self.f, indent=4)
+
+class DependencyReportWriter(ReportWriter):
+    """
+    Dependency graph and conflict analysis (.deps.json), see analyze_dependencies. Keeps
+    only the dependency fields of each record (descriptions and links are the bulk).
+    """
+    suffix = '.deps.json'
+    analysis = None # A precomputed analyze_dependencies result for the same mods, see export_reports
+
+    def begin(self):
+        self.mods = []
+        if self.analysis is not None:
+            self.uses_mods = False
+
+    def write_mod(self, index, mod):
+        self.mods.append(dependency_record(mod))
+
+    def end(self):
+        analysis = self.analysis if self.analysis is not None else analyze_dependencies(self.mods)
+        json.dump({
+            'scan_path': str(self.scan_path),
+            'total_mods': self.total_mods,
+            'mod_ids': analysis['mod_ids'],
+            'counts': analysis['counts'],
+            'issues': analysis['issues'],
+            'graph': analysis['graph']
+        }, self.f, indent=4)
+
+# Format name -> writer class, in export order
+REPORT_WRITERS = {
+    'md': MarkdownReportWriter,
+    'txt': TextReportWriter,
+    'json': JsonReportWriter,
+    'csv': CsvReportWriter,
+    'info': InfoReportWriter,
+    'modlinks': ModlinksReportWriter,
+    'deps': DependencyReportWriter,
+}
+
+def write_reports(writers, mods):
+    """
+    Writes several reports in one pass over mods: each record is handed to every writer in
+    turn (formatted into its buffered temp file), then the writers' end() and atomic rename
+    run concurrently. A failing writer is discarded without stopping the others. Returns
+    {writer: (seconds, bytes written) or the exception it failed with}.
+    """
+    outcomes = {}
+    seconds = {}
+    active = []
+    for writer in writers:
+        start = time.perf_counter()
+        try:
+            writer.open()
+            writer.begin()
+        except Exception as e:
+            writer.discard()
+            outcomes[writer] = e
+            continue
+        seconds[writer] = time.perf_counter() - start
+        active.append(writer)
+
+    passing = [writer for writer in active if writer.uses_mods]
+    try:
+        if passing:
+            for index, mod in enumerate(mods):
+                for writer in passing:
+                    start = time.perf_counter()
+                    try:
+                        writer.write_mod(index, mod)
+                    except Exception as e:
+                        writer.discard()
+                        outcomes[writer] = e
+                    seconds[writer] += time.perf_counter() - start
+                if outcomes:
+                    passing = [writer for writer in passing if writer not in outcomes]
+    except Exception as e:
+        # Reading mods failed (e.g. a sort run on disk): every report is incomplete
+        for writer in active:
+            if writer not in outcomes:
+                writer.discard()
+                outcomes[writer] = e
+    except BaseException:
+        for writer in active:
+            writer.discard()
+        raise
+
+    def finish(writer):
+        start = time.perf_counter()
+        try:
+            writer.end()
+            writer.commit()
+        except BaseException:
+            writer.discard()
+            raise
+        return seconds[writer] + time.perf_counter() - start, os.path.getsize(writer.filepath)
+
+    active = [writer for writer in active if writer not in outcomes]
+    if active:
+        with ThreadPoolExecutor(max_workers=len(active)) as executor:
+            futures = [(writer, executor.submit(finish, writer)) for writer in active]
+            for writer, future in futures:
+                try:
+                    outcomes[writer] = future.result()
+                except Exception as e:
+                    outcomes[writer] = e
+    return outcomes
+
+def format_export_stats(stats):
+    """Summarizes per-format export timings and sizes (from export_reports) for info.txt."""
+    info = ["\n--- Export Timings ---\n"]
+    for stat in stats:
+        info.append(f"{stat['format']}: {stat['seconds'] * 1000:.1f} ms, {stat['bytes']:,} bytes ({stat['filename']})\n")
+    return "\n".join(info)
+
+def format_export_summary(stats):
+    """Compact one-line per-format summary for status messages, e.g. 'md 12ms/40KB'."""
+    return ", ".join(f"{stat['format']} {stat['seconds'] * 1000:.0f}ms/{stat['bytes'] / 1024:.0f}KB" for stat in stats)
+
+def export_reports(mods, scan_path, export_dir, base_filename, formats=REPORT_FORMATS, diff=None, info_sections=(),
+                   perf=None, analysis=None):
+    """
+    Writes the selected report formats (see REPORT_WRITERS) to export_dir in one pass over
+    mods (see write_reports); each is atomically renamed into place. info.txt is
+    written last so it can include the per-format timings and byte counts. When a diff from
+    an incremental rescan is given, <base>.diff.json is written too, and when a PerfRecorder
+    is given alongside info.txt, <base>.perf.json with the scan and export timings. The deps
+    report uses analysis (analyze_dependencies of the same mods) instead of recomputing it.
+
+    Returns (written_paths, errors, stats): errors is a list of (filename, message) and stats
+    a list of {'format', 'filename', 'seconds', 'bytes'} dicts in export order.
+    """
+    export_dir = Path(export_dir)
+    names = [name for name in REPORT_WRITERS if name in formats]
+    if diff:
+        names.append('diff')
+
+    def make_writer(name, sections=info_sections):
+        writer_class = DiffReportWriter if name == 'diff' else REPORT_WRITERS[name]
+        return writer_class(export_dir / f"{base_filename}{writer_class.suffix}", scan_path, len(mods),
+                            diff, sections)
+
+    writers = {name: make_writer(name) for name in names if name != 'info'}
+    if 'deps' in writers:
+        writers['deps'].analysis = analysis
+    outcomes = write_reports(list(writers.values()), mods)
+    results = {name: (writer, outcomes[writer]) for name, writer in writers.items()} # name -> (writer, outcome)
+
+    def collect():
+        written, errors, stats = [], [], []
+        for name in names:
+            if name not in results:
+                continue
+            writer, outcome = results[name]
+            if isinstance(outcome, Exception):
+                errors.append((writer.filepath.name, str(outcome)))
+            else:
+                written.append(writer.filepath)
+                stats.append({'format': name, 'filename': writer.filepath.name,
+                              'seconds': outcome[0], 'bytes': outcome[1]})
+        return written, errors, stats
+
+    if 'info' in names:
+        _, _, stats = collect()
+        writer = make_writer('info', list(info_sections) + [format_export_stats(stats)])
+        try:
+            results['info'] = (writer, writer.run(mods))
+        except Exception as e:
+            results['info'] = (writer, e)
+
+    if perf is not None and PERF_REPORT_ENABLED and 'info' in names:
+        _, _, stats = collect()
+        names.append('perf')
+        writer = PerfReportWriter(export_dir / f"{base_filename}{PerfReportWriter.suffix}", scan_path, len(mods))
+        writer.perf_data = perf.to_dict(stats)
+        try:
+            results['perf'] = (writer, writer.run(mods))
+        except Exception as e:
+            results['perf'] = (writer, e)
+
+    return collect()
+
+# --- Batch Export ---
+BATCH_HASH_WORKERS = 8
+BATCH_EXPORT_WORKERS = 4    # Instances whose report sets are written at the same time
+BATCH_COMBINED_SUFFIX = "-combined"
+
+def content_keys(jar_entries, workers=BATCH_HASH_WORKERS, hash_cache=None):
+    """
+    Returns (keys, hashed_count): one key per (full_path, filename, stat_result) entry that is
+    equal for byte-identical files. Only files whose size is shared with another file are
+    hashed (SHA-1, reused from hash_cache when given); a file with a unique size can't have a
+    duplicate and keeps a size key.
+    """
+    keys = [None] * len(jar_entries)
+    by_size = {}
+    for index, (_, _, stat_result) in enumerate(jar_entries):
+        by_size.setdefault(stat_result.st_size, []).append(index)
+
+    to_hash = []
+    for size, indices in by_size.items():
+        if len(indices) == 1:
+            keys[indices[0]] = f"size:{size}"
+        else:
+            to_hash.extend(indices)
+
+    hashed = [jar_entries[index] for index in to_hash]
+    for position, hashes, _ in iter_hash(hashed, hash_cache, workers, "thread", algorithms=('sha1',)):
+        index = to_hash[position]
+        if hashes is None:
+            # Unreadable, never merged with another file
+            keys[index] = f"path:{os.path.abspath(str(jar_entries[index][0]))}"
+        else:
+            keys[index] = f"sha1:{hashes['sha1']}"
+    return keys, len(to_hash)
+
+def batch_scan(instances, cache=None, workers=SCAN_WORKERS, pool_kind=SCAN_POOL_KIND, hash_cache=None,
+               nested=NESTED_JARS_ENABLED, perf=None):
+    """
+    Scans several instances as one batch. instances is a list of (name, mods_path) pairs.
+
+    The mods folders are listed concurrently, JARs present in more than one place are
+    deduplicated by content (see content_keys) and every unique file is extracted once on
+    the worker pool. Returns a dict with the per-instance results ('instances': list of
+    {'name', 'mods_path', 'mods'}), the deduplicated 'unique_mods' (each with an 'instances'
+    list of instance names, numbered like the report folders when two instances share a
+    name), both as ModTables, and the counters used by format_batch_summary. Stage timings go to perf if given.
+    """
+    start = time.perf_counter()
+    perf = perf if perf is not None else PerfRecorder()
+
+    # 1. List every mods folder
+    with perf.timer('scan_for_jar_files'):
+        with ThreadPoolExecutor(max_workers=max(1, min(DISCOVERY_WORKERS, len(instances)))) as executor:
+            listings = list(executor.map(find_jar_entries, [mods_path for _, mods_path in instances]))
+    all_entries = [entry for listing in listings for entry in listing]
+
+    # 2. Group identical files
+    hash_start = time.perf_counter()
+    keys, hashed_count = content_keys(all_entries, hash_cache=hash_cache)
+    hash_time = time.perf_counter() - hash_start
+    perf.add_time('content_keys', hash_time)
+
+    # 3. Extract one representative per unique file
+    unique_index = {}   # content key -> index into unique_entries
+    unique_entries = []
+    for entry, key in zip(all_entries, keys):
+        if key not in unique_index:
+            unique_index[key] = len(unique_entries)
+            unique_entries.append(entry)
+    with perf.timer('extract'):
+        unique_mods, timings = extract_entries(unique_entries, cache, workers, pool_kind, nested=nested, perf=perf)
+
+    # 4. Fan the results back out to every instance
+    results = []
+    owners = [[] for _ in unique_entries]
+    labels = _batch_folder_names([name for name, _ in instances])
+    position = 0
+    for (name, mods_path), label, listing in zip(instances, labels, listings):
+        mods = ModTable()
+        for _, filename, _ in listing:
+            unique = unique_index[keys[position]]
+            position += 1
+            mod_data = unique_mods[unique]
+            mods.append(mod_data if mod_data['filename'] == filename else mod_data.replace(filename=filename))
+            # Instances are listed one after another, so a repeat can only be the last entry
+            if not owners[unique] or owners[unique][-1] != label:
+                owners[unique].append(label)
+        mods.sort('name')
+        results.append({'name': name, 'mods_path': mods_path, 'mods': mods})
+
+    combined = ModTable(mod_data.replace(instances=names) for mod_data, names in zip(unique_mods, owners))
+    combined.sort('name')
+    return {
+        'instances': results,
+        'unique_mods': combined,
+        'total_jars': len(all_entries),
+        'hashed_files': hashed_count,
+        'hash_time': hash_time,
+        'timings': timings,
+        'wall_time': time.perf_counter() - start,
+    }
+
+def format_batch_summary(batch):
+    """Summarizes a batch_scan result for info.txt."""
+    unique = len(batch['unique_mods'])
+    info = ["\n--- Batch Scan ---\n"]
+    info.append(f"Instances: {len(batch['instances'])}\n")
+    info.append(f"JARs Found: {batch['total_jars']} ({unique} unique, {batch['total_jars'] - unique} duplicates parsed once)\n")
+    info.append(f"Files Hashed: {batch['hashed_files']} in {batch['hash_time']:.3f}s\n")
+    info.append(f"Wall Time: {batch['wall_time']:.3f}s\n")
+    info.append("Per Instance:\n")
+    for instance in batch['instances']:
+        info.append(f"  {instance['name']}: {len(instance['mods'])} JARs ({instance['mods_path']})\n")
+    return "\n".join(info)
+
+def _batch_folder_names(names):
+    """Makes the per-instance report folder names unique (two launchers can share an instance name)."""
+    folders, seen = [], set()
+    for name in names:
+        folder, counter = name, 2
+        while folder.lower() in seen:
+            folder = f"{name} ({counter})"
+            counter += 1
+        seen.add(folder.lower())
+        folders.append(folder)
+    return folders
+
+def export_batch(batch, export_dir, base_filename, formats=REPORT_FORMATS, info_sections=(), perf=None):
+    """
+    Writes a batch_scan result: one report set per instance in its own subfolder of
+    export_dir, plus a combined report set (<base>-combined.*) of the unique mods, where each
+    mod also lists the instances that contain it. perf goes with the combined set.
+
+    Returns (written_paths, errors, stats) like export_reports; stats covers the combined
+    report set.
+    """
+    export_dir = Path(export_dir)
+    summary = format_batch_summary(batch)
+    written, errors = [], []
+
+    def export_instance(args):
+        instance, folder = args
+        instance_dir = export_dir / folder
+        os.makedirs(instance_dir, exist_ok=True)
+        return export_reports(instance['mods'], instance['mods_path'], instance_dir, base_filename, formats,
+                              info_sections=info_sections)
+
+    folders = _batch_folder_names([instance['name'] for instance in batch['instances']])
+    jobs = list(zip(batch['instances'], folders))
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(BATCH_EXPORT_WORKERS, len(jobs))) as executor:
+            futures = [executor.submit(export_instance, job) for job in jobs]
+            for folder, future in zip(folders, futures):
+                try:
+                    instance_written, instance_errors, _ = future.result()
+                except OSError as e:
+                    errors.append((folder, str(e)))
+                    continue
+                written.extend(instance_written)
+                errors.extend((f"{folder}/{filename}", message) for filename, message in instance_errors)
+
+    mods_paths = [str(instance['mods_path']) for instance in batch['instances']]
+    try:
+        scan_path = os.path.commonpath(mods_paths) if mods_paths else ''
+    except ValueError:
+        scan_path = mods_paths[0] # Different drives on Windows
+    os.makedirs(export_dir, exist_ok=True)
+    # Mods of different instances never load together, so the dependency check stays per instance
+    combined_formats = tuple(name for name in formats if name != 'deps')
+    combined_written, combined_errors, stats = export_reports(
+        batch['unique_mods'], scan_path, export_dir, base_filename + BATCH_COMBINED_SUFFIX, combined_formats,
+        info_sections=list(info_sections) + [summary], perf=perf)
+    return written + combined_written, errors + combined_errors, stats
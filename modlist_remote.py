@@ -0,0 +1,516 @@
+"""
+Optional remote metadata enrichment for the Minecraft Modlist Exporter.
+
+Looks scanned mods up in bulk on Modrinth (by SHA-1) and CurseForge (by fingerprint) and
+fills in what the JAR metadata left out: project links, and name/version/description for
+JARs without metadata. Needs the 'hashes' field, so scans must run with hashing enabled.
+
+Requests are batched, run on asyncio over a small pool of keep-alive connections per
+service and paced by a rate limiter. Responses are kept per hash/project in an on-disk
+JSON-lines cache with a TTL, so re-scans only ask about new files. Base URLs can point
+at a local stub server for offline testing. Only the standard library is used; this
+module is imported on demand so plain scans never pay for asyncio/ssl.
+"""
+import asyncio
+import json
+import os
+import ssl
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import modlist_core as core
+
+# --- Remote Enrichment Settings ---
+MODRINTH_API_URL = os.environ.get('MODLIST_MODRINTH_URL', "https://api.modrinth.com")
+CURSEFORGE_API_URL = os.environ.get('MODLIST_CURSEFORGE_URL', "https://api.curseforge.com")
+CURSEFORGE_API_KEY = os.environ.get('CURSEFORGE_API_KEY') # CurseForge lookups are skipped without a key
+USER_AGENT = f"Minxify/mc-modlist-export/{core.APP_VERSION}"
+ENRICH_MAX_CONNECTIONS = 4         # Keep-alive connections per service
+ENRICH_REQUESTS_PER_SECOND = 5.0   # Per service; Modrinth allows 300 requests/minute
+ENRICH_BATCH_SIZE = 100            # Hashes/ids per bulk request
+ENRICH_TIMEOUT_SECONDS = 20        # Per request, including connecting
+ENRICH_MAX_RETRIES = 3             # For 429/5xx answers and dropped connections
+ENRICH_CACHE_FILENAME = "remote-cache.jsonl"
+ENRICH_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ENRICH_MISS_TTL_SECONDS = 24 * 3600 # "Not found" answers are re-checked sooner
+
+LOADER_NAMES = {'fabric': 'Fabric', 'forge': 'Forge', 'neoforge': 'NeoForge', 'quilt': 'Quilt'}
+
+
+class EnrichmentError(Exception):
+    """A remote service answered with an error or could not be reached."""
+
+
+# --- Response Cache ---
+
+class ResponseCache:
+    """
+    JSON-lines cache of remote answers keyed by (kind, key), e.g. ('modrinth-version', sha1).
+    None answers ("not found") are cached too, with the shorter miss TTL. Expired entries
+    are dropped on load and never returned.
+    """
+
+    def __init__(self, cache_path=None, ttl=ENRICH_CACHE_TTL_SECONDS, miss_ttl=ENRICH_MISS_TTL_SECONDS):
+        self.cache_path = Path(cache_path) if cache_path else core.get_user_cache_dir() / ENRICH_CACHE_FILENAME
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.entries = {}   # "kind:key" -> (fetched timestamp, value)
+        self.loaded = False
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Reads the cache file once. Corrupt and expired lines are skipped."""
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        key, fetched, value = record['k'], record['t'], record['d']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if not self._expired(fetched, value):
+                        self.entries[key] = (fetched, value)
+                    else:
+                        self.dirty = True
+        except OSError:
+            pass # No cache yet, or unreadable: start empty
+
+    def _expired(self, fetched, value, now=None):
+        ttl = self.ttl if value is not None else self.miss_ttl
+        return (now or time.time()) - fetched > ttl
+
+    def get(self, kind, key):
+        """Returns (True, value) for a fresh entry, otherwise (False, None)."""
+        with self._lock:
+            entry = self.entries.get(f"{kind}:{key}")
+        if entry is None or self._expired(*entry):
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, kind, key, value):
+        with self._lock:
+            self.entries[f"{kind}:{key}"] = (time.time(), value)
+            self.dirty = True
+
+    def save(self):
+        """Rewrites the cache file atomically if anything changed. Errors are ignored."""
+        if not self.dirty:
+            return
+        now = time.time()
+        with self._lock:
+            lines = [json.dumps({'k': key, 't': fetched, 'd': value}, ensure_ascii=False)
+                     for key, (fetched, value) in self.entries.items() if not self._expired(fetched, value, now)]
+            self.dirty = False
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + ("\n" if lines else ""))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+
+# --- Async HTTP Client ---
+
+class RateLimiter:
+    """Spaces request starts at least 1/per_second apart (a token bucket of size one)."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class HttpPool:
+    """
+    Minimal asyncio HTTP/1.1 client for JSON APIs on one origin. At most max_connections
+    requests are in flight; their connections are kept alive and reused. Handles
+    Content-Length, chunked and read-until-close bodies (no compression is requested).
+    """
+
+    def __init__(self, base_url, max_connections=ENRICH_MAX_CONNECTIONS, per_second=ENRICH_REQUESTS_PER_SECOND,
+                 headers=None, timeout=ENRICH_TIMEOUT_SECONDS, retries=ENRICH_MAX_RETRIES):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported API base URL: {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.base_path = parts.path.rstrip('/')
+        host_header = self.host if parts.port is None else f"{self.host}:{parts.port}"
+        self.headers = dict({'Host': host_header, 'User-Agent': USER_AGENT, 'Accept': 'application/json'},
+                            **(headers or {}))
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = RateLimiter(per_second)
+        self.requests = 0
+        self.connections = 0
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []     # (reader, writer) pairs ready for reuse
+
+    async def _connect(self):
+        if self._idle:
+            return self._idle.pop(), True
+        self.connections += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl), False
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed before a response")
+        try:
+            status = int(status_line.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise EnrichmentError(f"Malformed status line: {status_line[:80]!r}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass # Trailers
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304) or 100 <= status < 200:
+            body = b''
+        else:
+            body = await reader.read()
+            headers['connection'] = 'close'
+        return status, headers, body
+
+    async def _send(self, method, path, body):
+        head = [f"{method} {self.base_path}{path} HTTP/1.1"]
+        head += [f"{name}: {value}" for name, value in self.headers.items()]
+        if body is not None:
+            head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + (body or b'')
+        for attempt in range(2):
+            (reader, writer), reused = await self._connect()
+            try:
+                writer.write(payload)
+                await writer.drain()
+                response = await self._read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused and attempt == 0:
+                    continue # The server dropped an idle keep-alive connection; retry on a fresh one
+                raise ConnectionError(f"{method} {path}: {e}") from e
+            except BaseException:
+                writer.close()
+                raise
+            if response[1].get('connection', '').lower() == 'close':
+                writer.close()
+            else:
+                self._idle.append((reader, writer))
+            return response
+
+    async def request_json(self, method, path, payload=None):
+        """
+        Sends one request and returns the decoded JSON body, or None for 404. Retries 429/5xx
+        answers (honouring Retry-After) and network errors; raises EnrichmentError after that.
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        for attempt in range(self.retries + 1):
+            async with self._slots:
+                await self.limiter.wait()
+                self.requests += 1
+                try:
+                    status, headers, data = await asyncio.wait_for(self._send(method, path, body), self.timeout)
+                except (OSError, asyncio.TimeoutError, EnrichmentError) as e:
+                    if attempt == self.retries:
+                        raise EnrichmentError(f"{self.host}: {e or type(e).__name__}") from e
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+            if status == 404:
+                return None
+            if status == 429 or status >= 500:
+                if attempt == self.retries:
+                    raise EnrichmentError(f"{self.host}{path.split('?')[0]}: HTTP {status}")
+                try:
+                    delay = float(headers.get('retry-after', ''))
+                except ValueError:
+                    delay = 2 ** attempt
+                await asyncio.sleep(min(delay, 60))
+                continue
+            if not 200 <= status < 300:
+                raise EnrichmentError(f"{self.host}{path.split('?')[0]}: HTTP {status}")
+            try:
+                return json.loads(data.decode('utf-8')) if data else None
+            except ValueError as e:
+                raise EnrichmentError(f"{self.host}{path.split('?')[0]}: invalid JSON ({e})") from e
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+def _batches(items, size=ENRICH_BATCH_SIZE):
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _cached_bulk(cache, kind, keys, fetch_batch, stats):
+    """
+    Resolves keys through the cache, fetching the misses in concurrent batches.
+    fetch_batch(batch) returns {key: value}; keys it leaves out are cached as None.
+    """
+    found, missing = {}, []
+    for key in dict.fromkeys(keys):
+        hit, value = cache.get(kind, key)
+        if hit:
+            found[key] = value
+        else:
+            missing.append(key)
+    stats['cached'] += len(found)
+
+    async def run(batch):
+        try:
+            answers = await fetch_batch(batch)
+        except EnrichmentError as e:
+            stats['errors'].append(str(e))
+            return # Not cached: retried on the next run
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            stats['errors'].append(f"{kind}: unexpected answer ({type(e).__name__}: {e})")
+            return
+        for key in batch:
+            value = answers.get(key)
+            cache.put(kind, key, value)
+            found[key] = value
+
+    await asyncio.gather(*(run(batch) for batch in _batches(missing)))
+    return found
+
+
+# --- Services ---
+
+def _expect(answer, kind, where):
+    """Returns answer if it is None or of the expected type (dict/list), else raises EnrichmentError."""
+    if answer is not None and not isinstance(answer, kind):
+        raise EnrichmentError(f"{where}: unexpected answer ({type(answer).__name__} instead of {kind.__name__})")
+    return answer
+
+
+async def _lookup_modrinth(pool, cache, sha1s, stats):
+    """Returns {sha1: (version, project)} for the hashes Modrinth knows."""
+    async def fetch_versions(batch):
+        where = f"{pool.host}/v2/version_files"
+        answer = _expect(await pool.request_json('POST', '/v2/version_files', {'hashes': batch, 'algorithm': 'sha1'}),
+                         dict, where) or {}
+        if not all(_is_modrinth_version(version) for version in answer.values()):
+            raise EnrichmentError(f"{where}: unexpected answer (version without a project id)")
+        return {sha1: _trim_modrinth_version(version) for sha1, version in answer.items()}
+
+    async def fetch_projects(batch):
+        ids = quote(json.dumps(batch, separators=(',', ':')))
+        projects = _expect(await pool.request_json('GET', f'/v2/projects?ids={ids}'),
+                           list, f"{pool.host}/v2/projects") or []
+        return {project['id']: project for project in projects
+                if isinstance(project, dict) and isinstance(project.get('id'), str)}
+
+    versions = await _cached_bulk(cache, 'modrinth-version', sha1s, fetch_versions, stats)
+    # Checked again: the cache may hold answers written by an older version
+    versions = {sha1: _trim_modrinth_version(v) for sha1, v in versions.items() if _is_modrinth_version(v)}
+    projects = await _cached_bulk(cache, 'modrinth-project', (v['project_id'] for v in versions.values()),
+                                  fetch_projects, stats)
+    projects = {project_id: project for project_id, project in projects.items()
+                if isinstance(project, dict) and isinstance(project.get('id'), str)}
+    return {sha1: (version, projects.get(version['project_id']))
+            for sha1, version in versions.items() if projects.get(version['project_id'])}
+
+
+def _is_modrinth_version(version):
+    return isinstance(version, dict) and isinstance(version.get('project_id'), str)
+
+
+def _trim_modrinth_version(version):
+    trimmed = {key: version.get(key) for key in ('id', 'project_id', 'version_number')}
+    for key in ('loaders', 'game_versions'):
+        values = version.get(key)
+        trimmed[key] = [value for value in values if isinstance(value, str)] if isinstance(values, list) else []
+    return trimmed
+
+
+async def _lookup_curseforge(pool, cache, fingerprints, stats):
+    """Returns {fingerprint: (file, mod)} for the fingerprints CurseForge knows."""
+    async def fetch_files(batch):
+        where = f"{pool.host}/v1/fingerprints"
+        answer = _expect(await pool.request_json('POST', '/v1/fingerprints', {'fingerprints': batch}), dict, where) or {}
+        data = _expect(answer.get('data'), dict, where) or {}
+        matches = {}
+        for match in _expect(data.get('exactMatches'), list, where) or ():
+            if not isinstance(match, dict) or not isinstance(match.get('file'), dict):
+                continue
+            file_info = match['file']
+            fingerprint = file_info.get('fileFingerprint')
+            if fingerprint in batch:
+                matches[fingerprint] = {'mod_id': match.get('id') or file_info.get('modId'), 'file_id': file_info.get('id'),
+                                        'display_name': file_info.get('displayName')}
+        return matches
+
+    async def fetch_mods(batch):
+        where = f"{pool.host}/v1/mods"
+        answer = _expect(await pool.request_json('POST', '/v1/mods', {'modIds': batch}), dict, where) or {}
+        return {mod['id']: {'name': mod.get('name'), 'summary': mod.get('summary'),
+                            'links': mod['links'] if isinstance(mod.get('links'), dict) else {}}
+                for mod in _expect(answer.get('data'), list, where) or ()
+                if isinstance(mod, dict) and isinstance(mod.get('id'), int)}
+
+    files = await _cached_bulk(cache, 'curseforge-file', fingerprints, fetch_files, stats)
+    files = {fp: f for fp, f in files.items() if isinstance(f, dict) and isinstance(f.get('mod_id'), int)}
+    mod_infos = await _cached_bulk(cache, 'curseforge-mod', (f['mod_id'] for f in files.values()), fetch_mods, stats)
+    mod_infos = {mod_id: info for mod_id, info in mod_infos.items() if isinstance(info, dict)}
+    return {fp: (f, mod_infos.get(f['mod_id'])) for fp, f in files.items() if mod_infos.get(f['mod_id'])}
+
+
+async def _enrich_async(sha1s, fingerprints, cache, modrinth_url, curseforge_url, curseforge_key, stats):
+    pools, lookups = [], {}
+    if modrinth_url and sha1s:
+        pool = HttpPool(modrinth_url)
+        pools.append(pool)
+        lookups['modrinth'] = _lookup_modrinth(pool, cache, sha1s, stats)
+    if curseforge_url and curseforge_key and fingerprints:
+        pool = HttpPool(curseforge_url, headers={'x-api-key': curseforge_key})
+        pools.append(pool)
+        lookups['curseforge'] = _lookup_curseforge(pool, cache, fingerprints, stats)
+    try:
+        results = dict(zip(lookups, await asyncio.gather(*lookups.values())))
+    finally:
+        for pool in pools:
+            await pool.close()
+        stats['requests'] = sum(pool.requests for pool in pools)
+        stats['connections'] = sum(pool.connections for pool in pools)
+    return results.get('modrinth', {}), results.get('curseforge', {})
+
+
+# --- Merging ---
+
+def _add_links(links, candidates):
+    """Adds each (key, url) whose key and url are both new; returns whether anything was added."""
+    known = set(links.values())
+    added = False
+    for key, url in candidates:
+        if url and isinstance(url, str) and key not in links and url not in known:
+            links[key] = url
+            known.add(url)
+            added = True
+    return added
+
+
+def _record_updates(mod, modrinth, curseforge):
+    """Returns the fields to change on mod for its Modrinth/CurseForge matches (may be empty)."""
+    links = dict(mod.get('links') or {})
+    remote = dict(mod.get('remote') or {})
+    fallback = mod.get('loader') == 'Unknown' and not mod.get('mod_id')
+    fields = {}
+    if modrinth:
+        version, project = modrinth
+        project_url = f"https://modrinth.com/{project.get('project_type') or 'mod'}/{project.get('slug') or project['id']}"
+        remote['modrinth'] = {'project_id': project['id'], 'version_id': version.get('id'), 'url': project_url}
+        _add_links(links, [('Modrinth', project_url), ('Sources', project.get('source_url')),
+                           ('Issues', project.get('issues_url')), ('Wiki', project.get('wiki_url')),
+                           ('Discord', project.get('discord_url'))])
+        if fallback:
+            loaders = [LOADER_NAMES.get(l, l.title()) for l in version.get('loaders') or () if l in LOADER_NAMES]
+            fields.update(name=project.get('title') or mod['name'], version=version.get('version_number') or mod['version'],
+                          description=project.get('description') or mod['description'])
+            if loaders:
+                fields['loader'] = '/'.join(loaders)
+            fallback = False
+    if curseforge:
+        file_info, mod_info = curseforge
+        cf_links = mod_info.get('links') or {}
+        remote['curseforge'] = {'mod_id': file_info['mod_id'], 'file_id': file_info.get('file_id'),
+                                'url': cf_links.get('websiteUrl')}
+        _add_links(links, [('CurseForge', cf_links.get('websiteUrl')), ('Sources', cf_links.get('sourceUrl')),
+                           ('Issues', cf_links.get('issuesUrl')), ('Wiki', cf_links.get('wikiUrl'))])
+        if fallback:
+            fields.update(name=mod_info.get('name') or mod['name'],
+                          description=mod_info.get('summary') or mod['description'])
+            if mod.get('version') in (None, '', 'N/A') and file_info.get('display_name'):
+                fields['version'] = file_info['display_name']
+    if remote != (mod.get('remote') or {}):
+        fields['remote'] = remote
+    if links != (mod.get('links') or {}):
+        fields['links'] = links
+    return fields
+
+
+def enrich_mods(mods, cache=None, modrinth_url=MODRINTH_API_URL, curseforge_url=CURSEFORGE_API_URL,
+                curseforge_key=CURSEFORGE_API_KEY):
+    """
+    Looks mods up remotely and returns (updates, stats): updates maps an index into mods to
+    the fields to set (see ModRecord.replace); mods are not changed. Mods without 'hashes'
+    are skipped. Pass '' as a URL to skip that service. cache is a ResponseCache that is
+    loaded here and saved by the caller; without one, answers are only kept in memory.
+    Network errors and unexpected answers are collected in stats['errors'] instead of
+    raised (and never cached), so a failed lookup never fails a scan. Must not be called
+    from a running event loop (the GUI and CLI call it from plain threads).
+    """
+    stats = {'mods': len(mods), 'matched': 0, 'cached': 0, 'requests': 0, 'connections': 0, 'errors': []}
+    if cache is None:
+        cache = ResponseCache()
+        cache.loaded = True # Memory only: never read the file (and the caller never saves it)
+    cache.load()
+    sha1s = [m['hashes']['sha1'] for m in mods if m.get('hashes') and m['hashes'].get('sha1')]
+    fingerprints = [m['hashes']['curseforge'] for m in mods if m.get('hashes') and m['hashes'].get('curseforge')]
+    if not sha1s and not fingerprints:
+        return {}, stats
+    try:
+        modrinth, curseforge = asyncio.run(_enrich_async(sha1s, fingerprints, cache, modrinth_url, curseforge_url,
+                                                         curseforge_key, stats))
+    except (EnrichmentError, ValueError, OSError) as e:
+        stats['errors'].append(str(e))
+        modrinth, curseforge = {}, {}
+    updates = {}
+    for index, mod in enumerate(mods):
+        file_hashes = mod.get('hashes') or {}
+        fields = _record_updates(mod, modrinth.get(file_hashes.get('sha1')), curseforge.get(file_hashes.get('curseforge')))
+        if fields:
+            updates[index] = fields
+        if 'remote' in fields:
+            stats['matched'] += 1
+    return updates, stats
+
+
+def format_enrich_summary(stats):
+    """One-line summary for logs and the status bar."""
+    summary = (f"{stats['matched']}/{stats['mods']} mods matched remotely"
+               f" ({stats['requests']} requests, {stats['cached']} cached answers)")
+    if stats['errors']:
+        summary += f"; {len(stats['errors'])} lookups failed: {stats['errors'][0]}"
+    return summary
@@ -1,13 +1,34 @@
+import sys
+import time
+STARTUP_START = time.perf_counter() # Import time and time to first paint go into .perf.json (see record_startup)
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Any arguments switch to the headless command-line interface, before tkinter is loaded
+    from modlist_cli import main
+    from modlist_core import record_startup
+    record_startup('import', STARTUP_START)
+    sys.exit(main())
+
 import tkinter as tk
-from tkinter import filedialog, ttk, Toplevel
+from tkinter import ttk, Toplevel
 import os
-import json
-import csv
 from pathlib import Path
 import platform
-import time
-from datetime import datetime
-import zipfile
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from modlist_core import (
+    APP_VERSION, LAUNCHER_PATHS, SCAN_WORKERS, SCAN_POOL_KIND, METADATA_CACHE_ENABLED, DEFAULT_EXPORT_DIR,
+    MetadataCache, extract_mod_info, find_jar_entries, iter_extract_cached, build_scan_index,
+    diff_mod_lists, format_diff_lines, resolve_path, find_minecraft_mods_folder, list_instances,
+    get_instance_metadata, InstanceMetadataCache, INSTANCE_METADATA_WORKERS, InstanceIndex, export_reports,
+    batch_scan, export_batch, analyze_dependencies, format_dependency_lines, SCAN_HASHES_ENABLED, FileHashCache, iter_hash, NESTED_JARS_ENABLED, format_scan_timings, format_export_summary, make_base_filename,
+    PerfRecorder, ProfileCapture, PROFILE_MODE, profiled_pool, ModTable,
+    FolderWatcher, apply_watch_changes, format_watch_changes, extract_entries, hash_entries,
+    ModSearchIndex, ENRICH_ENABLED, record_scan_history, record_startup
+)
+record_startup('import', STARTUP_START)
 
 # --- Theme Definitions ---
 LIGHT_THEME = {
@@ -31,41 +52,31 @@ DARK_THEME = {
     'button_active_bg': '#606060' # Button active bg
 }
 
-# --- Common Launcher Path Definitions ---
-LAUNCHER_PATHS = {
-    "Windows": {
-        "Default Minecraft (.minecraft)": r"%APPDATA%\.minecraft\mods", # Final folder
-        "Prism Launcher (Instances)": r"%APPDATA%\PrismLauncher\instances", # Instance root
-        "MultiMC (Instances)": r"%APPDATA%\MultiMC\instances", # Instance root
-        "Modrinth App (Instances)": r"%APPDATA%\Modrinth\instances", # Instance root
-        "CurseForge (Legacy Overwolf)": r"%APPDATA%\CurseForge\Minecraft\Instances", # Instance root
-        "FTB App (Instances)": r"%APPDATA%\ftblauncher\instances", # Instance root
-        "GDLauncher (Instances)": r"%APPDATA%\gdlauncher\instances", # Instance root
-        "Technic Launcher (Modpacks)": r"%APPDATA%\.technic\modpacks", # Instance root
-        "ATLauncher (Instances)": r"%APPDATA%\ATLauncher\Instances", # Instance root
-    },
-    "Linux": {
-        "Default Minecraft (.minecraft)": "~/.minecraft/mods", # Final folder
-        "Prism Launcher (Instances)": "~/.local/share/PrismLauncher/instances", # Instance root
-        "MultiMC (Instances)": "~/.local/share/multimc/instances", # Instance root
-        "PolyMC (Instances)": "~/.local/share/polymc/instances", # Instance root
-        "Modrinth App (Instances)": "~/.local/share/modrinth-app/instances", # Instance root
-        "GDLauncher / GTK-L (Instances) (1)": "~/.local/share/gdlauncher/instances", # Instance root
-        "GDLauncher / GTK-L (Instances) (2 - Alternative)": "~/gdlauncher/instances", # Instance root
-        "ATLauncher (Instances) (1)": "~/ATLauncher/Instances", # Instance root
-        "ATLauncher (Instances) (2 - Local Share)": "~/.local/share/atlauncher/instances", # Instance root
-        "FTB App (Flatpak/Snap)": "~/.var/app/com.feed-the-beast.ftb-app/data/ftblauncher/instances", # Instance root
-        "XMinecraft Launcher (Instances)": "~/.minecraftx/instances", # Instance root
-    },
-    "Darwin": { # macOS
-        "Default Minecraft": "~/Library/Application Support/minecraft/mods", # Final folder
-        "Prism Launcher (Instances)": "~/Library/Application Support/PrismLauncher/instances", # Instance root
-        "MultiMC (Instances)": "~/Library/Application Support/MultiMC/instances", # Instance root
-        "Modrinth App (Instances)": "~/Library/Application Support/Modrinth/instances", # Instance root
-        "CurseForge (Overwolf)": "~/Library/Application Support/CurseForge/Minecraft/Instances", # Instance root
-        "FTB App (Instances)": "~/Library/Application Support/ftblauncher/instances", # Instance root
-    }
-}
+# --- Background Scan Settings ---
+SCAN_POLL_INTERVAL_MS = 50      # How often the Tk thread drains the scan queue
+SCAN_MESSAGES_PER_POLL = 200    # Max queued results handled per poll, keeps the UI responsive
+# Hashing runs from background threads of a Tk process: forking it can deadlock and spawned
+# workers would re-import this module (and tkinter), so the GUI never uses the process pool
+HASH_POOL_KIND = "thread"
+
+# --- Results View Settings ---
+RESULTS_CHUNK_SIZE = 500        # Rows inserted per after() tick when (re)filling the results view
+RESULTS_COLUMNS = (             # (column id, heading, width) next to the Name tree column
+    ('version', 'Version', 140),
+    ('loader', 'Loader', 80),
+    ('size', 'Size', 80),
+)
+FILTER_DELAY_MS = 120           # The results filter re-runs once typing pauses this long
+FILTER_ALL = "All"              # Facet choice that doesn't filter
+
+def format_size(num_bytes):
+    """Formats a byte count for display (e.g. '1.4 MB')."""
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
 class ModlistExporterApp:
     """
@@ -75,18 +86,65 @@ class ModlistExporterApp:
 
     def __init__(self, master):
         self.master = master
-        master.title("Minecraft Modlist Exporter v4.5 (Rich Instance Selection)")
+        master.title(f"Minecraft Modlist Exporter v{APP_VERSION} (Rich Instance Selection)")
         master.geometry("700x550")
         master.resizable(True, True)
 
         # --- State Variables ---
-        self.scanned_mods = []
+        self.scanned_mods = ModTable()
         self.current_scan_path = ""
         self.current_theme_name = "light"
         self.current_theme = LIGHT_THEME
         self.os_system = platform.system()
         self.launcher_popup = None      # Stores the first (Launcher Root) popup
         self.instance_popup = None      # Stores the second (Instance List) popup
+        self.scan_workers = SCAN_WORKERS
+        self.scan_pool_kind = SCAN_POOL_KIND
+        self.scan_timings = []          # (filename, seconds) for each JAR of the last scan
+        self.scan_wall_time = 0.0
+        self.scan_perf = PerfRecorder()  # Timers of the last scan and its UI updates, for .perf.json
+        self.scan_thread = None         # Background worker for the running scan
+        self.scan_queue = queue.Queue() # Worker -> Tk thread messages
+        self.scan_cancel_event = threading.Event()
+        self.scan_total = 0
+        self.scan_start_time = 0.0
+        self.metadata_cache = MetadataCache() if METADATA_CACHE_ENABLED else None
+        self.hash_cache = FileHashCache() if METADATA_CACHE_ENABLED else None
+        self.scan_hashed = 0            # Files hashed so far by the optional hashing stage
+        self.remote_cache = None        # Modrinth/CurseForge answers, see _get_remote_cache
+        self.scan_enriching = 0         # Files being looked up remotely by the optional enrichment stage
+        self.scan_enriched = 0          # Of those, records updated so far
+        self.enrich_summary = ""
+        self.scan_index = {}            # Last complete scan, see build_scan_index (for incremental rescans)
+        self.scan_complete = False      # The last scan finished without being cancelled or failing
+        self.scan_entries = []          # (path, filename, stat) of the running scan
+        self.scan_results_by_entry = [] # mod_data per scan_entries slot
+        self.scan_table_positions = []  # Position in scanned_mods per scan_entries slot, while scanning
+        self.previous_mods = None       # Mods of the previous scan while an incremental rescan runs
+        self.last_diff = None           # diff_mod_lists result of the last incremental rescan
+        self.dependency_analysis = None # analyze_dependencies result of the last complete scan
+        self.export_thread = None       # Background worker for the running export
+        self.results_rows = {}          # Treeview item id -> mod dict (rows whose links aren't built yet)
+        self.record_items = {}          # id(mod) -> Treeview item of its row (for watch mode patches)
+        self.dependency_item = None     # Treeview item of the dependency summary row
+        self.search_index = ModSearchIndex() # Filled as results arrive, backs the results filter
+        self.filter_job = None          # Pending after() id of a debounced filter update
+        self.watch_thread = None        # Background FolderWatcher on current_scan_path
+        self.watch_queue = queue.Queue() # Watcher -> Tk thread change sets
+        self.watch_stop_event = threading.Event()
+        self.results_sort = ('name', False) # (column, descending)
+        self.results_fill_job = None    # Pending after() id of a chunked fill
+        self.instance_metadata_cache = InstanceMetadataCache()
+        self.instance_pool = None       # Created on first use of the instance popup
+        self.instance_queue = queue.Queue() # (popup, instance key, metadata) from the pool
+        self.instance_rows = {}         # instance key -> widgets to fill in when metadata arrives
+        self.instance_index = None      # InstanceIndex, loaded when the launcher popup first opens
+        self.index_thread = None        # Background InstanceIndex.rebuild()
+        self.index_queue = queue.Queue()
+        self.index_tree = None          # Treeview of indexed instances in the launcher popup
+        self.index_search_var = None
+        self.index_status_label = None
+        self.export_queue = queue.Queue()
 
         # --- Central Centering Frame (Grid) ---
         master.grid_rowconfigure(0, weight=1)
@@ -103,9 +161,7 @@ class ModlistExporterApp:
         self.style.configure('TFrame', background=LIGHT_THEME['bg'])
         self.style.configure('TLabel', background=LIGHT_THEME['bg'], foreground=LIGHT_THEME['fg'], font=('Inter', 10))
         self.style.configure('TButton', font=('Inter', 10, 'bold'), padding=8, background=LIGHT_THEME['button_bg'], foreground=LIGHT_THEME['fg'])
-        self.style.map('TButton',
-                       background=[('active', LIGHT_THEME['button_active_bg']), ('!disabled', LIGHT_THEME['button_bg'])],
-                       foreground=[('active', LIGHT_THEME['fg']), ('!disabled', LIGHT_THEME['fg'])])
+        # The state maps are set once by apply_theme below
 
         # --- Theme Toggle Button ---
         self.theme_button_frame = ttk.Frame(self.content_wrapper)
@@ -116,6 +172,21 @@ class ModlistExporterApp:
                                        command=self.toggle_theme)
         self.theme_button.pack(side='right')
 
+        # Optional hashing stage (SHA-1/SHA-512 for Modrinth, fingerprint for CurseForge)
+        self.hashes_var = tk.BooleanVar(value=SCAN_HASHES_ENABLED)
+        ttk.Checkbutton(self.theme_button_frame, text="Compute file hashes", variable=self.hashes_var).pack(side='left', padx=(0, 10))
+        # Optional jar-in-jar scanning
+        self.nested_var = tk.BooleanVar(value=NESTED_JARS_ENABLED)
+        ttk.Checkbutton(self.theme_button_frame, text="Scan bundled JARs", variable=self.nested_var).pack(side='left', padx=(0, 10))
+        # Optional remote lookups by hash (implies hashing)
+        self.enrich_var = tk.BooleanVar(value=ENRICH_ENABLED)
+        ttk.Checkbutton(self.theme_button_frame, text="Look up on Modrinth/CurseForge", variable=self.enrich_var,
+                        command=lambda: self.enrich_var.get() and self.hashes_var.set(True)).pack(side='left', padx=(0, 10))
+        # Watch mode: patch the results as JARs are added, removed or replaced
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.theme_button_frame, text="Watch folder", variable=self.watch_var,
+                        command=self._toggle_watch).pack(side='left')
+
         # --- Main Layout Frame (Pack) ---
         self.main_frame = ttk.Frame(self.content_wrapper, padding="15")
         self.main_frame.pack(fill='both', expand=True, anchor='center')
@@ -133,26 +204,79 @@ class ModlistExporterApp:
 
         ttk.Button(button_frame, text="🚀 Quick Scan (Default)", command=self.quick_scan).pack(side='left', padx=(0, 10))
         ttk.Button(button_frame, text="🔗 Select Launcher Instance", command=self.show_launcher_paths).pack(side='left', padx=(0, 10))
-        ttk.Button(button_frame, text="📂 Select Custom Folder", command=self.select_custom_folder).pack(side='left')
+        ttk.Button(button_frame, text="📂 Select Custom Folder", command=self.select_custom_folder).pack(side='left', padx=(0, 10))
+        ttk.Button(button_frame, text="🔄 Rescan Changes", command=self.incremental_rescan).pack(side='left')
 
         # Current Path Display
         self.path_label = ttk.Label(self.main_frame, text="No folder selected.", wraplength=1000)
         self.path_label.pack(anchor='w', fill='x', pady=(5, 10))
 
+        # Scan Progress (files done / total, throughput) and Cancel
+        progress_frame = ttk.Frame(self.main_frame)
+        progress_frame.pack(fill='x', pady=(0, 10))
+
+        self.progress_bar = ttk.Progressbar(progress_frame, orient='horizontal', mode='determinate')
+        self.progress_bar.pack(side='left', fill='x', expand=True, padx=(0, 10))
+
+        self.progress_label = ttk.Label(progress_frame, text="Idle", font=('Inter', 9))
+        self.progress_label.pack(side='left', padx=(0, 10))
+
+        self.cancel_button = ttk.Button(progress_frame, text="✖ Cancel", command=self.cancel_scan, state='disabled')
+        self.cancel_button.pack(side='left')
+
         # --- Scan Results Section ---
-        self.label_results = ttk.Label(self.main_frame, text="2. Found Mods (Name, Version, Links):", font=('Inter', 12, 'bold'))
+        self.label_results = ttk.Label(self.main_frame, text="2. Found Mods (click a heading to sort, expand a mod for its links):", font=('Inter', 12, 'bold'))
         self.label_results.pack(anchor='w', pady=(5, 5))
 
-        # Text area for showing results
-        self.results_text = tk.Text(self.main_frame, height=15, state='disabled', wrap='word',
-                                    font=('Consolas', 9), relief=tk.SUNKEN, borderwidth=1)
-        self.results_text.pack(fill='both', expand=True, pady=(0, 10))
+        # Results filter: full-text (prefix/fuzzy) query plus facets, see ModSearchIndex
+        filter_frame = ttk.Frame(self.main_frame)
+        filter_frame.pack(fill='x', pady=(0, 5))
+        ttk.Label(filter_frame, text="🔍 Filter:").pack(side='left', padx=(0, 5))
+        self.filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.filter_var).pack(side='left', fill='x', expand=True, padx=(0, 10))
+        ttk.Label(filter_frame, text="Loader:").pack(side='left', padx=(0, 5))
+        self.loader_filter_var = tk.StringVar(value=FILTER_ALL)
+        self.loader_filter_box = ttk.Combobox(filter_frame, textvariable=self.loader_filter_var, values=[FILTER_ALL],
+                                              state='readonly', width=10)
+        self.loader_filter_box.pack(side='left', padx=(0, 10))
+        ttk.Label(filter_frame, text="MC:").pack(side='left', padx=(0, 5))
+        self.mc_filter_var = tk.StringVar(value=FILTER_ALL)
+        self.mc_filter_box = ttk.Combobox(filter_frame, textvariable=self.mc_filter_var, values=[FILTER_ALL],
+                                          state='readonly', width=8)
+        self.mc_filter_box.pack(side='left', padx=(0, 10))
+        self.links_filter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="Has links", variable=self.links_filter_var).pack(side='left', padx=(0, 10))
+        self.fallback_filter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="Fallback only", variable=self.fallback_filter_var).pack(side='left', padx=(0, 10))
+        self.filter_count_label = ttk.Label(filter_frame, text="", font=('Inter', 9))
+        self.filter_count_label.pack(side='left')
+        for variable in (self.filter_var, self.loader_filter_var, self.mc_filter_var, self.links_filter_var,
+                         self.fallback_filter_var):
+            variable.trace_add('write', lambda *args: self._schedule_filter())
+
+        # Results view: a Treeview only lays out visible rows, and link rows are created on expand
+        results_frame = ttk.Frame(self.main_frame)
+        results_frame.pack(fill='both', expand=True, pady=(0, 10))
+
+        self.results_tree = ttk.Treeview(results_frame, columns=[c[0] for c in RESULTS_COLUMNS], height=15)
+        self.results_tree.heading('#0', text='Name', command=lambda: self.sort_results('name'))
+        self.results_tree.column('#0', width=300, stretch=True)
+        for column, heading, width in RESULTS_COLUMNS:
+            self.results_tree.heading(column, text=heading, command=lambda c=column: self.sort_results(c))
+            self.results_tree.column(column, width=width, stretch=False, anchor='e' if column == 'size' else 'w')
+        self.results_tree.tag_configure('warning', foreground='#d2691e')
+
+        results_scrollbar = ttk.Scrollbar(results_frame, orient='vertical', command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=results_scrollbar.set)
+        self.results_tree.pack(side='left', fill='both', expand=True)
+        results_scrollbar.pack(side='right', fill='y')
+        self.results_tree.bind('<<TreeviewOpen>>', self._on_results_open)
 
         # --- Output Section ---
         output_frame = ttk.Frame(self.main_frame)
         output_frame.pack(fill='x')
 
-        self.export_button = ttk.Button(output_frame, text="💾 Export Full Report (6 Files)", command=self.export_modlist, state='disabled')
+        self.export_button = ttk.Button(output_frame, text="💾 Export Full Report (7 Files)", command=self.export_modlist, state='disabled')
         self.export_button.pack(side='left', padx=(0, 10))
 
         # Status Label
@@ -162,13 +286,21 @@ class ModlistExporterApp:
         # Apply initial theme
         self.apply_theme(LIGHT_THEME, "light")
 
+        # Startup timing: the launcher and instance popups are only built when first opened, so
+        # the main window is all there is to draw before the first paint
+        self.first_paint_binding = master.bind('<Map>', self._on_first_map, '+')
+
+    def _on_first_map(self, event):
+        """Records the time to first paint once the main window is mapped and its redraws are done."""
+        if event.widget is not self.master or self.first_paint_binding is None:
+            return
+        self.master.unbind('<Map>', self.first_paint_binding)
+        self.first_paint_binding = None
+        self.master.after_idle(record_startup, 'first_paint', STARTUP_START)
+
     def resolve_path(self, path_template):
         """Resolves OS-specific path variables like ~ and %APPDATA%."""
-        if self.os_system == "Windows":
-            path = path_template.replace("%APPDATA%", os.environ.get('APPDATA', ''))
-        else:
-            path = os.path.expanduser(path_template)
-        return path
+        return resolve_path(path_template, self.os_system)
 
     def show_launcher_paths(self):
         """Creates the first pop-up window (Launcher Root Selection)."""
@@ -185,16 +317,55 @@ class ModlistExporterApp:
             return
 
         self.launcher_popup = Toplevel(self.master)
-        self.launcher_popup.title(f"Select Launcher Root ({self.os_system})")
-        self.launcher_popup.geometry("550x450")
+        self.launcher_popup.title(f"Select Launcher Instance ({self.os_system})")
+        self.launcher_popup.geometry("760x620")
         self.launcher_popup.resizable(False, False)
         self.launcher_popup.config(bg=self.current_theme['bg'])
 
         popup_frame = ttk.Frame(self.launcher_popup, padding="15")
         popup_frame.pack(fill='both', expand=True)
 
+        # --- Indexed instances across every launcher root ---
         ttk.Label(popup_frame,
-                  text="1. Select the Launcher's root instance folder (e.g., '.../instances'):",
+                  text="Search all instances found on this machine:",
+                  font=('Inter', 11, 'bold')).pack(pady=(0, 5), anchor='w')
+
+        search_frame = ttk.Frame(popup_frame)
+        search_frame.pack(fill='x', pady=(0, 5))
+        self.index_search_var = tk.StringVar()
+        self.index_search_var.trace_add('write', lambda *args: self._fill_index_tree())
+        search_entry = ttk.Entry(search_frame, textvariable=self.index_search_var)
+        search_entry.pack(side='left', fill='x', expand=True, padx=(0, 10))
+        ttk.Button(search_frame, text="🔄 Refresh Index", command=self._refresh_instance_index).pack(side='left', padx=(0, 10))
+        ttk.Button(search_frame, text="Scan Selected", command=self._scan_selected_index_entry).pack(side='left', padx=(0, 10))
+        ttk.Button(search_frame, text="Batch Export Selected", command=self._batch_export_selected).pack(side='left')
+
+        tree_frame = ttk.Frame(popup_frame)
+        tree_frame.pack(fill='x', pady=(0, 5))
+        self.index_tree = ttk.Treeview(tree_frame, columns=('launcher', 'loader', 'mc', 'mods', 'size', 'modified'), height=9)
+        for column, heading, width in (('#0', 'Instance', 180), ('launcher', 'Launcher', 150), ('loader', 'Loader', 70),
+                                       ('mc', 'MC', 60), ('mods', 'Mods', 50), ('size', 'Size', 75), ('modified', 'Modified', 110)):
+            self.index_tree.heading(column, text=heading)
+            self.index_tree.column(column, width=width, stretch=column == '#0')
+        index_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.index_tree.yview)
+        self.index_tree.configure(yscrollcommand=index_scrollbar.set)
+        self.index_tree.pack(side='left', fill='x', expand=True)
+        index_scrollbar.pack(side='right', fill='y')
+        self.index_tree.bind('<Double-1>', lambda e: self._scan_selected_index_entry())
+
+        self.index_status_label = ttk.Label(popup_frame, text="", font=('Inter', 9, 'italic'))
+        self.index_status_label.pack(anchor='w', pady=(0, 10))
+
+        if self.instance_index is None:
+            self.instance_index = InstanceIndex(os_system=self.os_system)
+            self.instance_index.load()
+        self._fill_index_tree()
+        self._refresh_instance_index()
+        search_entry.focus_set()
+
+        # --- Manual launcher root selection ---
+        ttk.Label(popup_frame,
+                  text="Or select a Launcher's root instance folder (e.g., '.../instances'):",
                   font=('Inter', 11, 'bold')).pack(pady=(0, 10), anchor='w')
 
         # Scrollable Frame setup
@@ -228,6 +399,114 @@ class ModlistExporterApp:
 
         self.apply_theme_to_toplevel(self.launcher_popup, scrollable_frame)
 
+    def _fill_index_tree(self):
+        """Shows the indexed instances matching the search box."""
+        if not self.index_tree or not self.index_tree.winfo_exists() or self.instance_index is None:
+            return
+        self.index_tree.delete(*self.index_tree.get_children())
+        for record in self.instance_index.search(self.index_search_var.get()):
+            modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(record['last_modified'])) if record['last_modified'] else ''
+            self.index_tree.insert('', 'end', iid=record['path'], text=record['name'],
+                                   values=(record['launcher'], record['loader'] or '', record['mc_version'] or '',
+                                           record['mod_count'], format_size(record['total_size']), modified))
+
+        total = len(self.instance_index.records)
+        if self.index_thread and self.index_thread.is_alive():
+            state = "refreshing..."
+        elif self.instance_index.built_at:
+            state = f"updated {time.strftime('%H:%M:%S', time.localtime(self.instance_index.built_at))}"
+        else:
+            state = "not built yet"
+        self.index_status_label.config(text=f"{total} instances indexed ({state}). Double-click to scan, or select several to batch export.")
+
+    def _refresh_instance_index(self):
+        """Rebuilds the instance index on a background thread; the list updates when it finishes."""
+        if self.index_thread and self.index_thread.is_alive():
+            return
+        index = self.instance_index
+
+        def worker():
+            try:
+                index.rebuild()
+                index.save()
+                self.index_queue.put(None)
+            except Exception as e:
+                self.index_queue.put(e)
+
+        self.index_thread = threading.Thread(target=worker, daemon=True)
+        self.index_thread.start()
+        self._fill_index_tree()
+        self.master.after(SCAN_POLL_INTERVAL_MS, self._poll_index_rebuild)
+
+    def _poll_index_rebuild(self):
+        """Waits on the Tk thread for the index rebuild and refreshes the list if the popup is open."""
+        try:
+            error = self.index_queue.get_nowait()
+        except queue.Empty:
+            self.master.after(SCAN_POLL_INTERVAL_MS, self._poll_index_rebuild)
+            return
+        if error is not None:
+            self._update_status(f"Error while indexing instances: {error}", 'status_fg_error')
+        self._fill_index_tree()
+
+    def _scan_selected_index_entry(self):
+        """Scans the mods folder of the instance selected in the index list."""
+        selection = self.index_tree.selection() if self.index_tree else ()
+        if not selection:
+            return
+        record = next((r for r in self.instance_index.records if r['path'] == selection[0]), None)
+        if record is None:
+            return
+
+        if self.launcher_popup:
+            self.launcher_popup.destroy()
+            self.launcher_popup = None
+        self.scan_for_jar_files(record['mods_path'])
+
+    def _batch_export_selected(self):
+        """
+        Scans every instance selected in the index list as one batch (identical JARs are parsed
+        once) and exports per-instance reports plus a combined report on a background thread.
+        """
+        selection = set(self.index_tree.selection()) if self.index_tree else set()
+        records = [r for r in self.instance_index.records if r['path'] in selection]
+        if not records:
+            return
+        if self.export_thread and self.export_thread.is_alive():
+            return
+
+        export_dir = DEFAULT_EXPORT_DIR
+        instances = [(Path(r['path']).name, r['mods_path']) for r in records]
+        cache, hash_cache, nested = self.metadata_cache, self.hash_cache, self.nested_var.get()
+        workers, pool_kind = profiled_pool(PROFILE_MODE, self.scan_workers, self.scan_pool_kind)
+        base_filename = make_base_filename()
+        self.export_button.config(state='disabled')
+        self._update_status(f"Batch exporting {len(instances)} instances...", 'fg')
+        export_start = time.perf_counter()
+        perf = PerfRecorder()
+        perf.meta.update(mode='batch', workers=workers, pool_kind=pool_kind, nested=nested,
+                         instances=[name for name, _ in instances])
+
+        def worker():
+            try:
+                with ProfileCapture(PROFILE_MODE) as capture:
+                    batch = batch_scan(instances, cache, workers, pool_kind, hash_cache, nested, perf)
+                perf.profile = capture.result
+                for file_cache in (cache, hash_cache):
+                    if file_cache is not None:
+                        file_cache.save()
+                timing_info = format_scan_timings(batch['timings'], batch['wall_time'], workers, pool_kind, cache)
+                history_error = record_scan_history(
+                    [(instance['mods'], instance['mods_path'], instance['name']) for instance in batch['instances']], perf)
+                result = export_batch(batch, export_dir, base_filename, info_sections=[timing_info], perf=perf)
+                self.export_queue.put(('done', result, time.perf_counter() - export_start, history_error))
+            except Exception as e:
+                self.export_queue.put(('error', str(e), 0.0, None))
+
+        self.export_thread = threading.Thread(target=worker, daemon=True)
+        self.export_thread.start()
+        self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_export_queue(export_dir))
+
     def select_launcher_path(self, path_name, path_template):
         """Handles the selection from the first pop-up."""
         resolved_path = self.resolve_path(path_template)
@@ -246,39 +525,7 @@ class ModlistExporterApp:
 
     def get_instance_metadata(self, instance_path):
         """Attempts to read metadata from common instance files."""
-        # 1. Check for XMinecraft Launcher (instance.json)
-        xmcl_path = Path(instance_path) / "instance.json"
-        if xmcl_path.exists():
-            try:
-                with open(xmcl_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    runtime = data.get('runtime', {})
-
-                    # Construct a descriptive runtime string
-                    runtime_parts = [f"MC: {runtime.get('minecraft') or 'N/A'}"]
-                    if runtime.get('fabricLoader'): runtime_parts.append(f"Fabric: {runtime['fabricLoader']}")
-                    if runtime.get('forge'): runtime_parts.append(f"Forge: {runtime['forge']}")
-                    if runtime.get('quiltLoader'): runtime_parts.append(f"Quilt: {runtime['quiltLoader']}")
-                    if runtime.get('neoForged'): runtime_parts.append(f"NeoForge: {runtime['neoForged']}")
-
-                    return {
-                        'name': data.get('name', Path(instance_path).name),
-                        'description': data.get('description', 'No description.'),
-                        'runtime': ", ".join(runtime_parts)
-                    }
-            except Exception as e:
-                # print(f"Error reading XMinecraft JSON: {e}")
-                pass # Continue to fallbacks
-
-        # 2. Add other launcher specific metadata checks here (e.g., Prism/MultiMC's instance.cfg)
-        # For now, we'll use a simple name fallback if JSON read fails or doesn't exist.
-
-        # Fallback metadata
-        return {
-            'name': Path(instance_path).name,
-            'description': 'Metadata unavailable or could not be read.',
-            'runtime': 'N/A'
-        }
+        return get_instance_metadata(instance_path)
 
     def show_instance_selection(self, launcher_name, instance_root_path):
         """Creates the second pop-up window (Instance Selection) with rich metadata."""
@@ -301,7 +548,7 @@ class ModlistExporterApp:
         popup_frame.pack(fill='both', expand=True)
 
         ttk.Label(popup_frame,
-                  text=f"Select the Modpack Instance (Folder) to scan its /mods directory:",
+                  text="Select the Modpack Instance (Folder) to scan its /mods directory:",
                   font=('Inter', 11, 'bold')).pack(pady=(0, 10), anchor='w')
 
         # Scrollable Frame setup for instances
@@ -318,8 +565,7 @@ class ModlistExporterApp:
 
         # List instances (directories) inside the root
         try:
-            instance_dirs = sorted([d for d in os.listdir(instance_root_path)
-                                   if (Path(instance_root_path) / d).is_dir() and not d.startswith('.')])
+            instance_dirs = list_instances(instance_root_path)
         except Exception as e:
             ttk.Label(scrollable_frame, text=f"Error reading directory: {e}", foreground='red').pack(pady=10)
             instance_dirs = []
@@ -327,12 +573,16 @@ class ModlistExporterApp:
         if not instance_dirs:
             ttk.Label(scrollable_frame, text="No instances found here. Please check the launcher path.", foreground='red').pack(pady=10)
         else:
+            # Rows are drawn immediately with placeholders; metadata is read on a background pool
+            if self.instance_pool is None:
+                self.instance_pool = ThreadPoolExecutor(max_workers=INSTANCE_METADATA_WORKERS)
+            popup = self.instance_popup
+            self.instance_rows = {}
+
             for instance_folder_name in instance_dirs:
                 full_instance_path = Path(instance_root_path) / instance_folder_name
                 final_mods_path = full_instance_path / "mods"
 
-                metadata = self.get_instance_metadata(full_instance_path)
-
                 # --- Instance Display Frame ---
                 instance_display_frame = ttk.Frame(scrollable_frame, padding=10, relief='groove', borderwidth=1)
                 instance_display_frame.pack(fill='x', pady=5, padx=5)
@@ -342,32 +592,72 @@ class ModlistExporterApp:
                 instance_display_frame.columnconfigure(1, weight=0) # Button column
 
                 # 1. Title/Name
-                ttk.Label(instance_display_frame,
-                          text=metadata['name'],
-                          font=('Inter', 11, 'bold')).grid(row=0, column=0, sticky='w', pady=(0, 2))
+                name_label = ttk.Label(instance_display_frame,
+                                       text=instance_folder_name,
+                                       font=('Inter', 11, 'bold'))
+                name_label.grid(row=0, column=0, sticky='w', pady=(0, 2))
 
                 # 2. Runtime Info (Smaller text)
-                ttk.Label(instance_display_frame,
-                          text=f"Runtime: {metadata['runtime']}",
-                          font=('Inter', 9, 'italic'),
-                          foreground='#4a4a4a' if self.current_theme_name == 'light' else '#a0a0a0'
-                          ).grid(row=1, column=0, sticky='w')
+                runtime_label = ttk.Label(instance_display_frame,
+                                          text="Runtime: Loading...",
+                                          font=('Inter', 9, 'italic'),
+                                          foreground='#4a4a4a' if self.current_theme_name == 'light' else '#a0a0a0')
+                runtime_label.grid(row=1, column=0, sticky='w')
 
                 # 3. Description (Wrap text)
-                ttk.Label(instance_display_frame,
-                          text=metadata['description'],
-                          wraplength=450).grid(row=2, column=0, sticky='w', pady=(5, 5))
+                description_label = ttk.Label(instance_display_frame,
+                                              text="Loading instance metadata...",
+                                              wraplength=450)
+                description_label.grid(row=2, column=0, sticky='w', pady=(5, 5))
 
                 # 4. Scan Button
-                scan_button_text = f"Scan /mods ({'Exists' if final_mods_path.is_dir() else 'Missing'})"
-                ttk.Button(
+                scan_button = ttk.Button(
                     instance_display_frame,
-                    text=scan_button_text,
+                    text="Scan /mods (...)",
                     command=lambda p=final_mods_path: self.scan_and_close_instance_popup(p)
-                ).grid(row=1, column=1, rowspan=2, padx=(10, 0), sticky='nse')
+                )
+                scan_button.grid(row=1, column=1, rowspan=2, padx=(10, 0), sticky='nse')
+
+                key = str(full_instance_path)
+                self.instance_rows[key] = (name_label, runtime_label, description_label, scan_button)
+                future = self.instance_pool.submit(self.instance_metadata_cache.get, full_instance_path)
+                future.add_done_callback(lambda f, k=key: self.instance_queue.put((popup, k, f)))
+
+            self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_instance_queue(popup))
 
         self.apply_theme_to_toplevel(self.instance_popup, scrollable_frame)
 
+    def _poll_instance_queue(self, popup):
+        """Fills in instance rows on the Tk thread as their metadata arrives from the pool."""
+        if popup is not self.instance_popup or not popup.winfo_exists():
+            return # Popup closed; late results are dropped below on the next open
+
+        for _ in range(SCAN_MESSAGES_PER_POLL):
+            try:
+                source_popup, key, future = self.instance_queue.get_nowait()
+            except queue.Empty:
+                break
+            if source_popup is not popup or key not in self.instance_rows:
+                continue # Result for an earlier popup
+
+            name_label, runtime_label, description_label, scan_button = self.instance_rows.pop(key)
+            try:
+                metadata = future.result()
+            except Exception as e:
+                description_label.config(text=f"Metadata could not be read: {e}")
+                continue
+
+            name_label.config(text=metadata['name'])
+            runtime_label.config(text=f"Runtime: {metadata['runtime']}")
+            description_label.config(text=metadata['description'])
+            if metadata['mods_exists']:
+                scan_button.config(text=f"Scan /mods ({metadata['mod_count']} JARs)")
+            else:
+                scan_button.config(text="Scan /mods (Missing)")
+
+        if self.instance_rows:
+            self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_instance_queue(popup))
+
     def scan_and_close_instance_popup(self, mods_path):
         """Closes the instance pop-up and starts the scan."""
         if self.instance_popup:
@@ -410,18 +700,17 @@ class ModlistExporterApp:
         self.style.configure('TFrame', background=theme['bg'])
         self.style.configure('TLabel', background=theme['bg'], foreground=theme['fg'])
         self.style.configure('TButton', background=theme['button_bg'], foreground=theme['fg'])
+        self.style.configure('TCheckbutton', background=theme['bg'], foreground=theme['fg'])
 
         # Use style map for button states (active, disabled)
         self.style.map('TButton',
                        background=[('active', theme['button_active_bg']), ('!disabled', theme['button_bg'])],
                        foreground=[('active', theme['fg']), ('!disabled', theme['fg'])])
 
-        # 2. Update Text Widgets (Non-ttk)
-        self.results_text.config(
-            bg=theme['text_bg'],
-            fg=theme['text_fg'],
-            insertbackground=theme['text_fg'] # Cursor color
-        )
+        # 2. Update the results view (a style change, no rows are touched)
+        self.style.configure('Treeview', background=theme['text_bg'], fieldbackground=theme['text_bg'],
+                             foreground=theme['text_fg'], font=('Consolas', 9))
+        self.style.configure('Treeview.Heading', background=theme['button_bg'], foreground=theme['fg'])
 
         # 3. Update Theme Button Text
         if theme_name == "dark":
@@ -448,94 +737,40 @@ class ModlistExporterApp:
         theme = self.current_theme
         color = theme.get(color_key, theme['fg'])
         self.status_label.config(text=message, foreground=color)
-        self.master.update()
+        self.master.update_idletasks()
 
     def find_minecraft_mods_folder(self):
         """Attempts to find the default Minecraft mods folder based on OS."""
-        path_key = "Default Minecraft (.minecraft)"
-
-        if self.os_system == "Windows":
-            path_template = LAUNCHER_PATHS["Windows"][path_key]
-        elif self.os_system == "Darwin":
-            path_template = LAUNCHER_PATHS["Darwin"][path_key]
-        else:
-            path_template = LAUNCHER_PATHS["Linux"][path_key]
-
-        mods_path = self.resolve_path(path_template)
-        return mods_path if Path(mods_path).is_dir() else None
+        return find_minecraft_mods_folder(self.os_system)
 
     def extract_mod_info(self, jar_path, filename):
         """
         Extracts mod metadata (name, version, links) from fabric.mod.json or mcmod.info inside the JAR.
         """
-        fallback_data = {
-            'filename': filename,
-            'name': filename.replace('.jar', ''),
-            'version': 'N/A',
-            'description': 'Could not extract metadata (Not a Fabric/Forge/Quilt mod, or JSON invalid).',
-            'links': {}
-        }
+        return extract_mod_info(jar_path, filename)
 
-        try:
-            with zipfile.ZipFile(jar_path, 'r') as zf:
-
-                # 1. Try Fabric/Quilt metadata (fabric.mod.json)
-                try:
-                    with zf.open('fabric.mod.json') as f:
-                        data = json.loads(f.read().decode('utf-8'))
-
-                        links = {
-                            'Homepage': data.get('contact', {}).get('homepage'),
-                            'Sources': data.get('contact', {}).get('sources'),
-                            'Issues': data.get('contact', {}).get('issues')
-                        }
-
-                        modmenu_links = data.get('custom', {}).get('modmenu', {}).get('links', {})
-                        for key, url in modmenu_links.items():
-                            clean_key = key.replace('modmenu.', '').replace('_', ' ').title()
-                            links[clean_key] = url
-
-                        cleaned_links = {k: v for k, v in links.items() if v and v.strip()}
-
-                        return {
-                            'filename': filename,
-                            'name': data.get('name', filename.replace('.jar', '')),
-                            'version': data.get('version', 'N/A'),
-                            'description': data.get('description', 'No description provided.'),
-                            'links': cleaned_links
-                        }
-                except KeyError:
-                    pass
-
-                # 2. Try Forge/Neoforge metadata (mcmod.info - legacy, or mods.toml)
-                try:
-                    with zf.open('mcmod.info') as f:
-                        # mcmod.info is usually an array, containing one mod entry
-                        data = json.loads(f.read().decode('utf-8'))[0]
-
-                        links = {}
-                        if 'url' in data: links['Homepage'] = data['url']
-
-                        return {
-                            'filename': filename,
-                            'name': data.get('name', filename.replace('.jar', '')),
-                            'version': data.get('version', 'N/A'),
-                            'description': data.get('description', 'Forge mod metadata found (mcmod.info).'),
-                            'links': links
-                        }
-                except KeyError:
-                    pass # Failed both fabric.mod.json and mcmod.info
-
-        except zipfile.BadZipFile:
-            fallback_data['description'] = 'Not a valid JAR/ZIP file.'
-        except Exception as e:
-            fallback_data['description'] = f'Error during extraction: {e}'
+    def scan_for_jar_files(self, directory, incremental=False):
+        """
+        Starts a background scan of the directory (and subdirectories) for .jar files.
+        With incremental=True and a previous complete scan of the same directory, only
+        added or changed JARs are re-extracted and a diff against the previous scan is produced.
+        """
+        if self.scan_thread and self.scan_thread.is_alive():
+            self._update_status("A scan is already running. Cancel it first to start a new one.", 'status_fg_error')
+            return
+        self._stop_watch()
 
-        return fallback_data
+        previous_index = None
+        self.previous_mods = None
+        self.last_diff = None
+        if incremental and self.scan_index and str(directory) == str(self.current_scan_path):
+            previous_index = self.scan_index
+            self.previous_mods = self.scanned_mods
 
-    def scan_for_jar_files(self, directory):
-        """Scans the given directory and its subdirectories for .jar files and extracts info."""
-        self.scanned_mods = []
+        self.scanned_mods = ModTable()
+        self.search_index = ModSearchIndex()
+        self.scan_timings = []
+        self.dependency_analysis = None
 
         # Check if the path exists before starting the walk
         if not os.path.isdir(directory):
@@ -545,29 +780,387 @@ class ModlistExporterApp:
             return
 
         self.current_scan_path = directory
+        self.path_label.config(text=f"Current Scan Path: {self.current_scan_path}")
         self._update_status(f"Scanning mods in: {Path(directory).name}...", 'fg')
+        self.export_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+
+        self._clear_results()
+
+        self.scan_total = 0
+        self.scan_hashed = 0
+        self.scan_enriching = self.scan_enriched = 0
+        self.enrich_summary = ""
+        self.scan_complete = False
+        workers, pool_kind = profiled_pool(PROFILE_MODE, self.scan_workers, self.scan_pool_kind)
+        self.scan_perf = PerfRecorder()
+        self.scan_perf.meta.update(mode='incremental' if previous_index is not None else 'scan', workers=workers,
+                                   pool_kind=pool_kind, nested=self.nested_var.get(), hashes=self.hashes_var.get(),
+                                   enrich=self.enrich_var.get())
+        self.scan_start_time = time.perf_counter()
+        self.progress_bar.config(value=0, maximum=1)
+        self.progress_label.config(text="Collecting files...")
+
+        if self.metadata_cache is not None:
+            self.metadata_cache.hits = self.metadata_cache.misses = 0
+
+        # Fresh queue and cancel flag per scan so a cancelled worker can't leak into the next one
+        self.scan_queue = queue.Queue()
+        self.scan_cancel_event = threading.Event()
+        self.scan_thread = threading.Thread(
+            target=self._scan_worker,
+            args=(directory, self.scan_queue, self.scan_cancel_event, workers, pool_kind,
+                  self.metadata_cache, previous_index, self.hashes_var.get() or self.enrich_var.get(), self.hash_cache,
+                  self.nested_var.get(), self.scan_perf, self.enrich_var.get(), self._get_remote_cache()),
+            daemon=True
+        )
+        self.scan_thread.start()
+        self.master.after(SCAN_POLL_INTERVAL_MS, self._poll_scan_queue)
+
+    def _get_remote_cache(self):
+        """The Modrinth/CurseForge answer cache, created (importing modlist_remote) on first use."""
+        if self.remote_cache is None and self.enrich_var.get() and METADATA_CACHE_ENABLED:
+            import modlist_remote # Keeps asyncio/ssl out of startup unless enrichment is used
+            self.remote_cache = modlist_remote.ResponseCache()
+        return self.remote_cache
+
+    @staticmethod
+    def _scan_worker(directory, scan_queue, cancel_event, workers, pool_kind, cache=None, previous_index=None,
+                     hashes=False, hash_cache=None, nested=False, perf=None, enrich=False, remote_cache=None):
+        """Runs on the background thread. Never touches Tk; only posts messages to scan_queue."""
+        perf = perf if perf is not None else PerfRecorder()
+        try:
+            with ProfileCapture(PROFILE_MODE) as capture:
+                with perf.timer('scan_for_jar_files'):
+                    jar_entries = find_jar_entries(directory)
+                scan_queue.put(('total', len(jar_entries), jar_entries))
+                records = [None] * len(jar_entries)
+                with perf.timer('extract'):
+                    results = iter_extract_cached(jar_entries, cache, workers, pool_kind, cancel_event, previous_index,
+                                                  nested, perf)
+                    for index, mod_data, elapsed in results:
+                        records[index] = mod_data
+                        scan_queue.put(('mod', index, mod_data, elapsed))
+
+                hashed = {}
+                if hashes and not cancel_event.is_set():
+                    with perf.timer('hash'):
+                        for index, file_hashes, _ in iter_hash(jar_entries, hash_cache, pool_kind=HASH_POOL_KIND,
+                                                               cancel_event=cancel_event):
+                            if file_hashes is not None:
+                                hashed[index] = file_hashes
+                            scan_queue.put(('hashes', index, file_hashes))
+
+                if enrich and hashed and not cancel_event.is_set():
+                    with perf.timer('enrich'):
+                        ModlistExporterApp._enrich_worker(records, hashed, remote_cache, scan_queue, perf)
+            perf.profile = capture.result
+
+            # Only a complete scan can tell which JARs were deleted
+            seen_paths = [path for path, _, _ in jar_entries]
+            for file_cache in (cache, hash_cache if hashes else None):
+                if file_cache is not None:
+                    if not cancel_event.is_set():
+                        file_cache.evict_missing(directory, seen_paths)
+                    file_cache.save()
+            if enrich and remote_cache is not None:
+                remote_cache.save()
+            scan_queue.put(('done', cancel_event.is_set()))
+        except Exception as e:
+            scan_queue.put(('error', str(e)))
 
-        # Recursive scan (for nested mod folders, e.g., optional or disabled subfolders)
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith('.jar'):
-                    full_path = Path(root) / file
-                    mod_data = self.extract_mod_info(full_path, file)
-                    self.scanned_mods.append(mod_data)
-
-        self.scanned_mods.sort(key=lambda x: x['name'].lower())
-
+    @staticmethod
+    def _enrich_worker(records, hashed, remote_cache, scan_queue, perf):
+        """
+        Looks the hashed records up on Modrinth/CurseForge (background thread) and posts the
+        fields to change per scan slot. The records themselves are only changed on the Tk thread.
+        """
+        import modlist_remote
+        slots = [index for index in hashed if records[index] is not None]
+        scan_queue.put(('enrich_start', len(slots)))
+        updates, stats = modlist_remote.enrich_mods([records[index].replace(hashes=hashed[index]) for index in slots],
+                                                    remote_cache)
+        for position, fields in updates.items():
+            scan_queue.put(('enriched', slots[position], fields))
+        perf.meta['remote'] = {key: value for key, value in stats.items() if key != 'errors'}
+        scan_queue.put(('enrich_done', modlist_remote.format_enrich_summary(stats)))
+
+    def _poll_scan_queue(self):
+        """Drains worker messages on the Tk thread, streaming results and updating progress."""
+        finished = False
+        poll_start = time.perf_counter()
+        for _ in range(SCAN_MESSAGES_PER_POLL):
+            try:
+                message = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = message[0]
+            if kind == 'total':
+                _, self.scan_total, self.scan_entries = message
+                self.scan_results_by_entry = [None] * self.scan_total
+                self.scan_table_positions = [None] * self.scan_total
+                self.progress_bar.config(maximum=max(self.scan_total, 1))
+            elif kind == 'mod':
+                _, index, mod_data, elapsed = message
+                self.scan_results_by_entry[index] = mod_data
+                self.scan_table_positions[index] = len(self.scanned_mods)
+                self.scanned_mods.append(mod_data)
+                self.search_index.add(mod_data)
+                self.scan_timings.append((mod_data['filename'], elapsed))
+                if not self._filter_active() or self.search_index.filter([mod_data], *self._filter_args()):
+                    self._insert_mod_row(mod_data)
+            elif kind == 'hashes':
+                _, index, file_hashes = message
+                self.scan_hashed += 1
+                if file_hashes is not None:
+                    self._replace_scan_record(index, self.scan_results_by_entry[index].replace(hashes=file_hashes))
+            elif kind == 'enrich_start':
+                self.scan_enriching = message[1]
+            elif kind == 'enriched':
+                _, index, fields = message
+                self._replace_scan_record(index, self.scan_results_by_entry[index].replace(**fields))
+                self.scan_enriched += 1
+            elif kind == 'enrich_done':
+                self.enrich_summary = message[1]
+            elif kind == 'done':
+                self._finish_scan(cancelled=message[1])
+                finished = True
+                break
+            elif kind == 'error':
+                self._finish_scan(cancelled=False, error=message[1])
+                finished = True
+                break
+
+        if not finished:
+            self._update_progress()
+            self.scan_perf.add_time('ui.poll_scan_queue', time.perf_counter() - poll_start)
+            self.master.after(SCAN_POLL_INTERVAL_MS, self._poll_scan_queue)
+
+    def _replace_scan_record(self, index, record):
+        """
+        Swaps a record of the running scan for a changed copy. Records are shared with the
+        previous scan (incremental rescans) and with running exports, so they are never
+        changed in place.
+        """
+        old = self.scan_results_by_entry[index]
+        self.scan_results_by_entry[index] = record
+        self.scanned_mods[self.scan_table_positions[index]] = record
+        self.search_index.remove(old)
+        self.search_index.add(record)
+        item = self.record_items.pop(id(old), None)
+        if item is not None:
+            self.record_items[id(record)] = item
+            if item in self.results_rows:
+                self.results_rows[item] = record
+
+    def _update_progress(self):
+        """Refreshes the progress bar and throughput label."""
+        done = len(self.scanned_mods)
+        elapsed = time.perf_counter() - self.scan_start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self.progress_bar.config(value=done)
+        hashed = f", {self.scan_hashed} hashed" if self.scan_hashed else ""
+        enriched = f", {self.scan_enriched}/{self.scan_enriching} matched online" if self.scan_enriching else ""
+        self.progress_label.config(text=f"{done} / {self.scan_total} files ({rate:.1f} mods/s{hashed}{enriched})")
+
+    def cancel_scan(self):
+        """Requests the running background scan to stop."""
+        if self.scan_thread and self.scan_thread.is_alive():
+            self.scan_cancel_event.set()
+            self.cancel_button.config(state='disabled')
+            self._update_status("Cancelling scan...", 'fg')
+
+    def _finish_scan(self, cancelled, error=None):
+        """Finalizes a scan on the Tk thread: sorts, redraws and updates the status bar."""
+        self.scan_wall_time = time.perf_counter() - self.scan_start_time
+        self.scan_perf.meta.update(jars=self.scan_total, wall_time=self.scan_wall_time, cancelled=cancelled)
+        self._update_progress()
+        self.cancel_button.config(state='disabled')
+
+        # Rebuilt in entry order (workers finish in any order), so mods with the same name
+        # sort exactly like the CLI's scan
+        self.scanned_mods = ModTable(mod for mod in self.scan_results_by_entry if mod is not None)
+        self.scanned_mods.sort('name')
+
+        self.scan_complete = not cancelled and not error
+        if cancelled or error:
+            # A partial scan can't serve as the baseline for the next incremental rescan
+            self.scan_index = {}
+        else:
+            self.scan_index = build_scan_index(self.scan_entries, self.scan_results_by_entry)
+            if self.previous_mods is not None:
+                self.last_diff = diff_mod_lists(self.previous_mods, self.scanned_mods)
+            self.dependency_analysis = analyze_dependencies(self.scanned_mods)
+        self.previous_mods = None
+
+        self.search_index.warm()
+        self._update_filter_choices()
         self.update_results_display()
 
-        if self.scanned_mods:
+        if error:
+            self._update_status(f"Error during scan: {error}", 'status_fg_error')
+            self.export_button.config(state='normal' if self.scanned_mods else 'disabled')
+        elif cancelled:
+            self._update_status(f"Scan cancelled after {len(self.scanned_mods)} of {self.scan_total} files. Partial results shown.", 'fg')
+            self.export_button.config(state='normal' if self.scanned_mods else 'disabled')
+        elif self.scanned_mods:
             valid_mods = [m for m in self.scanned_mods if 'Could not extract metadata' not in m['description']]
-            self._update_status(f"Scan complete. Found {len(valid_mods)} mods with metadata, {len(self.scanned_mods) - len(valid_mods)} fallback entries. Ready to export.", 'status_fg_ok')
+            cache_note = f", {self.metadata_cache.hits} cached" if self.metadata_cache is not None else ""
+            issues = len(self.dependency_analysis['issues'])
+            issue_note = f" {issues} dependency issues (see the top of the list)." if issues else ""
+            enrich_note = f" {self.enrich_summary}." if self.enrich_summary else ""
+            self._update_status(f"Scan complete in {self.scan_wall_time:.2f}s ({self.scan_workers} {self.scan_pool_kind} workers{cache_note}). Found {len(valid_mods)} mods with metadata, {len(self.scanned_mods) - len(valid_mods)} fallback entries.{issue_note}{enrich_note} Ready to export.", 'status_fg_ok')
             self.export_button.config(state='normal')
         else:
             self._update_status(f"Scan complete. No .jar files found in the directory. (Path: {self.current_scan_path})", 'fg')
             self.export_button.config(state='disabled')
 
-        self.path_label.config(text=f"Current Scan Path: {self.current_scan_path}")
+        if self.scan_complete and self.watch_var.get():
+            self._start_watch()
+
+    # --- Watch Mode ---
+
+    def _toggle_watch(self):
+        """Starts or stops watching the folder of the last complete scan."""
+        if not self.watch_var.get():
+            self._stop_watch()
+            self._update_status("Stopped watching the mods folder.", 'fg')
+        elif self.scan_thread and self.scan_thread.is_alive():
+            self._update_status("Watching starts when the running scan completes.", 'fg')
+        elif self.scan_complete:
+            self._start_watch()
+        else:
+            self._update_status("Watching starts after the next complete scan.", 'fg')
+
+    def _start_watch(self):
+        """Watches current_scan_path on a background thread, starting from the last scan's listing."""
+        self._stop_watch()
+        self.watch_queue = queue.Queue()
+        self.watch_stop_event = threading.Event()
+        self.watch_thread = threading.Thread(
+            target=self._watch_worker,
+            args=(self.current_scan_path, list(self.scan_entries), self.watch_queue, self.watch_stop_event,
+                  self.metadata_cache, self.hash_cache, self.hashes_var.get() or self.enrich_var.get(),
+                  self.nested_var.get(), self.scan_workers, self.scan_pool_kind, self.enrich_var.get(),
+                  self._get_remote_cache()),
+            daemon=True
+        )
+        self.watch_thread.start()
+        self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_watch_queue(self.watch_queue))
+
+    def _stop_watch(self):
+        self.watch_stop_event.set()
+        self.watch_thread = None
+
+    @staticmethod
+    def _watch_worker(directory, jar_entries, watch_queue, stop_event, cache, hash_cache, hashes, nested, workers,
+                      pool_kind, enrich=False, remote_cache=None):
+        """
+        Runs on the background thread: re-extracts only the JARs of each change set and posts
+        them to watch_queue. Never touches Tk.
+        """
+        try:
+            watcher = FolderWatcher(directory, jar_entries, stop_event)
+            watch_queue.put(('started', watcher.mode))
+            for changes in watcher.changes():
+                entries = changes['added'] + changes['changed']
+                mods, _ = extract_entries(entries, cache, workers, pool_kind, nested=nested)
+                if hashes:
+                    for index, file_hashes in enumerate(hash_entries(entries, hash_cache, pool_kind=HASH_POOL_KIND)):
+                        if file_hashes is not None:
+                            mods[index]['hashes'] = file_hashes
+                if enrich and mods:
+                    import modlist_remote
+                    updates, _ = modlist_remote.enrich_mods(mods, remote_cache)
+                    for index, fields in updates.items():
+                        mods[index] = mods[index].replace(**fields)
+                for file_cache in (cache, hash_cache if hashes else None):
+                    if file_cache is not None:
+                        file_cache.evict_missing(directory, [path for path, _, _ in changes['entries']])
+                        file_cache.save()
+                if enrich and remote_cache is not None:
+                    remote_cache.save()
+                watch_queue.put(('changes', changes, mods))
+        except Exception as e:
+            watch_queue.put(('error', str(e)))
+
+    def _poll_watch_queue(self, watch_queue):
+        """Applies change sets from the watcher on the Tk thread until that watcher is stopped."""
+        if watch_queue is not self.watch_queue:
+            return # Superseded by a newer watcher or a new scan
+        while True:
+            try:
+                message = watch_queue.get_nowait()
+            except queue.Empty:
+                break
+            if self.watch_stop_event.is_set():
+                return
+            if message[0] == 'started':
+                self._update_status(f"Watching {Path(self.current_scan_path).name} for changes ({message[1]}).", 'fg')
+            elif message[0] == 'changes':
+                self._apply_watch_changes(message[1], message[2])
+            elif message[0] == 'error':
+                self._update_status(f"Watch mode stopped: {message[1]}", 'status_fg_error')
+                self.watch_var.set(False)
+                return
+        if not self.watch_stop_event.is_set():
+            self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_watch_queue(watch_queue))
+
+    def _apply_watch_changes(self, changes, mods):
+        """Patches the scanned mods and the results view in place: only affected rows change."""
+        with self.scan_perf.timer('ui.apply_watch_changes'):
+            old_records, new_records = apply_watch_changes(self.scan_index, changes, mods)
+            self.scan_entries = changes['entries']
+            for record in old_records:
+                self.scanned_mods.remove(record)
+                self.search_index.remove(record)
+            self.scanned_mods.extend(new_records)
+            self.search_index.extend(new_records)
+            self._update_filter_choices()
+
+            if self.results_fill_job is not None or not self.record_items or self._filter_active():
+                self.dependency_analysis = analyze_dependencies(self.scanned_mods)
+                self.update_results_display() # Rows still being filled, or only the placeholder
+            else:
+                for record in old_records:
+                    item = self.record_items.pop(id(record), None)
+                    if item is not None and self.results_tree.exists(item):
+                        self.results_rows.pop(item, None)
+                        self.results_tree.delete(item)
+                self._insert_sorted_rows(new_records)
+                self.dependency_analysis = analyze_dependencies(self.scanned_mods)
+                if self.dependency_item is not None and self.results_tree.exists(self.dependency_item):
+                    self.results_tree.delete(self.dependency_item)
+                self.dependency_item = None
+                if self.dependency_analysis['issues']:
+                    self._show_dependency_issues_in_results(self.dependency_analysis, 1 if self.last_diff else 0)
+
+        issues = len(self.dependency_analysis['issues'])
+        issue_note = f", {issues} dependency issues" if issues else ""
+        self._update_status(f"Folder changed: {format_watch_changes(changes)}. {len(self.scanned_mods)} JARs{issue_note}.", 'status_fg_ok')
+        self.export_button.config(state='normal' if self.scanned_mods else 'disabled')
+
+    def _insert_sorted_rows(self, records):
+        """Inserts rows for records at their place in the current sort order."""
+        column, descending = self.results_sort
+        order = self.scanned_mods.order(column, descending)
+        rank = {id(self.scanned_mods[index]): position for position, index in enumerate(order)}
+        for record in records:
+            index = 'end'
+            for position in range(rank[id(record)] + 1, len(order)):
+                following = self.record_items.get(id(self.scanned_mods[order[position]]))
+                if following is not None:
+                    index = self.results_tree.index(following)
+                    break
+            self._insert_mod_row(record, index)
+
+    def incremental_rescan(self):
+        """Rescans the current folder, re-extracting only added or changed JARs, and shows what changed."""
+        if not self.current_scan_path:
+            self._update_status("Error: No previous scan to update. Please perform a scan first.", 'status_fg_error')
+            return
+        self.scan_for_jar_files(self.current_scan_path, incremental=True)
 
     def quick_scan(self):
         """Initiates a scan on the detected default Minecraft mods folder."""
@@ -583,105 +1176,172 @@ class ModlistExporterApp:
 
     def select_custom_folder(self):
         """Opens a dialog for the user to select a custom folder to scan."""
+        from tkinter import filedialog # Only needed once the dialog is opened
         folder_selected = filedialog.askdirectory(title="Select Mods Folder")
         if folder_selected:
             self.scan_for_jar_files(folder_selected)
         else:
             self._update_status("Folder selection cancelled.", 'fg')
 
-    def update_results_display(self):
-        """Clears and updates the text area with the list of found files."""
-        self.results_text.config(state='normal')
-        self.results_text.delete('1.0', tk.END)
+    def _clear_results(self):
+        """Removes every row from the results view and stops any pending chunked fill."""
+        if self.results_fill_job is not None:
+            self.master.after_cancel(self.results_fill_job)
+            self.results_fill_job = None
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.results_rows = {}
+        self.record_items = {}
+        self.dependency_item = None
+
+    def _insert_mod_row(self, mod, index='end'):
+        """Appends (or inserts at index) a single mod row. Link rows are only created when the row is expanded."""
+        warning = 'Could not extract metadata' in mod['description']
+        item = self.results_tree.insert('', index, text=mod['name'],
+                                        values=(mod['version'], mod.get('loader', ''), format_size(mod.get('size', 0))),
+                                        tags=('warning',) if warning else ())
+        # Placeholder child so the row shows an expand arrow
+        self.results_tree.insert(item, 'end', text='...')
+        self.results_rows[item] = mod
+        self.record_items[id(mod)] = item
+
+    def _on_results_open(self, event):
+        """Builds the link rows of a mod the first time it is expanded."""
+        item = self.results_tree.focus()
+        mod = self.results_rows.pop(item, None)
+        if mod is None:
+            return
+        self.results_tree.delete(*self.results_tree.get_children(item))
 
-        if not self.scanned_mods:
-            self.results_text.insert(tk.END, "No files to display. Please perform a scan.")
+        links = mod['links']
+        if links:
+            for key, url in links.items():
+                self.results_tree.insert(item, 'end', text=f"{key}: {url}")
         else:
-            for i, mod in enumerate(self.scanned_mods):
-                self.results_text.insert(tk.END, f"{i+1}. {mod['name']} ({mod['version']})\n")
-
-                links = mod['links']
-                if links:
-                    for key, url in links.items():
-                        self.results_text.insert(tk.END, f"   - {key}: {url}\n")
-                else:
-                     self.results_text.insert(tk.END, "   - No automatic links found.\n")
+            self.results_tree.insert(item, 'end', text="No automatic links found.")
+
+        for bundled in mod.get('nested', ()):
+            indent = '    ' * (bundled['depth'] - 1)
+            self.results_tree.insert(item, 'end', text=f"{indent}📦 {bundled['name']} (in {bundled['parent']})",
+                                     values=(bundled['version'], bundled['loader'], format_size(bundled['size'])))
+
+        if 'Could not extract metadata' in mod['description']:
+            self.results_tree.insert(item, 'end', text=f"[WARNING] {mod['description']}", tags=('warning',))
+
+    def _fill_results(self, mods, start=0):
+        """Inserts rows RESULTS_CHUNK_SIZE at a time, yielding to the event loop between chunks."""
+        with self.scan_perf.timer('ui.fill_results_chunk'):
+            for mod in mods[start:start + RESULTS_CHUNK_SIZE]:
+                self._insert_mod_row(mod)
+        if start + RESULTS_CHUNK_SIZE < len(mods):
+            self.results_fill_job = self.master.after(1, lambda: self._fill_results(mods, start + RESULTS_CHUNK_SIZE))
+        else:
+            self.results_fill_job = None
+
+    def _show_diff_in_results(self, diff):
+        """Inserts the change summary of an incremental rescan above the mod list."""
+        lines = format_diff_lines(diff)
+        item = self.results_tree.insert('', 0, text=f"=== {lines[0]}", open=True)
+        for line in lines[1:]:
+            self.results_tree.insert(item, 'end', text=line)
+
+    def _show_dependency_issues_in_results(self, analysis, index=0):
+        """Inserts the dependency check summary above the mod list (expanded when there are errors)."""
+        lines = format_dependency_lines(analysis)
+        has_errors = any(issue['severity'] == 'error' for issue in analysis['issues'])
+        item = self.results_tree.insert('', index, text=f"=== {lines[0]}", open=has_errors,
+                                        tags=('warning',) if analysis['issues'] else ())
+        self.dependency_item = item
+        for line, issue in zip(lines[1:], analysis['issues']):
+            self.results_tree.insert(item, 'end', text=line, tags=('warning',) if issue['severity'] == 'error' else ())
+
+    def sort_results(self, column):
+        """Sorts the results view by a column; clicking the same heading again reverses the order."""
+        current, descending = self.results_sort
+        self.results_sort = (column, not descending if column == current else False)
+        self.update_results_display()
 
-                if 'Could not extract metadata' in mod['description']:
-                    self.results_text.insert(tk.END, f"   [WARNING] {mod['description']}\n")
+    def _sorted_mods(self):
+        """Returns the scanned mods that pass the filter, in the results view's current sort order."""
+        column, descending = self.results_sort
+        mods = self.scanned_mods.sorted(column, descending)
+        if self._filter_active():
+            mods = self.search_index.filter(mods, *self._filter_args())
+        return mods
+
+    # --- Results Filter ---
+
+    def _filter_args(self):
+        """(query, facets) for ModSearchIndex.search from the filter widgets."""
+        loader, mc = self.loader_filter_var.get(), self.mc_filter_var.get()
+        return self.filter_var.get(), {
+            'loader': loader if loader != FILTER_ALL else None,
+            'mc': mc if mc != FILTER_ALL else None,
+            'links': 'yes' if self.links_filter_var.get() else None,
+            'fallback': 'yes' if self.fallback_filter_var.get() else None,
+        }
 
-                self.results_text.insert(tk.END, "\n") # Spacer
+    def _filter_active(self):
+        query, facets = self._filter_args()
+        return bool(query.strip()) or any(value is not None for value in facets.values())
 
-        self.results_text.config(state='disabled')
+    def _schedule_filter(self):
+        """Re-filters the results once typing pauses (FILTER_DELAY_MS)."""
+        if self.filter_job is not None:
+            self.master.after_cancel(self.filter_job)
+        self.filter_job = self.master.after(FILTER_DELAY_MS, self._apply_filter)
 
-    # --- Helper Functions for Export ---
+    def _apply_filter(self):
+        self.filter_job = None
+        self.update_results_display()
 
-    def _get_system_info(self):
-        """Gathers system information for info.txt."""
-        info = []
-        info.append("--- System Information ---\n")
-        info.append(f"Date and Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    def _update_filter_choices(self):
+        """Offers the loaders and MC versions present in the scanned mods as facet choices."""
+        counts = self.search_index.facet_counts()
+        for box, variable, facet in ((self.loader_filter_box, self.loader_filter_var, 'loader'),
+                                     (self.mc_filter_box, self.mc_filter_var, 'mc')):
+            values = sorted(counts[facet])
+            box.config(values=[FILTER_ALL] + values)
+            if variable.get() != FILTER_ALL and variable.get() not in values:
+                variable.set(FILTER_ALL)
 
-        system = platform.system()
-        # Custom note for the user's environment
-        if system == "Linux":
-            info.append(f"Operating System: Linux (Arch Linux/KDE - Inferred from user environment)\n")
-        else:
-             info.append(f"Operating System: {system} {platform.release()} ({platform.version()})\n")
-
-        info.append(f"System Architecture: {platform.machine()}\n")
-        info.append(f"Python Version: {platform.python_version()}\n")
-        info.append(f"Current Scan Path: {self.current_scan_path}\n")
-        info.append("\n--- Disclaimer ---\n")
-        info.append("Detailed hardware information (like RAM usage or GPU model) requires external, non-standard Python libraries and is therefore omitted.")
-        return "\n".join(info)
-
-    def export_info_file(self, export_dir, base_filename):
-        """Creates the info.txt file with system details."""
-        info_content = self._get_system_info()
-        info_path = export_dir / f"{base_filename}.info.txt"
-        try:
-            with open(info_path, 'w', encoding='utf-8') as f:
-                f.write(info_content)
-            return True
-        except IOError as e:
-            self._update_status(f"Error writing info.txt: {e}", 'status_fg_error')
-            return False
-
-    def export_modlinks_automatic_file(self, export_dir, base_filename):
-        """Creates the modlinks.txt file with ALL unique extracted URLs."""
-        all_links = set()
+    def update_results_display(self):
+        """Clears and refills the results view with the found files that pass the filter (in chunks)."""
+        with self.scan_perf.timer('ui.update_results_display'):
+            self._clear_results()
+
+            mods = self._sorted_mods() if self.scanned_mods else []
+            if not self.scanned_mods:
+                self.results_tree.insert('', 'end', text="No files to display. Please perform a scan.")
+            elif not mods:
+                self.results_tree.insert('', 'end', text="No mods match the filter.")
+            else:
+                self._fill_results(mods)
+            filtered = self.scanned_mods and self._filter_active()
+            self.filter_count_label.config(text=f"{len(mods)} of {len(self.scanned_mods)}" if filtered else "")
 
-        for mod in self.scanned_mods:
-            for url in mod['links'].values():
-                all_links.add(url)
+            if self.dependency_analysis and self.dependency_analysis['issues']:
+                self._show_dependency_issues_in_results(self.dependency_analysis)
+            if self.last_diff:
+                self._show_diff_in_results(self.last_diff)
 
-        links_path = export_dir / f"{base_filename}.modlinks.txt"
+    # --- Helper Functions for Export ---
 
-        try:
-            with open(links_path, 'w', encoding='utf-8') as f:
-                f.write("--- Automatically Extracted Mod Links ---\n")
-                f.write(f"Total unique links found: {len(all_links)}\n\n")
-                if all_links:
-                    for url in sorted(list(all_links)):
-                        f.write(f"{url}\n")
-                else:
-                    f.write("No links (homepage, sources, modrinth, etc.) were found in the mod metadata files.\n")
-            return True
-        except IOError as e:
-            self._update_status(f"Error writing modlinks.txt: {e}", 'status_fg_error')
-            return False
+    def _get_scan_timing_info(self):
+        """Summarizes the per-file extraction timings of the last scan for info.txt."""
+        return format_scan_timings(self.scan_timings, self.scan_wall_time, self.scan_workers,
+                                   self.scan_pool_kind, self.metadata_cache)
 
     # --- Main Export Function ---
 
     def export_modlist(self):
-        """Exports the list of mod data into 6 formats."""
+        """Exports the list of mod data into 7 formats (plus .diff.json and .perf.json) on a background thread."""
         if not self.scanned_mods:
             self._update_status("Error: No mods scanned to export.", 'status_fg_error')
             return
+        if self.export_thread and self.export_thread.is_alive():
+            return
 
-        desktop_path = Path.home() / "Desktop"
-        export_dir = desktop_path / "modlist"
+        export_dir = DEFAULT_EXPORT_DIR
 
         try:
             os.makedirs(export_dir, exist_ok=True)
@@ -689,90 +1349,52 @@ class ModlistExporterApp:
             self._update_status(f"Error creating export directory: {e}", 'status_fg_error')
             return
 
-        base_filename = f"modlist-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.export_button.config(state='disabled')
+        self._update_status("Exporting reports...", 'fg')
 
-        exported_count = 0
+        # Snapshot the state so a scan started meanwhile can't change what gets exported
+        mods = self.scanned_mods.copy()
+        args = (mods, self.current_scan_path, export_dir, make_base_filename())
+        kwargs = {'diff': self.last_diff, 'info_sections': [self._get_scan_timing_info()], 'perf': self.scan_perf,
+                  'analysis': self.dependency_analysis}
+        export_start = time.perf_counter()
 
-        def write_file(filepath, content=None, json_data=None, csv_rows=None):
-            nonlocal exported_count
+        def worker():
             try:
-                if json_data is not None:
-                     with open(filepath, 'w', encoding='utf-8') as f:
-                        json.dump(json_data, f, indent=4)
-                elif csv_rows is not None:
-                    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(['Index', 'Mod Name', 'Version', 'Filename', 'Homepage', 'Sources'])
-                        for i, mod in enumerate(self.scanned_mods):
-                            writer.writerow([
-                                i + 1,
-                                mod['name'],
-                                mod['version'],
-                                mod['filename'],
-                                mod['links'].get('Homepage', ''),
-                                mod['links'].get('Sources', '')
-                            ])
-                else:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                exported_count += 1
-            except IOError as e:
-                self._update_status(f"Error writing file {filepath.name}: {e}", 'status_fg_error')
-
-        # --- 1. Markdown (.md) - Detailed Rich Format ---
-        md_content = f"# Minecraft Modlist Export\n\n"
-        md_content += f"Scanned Directory: `{self.current_scan_path}`\n"
-        md_content += f"Total Mods: **{len(self.scanned_mods)}**\n\n---\n\n"
-
-        for i, mod in enumerate(self.scanned_mods):
-            md_content += f"### {i+1}. {mod['name']} (`{mod['version']}`)\n"
-            md_content += f"**File:** `{mod['filename']}`\n\n"
-            md_content += f"**Description:** {mod['description']}\n\n"
-
-            if mod['links']:
-                md_content += "**Links:**\n"
-                for key, url in mod['links'].items():
-                    md_content += f"* [{key}]({url})\n"
-            else:
-                md_content += "* No links found in metadata.\n"
-            md_content += "\n"
-
-        write_file(export_dir / f"{base_filename}.md", content=md_content)
-
-        # --- 2. Plain Text (.txt) ---
-        txt_content = f"Minecraft Modlist Export\nScanned Directory: {self.current_scan_path}\nTotal Mods: {len(self.scanned_mods)}\n" + ("=" * 50) + "\n\n"
-        for mod in self.scanned_mods:
-            txt_content += f"MOD: {mod['name']} ({mod['version']})\n"
-            txt_content += f"FILE: {mod['filename']}\n"
-            for key, url in mod['links'].items():
-                txt_content += f" {key}: {url}\n"
-            txt_content += "-" * 50 + "\n"
-
-        write_file(export_dir / f"{base_filename}.txt", content=txt_content)
-
-        # --- 3. JSON (.json) - Raw Data ---
-        json_data = {
-            "scan_path": self.current_scan_path,
-            "total_mods": len(self.scanned_mods),
-            "mods": self.scanned_mods
-        }
-        write_file(export_dir / f"{base_filename}.json", json_data=json_data)
-
-        # --- 4. CSV (.csv) - Spreadsheet friendly ---
-        write_file(export_dir / f"{base_filename}.csv", csv_rows=self.scanned_mods)
+                history_error = record_scan_history([(mods, args[1], None)], self.scan_perf)
+                result = export_reports(*args, **kwargs)
+                self.export_queue.put(('done', result, time.perf_counter() - export_start, history_error))
+            except Exception as e:
+                self.export_queue.put(('error', str(e), 0.0, None))
 
-        # --- 5. System Info (info.txt) ---
-        self.export_info_file(export_dir, base_filename)
+        self.export_thread = threading.Thread(target=worker, daemon=True)
+        self.export_thread.start()
+        self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_export_queue(export_dir))
 
-        # --- 6. Automatic Mod Links (modlinks.txt) ---
-        self.export_modlinks_automatic_file(export_dir, base_filename)
+    def _poll_export_queue(self, export_dir):
+        """Waits on the Tk thread for the background export to finish and reports the result."""
+        try:
+            kind, result, elapsed, history_error = self.export_queue.get_nowait()
+        except queue.Empty:
+            self.master.after(SCAN_POLL_INTERVAL_MS, lambda: self._poll_export_queue(export_dir))
+            return
 
-        final_count = 6
+        self.export_button.config(state='normal' if self.scanned_mods else 'disabled')
+        if kind == 'error':
+            self._update_status(f"Error during export: {result}", 'status_fg_error')
+            return
 
-        self._update_status(f"Successfully exported {final_count} files to: {export_dir}", 'status_fg_ok')
+        written, errors, stats = result
+        if errors:
+            filename, message = errors[0]
+            self._update_status(f"Exported {len(written)} files. Error writing file {filename}: {message}", 'status_fg_error')
+        else:
+            total_bytes = sum(stat['bytes'] for stat in stats)
+            history_note = f" {history_error}." if history_error else ""
+            self._update_status(f"Successfully exported {len(written)} files ({total_bytes / 1024:.0f} KB) in {elapsed * 1000:.0f} ms to: {export_dir} [{format_export_summary(stats)}]{history_note}", 'status_fg_ok')
 
 
-# Run the application
+# Run the application (command-line arguments were dispatched to modlist_cli at the top)
 if __name__ == "__main__":
     try:
         root = tk.Tk()
@@ -0,0 +1,76 @@
+"""batch_scan: cross-instance deduplication by content, and export_batch."""
+import json
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+
+def _write_jar(path, mod_id, version='1.0', padding=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    metadata = {'schemaVersion': 1, 'id': mod_id, 'name': mod_id.title(), 'version': version, 'pad': 'x' * padding}
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as jar:
+        info = zipfile.ZipInfo('fabric.mod.json', date_time=(2024, 1, 1, 0, 0, 0))
+        jar.writestr(info, json.dumps(metadata))
+
+
+@pytest.fixture
+def instances(tmp_path):
+    """Two instances called 'Pack' under different launcher roots."""
+    first, second = tmp_path / 'prism' / 'Pack' / 'mods', tmp_path / 'multimc' / 'Pack' / 'mods'
+    _write_jar(first / 'shared.jar', 'shared')
+    _write_jar(second / 'shared.jar', 'shared')                 # Byte-identical copy
+    _write_jar(first / 'lib-1.0.jar', 'lib')
+    _write_jar(second / 'lib-renamed.jar', 'lib')               # Same bytes, another name
+    _write_jar(first / 'twin.jar', 'twin', version='1.0')
+    _write_jar(second / 'twin.jar', 'twin', version='2.0')      # Same size, other content
+    _write_jar(first / 'only-here.jar', 'onlyhere', padding=500) # Unique size: never hashed
+    return [('Pack', str(first)), ('Pack', str(second))]
+
+
+def test_content_keys_hash_only_shared_sizes(instances):
+    entries = [entry for _, mods_path in instances for entry in core.find_jar_entries(mods_path)]
+    keys, hashed = core.content_keys(entries)
+    by_name = {}
+    for (path, name, _), key in zip(entries, keys):
+        by_name.setdefault(name, []).append(key)
+    assert hashed == 6
+    assert by_name['only-here.jar'][0].startswith('size:')
+    assert by_name['shared.jar'][0] == by_name['shared.jar'][1]
+    assert by_name['lib-1.0.jar'] == by_name['lib-renamed.jar']
+    assert by_name['twin.jar'][0] != by_name['twin.jar'][1]
+    assert all(key.startswith('sha1:') for name, keys in by_name.items() if name != 'only-here.jar' for key in keys)
+
+
+def test_batch_scan_dedups_across_instances(instances):
+    batch = core.batch_scan(instances, workers=2)
+    assert batch['total_jars'] == 7
+    assert batch['hashed_files'] == 6
+    unique = {(mod['name'], mod['version']): mod for mod in batch['unique_mods']}
+    assert len(unique) == len(batch['unique_mods']) == 5
+    # Same-named instances stay apart, numbered like their report folders
+    assert unique[('Shared', '1.0')]['instances'] == ['Pack', 'Pack (2)']
+    assert unique[('Lib', '1.0')]['instances'] == ['Pack', 'Pack (2)']
+    assert unique[('Twin', '1.0')]['instances'] == ['Pack']
+    assert unique[('Twin', '2.0')]['instances'] == ['Pack (2)']
+    assert unique[('Onlyhere', '1.0')]['instances'] == ['Pack']
+
+    first, second = batch['instances']
+    assert [mod['filename'] for mod in first['mods']] == ['lib-1.0.jar', 'only-here.jar', 'shared.jar', 'twin.jar']
+    assert [mod['filename'] for mod in second['mods']] == ['lib-renamed.jar', 'shared.jar', 'twin.jar']
+    # A renamed duplicate keeps its own filename in its instance, sharing everything else
+    lib = second['mods'][0]
+    assert lib['version'] == '1.0' and 'instances' not in lib
+    assert second['mods_path'] == instances[1][1]
+
+
+def test_export_batch(instances, tmp_path):
+    batch = core.batch_scan(instances, workers=1)
+    out = tmp_path / 'out'
+    written, errors, _ = core.export_batch(batch, out, 'modlist', formats=('json', 'csv'))
+    assert errors == []
+    assert (out / 'Pack' / 'modlist.json').exists() and (out / 'Pack (2)' / 'modlist.json').exists()
+    combined = json.loads((out / 'modlist-combined.json').read_text(encoding='utf-8'))
+    assert len(combined['mods']) == 5
+    assert sorted(map(str, written)) == sorted(str(path) for path in out.rglob('*') if path.is_file())
@@ -0,0 +1,147 @@
+"""MetadataCache: hits, misses, invalidation, eviction and the JSON-lines file."""
+import json
+import os
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+
+def _write_jar(path, mod_id, version='1.0'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version}))
+
+
+@pytest.fixture
+def jar(tmp_path):
+    path = tmp_path / 'mods' / 'a.jar'
+    _write_jar(path, 'a')
+    return path
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / 'cache' / 'metadata-cache.jsonl'
+
+
+def _stored(cache_path, jar, verify_hash=False):
+    cache = core.MetadataCache(cache_path, verify_hash=verify_hash)
+    cache.load()
+    cache.store(jar, os.stat(jar), core.extract_mod_info(str(jar), jar.name))
+    cache.save()
+    reloaded = core.MetadataCache(cache_path, verify_hash=verify_hash)
+    reloaded.load()
+    return reloaded
+
+
+def test_hit_after_reload(cache_path, jar):
+    cache = _stored(cache_path, jar)
+    data = cache.lookup(jar, os.stat(jar))
+    assert isinstance(data, core.ModRecord)
+    assert (data['mod_id'], data['version'], data['filename']) == ('a', '1.0', 'a.jar')
+    assert (cache.hits, cache.misses) == (1, 0)
+    data['version'] = 'changed'  # Callers get a copy
+    assert cache.lookup(jar, os.stat(jar))['version'] == '1.0'
+
+
+def test_size_or_mtime_change_is_a_miss(cache_path, jar):
+    cache = _stored(cache_path, jar)
+    stat_result = os.stat(jar)
+    os.utime(jar, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    assert cache.lookup(jar, os.stat(jar)) is None
+    _write_jar(jar, 'a', version='1.0.0-longer')
+    assert cache.lookup(jar, os.stat(jar)) is None
+    assert cache.misses == 2
+
+
+def test_unknown_path_is_a_miss(cache_path, jar, tmp_path):
+    cache = _stored(cache_path, jar)
+    other = tmp_path / 'mods' / 'b.jar'
+    _write_jar(other, 'b')
+    assert cache.lookup(other, os.stat(other)) is None
+
+
+def test_required_keys(cache_path, jar):
+    cache = _stored(cache_path, jar)
+    assert cache.lookup(jar, os.stat(jar), require=('nested',)) is None  # Stored by a scan without --nested
+    cache.store(jar, os.stat(jar), core.extract_mod_info(str(jar), jar.name, nested=True))
+    assert cache.lookup(jar, os.stat(jar), require=('nested',))['nested'] == []
+
+
+def test_extractor_version_invalidates(cache_path, jar, monkeypatch):
+    _stored(cache_path, jar)
+    monkeypatch.setattr(core.MetadataCache, 'record_version', core.EXTRACTOR_VERSION + 1)
+    cache = core.MetadataCache(cache_path)
+    cache.load()
+    assert cache.entries == {}
+    assert cache.lookup(jar, os.stat(jar)) is None
+
+
+def test_verify_hash_catches_same_size_same_mtime_edits(cache_path, jar):
+    cache = _stored(cache_path, jar, verify_hash=True)
+    stat_result = os.stat(jar)
+    assert cache.lookup(jar, stat_result) is not None
+    content = bytearray(jar.read_bytes())
+    content[-1] ^= 0xFF
+    jar.write_bytes(bytes(content))
+    os.utime(jar, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+    assert cache.lookup(jar, os.stat(jar)) is None
+
+
+def test_extraction_errors_are_not_stored(cache_path, jar):
+    cache = core.MetadataCache(cache_path)
+    cache.load()
+    error = core.ModRecord(name='a', version='N/A', filename='a.jar', description='Error during extraction: boom')
+    cache.store(jar, os.stat(jar), error)
+    assert cache.entries == {} and not cache.dirty
+
+
+def test_evict_missing(cache_path, tmp_path):
+    mods, elsewhere = tmp_path / 'mods', tmp_path / 'mods-other'
+    paths = [mods / 'a.jar', mods / 'sub' / 'b.jar', mods / 'c.jar', elsewhere / 'd.jar']
+    cache = core.MetadataCache(cache_path)
+    cache.load()
+    for path in paths:
+        _write_jar(path, path.stem)
+        cache.store(path, os.stat(path), core.extract_mod_info(str(path), path.name))
+    cache.dirty = False
+    assert cache.evict_missing(mods, [paths[0]]) == 2
+    # Only entries under that folder go; 'mods-other' merely shares the prefix
+    assert sorted(os.path.basename(key) for key in cache.entries) == ['a.jar', 'd.jar']
+    assert cache.dirty
+    assert cache.evict_missing(mods, [paths[0]]) == 0
+
+
+def test_corrupt_and_foreign_lines_are_skipped(cache_path, jar):
+    _stored(cache_path, jar)
+    with open(cache_path, 'a', encoding='utf-8') as f:
+        f.write('{"v": 5, "path": \n')                     # Truncated write
+        f.write('not json at all\n')
+        f.write(json.dumps({'v': core.EXTRACTOR_VERSION}) + '\n')  # No path
+    cache = core.MetadataCache(cache_path)
+    cache.load()
+    assert list(cache.entries) == [os.path.abspath(jar)]
+    assert cache.lookup(jar, os.stat(jar)) is not None
+
+
+def test_save_only_when_dirty(cache_path, jar):
+    cache = _stored(cache_path, jar)
+    before = cache_path.stat().st_mtime_ns
+    cache.lookup(jar, os.stat(jar))
+    cache.save()
+    assert cache_path.stat().st_mtime_ns == before
+    assert not cache_path.with_name(cache_path.name + '.tmp').exists()
+
+
+def test_scan_uses_the_cache(cache_path, tmp_path):
+    for name in ('a', 'b'):
+        _write_jar(tmp_path / 'mods' / f'{name}.jar', name)
+    entries = core.find_jar_entries(tmp_path / 'mods')
+    cache = core.MetadataCache(cache_path)
+    first, _ = core.extract_entries(entries, cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    second, _ = core.extract_entries(entries, cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert [mod.to_dict() for mod in second] == [mod.to_dict() for mod in first]
@@ -0,0 +1,103 @@
+"""The headless CLI: argument parsing, invalid combinations and the scan/batch paths."""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+import modlist_core as core
+import modlist_cli
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_jar(path, mod_id, version='1.0'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version,
+                                                    'name': mod_id.title()}))
+
+
+def _main(*argv):
+    return modlist_cli.main(['--no-cache', '--no-history', '-q', *argv])
+
+
+def test_parse_formats():
+    assert modlist_cli.parse_formats('md, JSON,csv') == ('md', 'json', 'csv')
+    assert modlist_cli.parse_formats('all') == core.REPORT_FORMATS
+    for value in ('pdf', 'md,pdf', ','):
+        with pytest.raises(argparse.ArgumentTypeError):
+            modlist_cli.parse_formats(value)
+
+
+def test_parser_defaults_and_exclusive_sources(capsys):
+    args = modlist_cli.build_parser().parse_args(['--scan', 'mods'])
+    assert (args.scan, args.formats, args.jobs, args.processes) == ('mods', None, core.SCAN_WORKERS, False)
+    with pytest.raises(SystemExit):
+        modlist_cli.build_parser().parse_args(['--scan', 'mods', '--instances', 'root'])
+    with pytest.raises(SystemExit):
+        modlist_cli.build_parser().parse_args(['--format', 'pdf'])
+    assert 'not allowed with argument' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('argv, error', [
+    (['--scan', '.', '--select', 'A'], "--select requires --instances"),
+    (['--instances', '.', '--watch'], "--watch only works with a single mods folder"),
+    (['--history', 'sodium', '--watch'], "--watch only works with a single mods folder"),
+    (['--instances', '.', '--enrich'], "--enrich only works with a single mods folder"),
+    (['--scan', '.', '--stream', '--enrich'], "--stream only works with a single mods folder"),
+    (['--scan', '.', '--stream', '--watch'], "--stream only works with a single mods folder"),
+    (['--scan', '.', '--jobs', '0'], "--jobs must be at least 1"),
+])
+def test_invalid_combinations(argv, error, capsys):
+    assert _main(*argv) == 2
+    assert error in capsys.readouterr().err
+
+
+def test_missing_folders(tmp_path, capsys):
+    assert _main('--scan', str(tmp_path / 'missing')) == 1
+    assert "Mods directory not found" in capsys.readouterr().err
+    assert _main('--instances', str(tmp_path / 'missing')) == 1
+    assert "Instance root not found" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('jobs, processes', [('1', False), ('3', False), ('2', True)])
+def test_scan_exports_the_requested_formats(tmp_path, jobs, processes):
+    _write_jar(tmp_path / 'mods' / 'b.jar', 'bravo')
+    _write_jar(tmp_path / 'mods' / 'a.jar', 'alpha')
+    out = tmp_path / 'out'
+    argv = ['--scan', str(tmp_path / 'mods'), '--format', 'json,csv', '--out', str(out), '--jobs', jobs]
+    assert _main(*argv + (['--processes'] if processes else [])) == 0
+    names = sorted(path.name.split('.', 1)[1] for path in out.iterdir())
+    assert names == ['csv', 'json']
+    report = json.loads(next(out.glob('*[0-9].json')).read_text(encoding='utf-8'))
+    assert [mod['name'] for mod in report['mods']] == ['Alpha', 'Bravo']
+
+
+def test_stream_scan_defaults_to_every_format_but_deps(tmp_path):
+    _write_jar(tmp_path / 'mods' / 'a.jar', 'alpha')
+    out = tmp_path / 'out'
+    assert _main('--scan', str(tmp_path / 'mods'), '--stream', '--out', str(out)) == 0
+    written = {path.name.split('.', 1)[1] for path in out.iterdir()}
+    assert 'json' in written and 'md' in written
+    assert not any('deps' in name for name in written)
+
+
+def test_instances_with_select(tmp_path, capsys):
+    root = tmp_path / 'instances'
+    for name in ('Pack A', 'Pack B', 'Pack C'):
+        _write_jar(root / name / 'mods' / 'shared.jar', 'shared')
+    out = tmp_path / 'out'
+    assert _main('--instances', str(root), '--select', 'Pack A, Pack C', '--format', 'json', '--out', str(out)) == 0
+    assert sorted(path.name for path in out.iterdir() if path.is_dir()) == ['Pack A', 'Pack C']
+    assert _main('--instances', str(root), '--select', 'Pack A,Nope', '--out', str(out)) == 1
+    assert "Instance(s) not found in" in capsys.readouterr().err
+
+
+def test_cli_never_imports_tkinter():
+    code = "import sys, modlist_cli; modlist_cli.build_parser(); print('tkinter' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
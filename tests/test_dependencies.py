@@ -0,0 +1,101 @@
+"""version_satisfies (Fabric predicates and Maven ranges) and analyze_dependencies."""
+import pytest
+
+import modlist_core as core
+
+
+def fabric(*versions):
+    return {'versions': list(versions), 'syntax': 'fabric'}
+
+
+def maven(*versions):
+    return {'versions': list(versions), 'syntax': 'maven'}
+
+
+@pytest.mark.parametrize('version, requirement, expected', [
+    ('0.15.11', fabric('>=0.14.0'), True),
+    ('0.13.3', fabric('>=0.14.0'), False),
+    ('1.20.1', fabric('~1.20'), True),
+    ('1.20.4', fabric('~1.20.1'), True),
+    ('1.21', fabric('~1.20.1'), False),
+    ('2.9.0', fabric('^2.1'), True),
+    ('3.0.0', fabric('^2.1'), False),
+    ('1.20.6', fabric('1.20.x'), True),
+    ('1.21.0', fabric('1.20.x'), False),
+    ('1.20', fabric('1.20.0'), True),                   # Trailing zeros don't matter
+    ('1.0.0-beta.2', fabric('>=1.0.0'), False),         # A pre-release sorts before its release
+    ('1.0.0-beta.2', fabric('>=1.0.0-beta.1'), True),
+    ('5.0.1+mc1.20.1', fabric('5.0.1'), True),          # Build metadata is ignored
+    ('v2.3', fabric('>=2.3'), True),
+    ('1.5', fabric('>=1.0 <2.0'), True),                # Space-separated predicates must all match
+    ('2.5', fabric('>=1.0 <2.0'), False),
+    ('2.5', fabric('<1.0', '>=2.0'), True),             # Any entry of the list may match
+    ('anything', fabric('*'), True),
+    ('1.0', fabric(), True),
+    ('${version}', fabric('>=1.0'), None),              # Unresolved placeholder: undecided
+    ('N/A', fabric('>=1.0'), None),
+])
+def test_fabric_predicates(version, requirement, expected):
+    assert core.version_satisfies(version, requirement) is expected
+
+
+@pytest.mark.parametrize('version, requirement, expected', [
+    ('47.2.0', maven('[47,)'), True),
+    ('46.0.14', maven('[47,)'), False),
+    ('1.20.1', maven('[1.20.1,1.21)'), True),
+    ('1.21', maven('[1.20.1,1.21)'), False),            # Exclusive upper bound
+    ('1.21', maven('[1.20.1,1.21]'), True),
+    ('1.20', maven('(1.20,1.21)'), False),              # Exclusive lower bound
+    ('1.0', maven('[1.0]'), True),                      # Pinned version
+    ('1.0.1', maven('[1.0]'), False),
+    ('0.9', maven('(,1.0]'), True),
+    ('1.5', maven('(,1.0],[1.2,)'), True),              # Union of ranges
+    ('1.1', maven('(,1.0],[1.2,)'), False),
+    ('2.0', maven('1.0'), True),                        # A bare version means "this or newer"
+    ('0.5', maven('1.0'), False),
+    ('1.0', maven('*'), True),
+    ('1.0', maven('[${forge_version},)'), None),
+])
+def test_maven_ranges(version, requirement, expected):
+    assert core.version_satisfies(version, requirement) is expected
+
+
+def _mod(name, mod_id, version, dependencies=(), provides=(), nested=()):
+    return {'name': name, 'filename': f"{mod_id}-{version}.jar", 'version': version, 'mod_id': mod_id,
+            'provides': list(provides), 'dependencies': list(dependencies), 'nested': list(nested)}
+
+
+def _dep(target, kind='depends', *versions):
+    return {'id': target, 'kind': kind, 'versions': list(versions), 'syntax': 'fabric'}
+
+
+def test_analyze_dependencies_reports_each_issue_type():
+    mods = [
+        _mod('Needs API', 'needs_api', '1.0', [_dep('fabric-api', 'depends', '>=0.90'), _dep('minecraft', 'depends', '1.20.x')]),
+        _mod('Fabric API', 'fabric-api', '0.80.0'),
+        _mod('Missing Lib', 'wants_lib', '1.0', [_dep('somelib')]),
+        _mod('Breaker', 'breaker', '1.0', [_dep('sodium', 'breaks', '*')]),
+        _mod('Sodium', 'sodium', '0.5.0'),
+        _mod('Dup A', 'dup', '1.0'),
+        _mod('Dup B', 'dup', '2.0'),
+        _mod('Bundler', 'bundler', '1.0', [_dep('bundled_lib')],
+             nested=[_mod('Bundled Lib', 'bundled_lib', '1.0')]),
+        _mod('Alias User', 'alias_user', '1.0', [_dep('old_id')]),
+        _mod('Renamed', 'new_id', '1.0', provides=['old_id']),
+    ]
+    analysis = core.analyze_dependencies(mods)
+    by_type = {}
+    for issue in analysis['issues']:
+        by_type.setdefault(issue['type'], []).append(issue['mod_id'] if issue['type'] != 'duplicate' else issue['target'])
+    assert by_type == {'duplicate': ['dup'], 'version': ['needs_api'], 'missing': ['wants_lib'], 'breaks': ['breaker']}
+    assert analysis['counts'] == {'duplicate': 1, 'version': 1, 'missing': 1, 'breaks': 1}
+    assert analysis['graph']['bundler']['bundles'] == ['bundled_lib']
+
+
+def test_dependency_record_keeps_what_the_analysis_reads():
+    mods = [_mod('A', 'a', '1.0', [_dep('b', 'depends', '>=2')]), _mod('B', 'b', '1.5')]
+    for mod in mods:
+        mod.update(description='x' * 1000, links={'Homepage': 'https://example.invalid'})
+    slim = [core.dependency_record(mod) for mod in mods]
+    assert 'description' not in slim[0] and 'links' not in slim[0]
+    assert core.analyze_dependencies(slim) == core.analyze_dependencies(mods)
@@ -0,0 +1,92 @@
+"""The GUI's background scan worker and the messages it posts to the Tk thread (no display needed)."""
+import json
+import os
+import queue
+import threading
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+tk_app = pytest.importorskip('modlistexportv3')
+
+
+def _write_jar(path, mod_id, version='1.0'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version,
+                                                    'name': mod_id.title()}))
+
+
+@pytest.fixture
+def mods_dir(tmp_path):
+    for name in ('alpha', 'beta', 'gamma', 'delta', 'epsilon'):
+        _write_jar(tmp_path / 'mods' / f'{name}.jar', name)
+    return tmp_path / 'mods'
+
+
+def _run_worker(directory, cancel_event=None, **options):
+    scan_queue = queue.Queue()
+    thread = threading.Thread(target=tk_app.ModlistExporterApp._scan_worker,
+                              args=(str(directory), scan_queue, cancel_event or threading.Event(), 3, 'thread'),
+                              kwargs=options)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    messages = []
+    while not scan_queue.empty():
+        messages.append(scan_queue.get_nowait())
+    return messages
+
+
+def test_worker_posts_total_then_every_mod_then_done(mods_dir):
+    perf = core.PerfRecorder()
+    messages = _run_worker(mods_dir, perf=perf)
+    kind, total, entries = messages[0]
+    assert (kind, total) == ('total', 5)
+    assert [name for _, name, _ in entries] == ['alpha.jar', 'beta.jar', 'delta.jar', 'epsilon.jar', 'gamma.jar']
+    mods = [message for message in messages if message[0] == 'mod']
+    assert sorted(index for _, index, _, _ in mods) == list(range(5))
+    assert all(mod['filename'] == entries[index][1] for _, index, mod, _ in mods)
+    assert messages[-1] == ('done', False)
+    assert perf.counters['extracted'] == 5 and 'scan_for_jar_files' in perf.timers
+
+
+def test_worker_fills_and_prunes_the_caches(mods_dir, tmp_path):
+    cache = core.MetadataCache(tmp_path / 'cache.jsonl')
+    hash_cache = core.FileHashCache(tmp_path / 'hashes.jsonl')
+    messages = _run_worker(mods_dir, cache=cache, hashes=True, hash_cache=hash_cache)
+    hashes = [message for message in messages if message[0] == 'hashes']
+    assert sorted(index for _, index, _ in hashes) == list(range(5))
+    assert all(set(file_hashes) >= {'sha1', 'sha512'} for _, _, file_hashes in hashes)
+    assert (tmp_path / 'cache.jsonl').exists() and (tmp_path / 'hashes.jsonl').exists()
+
+    (mods_dir / 'beta.jar').unlink()
+    messages = _run_worker(mods_dir, cache=cache)
+    assert messages[-1] == ('done', False)
+    assert cache.hits == 4
+    assert sorted(os.path.basename(path) for path in cache.entries) == ['alpha.jar', 'delta.jar', 'epsilon.jar',
+                                                                         'gamma.jar']
+
+
+def test_cancelled_worker_keeps_cache_entries(mods_dir, tmp_path):
+    cache = core.MetadataCache(tmp_path / 'cache.jsonl')
+    _run_worker(mods_dir, cache=cache)
+    (mods_dir / 'beta.jar').unlink()
+    cancel_event = threading.Event()
+    cancel_event.set()
+    messages = _run_worker(mods_dir, cancel_event=cancel_event, cache=cache)
+    assert [message[0] for message in messages] == ['total', 'done']
+    assert messages[-1] == ('done', True)
+    # A cancelled scan can't tell which JARs were deleted
+    assert len(cache.entries) == 5
+
+
+def test_worker_reports_errors(mods_dir):
+    class BrokenCache(core.MetadataCache):
+        def load(self):
+            raise RuntimeError("cache unreadable")
+
+    messages = _run_worker(mods_dir, cache=BrokenCache())
+    assert messages[-1] == ('error', "cache unreadable")
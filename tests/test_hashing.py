@@ -0,0 +1,55 @@
+"""MurmurHash2 and the CurseForge fingerprint in compute_file_hashes."""
+import hashlib
+
+import pytest
+
+import modlist_core as core
+
+# Expected values from the reference C MurmurHash2 (Austin Appleby), seed 1 as CurseForge uses
+REFERENCE_SEED_1 = [
+    (b'', 1540447798),
+    (b'a', 626045324),
+    (b'ab', 1692487918),
+    (b'abc', 1621425345),
+    (b'abcd', 3376380438),
+    (b'The quick brown fox jumps over the lazy dog', 504383975),
+    (bytes((i * 7 + 3) & 0xFF for i in range(1000)), 4239278803),
+]
+FOX_FINGERPRINT = 3751777527 # Reference MurmurHash2 (seed 1) of b'Thequickbrownfoxjumpsoverthelazydog'
+
+
+@pytest.mark.parametrize('data, expected', REFERENCE_SEED_1)
+def test_murmur2_matches_reference(data, expected):
+    assert core.murmur2(data) == expected
+
+
+def test_murmur2_seed_zero():
+    assert core.murmur2(b'', seed=0) == 0
+    assert core.murmur2(b'abcd', seed=0) == 646393889
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 4096])
+def test_incremental_hasher_any_chunking(chunk_size):
+    data = REFERENCE_SEED_1[-1][0]
+    hasher = core.Murmur2Hasher(len(data))
+    for start in range(0, len(data), chunk_size):
+        hasher.update(data[start:start + chunk_size])
+    assert hasher.intdigest() == REFERENCE_SEED_1[-1][1]
+
+
+@pytest.mark.parametrize('read_size', [1, 3, 7, 1 << 20])
+def test_curseforge_fingerprint_ignores_whitespace(tmp_path, read_size):
+    path = tmp_path / 'fox.jar'
+    content = b'The quick\tbrown fox\r\njumps over  the lazy dog\n'
+    path.write_bytes(content)
+    hashes = core.compute_file_hashes(path, read_size=read_size)
+    assert hashes['curseforge'] == FOX_FINGERPRINT
+    assert hashes['sha1'] == hashlib.sha1(content).hexdigest()
+    assert hashes['sha512'] == hashlib.sha512(content).hexdigest()
+
+
+def test_only_requested_algorithms(tmp_path):
+    path = tmp_path / 'empty.jar'
+    path.write_bytes(b'')
+    assert core.compute_file_hashes(path, algorithms=('curseforge',)) == {'curseforge': 1540447798}
+    assert core.compute_file_hashes(path, algorithms=('sha1',)) == {'sha1': hashlib.sha1(b'').hexdigest()}
@@ -0,0 +1,122 @@
+"""ScanHistory: appending scans and the trend queries (mod_history, instances_running)."""
+import pytest
+
+import modlist_core as core
+
+
+def _mod(name, version, mod_id=None, filename=None):
+    return core.ModRecord({'name': name, 'version': version, 'mod_id': mod_id, 'loader': 'Fabric', 'size': 100,
+                           'filename': filename or f"{mod_id or name.lower()}-{version}.jar"})
+
+
+@pytest.fixture
+def folders(tmp_path):
+    survival, creative = tmp_path / 'Survival' / 'mods', tmp_path / 'Creative' / 'mods'
+    survival.mkdir(parents=True)
+    creative.mkdir(parents=True)
+    return survival, creative
+
+
+@pytest.fixture
+def history(tmp_path, folders):
+    survival, creative = folders
+    with core.ScanHistory(tmp_path / 'history.sqlite3') as history:
+        history.append([([_mod('Sodium', '0.5.0', 'sodium'), _mod('Lithium', '0.11.0', 'lithium'),
+                          _mod('Loose', '1.0', filename='loose.jar')], survival, None),
+                        ([_mod('Sodium', '0.5.0', 'sodium')], creative, None)], timestamp=100)
+        history.append([([_mod('Sodium', '0.6.0', 'sodium'), _mod('Loose', '1.0', filename='loose.jar')],
+                          survival, None),
+                        ([_mod('Sodium', '0.5.0', 'sodium')], creative, None)], timestamp=200)
+        history.append([([_mod('Sodium', '0.6.0', 'sodium'), _mod('Lithium', '0.12.0', 'lithium')], survival, None),
+                        ([_mod('Jade', '11.0', 'jade')], creative, 'Creative Test')], timestamp=300)
+        yield history
+
+
+def _events(events):
+    return [(event['time'], event['label'], event['change'], event['old_version'], event['version'])
+            for event in events]
+
+
+def test_history_label_and_key():
+    assert core.history_label('/games/Survival/mods') == 'Survival'
+    assert core.history_label('/games/loose-jars') == 'loose-jars'
+    assert core.history_key({'mod_id': 'sodium', 'filename': 'x.jar'}) == 'sodium'
+    assert core.history_key({'mod_id': None, 'filename': 'x.jar'}) == 'file:x.jar'
+
+
+def test_scans_are_recorded_per_instance(history, folders):
+    scans = history.scans()
+    assert [(scan['time'], scan['label'], scan['mods']) for scan in scans] == [
+        (100, 'Survival', 3), (100, 'Creative', 1), (200, 'Survival', 2), (200, 'Creative', 1),
+        (300, 'Survival', 2), (300, 'Creative Test', 1)]
+    assert [scan['time'] for scan in history.scans(str(folders[1]))] == [100, 200, 300]
+    assert [scan['time'] for scan in history.scans('Survival')] == [100, 200, 300]
+
+
+def test_mod_history_reports_version_changes(history):
+    assert _events(history.mod_history('sodium')) == [
+        (100, 'Creative', 'added', None, '0.5.0'),
+        (100, 'Survival', 'added', None, '0.5.0'),
+        (200, 'Survival', 'updated', '0.5.0', '0.6.0'),
+        (300, 'Creative Test', 'removed', None, '0.5.0'),
+    ]
+
+
+def test_mod_history_removed_and_added_again(history):
+    assert _events(history.mod_history('lithium')) == [
+        (100, 'Survival', 'added', None, '0.11.0'),
+        (200, 'Survival', 'removed', None, '0.11.0'),
+        (300, 'Survival', 'added', None, '0.12.0'),
+    ]
+
+
+def test_mod_history_lookups(history, folders):
+    assert history.mod_history('LITHIUM') == history.mod_history('lithium')    # By name, any case
+    assert [event['mod'] for event in history.mod_history('loose.jar')] == ['file:loose.jar'] * 2
+    assert history.mod_history('nothing') == []
+    survival_only = history.mod_history('sodium', instance=str(folders[0]))
+    assert survival_only == history.mod_history('sodium', instance='Survival')
+    assert {event['label'] for event in survival_only} == {'Survival'}
+
+
+def test_instances_running_uses_the_latest_scan(history, folders):
+    running = history.instances_running('sodium')
+    assert [(result['label'], result['version'], result['time']) for result in running] == [('Survival', '0.6.0', 300)]
+    assert running[0]['instance'] == str(folders[0])
+    assert running[0]['filename'] == 'sodium-0.6.0.jar'
+    assert history.instances_running('sodium', version='0.5.0') == []
+    assert [result['label'] for result in history.instances_running('Jade')] == ['Creative Test']
+
+
+def test_history_persists_and_stats(history):
+    stats = history.stats()
+    assert stats['scans'] == 6
+    assert stats['records'] == 3 + 1 + 2 + 1 + 2 + 1
+    assert stats['bytes'] > 0
+    history.close()
+    with core.ScanHistory(history.db_path) as reopened:
+        assert reopened.stats()['records'] == stats['records']
+        assert _events(reopened.mod_history('lithium')) == _events(history.mod_history('lithium'))
+
+
+def test_append_in_batches(tmp_path, folders, monkeypatch):
+    monkeypatch.setattr(core, 'HISTORY_INSERT_BATCH', 3)
+    mods = [_mod(f"Mod {i}", '1.0', f"mod{i}") for i in range(10)]
+    with core.ScanHistory(tmp_path / 'batched.sqlite3') as history:
+        history.append([(mods, folders[0], None)], timestamp=1)
+        assert history.stats()['records'] == 10
+        assert [result['version'] for result in history.instances_running('Mod 9')] == ['1.0']
+
+
+def test_format_history_lines(history):
+    lines = core.format_history_lines(history.mod_history('sodium', instance='Survival'))
+    assert [line.split('  ', 1)[1] for line in lines] == [
+        'Survival: sodium added (0.5.0)', 'Survival: sodium 0.5.0 -> 0.6.0']
+
+
+def test_broken_history_never_fails_a_scan(tmp_path, folders, monkeypatch):
+    monkeypatch.setattr(core, 'HISTORY_ENABLED', True)
+    db_path = tmp_path / 'broken.sqlite3'
+    db_path.write_bytes(b'not a database' * 100)
+    message = core.record_scan_history([([_mod('Sodium', '0.5.0', 'sodium')], folders[0], None)], db_path=db_path)
+    assert message.startswith('Scan history not updated')
@@ -0,0 +1,105 @@
+"""InstanceIndex: probing every launcher root, reusing unchanged instances, persistence and search."""
+import json
+import os
+
+import pytest
+
+import modlist_core as core
+
+
+def _instance(root, name, version, uid='net.fabricmc.fabric-loader', jars=1):
+    path = root / name
+    (path / 'mods').mkdir(parents=True)
+    for index in range(jars):
+        (path / 'mods' / f'mod{index}.jar').write_bytes(b'PK' * 10)
+    (path / 'instance.cfg').write_text(f"name={name}\n", encoding='utf-8')
+    (path / 'mmc-pack.json').write_text(json.dumps({'components': [
+        {'uid': 'net.minecraft', 'version': version}, {'uid': uid, 'version': '1'}]}), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def launchers(tmp_path, monkeypatch):
+    """A fake Linux LAUNCHER_PATHS: .minecraft, two instance roots (one twice) and a missing root."""
+    prism, multimc = tmp_path / 'prism', tmp_path / 'multimc'
+    _instance(prism, 'Fabric Pack', '1.20.1', jars=3)
+    _instance(prism, 'Forge Pack', '1.19.2', uid='net.minecraftforge')
+    _instance(multimc, 'Old Pack', '1.12.2', uid='net.minecraftforge', jars=2)
+    (tmp_path / '.minecraft' / 'mods').mkdir(parents=True)
+    try:
+        os.symlink(prism, tmp_path / 'prism-alias', target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not available")
+    monkeypatch.setitem(core.LAUNCHER_PATHS, 'Linux', {
+        "Default Minecraft (.minecraft)": str(tmp_path / '.minecraft' / 'mods'),
+        "Prism Launcher (Instances)": str(prism),
+        "Prism Launcher (Alias)": str(tmp_path / 'prism-alias'),
+        "MultiMC (Instances)": str(multimc),
+        "Missing Launcher": str(tmp_path / 'missing'),
+    })
+    return tmp_path
+
+
+def _index(launchers):
+    return core.InstanceIndex(launchers / 'cache' / 'instance-index.json', os_system='Linux')
+
+
+def test_rebuild_finds_every_instance_once(launchers):
+    records = _index(launchers).rebuild(workers=4)
+    assert [(r['launcher'], r['name']) for r in records] == [
+        ("Default Minecraft (.minecraft)", '.minecraft'),
+        ("MultiMC (Instances)", 'Old Pack'),
+        ("Prism Launcher (Instances)", 'Fabric Pack'),
+        ("Prism Launcher (Instances)", 'Forge Pack'),
+    ]
+    fabric = records[2]
+    assert (fabric['loader'], fabric['mc_version'], fabric['mod_count'], fabric['total_size']) == ('Fabric', '1.20.1',
+                                                                                                   3, 60)
+    assert fabric['mods_path'] == str(launchers / 'prism' / 'Fabric Pack' / 'mods')
+    assert fabric['last_modified'] > 0
+
+
+def test_rebuild_reuses_unchanged_instances(launchers, monkeypatch):
+    index = _index(launchers)
+    index.rebuild()
+    calls = []
+    original = core.get_instance_metadata
+    monkeypatch.setattr(core, 'get_instance_metadata', lambda path: calls.append(path.name) or original(path))
+    first = {record['path']: record for record in index.records}
+    assert index.rebuild() == list(first.values()) and calls == []
+
+    cfg = launchers / 'prism' / 'Forge Pack' / 'instance.cfg'
+    cfg.write_text("name=Renamed Pack\n", encoding='utf-8')
+    os.utime(cfg, ns=(0, os.stat(cfg).st_mtime_ns + 1_000_000_000))
+    records = index.rebuild()
+    assert calls == ['Forge Pack']
+    assert 'Renamed Pack' in [record['name'] for record in records]
+
+
+def test_save_and_load(launchers):
+    index = _index(launchers)
+    assert not index.load()
+    index.rebuild()
+    index.save()
+    reloaded = _index(launchers)
+    assert reloaded.load()
+    assert reloaded.records == index.records and reloaded.built_at == index.built_at
+    assert not (launchers / 'cache' / 'instance-index.json.tmp').exists()
+
+
+def test_outdated_index_is_ignored(launchers, monkeypatch):
+    index = _index(launchers)
+    index.rebuild()
+    index.save()
+    monkeypatch.setattr(core, 'INSTANCE_INDEX_VERSION', core.INSTANCE_INDEX_VERSION + 1)
+    reloaded = _index(launchers)
+    assert not reloaded.load() and reloaded.records == []
+
+
+def test_search(launchers):
+    index = _index(launchers)
+    index.rebuild()
+    assert len(index.search('')) == 4
+    assert [r['name'] for r in index.search('forge')] == ['Old Pack', 'Forge Pack']
+    assert [r['name'] for r in index.search('PRISM 1.20')] == ['Fabric Pack']
+    assert index.search('quilt') == []
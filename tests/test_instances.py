@@ -0,0 +1,99 @@
+"""get_instance_metadata for the launcher instance formats, and InstanceMetadataCache."""
+import json
+import os
+
+import pytest
+
+import modlist_core as core
+
+
+def _instance(tmp_path, name, jars=2):
+    path = tmp_path / name
+    (path / 'mods').mkdir(parents=True)
+    for index in range(jars):
+        (path / 'mods' / f'mod{index}.jar').write_bytes(b'PK')
+    (path / 'mods' / 'readme.txt').write_text('not a jar')
+    return path
+
+
+def _mmc_pack(path, components):
+    (path / 'mmc-pack.json').write_text(json.dumps({'components': [
+        {'uid': uid, 'version': version} for uid, version in components]}), encoding='utf-8')
+
+
+def test_xmcl_instance_json(tmp_path):
+    path = _instance(tmp_path, 'xmcl')
+    (path / 'instance.json').write_text(json.dumps({
+        'name': 'Fancy Pack', 'description': 'Shaders',
+        'runtime': {'minecraft': '1.20.1', 'fabricLoader': '0.15.0'}}), encoding='utf-8')
+    metadata = core.get_instance_metadata(path)
+    assert metadata == {'mod_count': 2, 'mods_exists': True, 'mc_version': '1.20.1', 'loader': 'Fabric',
+                        'name': 'Fancy Pack', 'description': 'Shaders', 'runtime': 'MC: 1.20.1, Fabric: 0.15.0'}
+
+
+def test_prism_instance_cfg_and_mmc_pack(tmp_path):
+    path = _instance(tmp_path, 'prism', jars=3)
+    (path / 'instance.cfg').write_text("[General]\nname=Prism Pack\nnotes=Tech mods\nIntendedVersion=1.12.2\n",
+                                       encoding='utf-8')
+    _mmc_pack(path, [('net.minecraft', '1.20.4'), ('net.neoforged', '20.4.80'), ('org.lwjgl3', '3.3.2')])
+    metadata = core.get_instance_metadata(path)
+    assert metadata['name'] == 'Prism Pack' and metadata['description'] == 'Tech mods'
+    assert (metadata['mc_version'], metadata['loader']) == ('1.20.4', 'NeoForge')
+    assert metadata['runtime'] == 'MC: 1.20.4, NeoForge: 20.4.80'
+    assert metadata['mod_count'] == 3
+
+
+@pytest.mark.parametrize('pack', [None, '{"components": ', '["not", "a", "dict"]'])
+def test_old_multimc_instance_without_a_usable_mmc_pack(tmp_path, pack):
+    path = _instance(tmp_path, 'Old Pack')
+    (path / 'instance.cfg').write_text("IntendedVersion=1.7.10\nnotes=\n", encoding='utf-8')
+    if pack is not None:
+        (path / 'mmc-pack.json').write_text(pack, encoding='utf-8')
+    metadata = core.get_instance_metadata(path)
+    assert (metadata['name'], metadata['description']) == ('Old Pack', 'No description.')
+    assert (metadata['mc_version'], metadata['loader'], metadata['runtime']) == ('1.7.10', None, 'MC: 1.7.10')
+
+
+def test_broken_instance_json_falls_back_to_instance_cfg(tmp_path):
+    path = _instance(tmp_path, 'mixed')
+    (path / 'instance.json').write_text('{broken', encoding='utf-8')
+    (path / 'instance.cfg').write_text("name=From Cfg\n", encoding='utf-8')
+    _mmc_pack(path, [('net.minecraft', '1.19.2'), ('net.minecraftforge', '43.2.0')])
+    metadata = core.get_instance_metadata(path)
+    assert (metadata['name'], metadata['loader']) == ('From Cfg', 'Forge')
+
+
+def test_no_metadata_and_no_mods_folder(tmp_path):
+    path = tmp_path / 'bare'
+    path.mkdir()
+    metadata = core.get_instance_metadata(path)
+    assert metadata['name'] == 'bare' and metadata['runtime'] == 'N/A'
+    assert (metadata['mod_count'], metadata['mods_exists']) == (None, False)
+
+
+def test_metadata_cache_reuses_until_the_instance_changes(tmp_path, monkeypatch):
+    path = _instance(tmp_path, 'cached')
+    (path / 'instance.cfg').write_text("name=First\n", encoding='utf-8')
+    calls = []
+    original = core.get_instance_metadata
+    monkeypatch.setattr(core, 'get_instance_metadata', lambda p: calls.append(p) or original(p))
+    cache = core.InstanceMetadataCache()
+    assert cache.get(path)['name'] == 'First'
+    assert cache.get(str(path)) is cache.get(path)
+    assert len(calls) == 1
+
+    (path / 'instance.cfg').write_text("name=Second\n", encoding='utf-8')
+    stat_result = os.stat(path / 'instance.cfg')
+    os.utime(path / 'instance.cfg', ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    assert cache.get(path)['name'] == 'Second'
+    assert len(calls) == 2
+
+
+def test_signature_tracks_the_mods_folder(tmp_path):
+    path = _instance(tmp_path, 'signed')
+    before = core.get_instance_signature(path)
+    assert len(before) == 2 + len(core.INSTANCE_METADATA_FILES)
+    assert before[2:] == (None, None, None)
+    (path / 'mods' / 'extra.jar').write_bytes(b'PK')
+    os.utime(path / 'mods', ns=(0, before[1] + 1_000_000_000))
+    assert core.get_instance_signature(path)[1] != before[1]
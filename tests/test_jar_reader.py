@@ -0,0 +1,127 @@
+"""CentralDirectoryJar and open_jar against zipfile on the layouts real JARs use."""
+import io
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+FABRIC_JSON = b'{"schemaVersion": 1, "id": "example", "version": "1.0.0", "name": "Example"}'
+MODS_TOML = b'modLoader="javafml"\n[[mods]]\nmodId="example"\nversion="1.0.0"\n'
+WANTED = ('fabric.mod.json', 'META-INF/mods.toml')
+
+
+class _Unseekable(io.RawIOBase):
+    """Write-only stream: zipfile then writes data descriptors after every entry, like `jar`."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def _entries(zf):
+    zf.writestr('fabric.mod.json', FABRIC_JSON, compress_type=zipfile.ZIP_DEFLATED)
+    zf.writestr('META-INF/mods.toml', MODS_TOML, compress_type=zipfile.ZIP_STORED)
+    for index in range(50):
+        zf.writestr(f'com/example/Class{index}.class', bytes(range(256)) * 4, compress_type=zipfile.ZIP_DEFLATED)
+
+
+def _write_jar(path, prefix=b''):
+    buffer = io.BytesIO()
+    buffer.write(prefix)
+    with zipfile.ZipFile(buffer, 'a' if prefix else 'w') as zf:
+        _entries(zf)
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+def _write_data_descriptor_jar(path):
+    stream = _Unseekable()
+    with zipfile.ZipFile(stream, 'w') as zf:
+        _entries(zf)
+    path.write_bytes(bytes(stream.buffer))
+    return path
+
+
+def _write_zip64_jar(path):
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, data in (('fabric.mod.json', FABRIC_JSON), ('META-INF/mods.toml', MODS_TOML)):
+            with zf.open(name, 'w', force_zip64=True) as f:
+                f.write(data)
+    return path
+
+
+def _assert_matches_zipfile(jar, path):
+    with zipfile.ZipFile(path) as zf:
+        for name in WANTED:
+            info = zf.getinfo(name)
+            assert name in jar
+            assert jar.read(name) == zf.read(name)
+            assert jar.entry_info(name) == (info.file_size, info.CRC)
+
+
+def test_reads_wanted_entries_like_zipfile(tmp_path):
+    path = _write_jar(tmp_path / 'plain.jar')
+    with core.CentralDirectoryJar(path, WANTED) as jar:
+        _assert_matches_zipfile(jar, path)
+        assert 'com/example/Class0.class' not in jar
+        with pytest.raises(KeyError):
+            jar.read('quilt.mod.json')
+
+
+def test_data_descriptor_jar(tmp_path):
+    path = _write_data_descriptor_jar(tmp_path / 'streamed.jar')
+    with zipfile.ZipFile(path) as zf:
+        assert all(info.flag_bits & 0x08 for info in zf.infolist())
+    with core.CentralDirectoryJar(path, WANTED) as jar:
+        _assert_matches_zipfile(jar, path)
+
+
+def test_prepended_stub_shifts_offsets(tmp_path):
+    path = _write_jar(tmp_path / 'stub.jar', prefix=b'#!/bin/sh\nexec java -jar "$0"\n')
+    with core.CentralDirectoryJar(path, WANTED) as jar:
+        _assert_matches_zipfile(jar, path)
+
+
+def test_locate_finds_more_entries_later(tmp_path):
+    path = _write_jar(tmp_path / 'plain.jar')
+    with core.CentralDirectoryJar(path, ('fabric.mod.json',)) as jar:
+        assert 'META-INF/mods.toml' not in jar
+        jar.locate(('META-INF/mods.toml', 'com/example/Class7.class'))
+        with zipfile.ZipFile(path) as zf:
+            assert jar.read('com/example/Class7.class') == zf.read('com/example/Class7.class')
+
+
+def test_zip64_entries_are_read_like_zipfile(tmp_path):
+    # ZIP64 extra fields in the local headers only: the sizes in the central directory still fit
+    path = _write_zip64_jar(tmp_path / 'zip64.jar')
+    with core.CentralDirectoryJar(path, WANTED) as jar:
+        _assert_matches_zipfile(jar, path)
+    with core.open_jar(path, WANTED) as jar:
+        _assert_matches_zipfile(jar, path)
+
+
+def test_zip64_end_record_falls_back_to_zipfile(tmp_path):
+    path = tmp_path / 'many.jar'
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('fabric.mod.json', FABRIC_JSON)
+        zf.writestr('META-INF/mods.toml', MODS_TOML)
+        for index in range(0xFFFF):
+            zf.writestr(f'e/{index}', b'')
+    with pytest.raises(core.UnsupportedJarLayout):
+        core.CentralDirectoryJar(path, WANTED)
+    with core.open_jar(path, WANTED) as jar:
+        _assert_matches_zipfile(jar, path)
+
+
+def test_not_a_zip_raises_bad_zip_file(tmp_path):
+    path = tmp_path / 'broken.jar'
+    path.write_bytes(b'not a zip file at all')
+    with pytest.raises(zipfile.BadZipFile):
+        core.open_jar(path, WANTED)
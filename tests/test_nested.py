@@ -0,0 +1,122 @@
+"""Jar-in-jar scanning: Fabric 'jars' and Forge jarjar, the depth limit, the memory budget and the result cache."""
+import io
+import json
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+
+@pytest.fixture(autouse=True)
+def fresh_nested_cache(monkeypatch):
+    monkeypatch.setattr(core, '_nested_results', {})
+
+
+def _jar_bytes(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as jar:
+        for name, data in files.items():
+            jar.writestr(zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0)), data)
+    return buffer.getvalue()
+
+
+def _fabric_jar(mod_id, bundled=None, padding=0):
+    """A Fabric mod JAR; bundled maps inner file names to JAR bytes listed under 'jars'."""
+    bundled = bundled or {}
+    metadata = {'schemaVersion': 1, 'id': mod_id, 'name': mod_id.title(), 'version': '1.0',
+                'jars': [{'file': f'META-INF/jars/{name}'} for name in bundled]}
+    files = {'fabric.mod.json': json.dumps(metadata), 'padding.bin': b'x' * padding}
+    files.update((f'META-INF/jars/{name}', data) for name, data in bundled.items())
+    return _jar_bytes(files)
+
+
+def _scan(tmp_path, data, name='top.jar'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return core.extract_mod_info(str(path), name, nested=True)
+
+
+def _chain(levels):
+    """top.jar bundling level1.jar bundling level2.jar ... levels deep."""
+    data = _fabric_jar(f'level{levels}')
+    for level in range(levels - 1, 0, -1):
+        data = _fabric_jar(f'level{level}', {f'level{level + 1}.jar': data})
+    return _fabric_jar('top', {'level1.jar': data})
+
+
+def test_bundled_jars_are_listed_with_parent_and_depth(tmp_path):
+    mod = _scan(tmp_path, _chain(2))
+    assert mod['name'] == 'Top'
+    assert [(n['name'], n['parent'], n['depth'], n['path']) for n in mod['nested']] == [
+        ('Level1', 'top.jar', 1, 'META-INF/jars/level1.jar'),
+        ('Level2', 'level1.jar', 2, 'META-INF/jars/level2.jar'),
+    ]
+
+
+@pytest.mark.parametrize('max_depth', [1, 2, 3])
+def test_depth_limit(tmp_path, monkeypatch, max_depth):
+    monkeypatch.setattr(core, 'NESTED_JAR_MAX_DEPTH', max_depth)
+    mod = _scan(tmp_path, _chain(4))
+    assert [n['depth'] for n in mod['nested']] == list(range(1, max_depth + 1))
+
+
+def test_without_nested_nothing_is_listed(tmp_path):
+    path = tmp_path / 'top.jar'
+    path.write_bytes(_chain(2))
+    assert 'nested' not in core.extract_mod_info(str(path), 'top.jar')
+
+
+def test_forge_jarjar_library(tmp_path):
+    library = _jar_bytes({'com/example/Lib.class': b'\xca\xfe\xba\xbe'})
+    jarjar = {'jars': [
+        {'path': 'META-INF/jarjar/lib-2.1.jar', 'identifier': {'group': 'com.example', 'artifact': 'lib'},
+         'version': {'artifactVersion': '2.1', 'range': '[2.1,)'}},
+        {'path': 'META-INF/jarjar/declared-but-missing.jar', 'identifier': {'artifact': 'gone'}},
+        'not a dict',
+    ]}
+    toml = 'modLoader="javafml"\nloaderVersion="[47,)"\nlicense="MIT"\n[[mods]]\nmodId="forgemod"\nversion="3.0"\n'
+    data = _jar_bytes({'META-INF/mods.toml': toml, core.JARJAR_METADATA_FILE: json.dumps(jarjar),
+                       'META-INF/jarjar/lib-2.1.jar': library})
+    mod = _scan(tmp_path, data)
+    assert mod['loader'] == 'Forge'
+    assert [(n['name'], n['version'], n['description'], n['size']) for n in mod['nested']] == [
+        ('lib', '2.1', 'Bundled library (jarjar).', len(library))]
+
+
+def test_jars_over_the_size_limit_are_listed_but_not_read(tmp_path, monkeypatch):
+    small, large = _fabric_jar('small'), _fabric_jar('large', padding=5000)
+    monkeypatch.setattr(core, 'NESTED_JAR_MAX_BYTES', 4000)
+    mod = _scan(tmp_path, _fabric_jar('top', {'small.jar': small, 'large.jar': large}))
+    by_file = {n['filename']: n for n in mod['nested']}
+    assert by_file['small.jar']['name'] == 'Small'
+    assert by_file['large.jar']['description'] == 'Nested JAR not scanned (over the memory limit).'
+    assert by_file['large.jar']['size'] == len(large)
+
+
+def test_memory_budget_covers_the_whole_chain(tmp_path, monkeypatch):
+    inner = _fabric_jar('inner', padding=3000)
+    outer = _fabric_jar('outer', {'inner.jar': inner}, padding=3000)
+    # Each JAR fits on its own, but not while its parent is still held in memory
+    monkeypatch.setattr(core, 'NESTED_JAR_MEMORY_LIMIT', len(outer) + len(inner) - 1)
+    mod = _scan(tmp_path, _fabric_jar('top', {'outer.jar': outer, 'sibling.jar': inner}))
+    assert [(n['filename'], n['depth'], n['description'].startswith('Nested JAR not scanned'))
+            for n in mod['nested']] == [('outer.jar', 1, False), ('inner.jar', 2, True), ('sibling.jar', 1, False)]
+
+
+def test_unreadable_nested_jar(tmp_path):
+    mod = _scan(tmp_path, _fabric_jar('top', {'broken.jar': b'not a zip'}))
+    assert [(n['filename'], n['description']) for n in mod['nested']] == [('broken.jar', 'Not a valid JAR/ZIP file.')]
+
+
+def test_shared_library_is_parsed_once(tmp_path, monkeypatch):
+    library = _fabric_jar('shared')
+    calls = []
+    original = core._read_mod_info
+    monkeypatch.setattr(core, '_read_mod_info',
+                        lambda source, filename, *args: calls.append(filename) or original(source, filename, *args))
+    first = _scan(tmp_path, _fabric_jar('first', {'shared.jar': library}), 'first.jar')
+    second = _scan(tmp_path, _fabric_jar('second', {'shared.jar': library}), 'second.jar')
+    assert calls == ['first.jar', 'shared.jar', 'second.jar']
+    assert first['nested'][0]['name'] == second['nested'][0]['name'] == 'Shared'
+    assert second['nested'][0]['parent'] == 'second.jar'
@@ -0,0 +1,114 @@
+"""Instrumentation: PerfRecorder, ProfileCapture and the .perf.json report."""
+import json
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+
+def _write_jar(path, mod_id):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': '1.0'}))
+
+
+def test_timers_and_counters():
+    perf = core.PerfRecorder()
+    perf.add_time('export.md', 0.25)
+    perf.add_time('export.md', 0.75)
+    perf.add_time('batch', 1.0, count=4)
+    perf.count('reused')
+    perf.count('reused', 2)
+    with perf.timer('block'):
+        pass
+    data = perf.to_dict()
+    assert data['timers']['export.md'] == {'count': 2, 'total_ms': 1000.0, 'max_ms': 750.0}
+    assert data['timers']['batch'] == {'count': 4, 'total_ms': 1000.0, 'max_ms': 250.0}
+    assert data['timers']['block']['count'] == 1
+    assert list(data['timers']) == ['batch', 'block', 'export.md']
+    assert data['counters'] == {'reused': 3}
+
+
+def test_slowest_files_are_kept_in_order():
+    perf = core.PerfRecorder(files_kept=3)
+    for index, seconds in enumerate([0.5, 0.1, 0.9, 0.3, 0.7, 0.2]):
+        perf.add_file(f'{index}.jar', seconds, {'parse': seconds / 2})
+    data = perf.to_dict(top_n=2)
+    assert data['slowest_jars'] == [{'filename': '2.jar', 'ms': 900.0}, {'filename': '4.jar', 'ms': 700.0}]
+    assert len(perf.files) == 3
+    assert data['timers']['extract.parse']['count'] == 6
+
+
+def test_to_dict_header():
+    perf = core.PerfRecorder()
+    perf.meta['mode'] = 'scan'
+    data = perf.to_dict([{'format': 'md', 'filename': 'x.md', 'seconds': 0.1, 'bytes': 10}])
+    assert data['app_version'] == core.APP_VERSION and data['extractor_version'] == core.EXTRACTOR_VERSION
+    assert data['meta'] == {'mode': 'scan'} and data['export'][0]['format'] == 'md'
+    assert data['profile'] is None
+    json.dumps(data)
+
+
+@pytest.fixture
+def scanned(tmp_path):
+    for index in range(5):
+        _write_jar(tmp_path / 'mods' / f'mod{index}.jar', f'mod{index}')
+    perf = core.PerfRecorder()
+    entries = core.find_jar_entries(tmp_path / 'mods')
+    with perf.timer('extract'):
+        mods, _ = core.extract_entries(entries, workers=2, perf=perf)
+    return mods, perf, tmp_path
+
+
+def test_perf_json_next_to_info_txt(scanned):
+    mods, perf, tmp_path = scanned
+    (tmp_path / 'out').mkdir()
+    written, errors, stats = core.export_reports(mods, tmp_path / 'mods', tmp_path / 'out', 'modlist',
+                                                 formats=('md', 'info'), perf=perf)
+    assert errors == []
+    assert [path.name for path in written] == ['modlist.md', 'modlist.info.txt', 'modlist.perf.json']
+    report = json.loads((tmp_path / 'out' / 'modlist.perf.json').read_text(encoding='utf-8'))
+    assert report['scan_path'] == str(tmp_path / 'mods') and report['total_mods'] == 5
+    assert report['counters']['extracted'] == 5
+    assert report['timers']['extract']['count'] == 1
+    assert {'extract.jar_open', 'extract.entry_read', 'extract.parse'} <= set(report['timers'])
+    assert sorted(jar['filename'] for jar in report['slowest_jars']) == [f'mod{index}.jar' for index in range(5)]
+    # The export timings cover every format written before it, info.txt included
+    assert [stat['format'] for stat in report['export']] == ['md', 'info']
+    assert [stat['format'] for stat in stats] == ['md', 'info', 'perf']
+
+
+def test_no_perf_json_without_info_or_when_disabled(scanned, monkeypatch):
+    mods, perf, tmp_path = scanned
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    written, _, _ = core.export_reports(mods, tmp_path, tmp_path / 'a', 'modlist', formats=('json',), perf=perf)
+    assert [path.name for path in written] == ['modlist.json']
+    monkeypatch.setattr(core, 'PERF_REPORT_ENABLED', False)
+    written, _, _ = core.export_reports(mods, tmp_path, tmp_path / 'b', 'modlist', formats=('info',), perf=perf)
+    assert [path.name for path in written] == ['modlist.info.txt']
+
+
+def test_profiled_pool():
+    assert core.profiled_pool('cprofile', 8, 'process') == (1, 'thread')
+    assert core.profiled_pool('tracemalloc', 8, 'process') == (8, 'thread')
+    assert core.profiled_pool(None, 8, 'process') == (8, 'process')
+
+
+def test_profile_capture(scanned):
+    _, _, tmp_path = scanned
+    entries = core.find_jar_entries(tmp_path / 'mods')
+    with core.ProfileCapture('cprofile', top_n=5) as capture:
+        core.extract_entries(entries, workers=1)
+    assert capture.result['mode'] == 'cprofile' and len(capture.result['functions']) == 5
+    assert any('extract_mod_info' in row['function'] for row in capture.result['functions'])
+
+    with core.ProfileCapture('tracemalloc', top_n=3) as capture:
+        core.extract_entries(entries, workers=2)
+    assert capture.result['mode'] == 'tracemalloc' and capture.result['peak_bytes'] > 0
+    assert len(capture.result['allocations']) <= 3
+
+    with core.ProfileCapture(None) as capture:
+        pass
+    assert capture.result is None
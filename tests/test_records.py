@@ -0,0 +1,109 @@
+"""ModRecord (slotted, dict-like) and the columnar ModTable."""
+import json
+
+import pytest
+
+import modlist_core as core
+
+
+def _mod(name, version='1.0', loader='Fabric', size=100, **fields):
+    return core.ModRecord(name=name, version=version, loader=loader, size=size, filename=f'{name.lower()}.jar',
+                          **fields)
+
+
+def test_reads_like_a_dict():
+    record = core.ModRecord({'name': 'Sodium', 'links': {'Homepage': 'https://x'}}, version='0.5', custom=1)
+    assert record['name'] == 'Sodium' and record.get('missing', 'default') == 'default'
+    assert 'custom' in record and 'hashes' not in record
+    assert record.keys() == ['name', 'version', 'links', 'custom']  # Slot order, extras last
+    assert dict(record) == {'name': 'Sodium', 'version': '0.5', 'links': {'Homepage': 'https://x'}, 'custom': 1}
+    assert len(record) == 4
+    with pytest.raises(KeyError):
+        record['hashes']
+    del record['custom']
+    del record['version']
+    assert record.keys() == ['name', 'links']
+    with pytest.raises(KeyError):
+        del record['version']
+
+
+def test_equality_and_no_hash():
+    record = _mod('Lithium')
+    assert record == dict(record) and record == _mod('Lithium')
+    assert record != _mod('Lithium', version='2.0')
+    assert record != 'Lithium'
+    # Equal records are still different scan slots, so they must not be usable as dict keys
+    assert core.ModRecord.__hash__ is None
+    with pytest.raises(TypeError):
+        {record}
+
+
+def test_repeated_strings_are_shared():
+    first = core.ModRecord(links={''.join(['Home', 'page']): 'a'}, description=''.join(['No description', ' provided.']),
+                           loader=''.join(['Fab', 'ric']))
+    second = core.ModRecord(links={'Homepage': 'b'}, description='No description provided.', loader='Fabric')
+    assert next(iter(first['links'])) is next(iter(second['links']))
+    assert first['description'] is second['description']
+    assert first['loader'] is second['loader']
+
+
+def test_nested_records_and_to_dict():
+    record = core.ModRecord(name='Outer', nested=[{'name': 'Inner', 'depth': 1}])
+    assert isinstance(record['nested'][0], core.ModRecord)
+    data = record.to_dict()
+    assert data == {'name': 'Outer', 'nested': [{'name': 'Inner', 'depth': 1}]}
+    assert type(data['nested'][0]) is dict
+    assert json.loads(json.dumps(record, default=core._json_default))['nested'][0]['name'] == 'Inner'
+    assert core.ModRecord.from_dict(record) is record
+
+
+def test_replace_returns_a_copy():
+    record = _mod('Sodium', links={'Homepage': 'a'})
+    changed = record.replace(version='2.0', hashes={'sha1': 'x'})
+    assert record['version'] == '1.0' and 'hashes' not in record
+    assert changed['version'] == '2.0' and changed['hashes'] == {'sha1': 'x'}
+    assert changed['name'] == 'Sodium'
+
+
+def test_table_columns_and_order():
+    table = core.ModTable([_mod('beta', size=30), {'name': 'Alpha', 'size': None}, _mod('gamma', size=5)])
+    assert isinstance(table[1], core.ModRecord) and len(table) == 3
+    assert table.columns['name'] == ['beta', 'Alpha', 'gamma']
+    assert table.columns['loader'] == ['Fabric', None, 'Fabric']
+    assert table.order('name') == [1, 0, 2]
+    assert table.order('size') == [1, 2, 0]               # Missing sizes sort as 0
+    assert table.order('size', descending=True) == [0, 2, 1]
+    assert [mod['name'] for mod in table.sorted('loader')] == ['Alpha', 'beta', 'gamma']  # Stable, None first
+
+
+def test_table_sort_keeps_columns_aligned():
+    table = core.ModTable([_mod('b', size=2), _mod('c', size=3), _mod('a', size=1)])
+    table.sort('name', descending=True)
+    assert [mod['name'] for mod in table] == ['c', 'b', 'a']
+    assert table.columns['size'] == [3, 2, 1]
+    assert table.where('size', lambda size: size > 1) == [0, 1]
+    assert [mod['name'] for mod in table.search('B.JAR')] == ['b']
+
+
+def test_table_remove_is_by_identity():
+    first, twin = _mod('Twin'), _mod('Twin')
+    table = core.ModTable([first, _mod('Other'), twin])
+    table.remove(twin)
+    assert [record is first for record in table] == [True, False]
+    assert table.columns['name'] == ['Twin', 'Other']
+    with pytest.raises(ValueError):
+        table.remove(_mod('Twin'))  # Equal, but not in the table
+
+
+def test_table_setitem_copy_and_refresh():
+    table = core.ModTable([_mod('a'), _mod('b')])
+    snapshot = table.copy()
+    table[0] = table[0].replace(version='2.0', size=999)
+    assert table.columns['version'] == ['2.0', '1.0'] and table.columns['size'] == [999, 100]
+    assert snapshot[0]['version'] == '1.0' and snapshot.columns['size'] == [100, 100]
+    assert snapshot[1] is table[1]
+
+    table[1]['loader'] = 'Quilt'  # Changed in place: columns are stale until refresh()
+    assert table.columns['loader'] == ['Fabric', 'Fabric']
+    table.refresh()
+    assert table.columns['loader'] == ['Fabric', 'Quilt']
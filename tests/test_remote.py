@@ -0,0 +1,345 @@
+"""HttpPool and enrich_mods against a local stub of the Modrinth and CurseForge APIs."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import modlist_core as core
+import modlist_remote as remote
+
+KNOWN_SHA1 = 'a' * 40
+UNKNOWN_SHA1 = 'b' * 40
+KNOWN_FINGERPRINT = 111
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        request = {'method': self.command, 'path': parts.path, 'query': parse_qs(parts.query),
+                   'headers': dict(self.headers), 'json': json.loads(self.rfile.read(length)) if length else None}
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests.append(request)
+            stub.connections.add(self.client_address)
+        route = stub.routes.get(parts.path)
+        status, answer, options = route(request) if route else (404, None, {})
+        if options.get('delay'):
+            time.sleep(options['delay'])
+        body = answer if isinstance(answer, bytes) else json.dumps(answer).encode('utf-8')
+        mode = options.get('mode', 'length')
+        self.send_response(status)
+        for name, value in options.get('headers', {}).items():
+            self.send_header(name, value)
+        if mode == 'chunked':
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for start in range(0, len(body), 7):
+                chunk = body[start:start + 7]
+                self.wfile.write(b'%x;ext=1\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\nX-Trailer: yes\r\n\r\n')
+        elif mode == 'close':
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(body)
+            self.close_connection = True
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            # 'drop': answer as if keeping the connection alive, then close it anyway
+            self.close_connection = bool(options.get('drop'))
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class Stub:
+    def __init__(self):
+        self.routes = {}        # path -> request -> (status, answer, options)
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.block_on_close = False
+        self.server.stub = self
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def paths(self):
+        return [request['path'] for request in self.requests]
+
+
+@pytest.fixture
+def stub():
+    stub = Stub()
+    yield stub
+    stub.close()
+
+
+def _pool_requests(pool_kwargs, stub, *requests):
+    """Runs the requests one after another on one HttpPool; returns (answers, pool)."""
+    async def main():
+        pool = remote.HttpPool(stub.url, per_second=0, **pool_kwargs)
+        try:
+            return [await pool.request_json(*request) for request in requests], pool
+        finally:
+            await pool.close()
+    return asyncio.run(main())
+
+
+def _echo(options=None):
+    return lambda request: (200, {'path': request['path'], 'query': request['query']}, dict(options or {}))
+
+
+# --- HttpPool ---
+
+@pytest.mark.parametrize('mode', ['length', 'chunked', 'close'])
+def test_body_framing(stub, mode):
+    stub.routes['/echo'] = lambda request: (200, {'text': 'x' * 100, 'json': request['json']}, {'mode': mode})
+    answers, pool = _pool_requests({}, stub, ('POST', '/echo', {'a': 1}), ('GET', '/echo'))
+    assert answers == [{'text': 'x' * 100, 'json': {'a': 1}}, {'text': 'x' * 100, 'json': None}]
+    assert pool.connections == (2 if mode == 'close' else 1)
+
+
+def test_keep_alive_reuse(stub):
+    stub.routes['/echo'] = _echo()
+    answers, pool = _pool_requests({}, stub, *[('GET', f'/echo?i={i}') for i in range(5)])
+    assert [answer['query'] for answer in answers] == [{'i': [str(i)]} for i in range(5)]
+    assert pool.requests == 5
+    assert pool.connections == len(stub.connections) == 1
+
+
+def test_reconnects_after_the_server_drops_a_kept_alive_connection(stub):
+    stub.routes['/echo'] = _echo({'drop': True})
+    answers, pool = _pool_requests({}, stub, ('GET', '/echo?i=1'), ('GET', '/echo?i=2'))
+    assert [answer['query'] for answer in answers] == [{'i': ['1']}, {'i': ['2']}]
+    assert pool.connections == 2
+
+
+def test_base_path_and_headers(stub):
+    stub.routes['/api/echo'] = _echo()
+    async def main():
+        pool = remote.HttpPool(stub.url + '/api/', per_second=0, headers={'x-api-key': 'secret'})
+        try:
+            return await pool.request_json('GET', '/echo')
+        finally:
+            await pool.close()
+    assert asyncio.run(main())['path'] == '/api/echo'
+    headers = stub.requests[0]['headers']
+    assert headers['x-api-key'] == 'secret' and headers['User-Agent'] == remote.USER_AGENT
+
+
+def test_404_is_none(stub):
+    answers, _ = _pool_requests({}, stub, ('GET', '/missing'))
+    assert answers == [None]
+
+
+def test_429_waits_for_retry_after(stub):
+    answers = iter([(429, {'error': 'slow down'}, {'headers': {'Retry-After': '0'}}), (200, {'ok': True}, {})])
+    stub.routes['/limited'] = lambda request: next(answers)
+    result, pool = _pool_requests({}, stub, ('GET', '/limited'))
+    assert result == [{'ok': True}]
+    assert pool.requests == 2
+
+
+def test_server_errors_give_up_after_the_retries(stub):
+    stub.routes['/broken'] = lambda request: (503, {}, {'headers': {'Retry-After': '0'}})
+    with pytest.raises(remote.EnrichmentError, match='HTTP 503'):
+        _pool_requests({'retries': 1}, stub, ('GET', '/broken'))
+    assert stub.paths() == ['/broken', '/broken']
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.routes['/forbidden'] = lambda request: (403, {}, {})
+    with pytest.raises(remote.EnrichmentError, match='HTTP 403'):
+        _pool_requests({}, stub, ('GET', '/forbidden'))
+    assert len(stub.requests) == 1
+
+
+def test_timeout(stub):
+    stub.routes['/slow'] = _echo({'delay': 1.0})
+    start = time.perf_counter()
+    with pytest.raises(remote.EnrichmentError):
+        _pool_requests({'timeout': 0.2, 'retries': 0}, stub, ('GET', '/slow'))
+    assert time.perf_counter() - start < 0.9
+
+
+def test_invalid_json(stub):
+    stub.routes['/garbage'] = lambda request: (200, b'{not json', {})
+    with pytest.raises(remote.EnrichmentError, match='invalid JSON'):
+        _pool_requests({}, stub, ('GET', '/garbage'))
+
+
+def test_rejects_unsupported_urls():
+    with pytest.raises(ValueError):
+        remote.HttpPool('ftp://example.invalid')
+
+
+# --- Response cache ---
+
+def test_cache_ttl_and_miss_ttl(tmp_path):
+    path = tmp_path / 'remote-cache.jsonl'
+    now = time.time()
+    lines = [{'k': 'kind:fresh', 't': now - 50, 'd': {'v': 1}},
+             {'k': 'kind:stale', 't': now - 200, 'd': {'v': 2}},
+             {'k': 'kind:fresh-miss', 't': now - 5, 'd': None},
+             {'k': 'kind:stale-miss', 't': now - 50, 'd': None}]
+    path.write_text('\n'.join(json.dumps(line) for line in lines) + '\n{corrupt\n', encoding='utf-8')
+    cache = remote.ResponseCache(path, ttl=100, miss_ttl=10)
+    cache.load()
+    assert cache.get('kind', 'fresh') == (True, {'v': 1})
+    assert cache.get('kind', 'fresh-miss') == (True, None)
+    assert cache.get('kind', 'stale') == (False, None)
+    assert cache.get('kind', 'stale-miss') == (False, None)
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.put('kind', 'new', [1, 2])
+    cache.save()
+    reloaded = remote.ResponseCache(path, ttl=100, miss_ttl=10)
+    reloaded.load()
+    assert sorted(reloaded.entries) == ['kind:fresh', 'kind:fresh-miss', 'kind:new']
+
+
+# --- enrich_mods ---
+
+MODRINTH_VERSION = {'id': 'ver1', 'project_id': 'proj1', 'version_number': '1.2.3', 'loaders': ['fabric', 'quilt'],
+                    'game_versions': ['1.20.1'], 'files': [{'url': 'https://cdn.example.invalid/x.jar'}]}
+MODRINTH_PROJECT = {'id': 'proj1', 'slug': 'cool-mod', 'title': 'Cool Mod', 'description': 'Does cool things',
+                    'project_type': 'mod', 'source_url': 'https://github.com/example/cool-mod', 'issues_url': None}
+
+
+def _modrinth_routes(stub):
+    def version_files(request):
+        return 200, {sha1: MODRINTH_VERSION for sha1 in request['json']['hashes'] if sha1 == KNOWN_SHA1}, {}
+
+    def projects(request):
+        ids = json.loads(request['query']['ids'][0])
+        return 200, [MODRINTH_PROJECT] if 'proj1' in ids else [], {}
+
+    stub.routes.update({'/v2/version_files': version_files, '/v2/projects': projects})
+
+
+def _mods():
+    fallback = core.ModRecord(filename='coolmod.jar', name='coolmod', version='N/A', description='No description',
+                              links={}, loader='Unknown', mod_id=None,
+                              hashes={'sha1': KNOWN_SHA1, 'curseforge': KNOWN_FINGERPRINT})
+    known = core.ModRecord(filename='other.jar', name='Other', version='2.0', description='Other mod',
+                           links={'Homepage': 'https://example.invalid/other'}, loader='Fabric', mod_id='other',
+                           hashes={'sha1': UNKNOWN_SHA1, 'curseforge': 222})
+    unhashed = core.ModRecord(filename='plain.jar', name='Plain', version='1.0', description='', links={},
+                              loader='Forge', mod_id='plain')
+    return [fallback, known, unhashed]
+
+
+def test_modrinth_enrichment(stub):
+    _modrinth_routes(stub)
+    mods = _mods()
+    updates, stats = remote.enrich_mods(mods, modrinth_url=stub.url, curseforge_url='')
+    assert list(updates) == [0]
+    fields = updates[0]
+    assert (fields['name'], fields['version'], fields['description'], fields['loader']) == \
+        ('Cool Mod', '1.2.3', 'Does cool things', 'Fabric/Quilt')
+    assert fields['links'] == {'Modrinth': 'https://modrinth.com/mod/cool-mod',
+                               'Sources': 'https://github.com/example/cool-mod'}
+    assert fields['remote'] == {'modrinth': {'project_id': 'proj1', 'version_id': 'ver1',
+                                             'url': 'https://modrinth.com/mod/cool-mod'}}
+    assert mods[0]['name'] == 'coolmod'  # Records are left alone
+    assert (stats['matched'], stats['errors']) == (1, [])
+    assert stub.requests[0]['json'] == {'hashes': [KNOWN_SHA1, UNKNOWN_SHA1], 'algorithm': 'sha1'}
+    assert stub.paths() == ['/v2/version_files', '/v2/projects']
+
+
+def test_cached_answers_skip_the_network(stub, tmp_path):
+    _modrinth_routes(stub)
+    cache = remote.ResponseCache(tmp_path / 'remote-cache.jsonl')
+    first, _ = remote.enrich_mods(_mods(), cache, modrinth_url=stub.url, curseforge_url='')
+    cache.save()
+    reloaded = remote.ResponseCache(tmp_path / 'remote-cache.jsonl')
+    second, stats = remote.enrich_mods(_mods(), reloaded, modrinth_url=stub.url, curseforge_url='')
+    assert second == first
+    assert (stats['requests'], stats['cached']) == (0, 3)  # Two hashes (one a miss) and one project
+    assert len(stub.requests) == 2
+
+
+def test_expired_misses_are_asked_again(stub, tmp_path):
+    _modrinth_routes(stub)
+    cache = remote.ResponseCache(tmp_path / 'remote-cache.jsonl', miss_ttl=-1)
+    remote.enrich_mods(_mods(), cache, modrinth_url=stub.url, curseforge_url='')
+    _, stats = remote.enrich_mods(_mods(), cache, modrinth_url=stub.url, curseforge_url='')
+    assert stats['requests'] == 1
+    assert stub.requests[-1]['json']['hashes'] == [UNKNOWN_SHA1]
+
+
+def test_curseforge_enrichment(stub):
+    def fingerprints(request):
+        assert request['headers']['x-api-key'] == 'test-key'
+        matches = [{'id': 123, 'file': {'id': 456, 'modId': 123, 'fileFingerprint': KNOWN_FINGERPRINT,
+                                        'displayName': 'Cool Mod 1.2.3'}},
+                   {'id': 999, 'file': {'id': 1, 'modId': 999, 'fileFingerprint': 999}},  # Not asked for
+                   'garbage']
+        return 200, {'data': {'exactMatches': matches, 'exactFingerprints': [KNOWN_FINGERPRINT]}}, {}
+
+    def mods(request):
+        assert request['json'] == {'modIds': [123]}
+        return 200, {'data': [{'id': 123, 'name': 'Cool Mod', 'summary': 'Cool summary',
+                               'links': {'websiteUrl': 'https://www.curseforge.com/minecraft/mc-mods/cool',
+                                         'sourceUrl': None}}]}, {}
+
+    stub.routes.update({'/v1/fingerprints': fingerprints, '/v1/mods': mods})
+    updates, stats = remote.enrich_mods(_mods(), modrinth_url='', curseforge_url=stub.url, curseforge_key='test-key')
+    assert list(updates) == [0]
+    fields = updates[0]
+    assert (fields['name'], fields['version'], fields['description']) == ('Cool Mod', 'Cool Mod 1.2.3', 'Cool summary')
+    assert fields['links'] == {'CurseForge': 'https://www.curseforge.com/minecraft/mc-mods/cool'}
+    assert fields['remote']['curseforge'] == {'mod_id': 123, 'file_id': 456,
+                                              'url': 'https://www.curseforge.com/minecraft/mc-mods/cool'}
+    assert (stats['matched'], stats['errors']) == (1, [])
+    assert stub.requests[0]['json'] == {'fingerprints': [KNOWN_FINGERPRINT, 222]}
+
+
+def test_curseforge_needs_a_key(stub):
+    updates, stats = remote.enrich_mods(_mods(), modrinth_url='', curseforge_url=stub.url, curseforge_key=None)
+    assert updates == {} and stub.requests == [] and stats['errors'] == []
+
+
+@pytest.mark.parametrize('path, answer', [
+    ('/v2/version_files', {KNOWN_SHA1: 'oops'}),
+    ('/v2/version_files', [KNOWN_SHA1]),
+    ('/v2/projects', {'proj1': MODRINTH_PROJECT}),
+    ('/v1/fingerprints', 'oops'),
+    ('/v1/fingerprints', {'data': 'oops'}),
+    ('/v1/fingerprints', {'data': {'exactMatches': {'oops': 1}}}),
+    ('/v1/mods', {'data': {'123': 'oops'}}),
+])
+def test_unexpected_answers_are_errors_not_crashes(stub, path, answer):
+    _modrinth_routes(stub)
+    stub.routes.update({
+        '/v1/fingerprints': lambda request: (200, {'data': {'exactMatches': [
+            {'id': 123, 'file': {'id': 456, 'fileFingerprint': KNOWN_FINGERPRINT}}]}}, {}),
+        '/v1/mods': lambda request: (200, {'data': [{'id': 123, 'name': 'Cool Mod'}]}, {}),
+    })
+    stub.routes[path] = lambda request: (200, answer, {})
+    cache = remote.ResponseCache()
+    cache.loaded = True
+    updates, stats = remote.enrich_mods(_mods(), cache, modrinth_url=stub.url, curseforge_url=stub.url,
+                                        curseforge_key='test-key')
+    assert len(stats['errors']) == 1 and 'unexpected answer' in stats['errors'][0]
+    assert 'oops' not in json.dumps([value for _, value in cache.entries.values()])
+    failed_kind = {'/v2/version_files': 'modrinth-version', '/v2/projects': 'modrinth-project',
+                   '/v1/fingerprints': 'curseforge-file', '/v1/mods': 'curseforge-mod'}[path]
+    assert not any(key.startswith(failed_kind + ':') for key in cache.entries)
+    assert all('remote' in fields for fields in updates.values())  # The other service still matched
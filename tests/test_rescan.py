@@ -0,0 +1,99 @@
+"""Incremental rescans: the JAR walk, reuse of unchanged records and diff_mod_lists."""
+import json
+import os
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+
+def _mod(name, version, filename):
+    return core.ModRecord(name=name, version=version, filename=filename)
+
+
+def _write_jar(path, mod_id, version='1.0'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version}))
+
+
+def test_unchanged_lists_have_no_diff():
+    mods = [_mod('Sodium', '0.5.0', 'sodium.jar'), _mod('Lithium', '0.11', 'lithium.jar')]
+    assert core.diff_mod_lists(mods, list(reversed(mods))) == {'added': [], 'removed': [], 'updated': []}
+
+
+def test_added_removed_and_updated():
+    old = [_mod('Sodium', '0.5.0', 'sodium-0.5.0.jar'), _mod('Lithium', '0.11', 'lithium.jar')]
+    new = [_mod('sodium', '0.6.0', 'sodium-0.6.0.jar'), _mod('Jade', '11.0', 'jade.jar')]
+    diff = core.diff_mod_lists(old, new)
+    assert diff['added'] == [{'name': 'Jade', 'version': '11.0', 'filename': 'jade.jar'}]
+    assert diff['removed'] == [{'name': 'Lithium', 'version': '0.11', 'filename': 'lithium.jar'}]
+    assert diff['updated'] == [{'name': 'sodium', 'old_version': '0.5.0', 'new_version': '0.6.0',
+                                'old_filename': 'sodium-0.5.0.jar', 'new_filename': 'sodium-0.6.0.jar'}]
+    assert core.format_diff_lines(diff) == ["Changes Since Previous Scan: 1 added, 1 removed, 1 updated",
+                                            " + Jade (11.0)", " - Lithium (0.11)", " ~ sodium: 0.5.0 -> 0.6.0"]
+
+
+def test_jars_sharing_a_name_are_all_kept():
+    old = [_mod('Cloth Config', '11.1', 'cloth-11.jar'), _mod('Cloth Config', '12.0', 'cloth-12.jar')]
+    new = [_mod('Cloth Config', '11.1', 'cloth-11.jar'), _mod('Cloth Config', '13.0', 'cloth-13.jar'),
+           _mod('Cloth Config', '8.0', 'cloth-8.jar')]
+    diff = core.diff_mod_lists(old, new)
+    assert [(u['old_filename'], u['new_filename']) for u in diff['updated']] == [('cloth-12.jar', 'cloth-13.jar')]
+    assert diff['added'] == [{'name': 'Cloth Config', 'version': '8.0', 'filename': 'cloth-8.jar'}]
+    assert diff['removed'] == []
+    back = core.diff_mod_lists(new, old)
+    assert [(u['old_filename'], u['new_filename']) for u in back['updated']] == [('cloth-13.jar', 'cloth-12.jar')]
+    assert back['removed'] == [{'name': 'Cloth Config', 'version': '8.0', 'filename': 'cloth-8.jar'}]
+
+
+def test_same_file_new_version():
+    diff = core.diff_mod_lists([_mod('Lib', '1.0', 'lib.jar'), _mod('Lib', '2.0', 'lib-extra.jar')],
+                               [_mod('Lib', '1.1', 'lib.jar'), _mod('Lib', '2.0', 'lib-extra.jar')])
+    assert diff['updated'] == [{'name': 'Lib', 'old_version': '1.0', 'new_version': '1.1',
+                                'old_filename': 'lib.jar', 'new_filename': 'lib.jar'}]
+    assert diff['added'] == diff['removed'] == []
+
+
+def test_plain_rename_is_not_a_change():
+    diff = core.diff_mod_lists([_mod('Sodium', '0.5.0', 'sodium.jar')],
+                               [_mod('Sodium', '0.5.0', 'sodium-fabric-0.5.0.jar')])
+    assert diff == {'added': [], 'removed': [], 'updated': []}
+
+
+def test_walk_order_and_symlink_loops(tmp_path):
+    mods = tmp_path / 'mods'
+    _write_jar(mods / 'b.jar', 'b')
+    _write_jar(mods / 'a.jar', 'a')
+    _write_jar(mods / 'sub' / 'c.jar', 'c')
+    (mods / 'readme.txt').write_text('not a jar')
+    try:
+        os.symlink('..', mods / 'sub' / 'loop', target_is_directory=True)
+        os.symlink(tmp_path / 'elsewhere', mods / 'linked', target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not available")
+    _write_jar(tmp_path / 'elsewhere' / 'd.jar', 'd')
+    entries = core.find_jar_entries(mods)
+    assert [os.path.relpath(path, mods) for path, _, _ in entries] == ['a.jar', 'b.jar', os.path.join('sub', 'c.jar')]
+    assert [name for _, name, _ in entries] == ['a.jar', 'b.jar', 'c.jar']
+    assert entries[0][2].st_size == os.path.getsize(mods / 'a.jar')
+
+
+def test_incremental_rescan_reuses_unchanged_records(tmp_path):
+    _write_jar(tmp_path / 'a.jar', 'a')
+    _write_jar(tmp_path / 'b.jar', 'b')
+    entries = core.find_jar_entries(tmp_path)
+    mods, _ = core.extract_entries(entries)
+    previous_index = core.build_scan_index(entries, mods)
+
+    _write_jar(tmp_path / 'b.jar', 'b', version='2.0.0')
+    _write_jar(tmp_path / 'c.jar', 'c')
+    entries = core.find_jar_entries(tmp_path)
+    results = {index: mod for index, mod, _ in core.iter_extract_cached(entries, previous_index=previous_index)}
+    rescanned = [results[index] for index in range(len(entries))]
+    assert rescanned[0] is mods[0]
+    assert rescanned[1] is not mods[1] and rescanned[1]['version'] == '2.0.0'
+    diff = core.diff_mod_lists(mods, rescanned)
+    assert [mod['filename'] for mod in diff['added']] == ['c.jar']
+    assert [(u['old_version'], u['new_version']) for u in diff['updated']] == [('1.0', '2.0.0')]
@@ -0,0 +1,181 @@
+"""The Treeview results view: chunked fills, sorting, lazy link rows and format_size (no display needed)."""
+import pytest
+
+import modlist_core as core
+
+tk_app = pytest.importorskip('modlistexportv3')
+
+
+class FakeTree:
+    """The part of ttk.Treeview the results view uses, kept in plain lists."""
+
+    def __init__(self):
+        self.items = {'': {'children': []}}
+        self._next = 0
+        self.focused = None
+
+    def insert(self, parent, index, text='', values=(), tags=(), open=False):
+        self._next += 1
+        item = f'I{self._next:03d}'
+        self.items[item] = {'children': [], 'parent': parent, 'text': text, 'values': values, 'tags': tags}
+        children = self.items[parent]['children']
+        children.insert(len(children) if index == 'end' else index, item)
+        return item
+
+    def delete(self, *items):
+        for item in items:
+            for child in list(self.items[item]['children']):
+                self.delete(child)
+            self.items[self.items[item]['parent']]['children'].remove(item)
+            del self.items[item]
+
+    def get_children(self, item=''):
+        return tuple(self.items[item]['children'])
+
+    def index(self, item):
+        return self.items[self.items[item]['parent']]['children'].index(item)
+
+    def focus(self):
+        return self.focused
+
+    def texts(self, item=''):
+        return [self.items[child]['text'] for child in self.get_children(item)]
+
+
+class FakeMaster:
+    """Runs after() callbacks only when asked, so chunking stays visible."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, delay, callback):
+        self.jobs.append(callback)
+        return len(self.jobs)
+
+    def after_cancel(self, job):
+        self.jobs[job - 1] = None
+
+    def run_pending(self):
+        while any(self.jobs):
+            jobs, self.jobs = self.jobs, [None] * len(self.jobs)
+            for job in filter(None, jobs):
+                job()
+
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Label:
+    def config(self, **options):
+        self.options = options
+
+
+def _app(mods):
+    app = object.__new__(tk_app.ModlistExporterApp)
+    app.master = FakeMaster()
+    app.results_tree = FakeTree()
+    app.results_fill_job = None
+    app.results_rows, app.record_items = {}, {}
+    app.dependency_item = app.dependency_analysis = app.last_diff = None
+    app.results_sort = ('name', False)
+    app.scan_perf = core.PerfRecorder()
+    app.scanned_mods = core.ModTable(mods)
+    app.search_index = core.ModSearchIndex()
+    app.search_index.extend(mods)
+    app.filter_var, app.loader_filter_var, app.mc_filter_var = Var(''), Var('All'), Var('All')
+    app.links_filter_var, app.fallback_filter_var = Var(False), Var(False)
+    app.filter_count_label = Label()
+    return app
+
+
+def _mod(name, version='1.0', loader='Fabric', size=2048, links=None, **fields):
+    return core.ModRecord(name=name, version=version, loader=loader, size=size, filename=f'{name.lower()}.jar',
+                          description='A mod', links=links or {}, **fields)
+
+
+def test_format_size():
+    assert tk_app.format_size(0) == '0 B'
+    assert tk_app.format_size(1023) == '1023 B'
+    assert tk_app.format_size(1536) == '1.5 KB'
+    assert tk_app.format_size(5 * 1024 ** 2) == '5.0 MB'
+    assert tk_app.format_size(3 * 1024 ** 3) == '3.0 GB'
+
+
+def test_fill_runs_in_chunks(monkeypatch):
+    monkeypatch.setattr(tk_app, 'RESULTS_CHUNK_SIZE', 4)
+    app = _app([_mod(f'Mod {index:02d}') for index in range(10)])
+    app.update_results_display()
+    assert len(app.results_tree.get_children()) == 4 and app.results_fill_job is not None
+    app.master.run_pending()
+    assert app.results_tree.texts() == [f'Mod {index:02d}' for index in range(10)]
+    assert app.results_fill_job is None
+    assert app.scan_perf.timers['ui.fill_results_chunk'][0] == 3
+
+
+def test_refill_cancels_a_pending_fill(monkeypatch):
+    monkeypatch.setattr(tk_app, 'RESULTS_CHUNK_SIZE', 4)
+    app = _app([_mod(f'Mod {index:02d}') for index in range(10)])
+    app.update_results_display()
+    app.update_results_display()
+    app.master.run_pending()
+    assert len(app.results_tree.get_children()) == 10
+
+
+def test_sort_by_column_and_reverse():
+    app = _app([_mod('beta', size=10), _mod('Alpha', size=300), _mod('gamma', size=20)])
+    app.update_results_display()
+    assert app.results_tree.texts() == ['Alpha', 'beta', 'gamma']
+    app.sort_results('size')
+    assert app.results_tree.texts() == ['beta', 'gamma', 'Alpha']
+    app.sort_results('size')
+    assert app.results_sort == ('size', True)
+    assert app.results_tree.texts() == ['Alpha', 'gamma', 'beta']
+    row = app.results_tree.items[app.results_tree.get_children()[0]]
+    assert row['values'] == ('1.0', 'Fabric', '300 B')
+
+
+def test_streamed_rows_land_at_their_sorted_place():
+    mods = [_mod('Alpha'), _mod('Charlie')]
+    app = _app(mods)
+    app.update_results_display()
+    late = _mod('Bravo')
+    app.scanned_mods.append(late)
+    app._insert_sorted_rows([late])
+    assert app.results_tree.texts() == ['Alpha', 'Bravo', 'Charlie']
+
+
+def test_link_rows_are_built_on_first_expand():
+    bundled = {'name': 'Lib', 'version': '2.0', 'loader': 'Fabric', 'size': 100, 'parent': 'linked.jar', 'depth': 1}
+    linked = _mod('Linked', links={'Homepage': 'https://example.org'}, nested=[bundled])
+    app = _app([linked, _mod('Plain')])
+    app.update_results_display()
+    tree = app.results_tree
+    first, second = tree.get_children()
+    assert tree.texts(first) == ['...']
+    tree.focused = first
+    app._on_results_open(None)
+    assert tree.texts(first) == ['Homepage: https://example.org', '📦 Lib (in linked.jar)']
+    app._on_results_open(None)  # Expanding again keeps the rows
+    assert len(tree.get_children(first)) == 2
+    tree.focused = second
+    app._on_results_open(None)
+    assert tree.texts(second) == ['No automatic links found.']
+
+
+def test_empty_and_filtered_views():
+    app = _app([])
+    app.update_results_display()
+    assert app.results_tree.texts() == ['No files to display. Please perform a scan.']
+    app = _app([_mod('Alpha', loader='Forge'), _mod('Beta')])
+    app.loader_filter_var.value = 'Fabric'
+    app.update_results_display()
+    assert app.results_tree.texts() == ['Beta']
+    assert app.filter_count_label.options == {'text': '1 of 2'}
+    app.filter_var.value = 'zzzz'
+    app.update_results_display()
+    assert app.results_tree.texts() == ['No mods match the filter.']
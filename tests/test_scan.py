@@ -0,0 +1,75 @@
+"""The parallel scan engine: ordered results from the worker pools and per-file timings."""
+import json
+import threading
+import zipfile
+
+import pytest
+
+import modlist_core as core
+
+
+def _write_jar(path, mod_id, version='1.0'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version,
+                                                    'name': mod_id.title()}))
+
+
+@pytest.fixture
+def jar_files(tmp_path):
+    for index in range(12):
+        _write_jar(tmp_path / f'mod{index:02d}.jar', f'mod{index:02d}', version=f'1.{index}')
+    (tmp_path / 'broken.jar').write_bytes(b'not a zip')
+    return core.find_jar_files(tmp_path)
+
+
+def _check_ordered(jar_files, mods, timings):
+    assert [mod['filename'] for mod in mods] == [name for _, name in jar_files]
+    assert [name for name, _ in timings] == [name for _, name in jar_files]
+    assert all(seconds >= 0 for _, seconds in timings)
+
+
+@pytest.mark.parametrize('workers, pool_kind', [(1, 'thread'), (4, 'thread'), (2, 'process')])
+def test_extract_many_keeps_input_order(jar_files, workers, pool_kind):
+    mods, timings = core.extract_many(jar_files, workers, pool_kind)
+    _check_ordered(jar_files, mods, timings)
+    assert mods[0]['description'] == 'Not a valid JAR/ZIP file.'  # 'broken.jar' sorts first
+    assert [mod['version'] for mod in mods[1:]] == [f'1.{index}' for index in range(12)]
+
+
+def test_pools_agree_with_a_serial_scan(jar_files):
+    serial, _ = core.extract_many(jar_files, workers=1)
+    parallel, _ = core.extract_many(jar_files, workers=4)
+    assert [mod.to_dict() for mod in parallel] == [mod.to_dict() for mod in serial]
+
+
+def test_iter_extract_yields_every_index_once(jar_files):
+    results = list(core.iter_extract(jar_files, workers=4))
+    assert sorted(index for index, _, _ in results) == list(range(len(jar_files)))
+    assert all(mod['filename'] == jar_files[index][1] for index, mod, _ in results)
+
+
+def test_extract_entries_timings_follow_entry_order(jar_files, tmp_path):
+    entries = core.find_jar_entries(tmp_path)
+    mods, timings = core.extract_entries(entries, workers=3)
+    _check_ordered(jar_files, mods, timings)
+
+
+def test_per_file_timings_reach_the_perf_recorder(jar_files):
+    perf = core.PerfRecorder(files_kept=3)
+    list(core.iter_extract(jar_files, workers=4, perf=perf))
+    assert perf.counters['extracted'] == len(jar_files)
+    assert len(perf.files) == 3
+    names = {name for _, name in jar_files}
+    assert all(name in names for _, _, name in perf.files)
+    assert perf.timers['extract.jar_open'][0] == len(jar_files) - 1  # 'broken.jar' never opens
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_cancel_stops_the_scan(jar_files, workers):
+    cancel_event = threading.Event()
+    seen = []
+    for index, _, _ in core.iter_extract(jar_files, workers=workers, cancel_event=cancel_event):
+        seen.append(index)
+        cancel_event.set()
+    assert len(seen) == 1
@@ -0,0 +1,131 @@
+"""ModSearchIndex: prefix, fuzzy and facet queries, and keeping the index current."""
+import pytest
+
+import modlist_core as core
+
+
+def _mod(name, mod_id, loader='Fabric', mc=None, links=None, instances=(), **extra):
+    dependencies = [{'id': 'minecraft', 'kind': 'depends', 'versions': [mc]}] if mc else []
+    return dict(name=name, mod_id=mod_id, filename=f"{mod_id}-1.0.jar", loader=loader,
+                dependencies=dependencies, links=links or {}, instances=list(instances), **extra)
+
+
+@pytest.fixture
+def mods():
+    return [
+        _mod('Sodium', 'sodium', mc='~1.20.1', links={'Modrinth': 'https://modrinth.com/mod/sodium'},
+             instances=['survival'], authors=['JellySquid']),
+        _mod('Lithium', 'lithium', mc='1.20.x', instances=['survival', 'creative']),
+        _mod('Jade', 'jade', loader='Forge', mc='[1.19.2,1.20)', description='Shows what you are looking at'),
+        _mod('Mod Menu', 'modmenu', mc='*'),
+        _mod('mystery', '', loader='Unknown'),
+    ]
+
+
+@pytest.fixture
+def index(mods):
+    index = core.ModSearchIndex()
+    index.extend(mods)
+    return index
+
+
+def _names(records):
+    return [record['name'] for record in records]
+
+
+def test_prefix_matches_any_token(index):
+    assert _names(index.search('sod')) == ['Sodium']
+    assert _names(index.search('MOD')) == ['Sodium', 'Mod Menu']  # Via the modrinth.com link domain
+    assert _names(index.search('looking')) == ['Jade']
+    assert _names(index.search('jelly')) == ['Sodium']
+
+
+def test_every_query_word_must_match(index):
+    assert _names(index.search('mod menu')) == ['Mod Menu']
+    assert index.search('sodium jade') == []
+
+
+def test_empty_query_returns_everything_in_add_order(index, mods):
+    assert index.search_ids() is None
+    assert index.search() == mods
+
+
+@pytest.mark.parametrize('query', ['lithum', 'lithiun', 'lihtium', 'lithiumm'])
+def test_fuzzy_fallback_one_edit_away(index, query):
+    assert _names(index.search(query)) == ['Lithium']
+
+
+def test_fuzzy_needs_a_long_enough_word(index):
+    assert _names(index.search('jadd')) == ['Jade']
+    assert index.search('jaxx') == []                   # Two edits away
+    assert index.search('jde') == []                    # Too short to be fuzzy
+    assert _names(index.search('jad')) == ['Jade']      # Still a prefix
+
+
+def test_prefix_match_wins_over_fuzzy(index):
+    index.add(_mod('Sodium Extra', 'sodiumextra'))
+    index.add(_mod('Sodiun', 'sodiun'))
+    assert _names(index.search('sodiu')) == ['Sodium', 'Sodium Extra', 'Sodiun']
+    assert _names(index.search('sodiun')) == ['Sodiun']
+
+
+def test_facets(index):
+    assert _names(index.search(facets={'loader': 'Forge'})) == ['Jade']
+    assert _names(index.search(facets={'mc': '1.20'})) == ['Sodium', 'Lithium']
+    assert _names(index.search(facets={'mc': 'any'})) == ['Mod Menu']
+    assert _names(index.search(facets={'mc': 'unknown'})) == ['mystery']
+    assert _names(index.search(facets={'links': 'yes'})) == ['Sodium']
+    assert _names(index.search(facets={'fallback': 'yes'})) == ['mystery']
+    assert _names(index.search(facets={'instance': 'creative'})) == ['Lithium']
+    assert index.search(facets={'loader': 'Quilt'}) == []
+
+
+def test_facets_combine_with_query(index):
+    assert _names(index.search('li', facets={'instance': 'survival'})) == ['Lithium']
+    assert _names(index.search('', facets={'instance': 'survival', 'mc': None})) == ['Sodium', 'Lithium']
+
+
+def test_facet_counts(index):
+    counts = index.facet_counts()
+    assert counts['loader'] == {'Fabric': 3, 'Forge': 1, 'Unknown': 1}
+    assert counts['mc'] == {'1.20': 2, '1.19': 1, 'any': 1, 'unknown': 1}
+    assert counts['instance'] == {'survival': 2, 'creative': 1}
+
+
+def test_filter_keeps_the_given_order(index, mods):
+    view = sorted(mods, key=lambda record: record['name'], reverse=True)
+    assert _names(index.filter(view, 'li')) == ['Lithium']
+    assert _names(index.filter(view, facets={'loader': 'Fabric'})) == ['Sodium', 'Mod Menu', 'Lithium']
+    assert index.filter(view) == view
+
+
+def test_add_is_idempotent_and_remove_updates_everything(index, mods):
+    index.add(mods[0])
+    assert len(index) == len(mods)
+    assert index.remove(mods[0]) is True
+    assert index.remove(mods[0]) is False
+    assert len(index) == len(mods) - 1
+    assert index.search('sodium') == []
+    assert _names(index.search(facets={'instance': 'survival'})) == ['Lithium']
+    assert 'yes' not in index.facet_counts()['links']
+
+
+def test_fuzzy_table_follows_later_adds(index):
+    index.search('lithum')  # Builds the symmetric-delete table
+    index.add(_mod('Iris Shaders', 'iris'))
+    index.add(_mod('Entityculling', 'entityculling'))
+    assert _names(index.search('entityculing')) == ['Entityculling']
+
+
+def test_heavy_prefixes_stay_current(monkeypatch):
+    monkeypatch.setattr(core, 'SEARCH_HEAVY_PREFIX_TOKENS', 3)
+    index = core.ModSearchIndex()
+    first = [_mod(f"Mod {i}", f"mod{i}") for i in range(5)]
+    index.extend(first)
+    index.warm()
+    assert 'mo' in index._heavy
+    late = _mod('Mod Late', 'modlate')
+    index.add(late)
+    assert index.search('mo') == first + [late]
+    index.remove(first[0])
+    assert index.search('mo') == first[1:] + [late]
@@ -0,0 +1,71 @@
+"""Cold startup: lazily imported modules, the CLI hand-off before tkinter, and record_startup timings."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import modlist_core as core
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ('csv', 'hashlib', 'pickle', 'sqlite3', 'tempfile', 'tomllib', 'multiprocessing',
+                'concurrent.futures.process', 'tkinter', 'asyncio', 'ssl', 'cProfile', 'tracemalloc')
+
+
+def _python(*args):
+    return subprocess.run([sys.executable, *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+
+@pytest.mark.parametrize('module', ['modlist_core', 'modlist_cli'])
+def test_imports_stay_lazy(module):
+    code = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    assert _python('-c', code).stdout.strip() == ''
+
+
+def test_cli_records_its_import_time():
+    code = "import modlist_cli, modlist_core; print(sorted(modlist_core.STARTUP_TIMINGS))"
+    assert _python('-c', code).stdout.strip() == "['import']"
+
+
+def test_gui_script_hands_arguments_to_the_cli_before_tkinter():
+    result = _python('-X', 'importtime', 'modlistexportv3.py', '--help')
+    assert result.stdout.startswith('usage: modlist_cli.py')
+    assert 'tkinter' not in result.stderr
+
+
+def test_record_startup_goes_into_every_perf_report(monkeypatch):
+    monkeypatch.setattr(core, 'STARTUP_TIMINGS', {})
+    start = core.time.perf_counter() - 0.25
+    core.record_startup('import', start)
+    assert 0.25 <= core.STARTUP_TIMINGS['import'] < 5
+    assert core.PerfRecorder().to_dict()['startup'] == {'import_ms': core.STARTUP_TIMINGS['import'] * 1000}
+    monkeypatch.setattr(core, 'STARTUP_TIMINGS', {'import': 0.04, 'first_paint': 0.3})
+    assert core.PerfRecorder().to_dict()['startup'] == {'import_ms': 40.0, 'first_paint_ms': 300.0}
+
+
+def test_first_paint_is_recorded_once_for_the_main_window():
+    tk_app = pytest.importorskip('modlistexportv3')
+
+    class Master:
+        def __init__(self):
+            self.idle, self.unbound = [], []
+
+        def unbind(self, sequence, binding):
+            self.unbound.append((sequence, binding))
+
+        def after_idle(self, *call):
+            self.idle.append(call)
+
+    class Event:
+        def __init__(self, widget):
+            self.widget = widget
+
+    app = object.__new__(tk_app.ModlistExporterApp)
+    app.master = master = Master()
+    app.first_paint_binding = 'binding'
+    app._on_first_map(Event(object()))  # A child widget being mapped
+    assert master.idle == []
+    app._on_first_map(Event(master))
+    app._on_first_map(Event(master))
+    assert master.unbound == [('<Map>', 'binding')]
+    assert master.idle == [(core.record_startup, 'first_paint', tk_app.STARTUP_START)]
@@ -0,0 +1,85 @@
+"""ExternalSorter: merge order across spilled runs and cleanup of the run files."""
+import random
+
+import pytest
+
+import modlist_core as core
+
+
+def _records(count, seed=7):
+    rng = random.Random(seed)
+    # Few distinct names (in mixed case) so ties have to keep their seq order
+    names = ['Sodium', 'lithium', 'Jade', 'mod menu', 'Iris', None]
+    return [core.ModRecord({'name': rng.choice(names), 'filename': f"mod{i}.jar"}) for i in range(count)]
+
+
+def _expected(records):
+    table = core.ModTable(records)
+    table.sort('name')
+    return [record['filename'] for record in table]
+
+
+def _files(records):
+    return [record['filename'] for record in records]
+
+
+@pytest.mark.parametrize('run_size', [1, 3, 7, 50, 1000])
+def test_merge_matches_in_memory_sort(tmp_path, run_size):
+    records = _records(50)
+    with core.ExternalSorter(run_size=run_size, temp_dir=tmp_path) as sorter:
+        for record in records:
+            sorter.add(record)
+        assert len(sorter.runs) == 50 // run_size
+        assert len(sorter) == 50
+        assert _files(sorter) == _expected(records)
+
+
+def test_ties_follow_seq_not_arrival(tmp_path):
+    records = _records(30)
+    order = list(range(30))
+    random.Random(3).shuffle(order)  # Out-of-order completion, as from the extract pool
+    with core.ExternalSorter(run_size=4, temp_dir=tmp_path) as sorter:
+        for seq in order:
+            sorter.add(records[seq], seq)
+        assert _files(sorter) == _expected(records)
+
+
+def test_repeated_iteration_and_later_adds(tmp_path):
+    records = _records(20)
+    with core.ExternalSorter(run_size=6, temp_dir=tmp_path) as sorter:
+        for record in records[:10]:
+            sorter.add(record)
+        assert _files(sorter) == _expected(records[:10])
+        assert _files(sorter) == _expected(records[:10])
+        for record in records[10:]:
+            sorter.add(record)
+        assert _files(sorter) == _expected(records)
+
+
+def test_runs_keep_the_records_intact(tmp_path):
+    record = core.ModRecord({'name': 'Nested', 'filename': 'a.jar', 'links': {'Homepage': 'https://example.invalid'},
+                             'nested': [core.ModRecord({'name': 'Inner', 'filename': 'b.jar'})]})
+    with core.ExternalSorter(run_size=1, temp_dir=tmp_path) as sorter:
+        sorter.add(record)
+        assert list(sorter) == [record]
+
+
+def test_close_removes_every_run(tmp_path):
+    sorter = core.ExternalSorter(run_size=2, temp_dir=tmp_path)
+    for record in _records(9):
+        sorter.add(record)
+    runs = list(sorter.runs)
+    assert len(runs) == 4 and sorted(str(path) for path in tmp_path.iterdir()) == sorted(runs)
+    sorter.close()
+    assert list(tmp_path.iterdir()) == []
+    assert list(sorter) == []
+    sorter.close()  # Closing twice is harmless
+
+
+def test_context_manager_cleans_up_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with core.ExternalSorter(run_size=2, temp_dir=tmp_path) as sorter:
+            for record in _records(6):
+                sorter.add(record)
+            raise RuntimeError
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,130 @@
+"""_MiniTomlParser (the fallback without tomllib) against tomllib on real mod metadata."""
+import pytest
+
+import modlist_core as core
+
+tomllib = pytest.importorskip('tomllib')
+
+# Forge MDK mods.toml, as shipped in countless mods (comments, multi-line strings, dotted tables)
+FORGE_MODS_TOML = '''
+# This is an example mods.toml file. It contains the data relating to the loading mods.
+modLoader="javafml" #mandatory
+loaderVersion="[47,)" #mandatory This is typically bumped every Minecraft version by Forge.
+license="All rights reserved"
+issueTrackerURL="https://change.me.to.your.issue.tracker.example.invalid/" #optional
+
+[[mods]] #mandatory
+modId="examplemod" #mandatory
+version="1.0.0" #mandatory
+displayName="Example Mod" #mandatory
+updateJSONURL="https://change.me.example.invalid/updates.json" #optional
+displayURL="https://change.me.to.your.mods.homepage.example.invalid/" #optional
+logoFile="examplemod.png" #optional
+credits="Thanks for this example mod goes to Java" #optional
+authors="Love, Cheese and small house plants" #optional
+displayTest="MATCH_VERSION"
+description=\'\'\'
+This is a long form description of the mod. You can write whatever you want here
+
+Have some lorem ipsum.
+\'\'\'
+
+[[dependencies.examplemod]] #optional
+    modId="forge" #mandatory
+    mandatory=true #mandatory
+    versionRange="[47,)" #mandatory
+    ordering="NONE"
+    side="BOTH"
+
+[[dependencies.examplemod]]
+    modId="minecraft"
+    mandatory=true
+    versionRange="[1.20.1,1.21)"
+    ordering="NONE"
+    side="BOTH"
+'''
+
+# NeoForge neoforge.mods.toml (type instead of mandatory, [[accessTransformers]], [modproperties])
+NEOFORGE_MODS_TOML = """
+modLoader = "javafml"
+loaderVersion = "[4,)"
+license = 'MIT'
+
+[[mods]]
+modId = "examplemod"
+version = "21.1.0-beta"
+displayName = "Example \\"Quoted\\" Mod"
+authors = "Someone"
+description = '''Literal ''multi-line''
+string with C:\\paths\\kept'''
+
+[[mixins]]
+config = "examplemod.mixins.json"
+
+[[accessTransformers]]
+file = "META-INF/accesstransformer.cfg"
+
+[[dependencies.examplemod]]
+modId = "neoforge"
+type = "required"
+versionRange = "[21.1.0,)"
+ordering = "NONE"
+side = "BOTH"
+
+[[dependencies.examplemod]]
+modId = "jei"
+type = "optional"
+versionRange = "[19,)"
+ordering = "AFTER"
+side = "CLIENT"
+
+[modproperties.examplemod]
+catalogueItemIcon = "minecraft:diamond"
+configBackground = { texture = "minecraft:textures/block/dirt.png", tint = [0x40, 0x40, 0x40] }
+"""
+
+EDGE_CASES = """
+bare-key_1 = 1_000
+"quoted key" = -0.5e3
+site."github.com".stars = +12
+flags = [ true, false, ]
+nested = [[1, 2], ["a", 'b']]
+unicode = "caf\\u00e9 \\U0001F600"
+hex = 0xff
+oct = 0o17
+bin = 0b101
+empty = {}
+multi = \"\"\"\\
+    folded \\
+    line\"\"\"
+
+[a.b]
+c = 1
+[a]
+d = 2
+"""
+
+
+@pytest.mark.parametrize('text', [FORGE_MODS_TOML, NEOFORGE_MODS_TOML, EDGE_CASES],
+                         ids=['forge', 'neoforge', 'edge-cases'])
+def test_matches_tomllib(text):
+    assert core._MiniTomlParser(text).parse() == tomllib.loads(text)
+
+
+def test_parse_toml_feeds_the_mods_toml_parser():
+    data = core.parse_toml(FORGE_MODS_TOML)
+    assert data['mods'][0]['modId'] == 'examplemod'
+    assert [dep['modId'] for dep in data['dependencies']['examplemod']] == ['forge', 'minecraft']
+
+
+@pytest.mark.parametrize('text', [
+    'key = "unterminated',
+    'key = [1, 2',
+    '[table\nkey = 1',
+    'key = 1\nkey = 2',
+    'key = "bad \\q escape"',
+    '= 1',
+])
+def test_malformed_input_raises_value_error(text):
+    with pytest.raises(ValueError):
+        core._MiniTomlParser(text).parse()
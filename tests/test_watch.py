@@ -0,0 +1,222 @@
+"""FolderWatcher (polling and inotify), apply_watch_changes and the CLI watch loop."""
+import argparse
+import errno
+import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+import zipfile
+
+import pytest
+
+import modlist_core as core
+import modlist_cli
+
+
+@pytest.fixture(autouse=True)
+def fast_watch(monkeypatch):
+    monkeypatch.setattr(core, 'WATCH_POLL_MIN_SECONDS', 0.02)
+    monkeypatch.setattr(core, 'WATCH_POLL_MAX_SECONDS', 0.05)
+    monkeypatch.setattr(core, 'WATCH_SETTLE_SECONDS', 0.05)
+    monkeypatch.setattr(core, 'WATCH_STOP_CHECK_SECONDS', 0.02)
+
+
+def _write_jar(path, mod_id, version='1.0'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version,
+                                                    'name': mod_id.title()}))
+
+
+def _inotify_available():
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        core._Inotify().close()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+class Watching:
+    """Runs FolderWatcher.changes() on a thread and hands out its change sets."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        for changes in self.watcher.changes():
+            self.queue.put(changes)
+
+    def next(self, timeout=5):
+        changes = self.queue.get(timeout=timeout)
+        return {key: sorted(os.path.basename(item if isinstance(item, str) else item[0]) for item in changes[key])
+                for key in ('added', 'changed', 'removed')}
+
+    def stop(self):
+        self.watcher.stop_event.set()
+        self.thread.join(5)
+        assert not self.thread.is_alive()
+
+
+MODES = [False, pytest.param(True, marks=pytest.mark.skipif(not _inotify_available(), reason="no inotify"))]
+
+
+@pytest.mark.parametrize('use_inotify', MODES, ids=['polling', 'inotify'])
+def test_reports_added_changed_and_removed(tmp_path, use_inotify):
+    _write_jar(tmp_path / 'a.jar', 'a')
+    watcher = core.FolderWatcher(tmp_path, use_inotify=use_inotify)
+    assert watcher.mode == ('inotify' if use_inotify else 'polling')
+    watching = Watching(watcher)
+    try:
+        _write_jar(tmp_path / 'sub' / 'b.jar', 'b')
+        assert watching.next() == {'added': ['b.jar'], 'changed': [], 'removed': []}
+        _write_jar(tmp_path / 'a.jar', 'a', version='2.0-with-a-longer-version')
+        assert watching.next() == {'added': [], 'changed': ['a.jar'], 'removed': []}
+        (tmp_path / 'notes.txt').write_text('not a jar')
+        (tmp_path / 'sub' / 'b.jar').unlink()
+        assert watching.next() == {'added': [], 'changed': [], 'removed': ['b.jar']}
+        assert watching.queue.empty()
+    finally:
+        watching.stop()
+
+
+@pytest.mark.parametrize('use_inotify', MODES, ids=['polling', 'inotify'])
+def test_recreated_subfolder_is_watched_again(tmp_path, use_inotify):
+    _write_jar(tmp_path / 'sub' / 'a.jar', 'a')
+    watching = Watching(core.FolderWatcher(tmp_path, use_inotify=use_inotify))
+    try:
+        shutil.rmtree(tmp_path / 'sub')
+        assert watching.next() == {'added': [], 'changed': [], 'removed': ['a.jar']}
+        (tmp_path / 'sub').mkdir()
+        time.sleep(0.2)  # Let the watcher notice the empty folder first
+        _write_jar(tmp_path / 'sub' / 'b.jar', 'b')
+        assert watching.next() == {'added': ['b.jar'], 'changed': [], 'removed': []}
+        if use_inotify:
+            assert str(tmp_path / 'sub') in watching.watcher.inotify.watched
+    finally:
+        watching.stop()
+
+
+@pytest.mark.skipif(not _inotify_available(), reason="no inotify")
+def test_falls_back_to_polling_when_out_of_watches(tmp_path, monkeypatch):
+    original = core._Inotify.add_watch
+
+    def add_watch(self, directory):
+        if os.path.basename(directory) == 'full':
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), directory)
+        original(self, directory)
+
+    monkeypatch.setattr(core._Inotify, 'add_watch', add_watch)
+    (tmp_path / 'full').mkdir()
+    watcher = core.FolderWatcher(tmp_path, use_inotify=True)
+    assert watcher.mode == 'polling' and watcher.inotify is None
+    watching = Watching(watcher)
+    try:
+        _write_jar(tmp_path / 'full' / 'a.jar', 'a')
+        assert watching.next() == {'added': ['a.jar'], 'changed': [], 'removed': []}
+    finally:
+        watching.stop()
+
+
+@pytest.mark.skipif(not _inotify_available(), reason="no inotify")
+def test_inotify_forgets_dropped_watches(tmp_path):
+    inotify = core._Inotify()
+    try:
+        (tmp_path / 'sub').mkdir()
+        inotify.add_watch(str(tmp_path))
+        inotify.add_watch(str(tmp_path / 'sub'))
+        assert not inotify.wait(0.01)
+        (tmp_path / 'sub').rmdir()
+        assert inotify.wait(1)
+        assert list(inotify.watched) == [str(tmp_path)]
+        with pytest.raises(OSError):
+            inotify.add_watch(str(tmp_path / 'missing'))
+    finally:
+        inotify.close()
+
+
+def test_stop_event_ends_an_idle_watcher(tmp_path):
+    stop_event = threading.Event()
+    watching = Watching(core.FolderWatcher(tmp_path, stop_event=stop_event, use_inotify=False))
+    stop_event.set()
+    watching.thread.join(2)
+    assert not watching.thread.is_alive() and watching.queue.empty()
+
+
+def test_apply_watch_changes(tmp_path):
+    for name in ('a', 'b', 'c'):
+        _write_jar(tmp_path / f'{name}.jar', name)
+    entries = core.find_jar_entries(tmp_path)
+    mods, _ = core.extract_entries(entries)
+    scan_index = core.build_scan_index(entries, mods)
+    by_name = {mod['filename']: mod for mod in mods}
+
+    (tmp_path / 'a.jar').unlink()
+    _write_jar(tmp_path / 'b.jar', 'b', version='2.0.0')
+    _write_jar(tmp_path / 'd.jar', 'd')
+    listing = {entry[1]: entry for entry in core.find_jar_entries(tmp_path)}
+    changes = {'added': [listing['d.jar']], 'changed': [listing['b.jar']],
+               'removed': [os.path.abspath(tmp_path / 'a.jar')], 'entries': list(listing.values())}
+    new_mods, _ = core.extract_entries(changes['added'] + changes['changed'])
+    old_records, new_records = core.apply_watch_changes(scan_index, changes, new_mods)
+
+    assert old_records == [by_name['a.jar'], by_name['b.jar']]
+    assert new_records == new_mods
+    assert sorted(os.path.basename(path) for path in scan_index) == ['b.jar', 'c.jar', 'd.jar']
+    assert scan_index[os.path.abspath(tmp_path / 'b.jar')][2]['version'] == '2.0.0'
+    assert scan_index[os.path.abspath(tmp_path / 'c.jar')][2] is by_name['c.jar']
+    assert core.format_watch_changes(changes) == "1 added, 1 updated, 1 removed"
+
+
+class _OneChangeWatcher:
+    """Stands in for FolderWatcher in the CLI loop: yields one prepared change set."""
+    mode = 'test'
+
+    def __init__(self, changes):
+        self._changes = changes
+
+    def __call__(self, directory):
+        return self
+
+    def changes(self):
+        yield self._changes
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('watch_history', [False, True])
+def test_cli_watch_evicts_removed_jars_and_records_history_on_request(tmp_path, monkeypatch, watch_history):
+    mods_dir, out_dir = tmp_path / 'mods', tmp_path / 'out'
+    out_dir.mkdir()
+    _write_jar(mods_dir / 'a.jar', 'a')
+    _write_jar(mods_dir / 'b.jar', 'b')
+    cache = core.MetadataCache(tmp_path / 'cache.jsonl')
+    cache.loaded = True
+    entries = core.find_jar_entries(mods_dir)
+    mods, _ = core.extract_entries(entries, cache)
+    scan_index = core.build_scan_index(entries, mods)
+    assert len(cache.entries) == 2
+
+    (mods_dir / 'b.jar').unlink()
+    changes = {'added': [], 'changed': [], 'removed': [os.path.abspath(mods_dir / 'b.jar')],
+               'entries': core.find_jar_entries(mods_dir)}
+    monkeypatch.setattr(core, 'FolderWatcher', _OneChangeWatcher(changes))
+    recorded = []
+    monkeypatch.setattr(core, 'record_scan_history', lambda scans, perf=None: recorded.append(scans))
+    args = argparse.Namespace(jobs=1, processes=False, nested=False, hashes=False, enrich=False,
+                              watch_history=watch_history, no_history=False, formats=('json',))
+    modlist_cli.watch_directory(str(mods_dir), str(out_dir), 'modlist', args, cache, None, scan_index,
+                                lambda message: None)
+
+    assert list(cache.entries) == [os.path.abspath(mods_dir / 'a.jar')]
+    assert len(recorded) == (1 if watch_history else 0)
+    report = json.loads((out_dir / 'modlist.json').read_text(encoding='utf-8'))
+    assert [mod['filename'] for mod in report['mods']] == ['a.jar']